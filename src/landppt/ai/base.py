@@ -27,6 +27,9 @@ class TextContent(BaseModel):
     """Text content for multimodal messages"""
     type: MessageContentType = MessageContentType.TEXT
     text: str
+    # Prompt caching breakpoint, e.g. {"type": "ephemeral"}; the content up to and including
+    # this part should be byte-identical across requests to be reused
+    cache_control: Optional[Dict[str, str]] = None
 
 class AIMessage(BaseModel):
     """AI message model with multimodal support"""
@@ -42,6 +45,12 @@ class AIResponse(BaseModel):
     finish_reason: Optional[str] = None
     metadata: Dict[str, Any] = {}
 
+    @property
+    def truncated(self) -> bool:
+        """Whether generation stopped because the output token limit was reached"""
+        # OpenAI/Ollama report "length", Anthropic "max_tokens", Gemini "MAX_TOKENS"
+        return (self.finish_reason or "").lower() in ("length", "max_tokens")
+
 class AIProvider(ABC):
     """Abstract base class for AI providers"""
     
@@ -72,9 +81,15 @@ class AIProvider(ABC):
         messages: List[AIMessage],
         **kwargs
     ) -> AsyncGenerator[str, None]:
-        """Stream chat completion (optional)"""
+        """Stream chat completion (optional)
+
+        on_usage: optional callback receiving the usage dict once the response is complete
+        """
+        on_usage = kwargs.pop("on_usage", None)
         # Default implementation: return full response at once
         response = await self.chat_completion(messages, **kwargs)
+        if on_usage and response.usage:
+            on_usage(response.usage)
         yield response.content
     
     async def stream_text_completion(
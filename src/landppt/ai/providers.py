@@ -36,6 +36,10 @@ class OpenAIProvider(AIProvider):
         if isinstance(message.content, str):
             # Simple text message
             openai_message["content"] = message.content
+        elif isinstance(message.content, list) and all(isinstance(part, TextContent) for part in message.content):
+            # Text split into cacheable prefix/suffix parts: OpenAI caches identical prompt
+            # prefixes automatically, and plain strings work with every compatible endpoint
+            openai_message["content"] = "".join(part.text for part in message.content)
         elif isinstance(message.content, list):
             # Multimodal message
             content_parts = []
@@ -121,13 +125,15 @@ class OpenAIProvider(AIProvider):
             # Filter out think content from the response
             filtered_content = self._filter_think_content(choice.message.content)
 
+            prompt_details = getattr(response.usage, "prompt_tokens_details", None)
             return AIResponse(
                 content=filtered_content,
                 model=response.model,
                 usage={
                     "prompt_tokens": response.usage.prompt_tokens,
                     "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens
+                    "total_tokens": response.usage.total_tokens,
+                    "cached_tokens": getattr(prompt_details, "cached_tokens", None) or 0
                 },
                 finish_reason=choice.finish_reason,
                 metadata={"provider": "openai"}
@@ -152,11 +158,17 @@ class OpenAIProvider(AIProvider):
         return await self.chat_completion(messages, **kwargs)
 
     async def stream_chat_completion(self, messages: List[AIMessage], **kwargs) -> AsyncGenerator[str, None]:
-        """Stream chat completion using OpenAI with think tag filtering"""
+        """Stream chat completion using OpenAI with think tag filtering
+
+        on_usage: optional callback receiving the usage dict from the final chunk
+        """
         if not self.client:
             raise RuntimeError("OpenAI client not available")
 
+        on_usage = kwargs.pop("on_usage", None)
         config = self._merge_config(**kwargs)
+        # Usage (including cached prompt tokens) is only sent in a final chunk when requested
+        extra_args = {"stream_options": {"include_usage": True}} if on_usage else {}
 
         # Convert messages to OpenAI format with multimodal support
         openai_messages = [
@@ -171,13 +183,22 @@ class OpenAIProvider(AIProvider):
                 # max_tokens=config.get("max_tokens", 2000),
                 temperature=config.get("temperature", 0.7),
                 top_p=config.get("top_p", 1.0),
-                stream=True
+                stream=True,
+                **extra_args
             )
 
             buffer = ""
             in_think_tag = False
 
             async for chunk in stream:
+                if on_usage and getattr(chunk, "usage", None):
+                    prompt_details = getattr(chunk.usage, "prompt_tokens_details", None)
+                    on_usage({
+                        "prompt_tokens": chunk.usage.prompt_tokens,
+                        "completion_tokens": chunk.usage.completion_tokens,
+                        "total_tokens": chunk.usage.total_tokens,
+                        "cached_tokens": getattr(prompt_details, "cached_tokens", None) or 0
+                    })
                 if chunk.choices and chunk.choices[0].delta.content:
                     chunk_content = chunk.choices[0].delta.content
                     buffer += chunk_content
@@ -276,10 +297,13 @@ class AnthropicProvider(AIProvider):
             content_parts = []
             for part in message.content:
                 if isinstance(part, TextContent):
-                    content_parts.append({
+                    text_part = {
                         "type": "text",
                         "text": part.text
-                    })
+                    }
+                    if part.cache_control:
+                        text_part["cache_control"] = part.cache_control
+                    content_parts.append(text_part)
                 elif isinstance(part, ImageContent):
                     # Anthropic expects base64 data without the data URL prefix
                     image_url = part.image_url.get("url", "")
@@ -337,14 +361,21 @@ class AnthropicProvider(AIProvider):
             )
             
             content = response.content[0].text if response.content else ""
+
+            # input_tokens excludes tokens read from or written to the prompt cache
+            cache_read_tokens = getattr(response.usage, "cache_read_input_tokens", None) or 0
+            cache_creation_tokens = getattr(response.usage, "cache_creation_input_tokens", None) or 0
+            prompt_tokens = response.usage.input_tokens + cache_read_tokens + cache_creation_tokens
             
             return AIResponse(
                 content=content,
                 model=response.model,
                 usage={
-                    "prompt_tokens": response.usage.input_tokens,
+                    "prompt_tokens": prompt_tokens,
                     "completion_tokens": response.usage.output_tokens,
-                    "total_tokens": response.usage.input_tokens + response.usage.output_tokens
+                    "total_tokens": prompt_tokens + response.usage.output_tokens,
+                    "cached_tokens": cache_read_tokens,
+                    "cache_creation_tokens": cache_creation_tokens
                 },
                 finish_reason=response.stop_reason,
                 metadata={"provider": "anthropic"}
@@ -587,7 +618,9 @@ class GoogleProvider(AIProvider):
                 usage={
                     "prompt_tokens": response.usage_metadata.prompt_token_count if hasattr(response, 'usage_metadata') else 0,
                     "completion_tokens": response.usage_metadata.candidates_token_count if hasattr(response, 'usage_metadata') else 0,
-                    "total_tokens": response.usage_metadata.total_token_count if hasattr(response, 'usage_metadata') else 0
+                    "total_tokens": response.usage_metadata.total_token_count if hasattr(response, 'usage_metadata') else 0,
+                    # Gemini 2.x implicit caching reports reused prompt tokens here
+                    "cached_tokens": (getattr(response.usage_metadata, 'cached_content_token_count', None) or 0) if hasattr(response, 'usage_metadata') else 0
                 },
                 finish_reason=finish_reason,
                 metadata={"provider": "google"}
@@ -684,10 +717,10 @@ class OllamaProvider(AIProvider):
                 content=content,
                 model=config.get("model", self.model),
                 usage=self._calculate_usage(
-                    " ".join([msg.content for msg in messages]),
+                    " ".join([msg["content"] for msg in ollama_messages]),
                     content
                 ),
-                finish_reason="stop",
+                finish_reason=response.get("done_reason") or "stop",
                 metadata={"provider": "ollama"}
             )
             
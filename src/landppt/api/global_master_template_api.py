@@ -4,8 +4,8 @@ Global Master Template API endpoints
 
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import JSONResponse, FileResponse, Response
 
 from .models import (
     GlobalMasterTemplateCreate, GlobalMasterTemplateUpdate, GlobalMasterTemplateResponse,
@@ -13,6 +13,8 @@ from .models import (
     TemplateSelectionRequest, TemplateSelectionResponse
 )
 from ..services.global_master_template_service import GlobalMasterTemplateService
+from ..services.slide_thumbnail_service import slide_thumbnail_service
+from ..utils.http_middleware import etag_matches
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +67,16 @@ async def get_all_templates(
         raise HTTPException(status_code=500, detail="Failed to get templates")
 
 
+@router.get("/tags", response_model=dict)
+async def get_template_tags(active_only: bool = Query(True, description="Only include tags of active templates")):
+    """Get all distinct template tags (for tag filters)"""
+    try:
+        return {"tags": await template_service.get_all_tags(active_only)}
+    except Exception as e:
+        logger.error(f"Failed to get template tags: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get template tags")
+
+
 @router.put("/{template_id}", response_model=dict)
 async def update_template(template_id: int, update_data: GlobalMasterTemplateUpdate):
     """Update a global master template"""
@@ -343,6 +355,34 @@ async def get_template_preview(template_id: int):
         raise HTTPException(status_code=500, detail="Failed to get template preview")
 
 
+@router.get("/{template_id}/preview-image")
+async def get_template_preview_image(
+    request: Request,
+    template_id: int,
+    v: Optional[str] = Query(None, description="Template version from the list response")
+):
+    """Get the rendered WebP preview of a template (404 when it cannot be rendered, the page falls back to an iframe)"""
+    try:
+        source = await template_service.get_preview_source(template_id)
+        if not source:
+            raise HTTPException(status_code=404, detail="Template not found")
+
+        cache_control = "private, max-age=31536000, immutable" if v == source["version"] else "private, no-cache"
+        headers = {"ETag": f'"{slide_thumbnail_service.content_key(source["html"])}"', "Cache-Control": cache_control}
+        if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        path = await slide_thumbnail_service.get_thumbnail(source["html"])
+        if path is None:
+            raise HTTPException(status_code=404, detail="Preview image unavailable", headers={"Cache-Control": "no-store"})
+        return FileResponse(path, media_type="image/webp", headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to get template preview image {template_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get template preview image")
+
+
 # Add increment usage endpoint for internal use
 @router.post("/{template_id}/increment-usage", response_model=dict)
 async def increment_template_usage(template_id: int):
@@ -566,10 +566,12 @@ async def view_image(
         if not image_path.exists():
             raise HTTPException(status_code=404, detail="Image file not found")
 
+        # 图片ID与内容一一对应，可长期缓存
         return FileResponse(
             path=str(image_path),
             media_type=f"image/{image_info.metadata.format.value}",
-            filename=image_info.filename
+            filename=image_info.filename,
+            headers={"Cache-Control": "public, max-age=31536000, immutable"}
         )
 
     except HTTPException:
@@ -581,27 +583,35 @@ async def view_image(
 
 @router.get("/api/image/thumbnail/{image_id}")
 async def get_image_thumbnail(
-    image_id: str
+    image_id: str,
+    request: Request,
+    size: Optional[str] = None
 ):
-    """获取图片缩略图"""
+    """获取图片缩略图（size: gallery / strip / preview，格式按 Accept 头选择 AVIF、WebP 或 JPEG）"""
     try:
         image_service = get_image_service()
 
         # 尝试获取缩略图
-        thumbnail_path = await image_service.get_thumbnail(image_id)
+        try:
+            thumbnail = await image_service.get_thumbnail(image_id, size, request.headers.get("accept", ""))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        if thumbnail_path and Path(thumbnail_path).exists():
+        if thumbnail and Path(thumbnail[0]).exists():
+            # 缩略图与图片ID一一对应，可长期缓存；格式随 Accept 变化
             return FileResponse(
-                path=str(thumbnail_path),
-                media_type="image/jpeg"
+                path=thumbnail[0],
+                media_type=thumbnail[1],
+                headers={"Cache-Control": "public, max-age=31536000, immutable", "Vary": "Accept"}
             )
 
-        # 如果没有缩略图，返回原图
+        # 缩略图尚未生成（或生成失败）时返回原图，不缓存以便下次取到缩略图
         image_info = await image_service.get_image(image_id)
         if image_info and image_info.local_path and Path(image_info.local_path).exists():
             return FileResponse(
                 path=str(image_info.local_path),
-                media_type=f"image/{image_info.metadata.format.value}"
+                media_type=f"image/{image_info.metadata.format.value}",
+                headers={"Cache-Control": "no-cache"}
             )
 
         raise HTTPException(status_code=404, detail="Thumbnail not found")
@@ -879,6 +889,7 @@ async def update_image_info(
         # 通过重新保存元数据来更新信息
         cache_key = image_service.cache_manager._generate_cache_key(image_info)
         await image_service.cache_manager._save_image_metadata(cache_key, image_info)
+        image_service.update_cached_image_index(image_info)
 
         return {
             "success": True,
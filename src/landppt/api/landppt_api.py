@@ -22,6 +22,7 @@ from ..services.file_processor import FileProcessor
 from ..services.deep_research_service import DEEPResearchService
 from ..services.research_report_generator import ResearchReportGenerator
 from ..core.config import ai_config
+from ..auth.middleware import get_current_admin_user
 
 
 def filter_think_tags(content: str) -> str:
@@ -1198,3 +1199,40 @@ async def get_available_research_providers():
     except Exception as e:
         logger.error(f"Error getting research providers: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting research providers: {str(e)}")
+
+
+# Research Cache Administration
+
+@router.get("/research/cache/stats")
+async def get_research_cache_stats(user: User = Depends(get_current_admin_user)):
+    """Get research cache size and hit statistics"""
+    try:
+        from ..services.research.research_cache import research_cache
+        return {
+            "success": True,
+            "stats": await research_cache.get_stats()
+        }
+
+    except Exception as e:
+        logger.error(f"Error getting research cache stats: {e}")
+        raise HTTPException(status_code=500, detail=f"Error getting research cache stats: {str(e)}")
+
+
+@router.delete("/research/cache")
+async def purge_research_cache(namespace: Optional[str] = None, expired_only: bool = False,
+                               user: User = Depends(get_current_admin_user)):
+    """Purge the research cache (optionally a single namespace: search, page or analysis)"""
+    try:
+        from ..services.research.research_cache import research_cache
+        deleted = await research_cache.purge(namespace, expired_only)
+        return {
+            "success": True,
+            "deleted": deleted,
+            "message": f"Purged {deleted} research cache entries"
+        }
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error purging research cache: {e}")
+        raise HTTPException(status_code=500, detail=f"Error purging research cache: {str(e)}")
@@ -73,9 +73,24 @@ class AIConfig(BaseSettings):
     research_enable_content_extraction: bool = Field(default=True, env="RESEARCH_ENABLE_CONTENT_EXTRACTION")
     research_max_content_length: int = Field(default=5000, env="RESEARCH_MAX_CONTENT_LENGTH")
     research_extraction_timeout: int = Field(default=30, env="RESEARCH_EXTRACTION_TIMEOUT")
+    research_step_concurrency: int = Field(default=3, env="RESEARCH_STEP_CONCURRENCY")
+    research_provider_max_concurrent: int = Field(default=2, env="RESEARCH_PROVIDER_MAX_CONCURRENT")
+    research_provider_min_interval: float = Field(default=1.0, env="RESEARCH_PROVIDER_MIN_INTERVAL")
+    research_cache_enabled: bool = Field(default=True, env="RESEARCH_CACHE_ENABLED")
+    research_cache_ttl: int = Field(default=86400, env="RESEARCH_CACHE_TTL")  # seconds
+    research_cache_max_size_mb: int = Field(default=200, env="RESEARCH_CACHE_MAX_SIZE_MB")
+
+    # Export Queue Configuration
+    export_max_concurrent: int = Field(default=2, env="EXPORT_MAX_CONCURRENT")
+    export_max_queue_size: int = Field(default=20, env="EXPORT_MAX_QUEUE_SIZE")
+    export_max_jobs_per_user: int = Field(default=3, env="EXPORT_MAX_JOBS_PER_USER")
 
     # Apryse SDK Configuration (for PPTX export functionality)
     apryse_license_key: Optional[str] = Field(default=None, env="APRYSE_LICENSE_KEY")
+    pdf_to_pptx_pool_size: int = Field(default=2, env="PDF_TO_PPTX_POOL_SIZE")  # 0 = one subprocess per job
+    pdf_to_pptx_worker_max_jobs: int = Field(default=50, env="PDF_TO_PPTX_WORKER_MAX_JOBS")
+    pdf_to_pptx_worker_max_memory_mb: int = Field(default=1024, env="PDF_TO_PPTX_WORKER_MAX_MEMORY_MB")
+    pdf_to_pptx_timeout: int = Field(default=300, env="PDF_TO_PPTX_TIMEOUT")  # seconds per job
 
     # Provider Selection
     default_ai_provider: str = Field(default="openai", env="DEFAULT_AI_PROVIDER")
@@ -108,12 +123,16 @@ class AIConfig(BaseSettings):
     # Parallel Generation Configuration
     enable_parallel_generation: bool = Field(default=False, env="ENABLE_PARALLEL_GENERATION")
     parallel_slides_count: int = Field(default=3, env="PARALLEL_SLIDES_COUNT")
+    speech_script_concurrency: int = Field(default=4, env="SPEECH_SCRIPT_CONCURRENCY")
+    # 项目事件跨worker转发：auto（WEB_CONCURRENCY 大于1时启用）/ true / false
+    project_event_relay: str = Field(default="auto", env="PROJECT_EVENT_RELAY")
     
     # Feature Flags
     enable_network_mode: bool = Field(default=True, env="ENABLE_NETWORK_MODE")
     enable_local_models: bool = Field(default=False, env="ENABLE_LOCAL_MODELS")
     enable_streaming: bool = Field(default=True, env="ENABLE_STREAMING")
     enable_auto_layout_repair: bool = Field(default=False, env="ENABLE_AUTO_LAYOUT_REPAIR")
+    enable_layout_geometry_check: bool = Field(default=True, env="ENABLE_LAYOUT_GEOMETRY_CHECK")  # only call the vision model when DOM geometry finds problems
     
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -417,7 +436,9 @@ def reload_ai_config():
     # Update parallel generation configuration
     ai_config.enable_parallel_generation = os.environ.get('ENABLE_PARALLEL_GENERATION', str(ai_config.enable_parallel_generation)).lower() == 'true'
     ai_config.parallel_slides_count = int(os.environ.get('PARALLEL_SLIDES_COUNT', str(ai_config.parallel_slides_count)))
+    ai_config.speech_script_concurrency = int(os.environ.get('SPEECH_SCRIPT_CONCURRENCY', str(ai_config.speech_script_concurrency)))
     ai_config.enable_auto_layout_repair = os.environ.get('ENABLE_AUTO_LAYOUT_REPAIR', str(ai_config.enable_auto_layout_repair)).lower() == 'true'
+    ai_config.enable_layout_geometry_check = os.environ.get('ENABLE_LAYOUT_GEOMETRY_CHECK', str(ai_config.enable_layout_geometry_check)).lower() == 'true'
 
     # Update Tavily configuration
     ai_config.tavily_api_key = os.environ.get('TAVILY_API_KEY', ai_config.tavily_api_key)
@@ -437,8 +458,21 @@ def reload_ai_config():
     ai_config.research_enable_content_extraction = os.environ.get('RESEARCH_ENABLE_CONTENT_EXTRACTION', str(ai_config.research_enable_content_extraction)).lower() == 'true'
     ai_config.research_max_content_length = int(os.environ.get('RESEARCH_MAX_CONTENT_LENGTH', str(ai_config.research_max_content_length)))
     ai_config.research_extraction_timeout = int(os.environ.get('RESEARCH_EXTRACTION_TIMEOUT', str(ai_config.research_extraction_timeout)))
+    ai_config.research_step_concurrency = int(os.environ.get('RESEARCH_STEP_CONCURRENCY', str(ai_config.research_step_concurrency)))
+    ai_config.research_provider_max_concurrent = int(os.environ.get('RESEARCH_PROVIDER_MAX_CONCURRENT', str(ai_config.research_provider_max_concurrent)))
+    ai_config.research_provider_min_interval = float(os.environ.get('RESEARCH_PROVIDER_MIN_INTERVAL', str(ai_config.research_provider_min_interval)))
+    ai_config.research_cache_enabled = os.environ.get('RESEARCH_CACHE_ENABLED', str(ai_config.research_cache_enabled)).lower() == 'true'
+    ai_config.research_cache_ttl = int(os.environ.get('RESEARCH_CACHE_TTL', str(ai_config.research_cache_ttl)))
+    ai_config.research_cache_max_size_mb = int(os.environ.get('RESEARCH_CACHE_MAX_SIZE_MB', str(ai_config.research_cache_max_size_mb)))
+    ai_config.export_max_concurrent = int(os.environ.get('EXPORT_MAX_CONCURRENT', str(ai_config.export_max_concurrent)))
+    ai_config.export_max_queue_size = int(os.environ.get('EXPORT_MAX_QUEUE_SIZE', str(ai_config.export_max_queue_size)))
+    ai_config.export_max_jobs_per_user = int(os.environ.get('EXPORT_MAX_JOBS_PER_USER', str(ai_config.export_max_jobs_per_user)))
 
     ai_config.apryse_license_key = os.environ.get('APRYSE_LICENSE_KEY', ai_config.apryse_license_key)
+    ai_config.pdf_to_pptx_pool_size = int(os.environ.get('PDF_TO_PPTX_POOL_SIZE', str(ai_config.pdf_to_pptx_pool_size)))
+    ai_config.pdf_to_pptx_worker_max_jobs = int(os.environ.get('PDF_TO_PPTX_WORKER_MAX_JOBS', str(ai_config.pdf_to_pptx_worker_max_jobs)))
+    ai_config.pdf_to_pptx_worker_max_memory_mb = int(os.environ.get('PDF_TO_PPTX_WORKER_MAX_MEMORY_MB', str(ai_config.pdf_to_pptx_worker_max_memory_mb)))
+    ai_config.pdf_to_pptx_timeout = int(os.environ.get('PDF_TO_PPTX_TIMEOUT', str(ai_config.pdf_to_pptx_timeout)))
 
 class AppConfig(BaseSettings):
     """Application configuration"""
@@ -462,6 +496,10 @@ class AppConfig(BaseSettings):
     
     # Cache Configuration
     cache_ttl: int = Field(default=3600, env="CACHE_TTL")  # 1 hour
+
+    # Response Compression Configuration (gzip/brotli + automatic ETag/304)
+    enable_response_compression: bool = Field(default=True, env="ENABLE_RESPONSE_COMPRESSION")
+    compression_min_size: int = Field(default=1024, env="COMPRESSION_MIN_SIZE")  # bytes
     
     model_config = {
         "case_sensitive": False,
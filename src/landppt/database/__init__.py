@@ -3,7 +3,10 @@ Database package for LandPPT
 """
 
 from .database import engine, SessionLocal, get_db, init_db, get_async_db
-from .models import Project, TodoBoard, TodoStage, ProjectVersion, SlideData, PPTTemplate
+from .models import (
+    Project, TodoBoard, TodoStage, ProjectVersion, SlideData, PPTTemplate, BackgroundTaskRecord, BackgroundTaskItem,
+    ProjectEvent, GlobalMasterTemplateTag
+)
 from .migrations import migration_manager
 from .health_check import health_checker
 from .service import DatabaseService
@@ -24,6 +27,10 @@ __all__ = [
     'ProjectVersion',
     'SlideData',
     'PPTTemplate',
+    'BackgroundTaskRecord',
+    'BackgroundTaskItem',
+    'ProjectEvent',
+    'GlobalMasterTemplateTag',
     'migration_manager',
     'health_checker',
     'DatabaseService',
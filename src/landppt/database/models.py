@@ -5,8 +5,8 @@ SQLAlchemy database models for LandPPT
 import time
 import hashlib
 from typing import Dict, Any, List, Optional
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, JSON, DateTime
-from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ForeignKey, JSON, DateTime, UniqueConstraint, Index
+from sqlalchemy.orm import relationship, Mapped, mapped_column, query_expression
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -204,7 +204,9 @@ class GlobalMasterTemplate(Base):
     template_name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     html_template: Mapped[str] = mapped_column(Text, nullable=False)
-    preview_image: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Base64 encoded preview image
+    preview_image: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # 用户提供的预览图URL（旧数据可能是base64）
+    # 列表查询加载的预览图（内联 data URL 不加载，见 GlobalMasterTemplateRepository._list_select）
+    list_preview_image: Mapped[Optional[str]] = query_expression()
     style_config: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)  # 样式配置
     tags: Mapped[List[str]] = mapped_column(JSON, nullable=True)  # 标签分类
     is_default: Mapped[bool] = mapped_column(Boolean, default=False)  # 是否为默认模板
@@ -215,6 +217,26 @@ class GlobalMasterTemplate(Base):
     updated_at: Mapped[float] = mapped_column(Float, default=time.time, onupdate=time.time)
 
 
+class GlobalMasterTemplateTag(Base):
+    """全局母版模板标签表（tags 字段的规范化索引，按标签筛选时不再扫描全部模板的JSON）"""
+    __tablename__ = "global_master_template_tags"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    template_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("global_master_templates.id", ondelete="CASCADE"), nullable=False
+    )
+    tag: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('template_id', 'tag', name='uq_global_master_template_tag'),
+        # 按标签查模板ID只需读索引
+        Index('idx_global_master_template_tags_tag', 'tag', 'template_id'),
+    )
+
+    def __repr__(self):
+        return f"<GlobalMasterTemplateTag(template_id={self.template_id}, tag='{self.tag}')>"
+
+
 class SpeechScript(Base):
     """演讲稿存储表"""
     __tablename__ = "speech_scripts"
@@ -247,3 +269,63 @@ class SpeechScript(Base):
 
     def __repr__(self):
         return f"<SpeechScript(id={self.id}, project_id='{self.project_id}', slide_index={self.slide_index})>"
+
+
+class BackgroundTaskRecord(Base):
+    """后台任务持久化表（多worker共享任务状态、进度和结果）"""
+    __tablename__ = "background_tasks"
+
+    task_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    task_type: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending", index=True)
+    progress: Mapped[float] = mapped_column(Float, default=0.0)
+    result: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    task_metadata: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    progress_data: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)  # 细粒度进度（如演讲稿逐页进度）
+    result_files: Mapped[Optional[List[str]]] = mapped_column(JSON, nullable=True)  # 结果文件路径，过期清理时一并删除
+
+    # 租约与心跳：执行中的worker定期续约，租约过期说明worker已退出
+    worker_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    lease_expires_at: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    heartbeat_at: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    created_at: Mapped[float] = mapped_column(Float, default=time.time)
+    updated_at: Mapped[float] = mapped_column(Float, default=time.time, onupdate=time.time, index=True)
+
+    def __repr__(self):
+        return f"<BackgroundTaskRecord(task_id='{self.task_id}', type='{self.task_type}', status='{self.status}')>"
+
+
+class BackgroundTaskItem(Base):
+    """后台任务的增量结果（如逐页完成的演讲稿），追加写入，避免每次更新进度时重写全部结果"""
+    __tablename__ = "background_task_items"
+    __table_args__ = (
+        UniqueConstraint('task_id', 'seq', name='uq_background_task_items_task_seq'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    task_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[float] = mapped_column(Float, default=time.time)
+
+    def __repr__(self):
+        return f"<BackgroundTaskItem(task_id='{self.task_id}', seq={self.seq})>"
+
+
+class ProjectEvent(Base):
+    """项目事件中转表（多worker之间转发待办进度、幻灯片保存等推送事件）"""
+    __tablename__ = "project_events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    username: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    project_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    payload: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+    worker_id: Mapped[str] = mapped_column(String(100), nullable=False)
+    created_at: Mapped[float] = mapped_column(Float, default=time.time, index=True)
+
+    def __repr__(self):
+        return f"<ProjectEvent(id={self.id}, project_id='{self.project_id}', type='{self.event_type}')>"
@@ -6,10 +6,13 @@ import time
 import logging
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, and_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, delete, and_, func, case
+from sqlalchemy.orm import selectinload, load_only, with_expression
 
-from .models import Project, TodoBoard, TodoStage, ProjectVersion, SlideData, PPTTemplate, GlobalMasterTemplate
+from .models import (
+    Project, TodoBoard, TodoStage, ProjectVersion, SlideData, PPTTemplate, GlobalMasterTemplate,
+    GlobalMasterTemplateTag
+)
 from ..api.models import PPTProject, TodoBoard as TodoBoardModel, TodoStage as TodoStageModel
 
 logger = logging.getLogger(__name__)
@@ -102,6 +105,25 @@ class ProjectRepository:
             await self.session.rollback()
             raise
     
+    async def get_feed_summary(self, project_id: str) -> Optional[Tuple[str, float]]:
+        """Get (title, updated_at) of a project without loading slides or relationships"""
+        stmt = select(Project.title, Project.updated_at).where(Project.project_id == project_id)
+        row = (await self.session.execute(stmt)).first()
+        return (row[0], row[1]) if row else None
+
+    async def get_slides_data_json(self, project_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Get only the legacy slides_data JSON column of a project"""
+        stmt = select(Project.slides_data).where(Project.project_id == project_id)
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def get_project_id_by_share_token(self, share_token: str) -> Optional[str]:
+        """Resolve an enabled share token to its project ID"""
+        stmt = select(Project.project_id).where(
+            Project.share_token == share_token,
+            Project.share_enabled == True
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
     async def delete(self, project_id: str) -> bool:
         """Delete project"""
         stmt = delete(Project).where(Project.project_id == project_id)
@@ -244,7 +266,7 @@ class SlideDataRepository:
         if existing_slide:
             # Update existing slide
             logger.info(f"📝 更新现有幻灯片: 数据库ID={existing_slide.id}, 项目ID={project_id}, 索引={slide_index}")
-            slide_data['updated_at'] = time.time()
+            slide_data.pop('updated_at', None)
 
             updated_fields = []
             for key, value in slide_data.items():
@@ -254,6 +276,10 @@ class SlideDataRepository:
                         setattr(existing_slide, key, value)
                         updated_fields.append(key)
 
+            # 内容没有变化时保留原更新时间，幻灯片修订号（变更订阅）只在真正修改时前进
+            if updated_fields:
+                existing_slide.updated_at = time.time()
+
             logger.info(f"📊 更新的字段: {updated_fields}")
             await self.session.commit()
             await self.session.refresh(existing_slide)
@@ -273,7 +299,42 @@ class SlideDataRepository:
         stmt = select(SlideData).where(SlideData.project_id == project_id).order_by(SlideData.slide_index)
         result = await self.session.execute(stmt)
         return result.scalars().all()
+
+    async def get_slides_revision(self, project_id: str) -> Tuple[int, Optional[float], Optional[float]]:
+        """Get (count, max updated_at, sum updated_at) of a project's slides without loading their content"""
+        stmt = select(
+            func.count(SlideData.id), func.max(SlideData.updated_at), func.sum(SlideData.updated_at)
+        ).where(SlideData.project_id == project_id)
+        count, latest, checksum = (await self.session.execute(stmt)).one()
+        return count or 0, latest, checksum
+
+    async def get_slides_updated_since(self, project_id: str, since: float) -> List[SlideData]:
+        """Get slides of a project updated after the given timestamp"""
+        stmt = select(SlideData).where(
+            SlideData.project_id == project_id,
+            SlideData.updated_at > since
+        ).order_by(SlideData.slide_index)
+        result = await self.session.execute(stmt)
+        return result.scalars().all()
     
+    async def get_slides_manifest(self, project_id: str) -> List[Any]:
+        """Get every slide field except html_content (rows ordered by slide_index)"""
+        stmt = select(
+            SlideData.slide_index, SlideData.slide_id, SlideData.title, SlideData.content_type,
+            SlideData.slide_metadata, SlideData.is_user_edited, SlideData.updated_at
+        ).where(SlideData.project_id == project_id).order_by(SlideData.slide_index)
+        result = await self.session.execute(stmt)
+        return result.all()
+
+    async def get_slide_by_index(self, project_id: str, slide_index: int) -> Optional[SlideData]:
+        """Get a single slide of a project by its index"""
+        stmt = select(SlideData).where(
+            SlideData.project_id == project_id,
+            SlideData.slide_index == slide_index
+        )
+        result = await self.session.execute(stmt)
+        return result.scalars().first()
+
     async def update_slide(self, slide_id: str, update_data: Dict[str, Any]) -> bool:
         """Update a specific slide"""
         update_data['updated_at'] = time.time()
@@ -325,7 +386,7 @@ class SlideDataRepository:
                 if slide_index in existing_slides:
                     # 更新现有幻灯片
                     existing_slide = existing_slides[slide_index]
-                    slide_data['updated_at'] = current_time
+                    slide_data.pop('updated_at', None)
 
                     # 只更新有变化的字段
                     has_changes = False
@@ -335,6 +396,7 @@ class SlideDataRepository:
                             has_changes = True
 
                     if has_changes:
+                        existing_slide.updated_at = current_time
                         updated_count += 1
                 else:
                     # 创建新幻灯片
@@ -439,15 +501,65 @@ class PPTTemplateRepository:
 class GlobalMasterTemplateRepository:
     """Repository for Global Master Template operations"""
 
+    # 列表只加载卡片需要的字段，不读取HTML模板、预览图和样式配置
+    LIST_COLUMNS = (
+        GlobalMasterTemplate.id, GlobalMasterTemplate.template_name, GlobalMasterTemplate.description,
+        GlobalMasterTemplate.tags, GlobalMasterTemplate.is_default, GlobalMasterTemplate.is_active,
+        GlobalMasterTemplate.usage_count, GlobalMasterTemplate.created_by,
+        GlobalMasterTemplate.created_at, GlobalMasterTemplate.updated_at
+    )
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
+    def _list_select(self):
+        # 预览图只在是URL时加载，内联的base64图片不随列表返回
+        stored_preview = case(
+            (GlobalMasterTemplate.preview_image.like('data:%'), None),
+            else_=GlobalMasterTemplate.preview_image
+        )
+        return select(GlobalMasterTemplate).options(
+            load_only(*self.LIST_COLUMNS),
+            with_expression(GlobalMasterTemplate.list_preview_image, stored_preview)
+        )
+
+    @staticmethod
+    def _normalize_tags(tags: Optional[List[str]]) -> List[str]:
+        """去除空白和重复的标签，保持原有顺序"""
+        normalized = []
+        for tag in tags or []:
+            tag = str(tag).strip()[:100]
+            if tag and tag not in normalized:
+                normalized.append(tag)
+        return normalized
+
+    async def _sync_tags(self, template_id: int, tags: Optional[List[str]]):
+        """用模板的 tags 字段重建标签索引（不提交，由调用方提交）"""
+        await self.session.execute(
+            delete(GlobalMasterTemplateTag).where(GlobalMasterTemplateTag.template_id == template_id)
+        )
+        for tag in self._normalize_tags(tags):
+            self.session.add(GlobalMasterTemplateTag(template_id=template_id, tag=tag))
+
+    def _tag_filter(self, tags: List[str]):
+        """模板必须包含全部指定标签，通过标签索引表查询"""
+        tags = self._normalize_tags(tags)
+        matching_ids = (
+            select(GlobalMasterTemplateTag.template_id)
+            .where(GlobalMasterTemplateTag.tag.in_(tags))
+            .group_by(GlobalMasterTemplateTag.template_id)
+            .having(func.count(GlobalMasterTemplateTag.tag) == len(tags))
+        )
+        return GlobalMasterTemplate.id.in_(matching_ids)
+
     async def create_template(self, template_data: Dict[str, Any]) -> GlobalMasterTemplate:
         """Create a new global master template"""
         template_data['created_at'] = time.time()
         template_data['updated_at'] = time.time()
         template = GlobalMasterTemplate(**template_data)
         self.session.add(template)
+        await self.session.flush()
+        await self._sync_tags(template.id, template.tags)
         await self.session.commit()
         await self.session.refresh(template)
         return template
@@ -464,9 +576,18 @@ class GlobalMasterTemplateRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_template_preview_source(self, template_id: int) -> Optional[Tuple[str, str, float]]:
+        """Get the name, HTML template and update time needed to render a template preview"""
+        stmt = select(
+            GlobalMasterTemplate.template_name, GlobalMasterTemplate.html_template, GlobalMasterTemplate.updated_at
+        ).where(GlobalMasterTemplate.id == template_id)
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        return tuple(row) if row else None
+
     async def get_all_templates(self, active_only: bool = True) -> List[GlobalMasterTemplate]:
-        """Get all global master templates"""
-        stmt = select(GlobalMasterTemplate)
+        """Get all global master templates (list fields only)"""
+        stmt = self._list_select()
         if active_only:
             stmt = stmt.where(GlobalMasterTemplate.is_active == True)
         stmt = stmt.order_by(GlobalMasterTemplate.is_default.desc(), GlobalMasterTemplate.usage_count.desc())
@@ -474,14 +595,14 @@ class GlobalMasterTemplateRepository:
         return result.scalars().all()
 
     async def get_templates_by_tags(self, tags: List[str], active_only: bool = True) -> List[GlobalMasterTemplate]:
-        """Get templates by tags"""
-        stmt = select(GlobalMasterTemplate)
+        """Get templates by tags (list fields only)"""
+        stmt = self._list_select()
         if active_only:
             stmt = stmt.where(GlobalMasterTemplate.is_active == True)
 
-        # Filter by tags (any tag matches)
-        for tag in tags:
-            stmt = stmt.where(GlobalMasterTemplate.tags.contains([tag]))
+        # Filter by tags (all tags must match)
+        if self._normalize_tags(tags):
+            stmt = stmt.where(self._tag_filter(tags))
 
         stmt = stmt.order_by(GlobalMasterTemplate.usage_count.desc())
         result = await self.session.execute(stmt)
@@ -494,11 +615,11 @@ class GlobalMasterTemplateRepository:
         limit: int = 6,
         search: Optional[str] = None
     ) -> Tuple[List[GlobalMasterTemplate], int]:
-        """Get templates with pagination"""
+        """Get templates with pagination (list fields only)"""
         from sqlalchemy import func, or_
 
         # Base query
-        stmt = select(GlobalMasterTemplate)
+        stmt = self._list_select()
         count_stmt = select(func.count(GlobalMasterTemplate.id))
 
         if active_only:
@@ -537,20 +658,20 @@ class GlobalMasterTemplateRepository:
         limit: int = 6,
         search: Optional[str] = None
     ) -> Tuple[List[GlobalMasterTemplate], int]:
-        """Get templates by tags with pagination"""
+        """Get templates by tags with pagination (list fields only)"""
         from sqlalchemy import func, or_
 
         # Base query
-        stmt = select(GlobalMasterTemplate)
+        stmt = self._list_select()
         count_stmt = select(func.count(GlobalMasterTemplate.id))
 
         if active_only:
             stmt = stmt.where(GlobalMasterTemplate.is_active == True)
             count_stmt = count_stmt.where(GlobalMasterTemplate.is_active == True)
 
-        # Filter by tags (any tag matches)
-        for tag in tags:
-            tag_filter = GlobalMasterTemplate.tags.contains([tag])
+        # Filter by tags (all tags must match)
+        if self._normalize_tags(tags):
+            tag_filter = self._tag_filter(tags)
             stmt = stmt.where(tag_filter)
             count_stmt = count_stmt.where(tag_filter)
 
@@ -580,12 +701,18 @@ class GlobalMasterTemplateRepository:
         update_data['updated_at'] = time.time()
         stmt = update(GlobalMasterTemplate).where(GlobalMasterTemplate.id == template_id).values(**update_data)
         result = await self.session.execute(stmt)
+        if result.rowcount > 0 and 'tags' in update_data:
+            await self._sync_tags(template_id, update_data['tags'])
         await self.session.commit()
         return result.rowcount > 0
 
     async def delete_template(self, template_id: int) -> bool:
         """Delete a global master template"""
         try:
+            # SQLite默认不执行外键级联，先删除标签索引
+            await self.session.execute(
+                delete(GlobalMasterTemplateTag).where(GlobalMasterTemplateTag.template_id == template_id)
+            )
             stmt = delete(GlobalMasterTemplate).where(GlobalMasterTemplate.id == template_id)
             result = await self.session.execute(stmt)
             await self.session.commit()
@@ -633,6 +760,29 @@ class GlobalMasterTemplateRepository:
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_all_tags(self, active_only: bool = True) -> List[str]:
+        """Get all distinct template tags from the tag index"""
+        stmt = select(GlobalMasterTemplateTag.tag).distinct()
+        if active_only:
+            stmt = stmt.join(GlobalMasterTemplate, GlobalMasterTemplate.id == GlobalMasterTemplateTag.template_id)
+            stmt = stmt.where(GlobalMasterTemplate.is_active == True)
+        result = await self.session.execute(stmt.order_by(GlobalMasterTemplateTag.tag))
+        return list(result.scalars().all())
+
+    async def rebuild_missing_tag_index(self) -> int:
+        """为还没有标签索引的模板（标签表创建之前保存的模板）建立索引，返回处理的模板数"""
+        indexed_ids = select(GlobalMasterTemplateTag.template_id)
+        stmt = select(GlobalMasterTemplate.id, GlobalMasterTemplate.tags).where(
+            GlobalMasterTemplate.id.not_in(indexed_ids)
+        )
+        result = await self.session.execute(stmt)
+        rows = [(template_id, tags) for template_id, tags in result.all() if self._normalize_tags(tags)]
+        for template_id, tags in rows:
+            await self._sync_tags(template_id, tags)
+        if rows:
+            await self.session.commit()
+        return len(rows)
+
 
 
     async def delete_templates_by_project_id(self, project_id: str) -> bool:
@@ -4,6 +4,7 @@ Database service layer for converting between database models and API models
 
 import time
 import uuid
+import hashlib
 import logging
 from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -68,20 +69,10 @@ class DatabaseService:
         slides_data = []
         if db_project.slides:
             # 从slide_data表中加载实际的幻灯片数据
-            slides_data = []
-            for slide in sorted(db_project.slides, key=lambda x: x.slide_index):
-                slide_dict = {
-                    "slide_id": slide.slide_id,
-                    "title": slide.title,
-                    "content_type": slide.content_type,
-                    "html_content": slide.html_content,
-                    "metadata": slide.slide_metadata or {},
-                    "is_user_edited": slide.is_user_edited,
-                    "created_at": slide.created_at,
-                    "updated_at": slide.updated_at,
-                    "page_number": slide.slide_index + 1  # 添加page_number字段，从slide_index转换而来
-                }
-                slides_data.append(slide_dict)
+            slides_data = [
+                self._convert_db_slide_to_dict(slide)
+                for slide in sorted(db_project.slides, key=lambda x: x.slide_index)
+            ]
             logger.debug(f"Loaded {len(slides_data)} slides from slide_data table for project {db_project.project_id}")
         elif db_project.slides_data:
             # 如果slide_data表中没有数据，回退到使用projects表中的slides_data字段
@@ -107,6 +98,21 @@ class DatabaseService:
             updated_at=db_project.updated_at
         )
     
+    @staticmethod
+    def _convert_db_slide_to_dict(slide) -> Dict[str, Any]:
+        """Convert a slide_data row to the slides_data dict format"""
+        return {
+            "slide_id": slide.slide_id,
+            "title": slide.title,
+            "content_type": slide.content_type,
+            "html_content": slide.html_content,
+            "metadata": slide.slide_metadata or {},
+            "is_user_edited": slide.is_user_edited,
+            "created_at": slide.created_at,
+            "updated_at": slide.updated_at,
+            "page_number": slide.slide_index + 1  # 添加page_number字段，从slide_index转换而来
+        }
+
     async def create_project(self, request: PPTGenerationRequest, username: str) -> PPTProject:
         """Create a new project with todo board"""
         project_id = str(uuid.uuid4())
@@ -411,6 +417,159 @@ class DatabaseService:
             logger.error(f"❌ 错误堆栈: {traceback.format_exc()}")
             return False
 
+    # 变更订阅的增量查询额外回看的时间窗口（秒）。幻灯片的updated_at在提交前生成，
+    # 并发写入时较早的时间戳可能晚于较新的时间戳提交，回看窗口内的幻灯片会被重复返回以免遗漏
+    SLIDES_FEED_GRACE_SECONDS = 10.0
+
+    @staticmethod
+    def to_revision(timestamp: Optional[float]) -> int:
+        """Convert an updated_at timestamp to an integer revision (microseconds)"""
+        return int(round((timestamp or 0) * 1_000_000))
+
+    async def get_slides_feed_state(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the current revision and ETag of a project's slides without loading slide content
+
+        The revision is the latest slide updated_at in microseconds; the ETag also covers the slide
+        count and the sum of all updated_at values so deletions and out-of-order writes change it.
+        """
+        summary = await self.project_repo.get_feed_summary(project_id)
+        if not summary:
+            return None
+        title, project_updated_at = summary
+
+        count, latest, checksum = await self.slide_repo.get_slides_revision(project_id)
+        if count:
+            source, revision = "slides", self.to_revision(latest)
+        else:
+            # slide_data表中没有记录时回退到projects表中的slides_data字段
+            legacy_slides = await self.project_repo.get_slides_data_json(project_id) or []
+            count, checksum = len(legacy_slides), project_updated_at
+            source, revision = "project", self.to_revision(project_updated_at) if legacy_slides else 0
+
+        digest = hashlib.md5(f"{source}:{count}:{revision}:{checksum!r}:{title}".encode("utf-8")).hexdigest()[:20]
+        return {
+            "project_id": project_id,
+            "project_title": title,
+            "revision": revision,
+            "total_slides": count,
+            "source": source,
+            "etag": f'W/"{digest}"'
+        }
+
+    async def get_slides_changes(self, project_id: str, since: Optional[int] = None,
+                                 state: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the slides changed after revision `since` (all slides when `since` is empty)
+
+        Clients replace slides by page_number and drop pages beyond total_slides.
+        """
+        state = state or await self.get_slides_feed_state(project_id)
+        if not state:
+            return None
+
+        full = not since
+        if state["source"] == "slides":
+            if full:
+                rows = await self.slide_repo.get_slides_by_project_id(project_id)
+            else:
+                rows = await self.slide_repo.get_slides_updated_since(
+                    project_id, since / 1_000_000 - self.SLIDES_FEED_GRACE_SECONDS
+                )
+            changed = [
+                dict(self._convert_db_slide_to_dict(slide), revision=self.to_revision(slide.updated_at))
+                for slide in rows
+            ]
+        elif full or state["revision"] > since:
+            legacy_slides = await self.project_repo.get_slides_data_json(project_id) or []
+            full = True
+            changed = [
+                dict(slide, page_number=slide.get("page_number") or index + 1, revision=state["revision"])
+                for index, slide in enumerate(legacy_slides)
+            ]
+        else:
+            changed = []
+
+        result = {key: value for key, value in state.items() if key not in ("source", "etag")}
+        result.update({"since": since or 0, "full": full, "changed_slides": changed})
+        return result
+
+    @staticmethod
+    def slide_hash(*parts: Any) -> str:
+        """Short hash identifying one version of a slide (used in per-slide URLs and ETags)"""
+        return hashlib.md5(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:16]
+
+    async def get_slides_manifest(self, project_id: str,
+                                  state: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the slide manifest of a project: every slide's fields except html_content, plus a hash
+        that changes whenever the slide changes, so clients can fetch and cache slides one by one
+        """
+        state = state or await self.get_slides_feed_state(project_id)
+        if not state:
+            return None
+
+        if state["source"] == "slides":
+            slides = []
+            for row in await self.slide_repo.get_slides_manifest(project_id):
+                revision = self.to_revision(row.updated_at)
+                slides.append({
+                    "slide_id": row.slide_id,
+                    "title": row.title,
+                    "content_type": row.content_type,
+                    "metadata": row.slide_metadata or {},
+                    "is_user_edited": row.is_user_edited,
+                    "updated_at": row.updated_at,
+                    "page_number": row.slide_index + 1,
+                    "revision": revision,
+                    "hash": self.slide_hash(row.slide_index, row.slide_id, revision)
+                })
+        else:
+            legacy_slides = await self.project_repo.get_slides_data_json(project_id) or []
+            slides = [
+                dict(
+                    {key: value for key, value in slide.items() if key != "html_content"},
+                    page_number=index + 1,
+                    revision=state["revision"],
+                    hash=self.slide_hash(index, slide.get("html_content", ""))
+                )
+                for index, slide in enumerate(legacy_slides)
+            ]
+
+        result = {key: value for key, value in state.items() if key not in ("source", "etag")}
+        result["slides"] = slides
+        return result
+
+    async def get_slide_content(self, project_id: str, slide_index: int) -> Optional[Dict[str, Any]]:
+        """Get the HTML of a single slide together with its manifest hash"""
+        slide = await self.slide_repo.get_slide_by_index(project_id, slide_index)
+        if slide:
+            return {
+                "title": slide.title,
+                "page_number": slide.slide_index + 1,
+                "html_content": slide.html_content,
+                "hash": self.slide_hash(slide.slide_index, slide.slide_id, self.to_revision(slide.updated_at))
+            }
+
+        # 与 get_slides_feed_state 一致：slide_data表中没有该项目的记录时才读取slides_data字段
+        count, _, _ = await self.slide_repo.get_slides_revision(project_id)
+        if count:
+            return None
+        legacy_slides = await self.project_repo.get_slides_data_json(project_id) or []
+        if not 0 <= slide_index < len(legacy_slides):
+            return None
+        html_content = legacy_slides[slide_index].get("html_content", "")
+        return {
+            "title": legacy_slides[slide_index].get("title", ""),
+            "page_number": slide_index + 1,
+            "html_content": html_content,
+            "hash": self.slide_hash(slide_index, html_content)
+        }
+
+    async def get_shared_project_id(self, share_token: str) -> Optional[str]:
+        """Resolve an enabled share token to its project ID"""
+        return await self.project_repo.get_project_id_by_share_token(share_token)
+
     async def update_project(self, project_id: str, update_data: Dict[str, Any]) -> bool:
         """Update project data"""
         try:
@@ -513,6 +672,11 @@ class DatabaseService:
         template_repo = GlobalMasterTemplateRepository(self.session)
         return await template_repo.get_template_by_name(template_name)
 
+    async def get_global_master_template_preview_source(self, template_id: int) -> Optional[Tuple[str, str, float]]:
+        """Get the name, HTML template and update time of a global master template"""
+        template_repo = GlobalMasterTemplateRepository(self.session)
+        return await template_repo.get_template_preview_source(template_id)
+
     async def get_all_global_master_templates(self, active_only: bool = True) -> List[DBGlobalMasterTemplate]:
         """Get all global master templates"""
         template_repo = GlobalMasterTemplateRepository(self.session)
@@ -570,3 +734,13 @@ class DatabaseService:
         """Get the default global master template"""
         template_repo = GlobalMasterTemplateRepository(self.session)
         return await template_repo.get_default_template()
+
+    async def get_global_master_template_tags(self, active_only: bool = True) -> List[str]:
+        """Get all distinct global master template tags"""
+        template_repo = GlobalMasterTemplateRepository(self.session)
+        return await template_repo.get_all_tags(active_only)
+
+    async def rebuild_global_master_template_tag_index(self) -> int:
+        """Index the tags of templates saved before the tag table existed"""
+        template_repo = GlobalMasterTemplateRepository(self.session)
+        return await template_repo.rebuild_missing_tag_index()
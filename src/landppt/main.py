@@ -5,6 +5,9 @@ Main FastAPI application entry point
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from .utils.static_assets import CachedStaticFiles
+from .utils.http_middleware import CompressionETagMiddleware
+from .core.config import app_config
 from fastapi.responses import HTMLResponse, FileResponse
 import uvicorn
 import asyncio
@@ -66,6 +69,24 @@ async def startup_event():
         else:
             logger.info("Database already exists - skipping template import")
 
+        # Index tags of master templates saved before the tag table existed
+        from .services.global_master_template_service import GlobalMasterTemplateService
+        indexed = await GlobalMasterTemplateService().rebuild_tag_index()
+        if indexed:
+            logger.info(f"Indexed tags of {indexed} global master templates")
+
+        # Warm up the shared HTTP connection pool used by research and image downloads
+        from .utils.http_client import http_clients
+        http_clients.get_session()
+
+        # Pre-compress static bundles (gzip/brotli) without delaying startup
+        from .utils.static_assets import precompress_static_assets
+        asyncio.get_running_loop().run_in_executor(None, precompress_static_assets)
+
+        # Periodically purge expired background tasks and their result files
+        from .services.background_tasks import get_task_manager
+        get_task_manager().start_maintenance()
+
     except Exception as e:
         logger.error(f"Failed to initialize application: {e}")
         raise
@@ -76,6 +97,40 @@ async def shutdown_event():
     """Clean up database connections on shutdown"""
     try:
         logger.info("Shutting down application...")
+
+        # Mark tasks still running in this worker as interrupted
+        from .services.background_tasks import get_task_manager
+        await get_task_manager().shutdown()
+
+        # Stop the project event relay
+        from .services.event_hub import project_event_hub
+        await project_event_hub.close()
+
+        # Stop background slide thumbnail rendering
+        from .services.slide_thumbnail_service import slide_thumbnail_service
+        await slide_thumbnail_service.close()
+
+        # Cancel image decision requests still waiting to be batched
+        from .services.decision_batcher import decision_batcher
+        await decision_batcher.close()
+
+        # Stop background image thumbnail generation
+        from .services.image.image_service import ImageService
+        if ImageService._instance is not None:
+            await ImageService._instance.close()
+
+        # Stop warm PDF to PPTX converter processes
+        from .services.pdf_to_pptx_pool import pdf_to_pptx_pool
+        await pdf_to_pptx_pool.close()
+
+        # Stop CPU worker processes (HTML validation)
+        from .utils.process_pool import process_pool
+        process_pool.shutdown(wait=False)
+
+        # Close pooled HTTP connections
+        from .utils.http_client import http_clients
+        await http_clients.close()
+
         logger.info("Application shutdown complete")
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
@@ -93,6 +148,10 @@ app.add_middleware(
 auth_middleware = create_auth_middleware()
 app.middleware("http")(auth_middleware)
 
+# Compress text responses and answer conditional GETs (added last so it wraps every response)
+if app_config.enable_response_compression:
+    app.add_middleware(CompressionETagMiddleware, minimum_size=max(0, app_config.compression_min_size))
+
 # Include routers
 app.include_router(auth_router, prefix="", tags=["Authentication"])
 app.include_router(config_router, prefix="", tags=["Configuration Management"])
@@ -106,7 +165,7 @@ app.include_router(web_router, prefix="", tags=["Web Interface"])
 
 # Mount static files
 static_dir = os.path.join(os.path.dirname(__file__), "web", "static")
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+app.mount("/static", CachedStaticFiles(directory=static_dir), name="static")
 
 # Mount temp directory for image cache
 temp_dir = os.path.join(os.getcwd(), "temp")
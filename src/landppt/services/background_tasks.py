@@ -1,6 +1,9 @@
 """
 后台任务管理器
 用于处理耗时的异步任务，如PDF转PPTX转换
+
+任务状态持久化在数据库中（见 task_store），任意worker都可以查询任务；
+执行任务的worker通过租约和心跳声明所有权，租约过期的任务视为失败。
 """
 
 import asyncio
@@ -8,10 +11,13 @@ import logging
 import uuid
 from datetime import datetime
 from enum import Enum
-from typing import Dict, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass, field
 import traceback
 
+from .task_store import TaskStore, task_store, get_worker_id
+from ..utils.thread_pool import run_blocking_io
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,37 +42,108 @@ class BackgroundTask:
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    result_files: List[str] = field(default_factory=list)
+    worker_id: Optional[str] = None
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "BackgroundTask":
+        """从持久化记录构建任务对象"""
+        return cls(
+            task_id=record["task_id"],
+            task_type=record["task_type"],
+            status=TaskStatus(record["status"]),
+            progress=record["progress"],
+            result=record["result"],
+            error=record["error"],
+            created_at=datetime.fromtimestamp(record["created_at"]),
+            updated_at=datetime.fromtimestamp(record["updated_at"]),
+            metadata=record["metadata"],
+            result_files=record["result_files"],
+            worker_id=record["worker_id"]
+        )
 
 
 class BackgroundTaskManager:
     """后台任务管理器"""
 
-    def __init__(self):
+    # 租约时长与心跳间隔（秒）
+    lease_seconds: float = 60.0
+    heartbeat_interval: float = 20.0
+
+    def __init__(self, store: Optional[TaskStore] = None):
+        self.store = store or task_store
+        self.worker_id = get_worker_id()
+        # 本进程创建/执行的任务，执行期间以内存状态为准
         self.tasks: Dict[str, BackgroundTask] = {}
         self.running_tasks: Dict[str, asyncio.Task] = {}
+        self._maintenance_task: Optional[asyncio.Task] = None
 
-    def create_task(self, task_type: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+    def create_task(self, task_type: str, metadata: Optional[Dict[str, Any]] = None,
+                    result_files: Optional[List[str]] = None) -> str:
         """创建新任务
 
         Args:
             task_type: 任务类型
             metadata: 任务元数据
+            result_files: 结果文件路径，任务过期清理时一并删除
 
         Returns:
             任务ID
         """
-        task_id = str(uuid.uuid4())
+        task = self._new_task(task_type, metadata, result_files)
+        self.store.save(task.task_id, **self._create_fields(task))
+        logger.info(f"创建后台任务: {task.task_id} (类型: {task_type})")
+        return task.task_id
+
+    async def create_task_async(self, task_type: str, metadata: Optional[Dict[str, Any]] = None,
+                                result_files: Optional[List[str]] = None) -> str:
+        """创建新任务（在线程池中写入任务存储，不阻塞事件循环）"""
+        task = self._new_task(task_type, metadata, result_files)
+        await run_blocking_io(self.store.save, task.task_id, **self._create_fields(task))
+        logger.info(f"创建后台任务: {task.task_id} (类型: {task_type})")
+        return task.task_id
+
+    def _new_task(self, task_type: str, metadata: Optional[Dict[str, Any]],
+                  result_files: Optional[List[str]]) -> BackgroundTask:
         task = BackgroundTask(
-            task_id=task_id,
+            task_id=str(uuid.uuid4()),
             task_type=task_type,
-            metadata=metadata or {}
+            metadata=metadata or {},
+            result_files=result_files or [],
+            worker_id=self.worker_id
         )
-        self.tasks[task_id] = task
-        logger.info(f"创建后台任务: {task_id} (类型: {task_type})")
-        return task_id
+        self.tasks[task.task_id] = task
+        return task
+
+    def _create_fields(self, task: BackgroundTask) -> Dict[str, Any]:
+        return {
+            "task_type": task.task_type,
+            "status": task.status.value,
+            "metadata": task.metadata,
+            "result_files": task.result_files,
+            "worker_id": self.worker_id,
+            "lease_seconds": self.lease_seconds
+        }
 
     def get_task(self, task_id: str) -> Optional[BackgroundTask]:
-        """获取任务信息"""
+        """获取任务信息（本进程正在执行的任务直接返回，否则从持久化存储读取）"""
+        if task_id in self.running_tasks and task_id in self.tasks:
+            return self.tasks[task_id]
+        return self._task_from_record(task_id, self.store.get(task_id))
+
+    async def get_task_async(self, task_id: str) -> Optional[BackgroundTask]:
+        """获取任务信息（在线程池中读取任务存储，供异步路由使用）"""
+        if task_id in self.running_tasks and task_id in self.tasks:
+            return self.tasks[task_id]
+        return self._task_from_record(task_id, await run_blocking_io(self.store.get, task_id))
+
+    def _task_from_record(self, task_id: str, record: Optional[Dict[str, Any]]) -> Optional[BackgroundTask]:
+        if record is not None:
+            try:
+                return BackgroundTask.from_record(record)
+            except Exception as e:
+                logger.warning(f"解析任务记录失败 {task_id}: {e}")
+
         return self.tasks.get(task_id)
 
     def update_task_status(
@@ -78,22 +155,64 @@ class BackgroundTaskManager:
         error: Optional[str] = None
     ):
         """更新任务状态"""
-        if task_id not in self.tasks:
-            logger.warning(f"任务不存在: {task_id}")
-            return
-
-        task = self.tasks[task_id]
-        task.status = status
-        task.updated_at = datetime.now()
+        fields = self._apply_status(task_id, status, progress, result, error)
+        saved = self.store.save(task_id, **fields)
+        self._log_status(task_id, status, progress, saved)
 
+    async def update_task_status_async(
+        self,
+        task_id: str,
+        status: TaskStatus,
+        progress: Optional[float] = None,
+        result: Optional[Any] = None,
+        error: Optional[str] = None
+    ):
+        """更新任务状态（在线程池中写入任务存储，不阻塞事件循环）"""
+        fields = self._apply_status(task_id, status, progress, result, error)
+        saved = await run_blocking_io(self.store.save, task_id, **fields)
+        self._log_status(task_id, status, progress, saved)
+
+    def _apply_status(self, task_id: str, status: TaskStatus, progress: Optional[float],
+                      result: Optional[Any], error: Optional[str]) -> Dict[str, Any]:
+        """更新本进程内存中的任务，返回需要写入存储的字段"""
+        fields: Dict[str, Any] = {"status": status.value}
         if progress is not None:
-            task.progress = progress
+            fields["progress"] = progress
         if result is not None:
-            task.result = result
+            fields["result"] = result
         if error is not None:
-            task.error = error
+            fields["error"] = error
+
+        task = self.tasks.get(task_id)
+        if task is not None:
+            task.status = status
+            task.updated_at = datetime.now()
+            if progress is not None:
+                task.progress = progress
+            if result is not None:
+                task.result = result
+            if error is not None:
+                task.error = error
+        return fields
+
+    def _log_status(self, task_id: str, status: TaskStatus, progress: Optional[float], saved: bool):
+        if not saved and task_id not in self.tasks:
+            logger.warning(f"任务不存在: {task_id}")
+            return
+
+        logger.info(f"任务状态更新: {task_id} -> {status} (进度: {progress if progress is not None else '-'}%)")
 
-        logger.info(f"任务状态更新: {task_id} -> {status} (进度: {task.progress}%)")
+    async def _heartbeat(self, task_id: str):
+        """定期续约；其他worker请求取消时在这里执行取消"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            cancel_requested = await run_blocking_io(
+                self.store.renew_lease, task_id, self.worker_id, self.lease_seconds
+            )
+            if cancel_requested and task_id in self.running_tasks:
+                logger.info(f"收到取消请求: {task_id}")
+                self.running_tasks[task_id].cancel()
+                return
 
     async def execute_task(
         self,
@@ -110,18 +229,20 @@ class BackgroundTaskManager:
             *args: 函数参数
             **kwargs: 函数关键字参数
         """
+        heartbeat = asyncio.create_task(self._heartbeat(task_id))
         try:
-            self.update_task_status(task_id, TaskStatus.RUNNING, progress=0.0)
+            await run_blocking_io(self.store.save, task_id, worker_id=self.worker_id,
+                                  lease_seconds=self.lease_seconds)
+            await self.update_task_status_async(task_id, TaskStatus.RUNNING, progress=0.0)
 
             # 检查函数是否是协程
             if asyncio.iscoroutinefunction(func):
                 result = await func(*args, **kwargs)
             else:
                 # 同步函数，在线程池中执行
-                from ..utils.thread_pool import run_blocking_io
                 result = await run_blocking_io(func, *args, **kwargs)
 
-            self.update_task_status(
+            await self.update_task_status_async(
                 task_id,
                 TaskStatus.COMPLETED,
                 progress=100.0,
@@ -129,7 +250,7 @@ class BackgroundTaskManager:
             )
 
         except asyncio.CancelledError:
-            self.update_task_status(
+            await self.update_task_status_async(
                 task_id,
                 TaskStatus.CANCELLED,
                 error="任务被取消"
@@ -138,7 +259,7 @@ class BackgroundTaskManager:
 
         except Exception as e:
             error_msg = f"{str(e)}\n{traceback.format_exc()}"
-            self.update_task_status(
+            await self.update_task_status_async(
                 task_id,
                 TaskStatus.FAILED,
                 error=error_msg
@@ -146,6 +267,7 @@ class BackgroundTaskManager:
             logger.error(f"任务执行失败: {task_id}\n{error_msg}")
 
         finally:
+            heartbeat.cancel()
             # 清理运行中的任务引用
             if task_id in self.running_tasks:
                 del self.running_tasks[task_id]
@@ -156,6 +278,7 @@ class BackgroundTaskManager:
         func: Callable,
         *args,
         metadata: Optional[Dict[str, Any]] = None,
+        result_files: Optional[List[str]] = None,
         **kwargs
     ) -> str:
         """提交任务到后台执行
@@ -165,14 +288,32 @@ class BackgroundTaskManager:
             func: 要执行的函数
             *args: 函数参数
             metadata: 任务元数据
+            result_files: 结果文件路径，任务过期清理时一并删除
             **kwargs: 函数关键字参数
 
         Returns:
             任务ID
         """
         # 创建任务
-        task_id = self.create_task(task_type, metadata)
+        task_id = self.create_task(task_type, metadata, result_files)
+        self._start(task_id, func, *args, **kwargs)
+        return task_id
+
+    async def submit_task_async(
+        self,
+        task_type: str,
+        func: Callable,
+        *args,
+        metadata: Optional[Dict[str, Any]] = None,
+        result_files: Optional[List[str]] = None,
+        **kwargs
+    ) -> str:
+        """提交任务到后台执行（任务记录在线程池中写入，供异步路由使用）"""
+        task_id = await self.create_task_async(task_type, metadata, result_files)
+        self._start(task_id, func, *args, **kwargs)
+        return task_id
 
+    def _start(self, task_id: str, func: Callable, *args, **kwargs):
         # 创建异步任务并开始执行
         async_task = asyncio.create_task(
             self.execute_task(task_id, func, *args, **kwargs)
@@ -180,7 +321,6 @@ class BackgroundTaskManager:
         self.running_tasks[task_id] = async_task
 
         logger.info(f"提交后台任务: {task_id}")
-        return task_id
 
     def cancel_task(self, task_id: str) -> bool:
         """取消任务
@@ -195,10 +335,15 @@ class BackgroundTaskManager:
             self.running_tasks[task_id].cancel()
             logger.info(f"取消任务: {task_id}")
             return True
+
+        # 任务在其他worker上执行，由其心跳检测到取消请求后取消
+        if self.store.request_cancel(task_id):
+            logger.info(f"已请求取消任务: {task_id}")
+            return True
         return False
 
     def cleanup_old_tasks(self, max_age_hours: int = 24):
-        """清理旧任务
+        """清理旧任务及其结果文件
 
         Args:
             max_age_hours: 任务保留时间（小时）
@@ -216,24 +361,40 @@ class BackgroundTaskManager:
         for task_id in tasks_to_remove:
             del self.tasks[task_id]
 
-        if tasks_to_remove:
-            logger.info(f"清理了 {len(tasks_to_remove)} 个过期任务")
+        removed = self.store.cleanup_expired(max_age_hours * 3600)
+        if removed or tasks_to_remove:
+            logger.info(f"清理了 {max(removed, len(tasks_to_remove))} 个过期任务")
 
     def get_task_stats(self) -> Dict[str, int]:
-        """获取任务统计信息"""
-        stats = {
-            "total": len(self.tasks),
-            "pending": 0,
-            "running": 0,
-            "completed": 0,
-            "failed": 0,
-            "cancelled": 0
-        }
+        """获取任务统计信息（所有worker）"""
+        return self.store.get_stats()
 
-        for task in self.tasks.values():
-            stats[task.status.value] += 1
+    def start_maintenance(self, interval_seconds: int = 3600, max_age_hours: int = 24):
+        """启动定期清理过期任务的后台循环"""
+        if self._maintenance_task and not self._maintenance_task.done():
+            return
 
-        return stats
+        async def _maintenance_loop():
+            from .progress_tracker import progress_tracker
+            while True:
+                try:
+                    await run_blocking_io(self.cleanup_old_tasks, max_age_hours)
+                    progress_tracker.cleanup_old_tasks()
+                except Exception as e:
+                    logger.warning(f"任务清理失败: {e}")
+                await asyncio.sleep(interval_seconds)
+
+        self._maintenance_task = asyncio.create_task(_maintenance_loop())
+
+    async def shutdown(self):
+        """进程关闭：停止维护循环，并将本进程未完成的任务标记为失败"""
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            self._maintenance_task = None
+
+        failed = await run_blocking_io(self.store.fail_worker_tasks, self.worker_id, "服务重启，任务已中断，请重新提交")
+        if failed:
+            logger.info(f"已将 {failed} 个未完成任务标记为失败")
 
 
 # 全局任务管理器实例
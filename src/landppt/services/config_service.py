@@ -88,6 +88,7 @@ class ConfigService:
             # Parallel Generation Configuration
             "enable_parallel_generation": {"type": "boolean", "category": "generation_params", "default": "false"},
             "parallel_slides_count": {"type": "number", "category": "generation_params", "default": "3"},
+            "speech_script_concurrency": {"type": "number", "category": "generation_params", "default": "4"},
             
             "tavily_api_key": {"type": "password", "category": "generation_params"},
             "tavily_max_results": {"type": "number", "category": "generation_params", "default": "10"},
@@ -104,14 +105,28 @@ class ConfigService:
             "research_enable_content_extraction": {"type": "boolean", "category": "generation_params", "default": "true"},
             "research_max_content_length": {"type": "number", "category": "generation_params", "default": "5000"},
             "research_extraction_timeout": {"type": "number", "category": "generation_params", "default": "30"},
+            "research_step_concurrency": {"type": "number", "category": "generation_params", "default": "3"},
+            "research_provider_max_concurrent": {"type": "number", "category": "generation_params", "default": "2"},
+            "research_provider_min_interval": {"type": "number", "category": "generation_params", "default": "1.0"},
+            "research_cache_enabled": {"type": "boolean", "category": "generation_params", "default": "true"},
+            "research_cache_ttl": {"type": "number", "category": "generation_params", "default": "86400"},
+            "research_cache_max_size_mb": {"type": "number", "category": "generation_params", "default": "200"},
+            "export_max_concurrent": {"type": "number", "category": "generation_params", "default": "2"},
+            "export_max_queue_size": {"type": "number", "category": "generation_params", "default": "20"},
+            "export_max_jobs_per_user": {"type": "number", "category": "generation_params", "default": "3"},
 
             "apryse_license_key": {"type": "password", "category": "generation_params"},
+            "pdf_to_pptx_pool_size": {"type": "number", "category": "generation_params", "default": "2"},
+            "pdf_to_pptx_worker_max_jobs": {"type": "number", "category": "generation_params", "default": "50"},
+            "pdf_to_pptx_worker_max_memory_mb": {"type": "number", "category": "generation_params", "default": "1024"},
+            "pdf_to_pptx_timeout": {"type": "number", "category": "generation_params", "default": "300"},
             
             # Feature Flags
             "enable_network_mode": {"type": "boolean", "category": "feature_flags", "default": "true"},
             "enable_local_models": {"type": "boolean", "category": "feature_flags", "default": "false"},
             "enable_streaming": {"type": "boolean", "category": "feature_flags", "default": "true"},
             "enable_auto_layout_repair": {"type": "boolean", "category": "generation_params", "default": "false"},
+            "enable_layout_geometry_check": {"type": "boolean", "category": "generation_params", "default": "true"},
             "log_level": {"type": "select", "category": "feature_flags", "default": "INFO"},
             "log_ai_requests": {"type": "boolean", "category": "feature_flags", "default": "false"},
             "debug": {"type": "boolean", "category": "feature_flags", "default": "true"},
@@ -158,6 +173,12 @@ class ConfigService:
             # Global Image Configuration
             "max_total_images_per_slide": {"type": "number", "category": "image_service", "default": "3"},
             "enable_smart_image_selection": {"type": "boolean", "category": "image_service", "default": "true"},
+            "enable_image_prefetch": {"type": "boolean", "category": "image_service", "default": "true"},
+            "image_prefetch_concurrency": {"type": "number", "category": "image_service", "default": "4"},
+            "image_prefetch_batch_size": {"type": "number", "category": "image_service", "default": "8"},
+            "enable_image_decision_batching": {"type": "boolean", "category": "image_service", "default": "true"},
+            "image_decision_batch_window": {"type": "number", "category": "image_service", "default": "0.3"},
+            "image_decision_batch_size": {"type": "number", "category": "image_service", "default": "8"},
 
             # Image Generation Providers
             "openai_api_key_image": {"type": "password", "category": "image_service"},
@@ -15,6 +15,9 @@ from ..api.models import (
 )
 from ..database.service import DatabaseService
 from ..database.database import get_async_db
+from .inline_image_service import inline_image_service
+from .event_hub import project_event_hub
+from .slide_thumbnail_service import slide_thumbnail_service
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
@@ -31,6 +34,16 @@ class DatabaseProjectManager:
         from ..database.database import AsyncSessionLocal
         session = AsyncSessionLocal()
         return DatabaseService(session)
+
+    async def _extract_inline_images(self, slides_html: Optional[str] = None,
+                                     slides_data: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+        """Lift inline base64 images into the image cache before persisting slides"""
+        try:
+            await inline_image_service.extract_slides(slides_data)
+            return await inline_image_service.extract_inline_images(slides_html, "slides")
+        except Exception as e:
+            logger.warning(f"Inline image extraction skipped: {e}")
+            return slides_html
     
     async def create_project(self, request: PPTGenerationRequest, username: str) -> PPTProject:
         """Create a new PPT project with TODO board"""
@@ -103,6 +116,7 @@ class DatabaseProjectManager:
 
             if success:
                 logger.info(f"Updated project {project_id} status to {status}")
+                project_event_hub.publish_nowait(project_id, "project", {"status": status})
 
             return success
         finally:
@@ -123,6 +137,9 @@ class DatabaseProjectManager:
 
             if success:
                 logger.info(f"Updated stage {stage_id} to {status}, progress: {progress}%")
+                project_event_hub.publish_nowait(project_id, "stage", {
+                    "stage_id": stage_id, "status": status, "progress": progress
+                })
 
             return success
         finally:
@@ -144,12 +161,15 @@ class DatabaseProjectManager:
     async def save_project_slides(self, project_id: str, slides_html: str,
                                 slides_data: List[Dict[str, Any]] = None) -> bool:
         """Save project slides using optimized batch update"""
+        slides_html = await self._extract_inline_images(slides_html, slides_data)
         db_service = await self._get_db_service()
         try:
             success = await db_service.save_project_slides(project_id, slides_html, slides_data)
 
             if success:
                 logger.info(f"Saved slides for project {project_id}")
+                project_event_hub.publish_nowait(project_id, "slides", {"total_slides": len(slides_data or [])})
+                slide_thumbnail_service.schedule_project(project_id)
 
             return success
         finally:
@@ -157,6 +177,7 @@ class DatabaseProjectManager:
 
     async def batch_save_slides(self, project_id: str, slides_data: List[Dict[str, Any]]) -> bool:
         """批量保存幻灯片 - 高效版本"""
+        await self._extract_inline_images(slides_data=slides_data)
         db_service = await self._get_db_service()
         try:
             # 准备幻灯片数据
@@ -179,6 +200,8 @@ class DatabaseProjectManager:
 
             if success:
                 logger.info(f"Batch saved {len(slides_data)} slides for project {project_id}")
+                project_event_hub.publish_nowait(project_id, "slides", {"total_slides": len(slides_data)})
+                slide_thumbnail_service.schedule_project(project_id)
 
             return success
         finally:
@@ -187,12 +210,15 @@ class DatabaseProjectManager:
     async def replace_all_project_slides(self, project_id: str, slides_html: str,
                                        slides_data: List[Dict[str, Any]] = None) -> bool:
         """完全替换项目的所有幻灯片 - 用于重新生成PPT等场景"""
+        slides_html = await self._extract_inline_images(slides_html, slides_data)
         db_service = await self._get_db_service()
         try:
             success = await db_service.replace_all_project_slides(project_id, slides_html, slides_data)
 
             if success:
                 logger.info(f"Replaced all slides for project {project_id}")
+                project_event_hub.publish_nowait(project_id, "slides", {"total_slides": len(slides_data or [])})
+                slide_thumbnail_service.schedule_project(project_id)
 
             return success
         finally:
@@ -204,18 +230,23 @@ class DatabaseProjectManager:
         try:
             deleted_count = await db_service.cleanup_excess_slides(project_id, current_slide_count)
             logger.info(f"Cleaned up {deleted_count} excess slides for project {project_id}")
+            if deleted_count:
+                project_event_hub.publish_nowait(project_id, "slides", {"total_slides": current_slide_count})
             return deleted_count
         finally:
             await db_service.session.close()
 
     async def save_single_slide(self, project_id: str, slide_index: int, slide_data: Dict[str, Any]) -> bool:
         """Save a single slide to database immediately"""
+        await self._extract_inline_images(slides_data=[slide_data])
         db_service = await self._get_db_service()
         try:
             success = await db_service.save_single_slide(project_id, slide_index, slide_data)
 
             if success:
                 logger.info(f"Saved slide {slide_index + 1} for project {project_id}")
+                project_event_hub.publish_nowait(project_id, "slides", {"slide_index": slide_index})
+                slide_thumbnail_service.schedule_project(project_id)
 
             return success
         finally:
@@ -229,6 +260,8 @@ class DatabaseProjectManager:
 
             if success:
                 logger.info(f"Updated project data for project {project_id}")
+                if "status" in update_data:
+                    project_event_hub.publish_nowait(project_id, "project", {"status": update_data["status"]})
 
             return success
         finally:
@@ -237,6 +270,48 @@ class DatabaseProjectManager:
     async def update_project(self, project_id: str, update_data: Dict[str, Any]) -> bool:
         """Alias for update_project_data for backward compatibility"""
         return await self.update_project_data(project_id, update_data)
+
+    async def get_slides_feed_state(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Get the slides revision and ETag of a project (no slide content is loaded)"""
+        db_service = await self._get_db_service()
+        try:
+            return await db_service.get_slides_feed_state(project_id)
+        finally:
+            await db_service.session.close()
+
+    async def get_slides_changes(self, project_id: str, since: Optional[int] = None,
+                                 state: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get the slides changed after a revision"""
+        db_service = await self._get_db_service()
+        try:
+            return await db_service.get_slides_changes(project_id, since, state)
+        finally:
+            await db_service.session.close()
+
+    async def get_slides_manifest(self, project_id: str,
+                                  state: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get the slide manifest (all slide fields except HTML) of a project"""
+        db_service = await self._get_db_service()
+        try:
+            return await db_service.get_slides_manifest(project_id, state)
+        finally:
+            await db_service.session.close()
+
+    async def get_slide_content(self, project_id: str, slide_index: int) -> Optional[Dict[str, Any]]:
+        """Get the HTML and manifest hash of a single slide"""
+        db_service = await self._get_db_service()
+        try:
+            return await db_service.get_slide_content(project_id, slide_index)
+        finally:
+            await db_service.session.close()
+
+    async def get_shared_project_id(self, share_token: str) -> Optional[str]:
+        """Resolve an enabled share token to its project ID"""
+        db_service = await self._get_db_service()
+        try:
+            return await db_service.get_shared_project_id(share_token)
+        finally:
+            await db_service.session.close()
     
     async def save_project_version(self, project_id: str, version_data: Dict[str, Any]) -> bool:
         """Save a version of the project"""
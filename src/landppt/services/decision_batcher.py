@@ -0,0 +1,245 @@
+"""
+小型AI决策请求合并器
+配图流程中每页都会发起若干次输出很短的AI调用（是否配图、图片需求、搜索关键词、尺寸、生成提示词），
+这些调用数量多、单次价值低，且占用大量请求配额。合并器在一个短时间窗口内收集同类请求，
+合并为一次要求返回结果数组的调用；缺失或不合格的单项结果再各自单独调用一次作为回退。
+没有同类请求在排队或执行时，新请求不等待窗口直接发出。
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+CompletionFunc = Callable[[str], Awaitable[str]]
+ValidateFunc = Callable[[str], bool]
+
+
+@dataclass
+class _PendingDecision:
+    prompt: str
+    complete: CompletionFunc
+    validate: Optional[ValidateFunc]
+    future: asyncio.Future = field(repr=False)
+
+
+def _extract_json_object(content: str) -> Optional[Dict[str, Any]]:
+    """从AI响应中提取JSON对象"""
+    content = content.split("</think>")[-1].strip()
+    start_idx = content.find('{')
+    end_idx = content.rfind('}')
+    if start_idx == -1 or end_idx <= start_idx:
+        return None
+    try:
+        result = json.loads(content[start_idx:end_idx + 1])
+    except (json.JSONDecodeError, ValueError):
+        return None
+    return result if isinstance(result, dict) else None
+
+
+class DecisionBatcher:
+    """按键合并同类AI决策请求，键相同的请求使用同一模型和参数"""
+
+    def __init__(self):
+        self._pending: Dict[Hashable, List[_PendingDecision]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._flush_tasks: Set[asyncio.Task] = set()
+        # 每个键正在执行的调用数（合并调用或单独调用）
+        self._in_flight: Dict[Hashable, int] = {}
+        self._stats = {'requests': 0, 'batches': 0, 'batched_items': 0, 'fallbacks': 0}
+
+    def _get_settings(self) -> Dict[str, Any]:
+        from .config_service import config_service
+        image_config = config_service.get_config_by_category('image_service')
+        try:
+            window = max(0.0, float(image_config.get('image_decision_batch_window', 0.3)))
+        except (TypeError, ValueError):
+            window = 0.3
+        try:
+            max_batch = max(1, int(image_config.get('image_decision_batch_size', 8)))
+        except (TypeError, ValueError):
+            max_batch = 8
+        return {
+            'enabled': bool(image_config.get('enable_image_decision_batching', True)),
+            'window': window,
+            'max_batch': max_batch,
+        }
+
+    async def run(self, key: Hashable, prompt: str, complete: CompletionFunc,
+                  validate: Optional[ValidateFunc] = None) -> str:
+        """
+        提交一个决策请求并等待其回复文本
+
+        Args:
+            key: 合并键，只有键相同的请求会被合并（如决策类型、模型、温度）
+            prompt: 该请求单独调用时使用的完整提示词
+            complete: 以提示词调用模型并返回回复文本
+            validate: 校验合并调用中该项的回复，不通过时单独回退调用
+        """
+        self._stats['requests'] += 1
+        settings = self._get_settings()
+        if not settings['enabled'] or settings['max_batch'] <= 1:
+            return await complete(prompt)
+
+        loop = asyncio.get_running_loop()
+        item = _PendingDecision(prompt=prompt, complete=complete, validate=validate,
+                                future=loop.create_future())
+        pending = self._pending.setdefault(key, [])
+        pending.append(item)
+
+        if len(pending) >= settings['max_batch']:
+            self._schedule_flush(key, 0)
+        elif len(pending) == 1 and not self._in_flight.get(key):
+            # 没有同类请求在排队或执行时不等待窗口，同一轮事件循环中到达的请求仍会合并进来
+            self._schedule_flush(key, 0)
+        elif key not in self._timers:
+            self._schedule_flush(key, settings['window'])
+
+        return await asyncio.shield(item.future)
+
+    def _schedule_flush(self, key: Hashable, delay: float):
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        loop = asyncio.get_running_loop()
+        self._timers[key] = loop.call_later(delay, self._start_flush, key)
+
+    def _start_flush(self, key: Hashable):
+        self._timers.pop(key, None)
+        task = asyncio.create_task(self._flush(key))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    def cancel(self, key: Hashable) -> int:
+        """取消键下尚未发出的请求（等待的调用方收到 CancelledError），返回取消的请求数"""
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+        pending = self._pending.pop(key, [])
+        for item in pending:
+            if not item.future.done():
+                item.future.cancel()
+        return len(pending)
+
+    async def close(self):
+        """取消全部等待中的请求和正在执行的调用（应用关闭时调用）"""
+        for key in list(self._pending):
+            self.cancel(key)
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        tasks = list(self._flush_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _flush(self, key: Hashable):
+        pending = self._pending.pop(key, [])
+        if not pending:
+            return
+        max_batch = self._get_settings()['max_batch']
+        items, remaining = pending[:max_batch], pending[max_batch:]
+        if remaining:
+            # 超出单次合并上限的请求留到下一批，立即调度
+            self._pending[key] = remaining
+            self._schedule_flush(key, 0)
+
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        try:
+            if len(items) == 1:
+                await self._run_single(items[0])
+            else:
+                await self._run_batch(items)
+        except asyncio.CancelledError:
+            for item in items:
+                if not item.future.done():
+                    item.future.cancel()
+            raise
+        finally:
+            self._in_flight[key] -= 1
+            if not self._in_flight[key]:
+                del self._in_flight[key]
+
+    async def _run_batch(self, items: List[_PendingDecision]):
+        self._stats['batches'] += 1
+        self._stats['batched_items'] += len(items)
+        answers: Dict[int, Any] = {}
+        try:
+            response_text = await items[0].complete(self._build_batch_prompt(items))
+            result = _extract_json_object(response_text or "")
+            if result is None:
+                raise ValueError("合并调用未返回有效JSON")
+            for entry in result.get('results') or []:
+                if isinstance(entry, dict) and 'id' in entry:
+                    try:
+                        answers[int(entry['id'])] = entry.get('answer')
+                    except (TypeError, ValueError):
+                        continue
+        except Exception as e:
+            logger.warning(f"合并{len(items)}个AI决策请求失败，逐个回退: {e}")
+
+        fallbacks = []
+        for index, item in enumerate(items, 1):
+            answer = answers.get(index)
+            if answer is not None and not isinstance(answer, str):
+                answer = json.dumps(answer, ensure_ascii=False)
+            if answer and (item.validate is None or self._is_valid(item, answer)):
+                if not item.future.done():
+                    item.future.set_result(answer)
+            else:
+                fallbacks.append(self._run_single(item))
+
+        if fallbacks:
+            self._stats['fallbacks'] += len(fallbacks)
+            logger.info(f"合并调用中{len(fallbacks)}/{len(items)}项结果缺失或无效，单独调用")
+            await asyncio.gather(*fallbacks)
+
+    @staticmethod
+    def _is_valid(item: _PendingDecision, answer: str) -> bool:
+        try:
+            return bool(item.validate(answer))
+        except Exception:
+            return False
+
+    async def _run_single(self, item: _PendingDecision):
+        try:
+            answer = await item.complete(item.prompt)
+        except Exception as e:
+            if not item.future.done():
+                item.future.set_exception(e)
+            return
+        if not item.future.done():
+            item.future.set_result(answer)
+
+    def _build_batch_prompt(self, items: List[_PendingDecision]) -> str:
+        tasks = "\n\n".join(
+            f"=== 任务 {index} ===\n{item.prompt}" for index, item in enumerate(items, 1)
+        )
+        return f"""以下是{len(items)}个相互独立的任务，请逐个完成，每个任务的回复内容和格式以该任务自身的要求为准。
+
+{tasks}
+
+=== 输出格式 ===
+请以JSON格式一次性返回全部任务的结果，格式如下：
+{{
+    "results": [
+        {{"id": 任务编号, "answer": 该任务的回复}}
+    ]
+}}
+
+【重要要求】：
+- 必须为每个任务返回一项，id与任务编号一致
+- 任务要求返回JSON的，answer直接使用该JSON对象；其余任务的answer为字符串
+- 各任务之间互不影响，不要合并或省略任务
+- 只返回JSON，不要添加任何解释文字，不要使用markdown代码块包装"""
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+
+# 全局决策合并器实例
+decision_batcher = DecisionBatcher()
@@ -7,7 +7,7 @@ import json
 import logging
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -83,7 +83,8 @@ class DEEPResearchService:
         """Dynamically get AI provider to ensure latest config"""
         return get_ai_provider()
     
-    async def conduct_deep_research(self, topic: str, language: str = "zh", context: Optional[Dict[str, Any]] = None) -> ResearchReport:
+    async def conduct_deep_research(self, topic: str, language: str = "zh", context: Optional[Dict[str, Any]] = None,
+                                    on_step_completed: Optional[Callable[[ResearchStep], Any]] = None) -> ResearchReport:
         """
         Conduct comprehensive DEEP research on a given topic
 
@@ -91,6 +92,7 @@ class DEEPResearchService:
             topic: Research topic
             language: Language for research and report (zh/en)
             context: Additional context information (scenario, audience, requirements, etc.)
+            on_step_completed: Optional callback (sync or async) invoked with each step as soon as it finishes
 
         Returns:
             Complete research report
@@ -102,15 +104,33 @@ class DEEPResearchService:
             # Step 1: Define research objectives and generate research plan with context
             research_plan = await self._define_research_objectives(topic, language, context)
 
-            # Step 2: Execute research steps
-            research_steps = []
-            for i, step_plan in enumerate(research_plan, 1):
-                step = await self._execute_research_step(i, step_plan, topic, language)
-                research_steps.append(step)
+            # Step 2: Execute research steps concurrently (Tavily rate limit is enforced per request)
+            semaphore = asyncio.Semaphore(max(1, ai_config.research_step_concurrency))
+
+            async def run_step(step_number: int, step_plan: Dict[str, str]) -> ResearchStep:
+                async with semaphore:
+                    return await self._execute_research_step(step_number, step_plan, topic, language)
 
-                # Add delay between requests to respect rate limits
-                if i < len(research_plan):
-                    await asyncio.sleep(1)
+            tasks = [asyncio.create_task(run_step(i, step_plan)) for i, step_plan in enumerate(research_plan, 1)]
+            research_steps = []
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    step = await finished
+                    research_steps.append(step)
+                    if on_step_completed:
+                        try:
+                            callback_result = on_step_completed(step)
+                            if asyncio.iscoroutine(callback_result):
+                                await callback_result
+                        except Exception as e:
+                            logger.warning(f"Research step callback failed: {e}")
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+
+            # Merge results in plan order
+            research_steps.sort(key=lambda step: step.step_number)
 
             # Step 3: Synthesize findings and generate report
             report = await self._generate_comprehensive_report(
@@ -282,8 +302,20 @@ class DEEPResearchService:
             if ai_config.tavily_exclude_domains:
                 search_params["exclude_domains"] = ai_config.tavily_exclude_domains.split(',')
 
-            # Execute search
-            response = self.tavily_client.search(**search_params)
+            # Reuse cached results for the same normalized query and search parameters
+            from .research.research_cache import research_cache, normalize_query, hash_key
+            cache_key = hash_key('tavily', normalize_query(query), language,
+                                 {k: v for k, v in search_params.items() if k != 'query'})
+            cached_results = await research_cache.get_value('search', cache_key)
+            if cached_results is not None:
+                logger.info(f"Tavily search cache hit for query: {query}")
+                return cached_results
+
+            # Execute search (the Tavily client is blocking, keep it off the event loop)
+            from .research.rate_limiter import get_rate_limiter
+            from ..utils.thread_pool import run_blocking_io
+            async with get_rate_limiter('tavily').limit():
+                response = await run_blocking_io(self.tavily_client.search, **search_params)
 
             # Process results
             results = []
@@ -298,6 +330,8 @@ class DEEPResearchService:
                 results.append(processed_result)
 
             logger.info(f"Tavily search returned {len(results)} results for query: {query}")
+            if results:
+                await research_cache.set('search', cache_key, results, ttl=ai_config.research_cache_ttl)
             return results
 
         except Exception as e:
@@ -336,6 +370,12 @@ class DEEPResearchService:
 请用{language}语言撰写分析报告，要求客观、专业、有深度。
 """
 
+        from .research.research_cache import research_cache, hash_key
+        cache_key = hash_key('deep_analysis', getattr(self.ai_provider, 'model', None), prompt)
+        cached_analysis = await research_cache.get_value('analysis', cache_key)
+        if cached_analysis is not None:
+            return cached_analysis
+
         try:
             response = await self.ai_provider.text_completion(
                 prompt=prompt,
@@ -343,7 +383,9 @@ class DEEPResearchService:
                 temperature=0.4
             )
 
-            return response.content.strip()
+            analysis = response.content.strip()
+            await research_cache.set('analysis', cache_key, analysis)
+            return analysis
 
         except Exception as e:
             logger.error(f"Failed to analyze search results: {e}")
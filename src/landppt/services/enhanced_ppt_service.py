@@ -14,7 +14,7 @@ import base64
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 from ..api.models import (
     PPTGenerationRequest, PPTOutline, EnhancedPPTOutline,
@@ -25,7 +25,14 @@ from ..ai.base import TextContent, ImageContent
 from ..core.config import ai_config
 from .ppt_service import PPTService
 from .db_project_manager import DatabaseProjectManager
+from .event_hub import project_event_hub
 from .global_master_template_service import GlobalMasterTemplateService
+from ..utils.html_processing import (
+    HTMLStreamTracker, auto_fix_html_with_parser, basic_html_syntax_check, check_html_well_formedness,
+    clean_html_response, process_html_response_async, stitch_html_continuation, strip_think_tags,
+    validate_html_completeness
+)
+from ..utils.process_pool import run_cpu_bound
 from .prompts import prompts_manager
 
 from .research.enhanced_research_service import EnhancedResearchService
@@ -99,6 +106,11 @@ class EnhancedPPTService(PPTService):
         # Per-project lock to avoid duplicate free-template generation under parallel slide generation
         self._free_template_generation_locks: Dict[str, asyncio.Lock] = {}
 
+        # 幻灯片生成的提示词缓存命中统计（由模型返回的usage累计）
+        self.prompt_cache_stats = {"requests": 0, "cache_hits": 0, "prompt_tokens": 0, "cached_tokens": 0}
+        # 被截断的HTML续写统计：续写次数、续写后得到完整文档的页数
+        self.html_continuation_stats = {"continuations": 0, "recovered": 0}
+
     def _get_auto_layout_debug_dir(self) -> Path:
         """Directory to persist auto layout repair debug artifacts (HTML & screenshots)."""
         project_root = Path(__file__).resolve().parent.parent.parent.parent
@@ -305,9 +317,12 @@ class EnhancedPPTService(PPTService):
             缓存统计信息字典
         """
         if self.file_cache_manager:
-            return self.file_cache_manager.get_cache_stats()
+            stats = self.file_cache_manager.get_cache_stats()
         else:
-            return {"error": "缓存管理器未初始化"}
+            stats = {"error": "缓存管理器未初始化"}
+        stats["prompt_cache"] = dict(self.prompt_cache_stats)
+        stats["html_continuation"] = dict(self.html_continuation_stats)
+        return stats
 
     def cleanup_cache(self):
         """清理过期的缓存条目"""
@@ -367,8 +382,27 @@ class EnhancedPPTService(PPTService):
         except Exception as e:
             logger.error(f"设计基因缓存清理失败: {e}")
 
-    async def generate_outline(self, request: PPTGenerationRequest, page_count_settings: Dict[str, Any] = None) -> PPTOutline:
-        """Generate PPT outline using real AI with optional Enhanced research and page count settings"""
+    def _research_progress_callback(self, project_id: Optional[str]) -> Optional[Callable[[Any], None]]:
+        """联网研究每完成一个步骤，向项目事件流推送进度（没有项目ID时不推送）"""
+        if not project_id:
+            return None
+
+        def on_step_completed(step):
+            project_event_hub.publish_nowait(project_id, "research_progress", {
+                'step_number': step.step_number,
+                'query': step.query,
+                'description': step.description,
+                'completed': step.completed
+            })
+
+        return on_step_completed
+
+    async def generate_outline(self, request: PPTGenerationRequest, page_count_settings: Dict[str, Any] = None,
+                               project_id: Optional[str] = None) -> PPTOutline:
+        """Generate PPT outline using real AI with optional Enhanced research and page count settings
+
+        project_id: 提供时，联网研究的每个步骤完成后通过项目事件推送进度
+        """
         try:
             research_context = ""
 
@@ -391,7 +425,8 @@ class EnhancedPPTService(PPTService):
                         enhanced_report = await self.enhanced_research_service.conduct_enhanced_research(
                             topic=request.topic,
                             language=request.language,
-                            context=research_context
+                            context=research_context,
+                            on_step_completed=self._research_progress_callback(project_id)
                         )
 
                         # Save enhanced report first
@@ -1310,7 +1345,8 @@ Please fully utilize the above research information to enrich the PPT content, e
                     research_report = await self.research_service.conduct_deep_research(
                         topic=project.topic,
                         language="zh",  # Default to Chinese for now
-                        context=research_context_data
+                        context=research_context_data,
+                        on_step_completed=self._research_progress_callback(project_id)
                     )
 
                     # Generate structured Markdown research context
@@ -2303,6 +2339,9 @@ Please fully utilize the above research information to enrich the PPT content, e
                 progress=100.0, result={"confirmed": True}
             )
 
+            # 大纲已确定，后台开始为整套幻灯片规划和获取图片
+            self._start_image_prefetch(project_id, project.outline.get('slides', []), project.confirmed_requirements)
+
             return True
 
         except Exception as e:
@@ -3198,6 +3237,15 @@ Please fully utilize the above research information to enrich the PPT content, e
             if not project.slides_data:
                 project.slides_data = []
 
+            # 为需要生成的页面预取图片（大纲确认时已启动的计划会被复用）
+            pending_pages = [
+                idx + 1 for idx in range(len(slides))
+                if not (idx < len(project.slides_data) and project.slides_data[idx]
+                        and project.slides_data[idx].get('html_content'))
+            ]
+            if pending_pages:
+                self._start_image_prefetch(project_id, slides, confirmed_requirements, pages=pending_pages)
+
             # 检查是否启用并行生成
             parallel_enabled = ai_config.enable_parallel_generation
             parallel_count = ai_config.parallel_slides_count if parallel_enabled else 1
@@ -3207,6 +3255,9 @@ Please fully utilize the above research information to enrich the PPT content, e
             else:
                 logger.info(f"📝 使用顺序生成模式")
             
+            # 生成过程中的HTML增量内容通过该队列与幻灯片结果一起推送给前端
+            stream_events: asyncio.Queue = asyncio.Queue()
+
             # 批量生成幻灯片（支持并行和顺序两种模式）
             i = 0
             while i < len(slides):
@@ -3267,7 +3318,8 @@ Please fully utilize the above research information to enrich the PPT content, e
                             try:
                                 html_content = await self._generate_single_slide_html_with_prompts(
                                     slide, confirmed_requirements, system_prompt,
-                                    idx + 1, len(slides), slides, project.slides_data, project_id
+                                    idx + 1, len(slides), slides, project.slides_data, project_id,
+                                    html_stream_callback=stream_events.put_nowait
                                 )
                                 return idx, slide, html_content, None
                             except Exception as e:
@@ -3276,9 +3328,12 @@ Please fully utilize the above research information to enrich the PPT content, e
                         # 创建所有并行任务
                         tasks = [generate_with_metadata(idx, slide) for idx, slide in slides_to_generate]
                         
-                        # 流式处理完成的任务 - 一旦某页生成完成，立即展示和添加
-                        for coro in asyncio.as_completed(tasks):
-                            idx, slide, html_content, error = await coro
+                        # 流式处理完成的任务 - 一旦某页生成完成，立即展示和添加，生成中的内容实时推送
+                        async for kind, value in self._run_with_stream_events(tasks, stream_events):
+                            if kind == 'event':
+                                yield f"data: {json.dumps(value)}\n\n"
+                                continue
+                            idx, slide, html_content, error = value
                             try:
                                 if error:
                                     raise error
@@ -3328,11 +3383,20 @@ Please fully utilize the above research information to enrich the PPT content, e
                                 yield f"data: {json.dumps(progress_data)}\n\n"
                                 logger.info(f"Generating slide {idx+1}/{len(slides)}: {slide_title}")
 
-                                # 生成HTML
-                                html_content = await self._generate_single_slide_html_with_prompts(
-                                    slide, confirmed_requirements, system_prompt,
-                                    idx + 1, len(slides), slides, project.slides_data, project_id
-                                )
+                                # 生成HTML，生成过程中的增量内容实时推送
+                                html_content = None
+                                async for kind, value in self._run_with_stream_events(
+                                    [self._generate_single_slide_html_with_prompts(
+                                        slide, confirmed_requirements, system_prompt,
+                                        idx + 1, len(slides), slides, project.slides_data, project_id,
+                                        html_stream_callback=stream_events.put_nowait
+                                    )],
+                                    stream_events
+                                ):
+                                    if kind == 'event':
+                                        yield f"data: {json.dumps(value)}\n\n"
+                                    else:
+                                        html_content = value
 
                                 # 创建幻灯片数据
                                 slide_data = {
@@ -3426,6 +3490,37 @@ Please fully utilize the above research information to enrich the PPT content, e
             error_response = {'type': 'error', 'message': error_message}
             yield f"data: {json.dumps(error_response)}\n\n"
 
+    @staticmethod
+    async def _run_with_stream_events(coros: List[Any], events: asyncio.Queue):
+        """
+        并发运行协程，同时转发它们放入队列的事件
+
+        依次产出 ('event', 事件) 和 ('result', 协程返回值)；某个协程完成时先转发它之前的全部事件，
+        保证同一页的增量内容总在该页结果之前送达。协程抛出的异常会向外传播。
+        """
+        pending = {asyncio.ensure_future(coro) for coro in coros}
+        getter: Optional[asyncio.Future] = None
+        try:
+            while pending:
+                if getter is None:
+                    getter = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait(pending | {getter}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield 'event', getter.result()
+                    getter = None
+                finished = [task for task in done if task is not getter and task in pending]
+                if finished:
+                    while not events.empty():
+                        yield 'event', events.get_nowait()
+                    for task in finished:
+                        pending.discard(task)
+                        yield 'result', task.result()
+        finally:
+            if getter is not None:
+                getter.cancel()
+            for task in pending:
+                task.cancel()
+
     async def _execute_general_subtask(self, project_id: str, stage, subtask: str, confirmed_requirements: Dict[str, Any], system_prompt: str) -> str:
         """Execute general subtask"""
         # 使用新的提示词模块
@@ -3446,8 +3541,14 @@ Please fully utilize the above research information to enrich the PPT content, e
 
     async def _generate_single_slide_html_with_prompts(self, slide_data: Dict[str, Any], confirmed_requirements: Dict[str, Any],
                                                      system_prompt: str, page_number: int, total_pages: int,
-                                                     all_slides: List[Dict[str, Any]] = None, existing_slides_data: List[Dict[str, Any]] = None, project_id: str = None) -> str:
-        """Generate HTML for a single slide using prompts.md and first step information with template selection"""
+                                                     all_slides: List[Dict[str, Any]] = None, existing_slides_data: List[Dict[str, Any]] = None, project_id: str = None,
+                                                     html_stream_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        Generate HTML for a single slide using prompts.md and first step information with template selection
+
+        html_stream_callback receives incremental 'slide_chunk'/'slide_reset' events while the
+        HTML is being streamed from the model.
+        """
         try:
             # 使用传入的项目ID或从confirmed_requirements获取
             if not project_id:
@@ -3467,7 +3568,8 @@ Please fully utilize the above research information to enrich the PPT content, e
             # 如果有选中的全局母版，使用模板生成
             if selected_template:
                 return await self._generate_slide_with_template(
-                    slide_data, selected_template, page_number, total_pages, confirmed_requirements
+                    slide_data, selected_template, page_number, total_pages, confirmed_requirements,
+                    project_id=project_id, html_stream_callback=html_stream_callback
                 )
 
 
@@ -3480,7 +3582,9 @@ Please fully utilize the above research information to enrich the PPT content, e
             style_genes = await self._get_or_extract_style_genes(project_id, template_html, page_number)
 
             # 检查是否启用图片生成服务并处理多图片
-            images_collection = await self._process_slide_image(slide_data, confirmed_requirements, page_number, total_pages, template_html)
+            images_collection = await self._process_slide_image(
+                slide_data, confirmed_requirements, page_number, total_pages, template_html, project_id=project_id
+            )
             if images_collection and images_collection.total_count > 0:
                 # 将图片集合信息添加到slide_data中，供后续生成使用
                 slide_data['images_collection'] = images_collection
@@ -3497,15 +3601,16 @@ Please fully utilize the above research information to enrich the PPT content, e
             # Build context information for better coherence
             context_info = self._build_slide_context(page_number, total_pages)
 
-            # 使用新的提示词模块生成上下文
-            context = prompts_manager.get_single_slide_html_prompt(
+            # 使用新的提示词模块生成上下文（整套PPT共享的前缀 + 当前页面后缀）
+            context_prefix, context = prompts_manager.get_single_slide_html_prompt_parts(
                 slide_data, confirmed_requirements, page_number, total_pages,
                 context_info, style_genes, unified_design_guide, template_html
             )
 
             # Try to generate HTML with retry mechanism for incomplete responses
             html_content = await self._generate_html_with_retry(
-                context, system_prompt, slide_data, page_number, total_pages, max_retries=5
+                context, system_prompt, slide_data, page_number, total_pages, max_retries=5,
+                context_prefix=context_prefix, html_stream_callback=html_stream_callback
             )
 
             return html_content
@@ -3516,10 +3621,37 @@ Please fully utilize the above research information to enrich the PPT content, e
             fallback_html = self._generate_fallback_slide_html(slide_data, page_number, total_pages)
         return await self._apply_auto_layout_repair(fallback_html, slide_data, page_number, total_pages)
 
+    def _start_image_prefetch(self, project_id: str, slides: List[Dict[str, Any]],
+                              confirmed_requirements: Dict[str, Any], pages: Optional[List[int]] = None):
+        """在后台为整套幻灯片预取图片，生成每页时只需等待本页结果"""
+        try:
+            from .ppt_image_processor import PPTImageProcessor
+            from .image_prefetch_service import image_prefetch_service
+
+            image_processor = PPTImageProcessor(
+                image_service=self.image_service,
+                provider_override=self.provider_name
+            )
+            image_prefetch_service.start(
+                project_id, slides, confirmed_requirements or {}, image_processor, pages=pages
+            )
+        except Exception as e:
+            logger.warning(f"启动图片预取失败，将在生成每页时处理图片: {e}")
+
     async def _process_slide_image(self, slide_data: Dict[str, Any], confirmed_requirements: Dict[str, Any],
-                                 page_number: int, total_pages: int, template_html: str = ""):
+                                 page_number: int, total_pages: int, template_html: str = "",
+                                 project_id: Optional[str] = None):
         """使用图片处理器处理幻灯片多图片"""
         try:
+            # 优先使用大纲确认后后台预取的图片
+            from .image_prefetch_service import image_prefetch_service
+            prefetched, images_collection = await image_prefetch_service.get_slide_images(
+                project_id or confirmed_requirements.get('project_id'), page_number, slide_data
+            )
+            if prefetched:
+                logger.info(f"第{page_number}页使用预取的图片结果")
+                return images_collection
+
             # 初始化图片处理器
             from .ppt_image_processor import PPTImageProcessor
             from .models.slide_image_info import SlideImagesCollection
@@ -3542,7 +3674,9 @@ Please fully utilize the above research information to enrich the PPT content, e
 
     async def _generate_slide_with_template(self, slide_data: Dict[str, Any], template: Dict[str, Any],
                                           page_number: int, total_pages: int,
-                                          confirmed_requirements: Dict[str, Any]) -> str:
+                                          confirmed_requirements: Dict[str, Any],
+                                          project_id: Optional[str] = None,
+                                          html_stream_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
         """使用选定的模板生成幻灯片HTML - AI参考模板风格生成新HTML"""
         try:
             # 获取模板HTML作为风格参考
@@ -3552,14 +3686,16 @@ Please fully utilize the above research information to enrich the PPT content, e
             logger.info(f"使用模板 {template_name} 作为风格参考生成第{page_number}页")
 
             # 构建创意模板参考上下文
-            context = await self._build_creative_template_context(
-                slide_data, template_html, template_name, page_number, total_pages, confirmed_requirements
+            context_prefix, context = await self._build_creative_template_context(
+                slide_data, template_html, template_name, page_number, total_pages, confirmed_requirements,
+                project_id=project_id
             )
 
             # 使用AI生成风格一致但内容创新的HTML
             system_prompt = self._load_prompts_md_system_prompt()
             html_content = await self._generate_html_with_retry(
-                context, system_prompt, slide_data, page_number, total_pages, max_retries=5
+                context, system_prompt, slide_data, page_number, total_pages, max_retries=5,
+                context_prefix=context_prefix, html_stream_callback=html_stream_callback
             )
 
             if html_content:
@@ -3578,18 +3714,26 @@ Please fully utilize the above research information to enrich the PPT content, e
 
     async def _build_creative_template_context(self, slide_data: Dict[str, Any], template_html: str,
                                        template_name: str, page_number: int, total_pages: int,
-                                       confirmed_requirements: Dict[str, Any]) -> str:
-        """构建创意模板参考上下文，平衡风格一致性与创意多样性（优化版本）"""
+                                       confirmed_requirements: Dict[str, Any],
+                                       project_id: Optional[str] = None) -> Tuple[str, str]:
+        """
+        构建创意模板参考上下文，平衡风格一致性与创意多样性（优化版本）
+
+        Returns:
+            (整套PPT共享的提示词前缀, 当前页面的提示词后缀)
+        """
 
         # 获取项目ID，检查是否已缓存设计基因
-        project_id = confirmed_requirements.get('project_id')
+        project_id = project_id or confirmed_requirements.get('project_id')
         style_genes = None
 
         # 设计基因只在第一页提取一次，后续都使用第一页的
         style_genes = await self._get_or_extract_style_genes(project_id, template_html, page_number)
 
         # 检查是否启用图片生成服务并处理多图片
-        images_collection = await self._process_slide_image(slide_data, confirmed_requirements, page_number, total_pages, template_html)
+        images_collection = await self._process_slide_image(
+            slide_data, confirmed_requirements, page_number, total_pages, template_html, project_id=project_id
+        )
         if images_collection and images_collection.total_count > 0:
             # 将图片集合信息添加到slide_data中，供后续生成使用
             slide_data['images_collection'] = images_collection
@@ -3613,7 +3757,7 @@ Please fully utilize the above research information to enrich the PPT content, e
         project_audience = confirmed_requirements.get('target_audience', '')
         project_style = confirmed_requirements.get('ppt_style', 'general')
         # 使用新的提示词模块
-        context = prompts_manager.get_creative_template_context_prompt(
+        return prompts_manager.get_creative_template_context_prompt_parts(
             slide_data=slide_data,
             template_html=template_html,
             slide_title=slide_title,
@@ -3629,8 +3773,6 @@ Please fully utilize the above research information to enrich the PPT content, e
             project_style=project_style
         )
 
-        return context
-
     async def _extract_style_genes(self, template_html: str) -> str:
         """使用AI从模板中提取核心设计基因"""
         try:
@@ -4105,107 +4247,19 @@ Please fully utilize the above research information to enrich the PPT content, e
 
     def _validate_html_completeness(self, html_content: str) -> Dict[str, Any]:
         """
-        Validate HTML format correctness and tag closure using BeautifulSoup and lxml.
-
-        This validator checks for:
-        1. Presence of essential elements (<!DOCTYPE>, <html>, <head>, <body>) as warnings
-        2. Correct structural order (<head> before <body>) as a warning
-        3. Well-formedness and tag closure using strict parsing, reported as errors
-        4. Unescaped special characters ('<' or '>') in text content as a warning
+        Validate HTML format correctness and tag closure using lxml (BeautifulSoup without lxml).
 
         Returns:
             Dict with 'is_complete', 'errors', 'warnings', 'missing_elements' keys
         """
-        from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
-        import warnings
-
-        validation_result = {
-            'is_complete': False,
-            'errors': [],
-            'warnings': [],
-            'missing_elements': []  # 添加missing_elements字段
-        }
-
-        if not html_content or not html_content.strip():
-            validation_result['errors'].append('HTML内容为空或仅包含空白字符')
-            return validation_result
-
-        # --- Primary Validation using Strict Parsing ---
-        # This is the most reliable way to find malformed HTML and unclosed tags
-        self._check_html_well_formedness(html_content, validation_result)
-
-        # --- Secondary Validation using BeautifulSoup for structural best practices ---
-        # This part runs even if there are syntax errors to provide more feedback
-        try:
-            # Suppress BeautifulSoup warnings about markup that looks like a file path
-            with warnings.catch_warnings():
-                warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
-                # Use 'html.parser' for better compatibility, fallback to 'lxml' if available
-                try:
-                    soup = BeautifulSoup(html_content, 'lxml')
-                except:
-                    soup = BeautifulSoup(html_content, 'html.parser')
-
-            # 1. Check for DOCTYPE declaration (Missing element)
-            if not html_content.strip().lower().startswith('<!doctype'):
-                validation_result['missing_elements'].append('doctype')
-
-            # 2. Check for essential structural elements (Missing elements)
-            essential_tags = {'html', 'head', 'body'}
-            for tag_name in essential_tags:
-                if not soup.find(tag_name):
-                    validation_result['missing_elements'].append(tag_name)
-
-            # 3. Check for correct structure order: <head> before <body> (Warning)
-            head_tag = soup.find('head')
-            body_tag = soup.find('body')
-
-            if head_tag and body_tag:
-                # Check if body tag has a preceding sibling named 'head'
-                if not body_tag.find_previous_sibling('head'):
-                    validation_result['warnings'].append('HTML结构顺序不正确：<body>标签出现在<head>标签之前')
-
-            # 4. Check for unescaped special characters in text content (Warning)
-            # soup.get_text() extracts only human-readable text
-            text_content = soup.get_text()
-            if '<' in text_content or '>' in text_content:
-                validation_result['warnings'].append('文本内容中可能包含未转义的特殊字符（\'<\'或\'>\'）')
-
-        except Exception as e:
-            # Catch potential errors from BeautifulSoup itself
-            validation_result['errors'].append(f'BeautifulSoup解析过程中发生意外错误: {e}')
-
-        # Final determination of validity is based on the absence of critical errors
-        # missing_elements are treated as warnings only, not errors
-        validation_result['is_complete'] = len(validation_result['errors']) == 0
-
-        return validation_result
+        return validate_html_completeness(html_content)
 
     def _check_html_well_formedness(self, html_content: str, validation_result: Dict[str, Any]) -> None:
         """
         Uses lxml's strict parser to check if the HTML is well-formed.
-        This is the definitive check for syntax errors like unclosed tags.
         Modifies the validation_result dictionary in place.
         """
-        try:
-            # Try to import lxml for strict parsing
-            from lxml import etree
-
-            # Encode the string to bytes for the lxml parser
-            encoded_html = html_content.encode('utf-8')
-            # Create a parser that does NOT recover from errors. This makes it strict.
-            parser = etree.HTMLParser(recover=False, encoding='utf-8')
-            etree.fromstring(encoded_html, parser)
-
-        except ImportError:
-            # lxml not available, fall back to basic regex checks
-            logger.warning("lxml not available, using basic HTML validation")
-            self._basic_html_syntax_check(html_content, validation_result)
-
-        except Exception as e:
-            # This error is triggered by unclosed tags, malformed tags, etc.
-            # It's the most reliable indicator of a syntax problem.
-            validation_result['errors'].append(f'HTML语法错误: {str(e)}')
+        check_html_well_formedness(html_content, validation_result)
 
     def _auto_fix_html_with_parser(self, html_content: str) -> str:
         """
@@ -4217,100 +4271,33 @@ Please fully utilize the above research information to enrich the PPT content, e
         Returns:
             修复后的 HTML 内容，如果修复失败则返回原始内容
         """
-        try:
-            from lxml import etree
-
-            # 首先检查原始 HTML 是否已经是有效的
-            try:
-                # 尝试严格解析
-                encoded_html = html_content.encode('utf-8')
-                strict_parser = etree.HTMLParser(recover=False, encoding='utf-8')
-                etree.fromstring(encoded_html, strict_parser)
-                # 如果严格解析成功，说明 HTML 已经是有效的，直接返回
-                logger.debug("HTML 已经是有效的，无需修复")
-                return html_content
-            except:
-                # 严格解析失败，需要修复
-                pass
-
-            # 创建一个启用恢复功能的解析器
-            parser = etree.HTMLParser(recover=True, encoding='utf-8')
-            tree = etree.fromstring(encoded_html, parser)
-
-            # 保留 DOCTYPE 声明（如果存在）
-            doctype_match = None
-            import re
-            doctype_pattern = r'<!DOCTYPE[^>]*>'
-            doctype_match = re.search(doctype_pattern, html_content, re.IGNORECASE)
-
-            # 将修复后的树转换回字符串
-            fixed_html = etree.tostring(tree, encoding='unicode', method='html', pretty_print=True)
-
-            # 如果原始 HTML 有 DOCTYPE，添加回去
-            if doctype_match:
-                doctype = doctype_match.group(0)
-                if not fixed_html.lower().startswith('<!doctype'):
-                    fixed_html = doctype + '\n' + fixed_html
-
-            logger.info("使用 lxml 解析器自动修复 HTML 成功")
-            return fixed_html
-
-        except ImportError:
-            logger.warning("lxml 不可用，无法使用解析器自动修复")
-            return html_content
-
-        except Exception as e:
-            logger.warning(f"解析器自动修复失败: {str(e)}")
-            return html_content
+        return auto_fix_html_with_parser(html_content)
 
     def _basic_html_syntax_check(self, html_content: str, validation_result: Dict[str, Any]) -> None:
         """
         Basic HTML syntax checking when lxml is not available.
         Uses regex patterns to detect common HTML syntax errors.
         """
-        import re
-        from collections import Counter
-
-        # Check for malformed tags (tags containing other tags)
-        malformed_tags = re.findall(r'<[^>]*<[^>]*>', html_content)
-        if malformed_tags:
-            validation_result['errors'].append('发现格式错误的标签')
-
-        # Check for unclosed critical HTML tags using tag counting
-        # Define critical HTML tags that must be properly closed
-        critical_tags = {'html', 'head', 'body', 'div', 'p', 'span'}
-
-        # Find all opening and closing tags
-        open_tags = re.findall(r'<([a-zA-Z][a-zA-Z0-9]*)[^>]*>', html_content)
-        close_tags = re.findall(r'</([a-zA-Z][a-zA-Z0-9]*)>', html_content)
-
-        # Self-closing tags that don't need closing tags
-        self_closing_tags = {'meta', 'link', 'img', 'br', 'hr', 'input', 'area', 'base', 'col', 'embed', 'source', 'track', 'wbr'}
-
-        # Filter to only check critical tags, excluding self-closing tags
-        open_tags_filtered = [tag.lower() for tag in open_tags
-                             if tag.lower() in critical_tags and tag.lower() not in self_closing_tags]
-        close_tags_lower = [tag.lower() for tag in close_tags if tag.lower() in critical_tags]
+        basic_html_syntax_check(html_content, validation_result)
 
-        # Count occurrences of each tag
-        open_tag_counts = Counter(open_tags_filtered)
-        close_tag_counts = Counter(close_tags_lower)
-
-        # Check for unclosed critical tags
-        unclosed_critical_tags = []
-        for tag, open_count in open_tag_counts.items():
-            close_count = close_tag_counts.get(tag, 0)
-            if open_count > close_count:
-                unclosed_critical_tags.append(f"{tag}({open_count - close_count}个未闭合)")
-
-        if unclosed_critical_tags:
-            validation_result['errors'].append(f'未闭合的关键HTML标签: {", ".join(unclosed_critical_tags)}')
+    async def _generate_html_with_retry(self, context: str, system_prompt: str, slide_data: Dict[str, Any],
+                                      page_number: int, total_pages: int, max_retries: int = 3,
+                                      context_prefix: str = "",
+                                      html_stream_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        Generate HTML with retry mechanism for incomplete responses
 
+        context_prefix is the deck-wide part of the prompt (template, style genes, rules). It is
+        sent first and unchanged on every slide and retry so providers can serve it from their
+        prompt cache; context holds the slide-specific part.
 
+        When streaming is enabled the completion is streamed: chunks are forwarded to
+        html_stream_callback and validation runs on the assembled document.
 
-    async def _generate_html_with_retry(self, context: str, system_prompt: str, slide_data: Dict[str, Any],
-                                      page_number: int, total_pages: int, max_retries: int = 3) -> str:
-        """Generate HTML with retry mechanism for incomplete responses"""
+        Output cut off by the token limit is continued from the cut point instead of being
+        regenerated (see _continue_truncated_html); a fresh attempt is only made when the
+        output contains no HTML document or is still unfinished after continuing.
+        """
 
         for attempt in range(max_retries):
             try:
@@ -4332,16 +4319,69 @@ Please fully utilize the above research information to enrich the PPT content, e
                 # Use the existing ai_config from imports
 
                 # Generate HTML
-                response = await self._text_completion_for_role("slide_generation",
-                    prompt=retry_context,
+                if context_prefix:
+                    # 共享前缀单独作为带缓存标记的内容块，只有后缀随页面和重试变化
+                    user_content = [
+                        TextContent(text=context_prefix, cache_control={"type": "ephemeral"}),
+                        TextContent(text=retry_context)
+                    ]
+                else:
+                    user_content = retry_context
+
+                messages = [AIMessage(role=MessageRole.USER, content=user_content)]
+                generation_kwargs = dict(
                     system_prompt=system_prompt,
-                    max_tokens=ai_config.max_tokens,  # Increase token limit for retries
-                    temperature=max(0.1, ai_config.temperature)  # Reduce temperature for retries
+                    max_tokens=ai_config.max_tokens,
+                    temperature=max(0.1, ai_config.temperature)
                 )
 
-                # Clean and extract HTML
+                streaming = ai_config.enable_streaming
+                if streaming:
+                    if attempt > 0 and html_stream_callback:
+                        html_stream_callback({
+                            'type': 'slide_reset',
+                            'page_number': page_number,
+                            'attempt': attempt + 1,
+                            'message': f'第{page_number}页正在重新生成（第{attempt + 1}次尝试）'
+                        })
+                    tracker = await self._stream_slide_html(
+                        messages, slide_data, page_number, attempt, html_stream_callback, **generation_kwargs
+                    )
+                    # 流式输出拿不到finish_reason，已开始的文档未闭合即视为截断
+                    truncated = not tracker.complete
+                else:
+                    if context_prefix:
+                        response = await self._chat_completion_for_role("slide_generation",
+                            messages=messages, **generation_kwargs
+                        )
+                    else:
+                        response = await self._text_completion_for_role("slide_generation",
+                            prompt=retry_context,
+                            **generation_kwargs
+                        )
+                    self._record_prompt_cache_usage(response, page_number)
+                    tracker = HTMLStreamTracker()
+                    tracker.feed(response.content)
+                    truncated = response.truncated
+                    if truncated:
+                        logger.warning(f"HTML for slide {page_number} hit the output token limit "
+                                       f"(finish_reason={response.finish_reason})")
+
+                # 截断的输出从截断处续写，只有不含HTML文档的输出才整页重新生成
+                tracker = await self._continue_truncated_html(
+                    messages, tracker, truncated, slide_data, page_number, attempt, streaming,
+                    html_stream_callback, **generation_kwargs
+                )
+                truncation = tracker.truncation_reason()
+                if truncation and (streaming or truncated) and attempt < max_retries - 1:
+                    logger.warning(f"HTML for slide {page_number} is incomplete ({truncation}), retrying")
+                    continue
+                response_content = tracker.finalized_text()
+
+                # Clean, extract and validate HTML off the event loop (one parse shared by validation and fix)
                 try:
-                    html_content = self._clean_html_response(response.content)
+                    processed = await process_html_response_async(response_content)
+                    html_content = processed['html']
                     if not html_content or len(html_content.strip()) < 50:
                         logger.warning(f"AI returned empty or too short HTML content for slide {page_number}")
                         continue
@@ -4350,7 +4390,7 @@ Please fully utilize the above research information to enrich the PPT content, e
                     continue
 
                 # Validate HTML completeness
-                validation_result = self._validate_html_completeness(html_content)
+                validation_result = processed['validation']
 
                 logger.info(f"HTML validation result for slide {page_number}, attempt {attempt + 1}: "
                           f"Complete: {validation_result['is_complete']}, "
@@ -4374,7 +4414,7 @@ Please fully utilize the above research information to enrich the PPT content, e
                     if validation_result['errors']:
                         # Try automatic parser-based fix
                         logger.info(f"🔧 Attempting automatic parser fix for slide {page_number}")
-                        parser_fixed_html = self._auto_fix_html_with_parser(html_content)
+                        parser_fixed_html = processed['fixed_html'] or html_content
 
                         # If parser actually changed something, return the fixed HTML directly
                         if parser_fixed_html != html_content:  # Only if parser actually changed something
@@ -4492,21 +4532,191 @@ Please fully utilize the above research information to enrich the PPT content, e
 
 
 
+    # 流式生成时，收到首个内容块后超过该时长（秒）没有新内容即视为输出停滞
+    html_stream_idle_timeout: float = 60.0
+    # 文档闭合后继续等待最后一个数据块（携带用量统计）的最长时间（秒）
+    html_stream_usage_grace: float = 2.0
+
+    async def _stream_slide_html(self, messages: List[AIMessage], slide_data: Dict[str, Any],
+                                 page_number: int, attempt: int,
+                                 html_stream_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                 tracker: Optional[HTMLStreamTracker] = None,
+                                 **kwargs) -> HTMLStreamTracker:
+        """
+        流式生成单页HTML，增量跟踪标签平衡并把内容块转发给回调
+
+        文档闭合后立即停止读取；输出长时间没有出现HTML或中途停滞时提前结束本次尝试，
+        由调用方根据 tracker.truncation_reason() 决定是否重试。续写时传入已有的 tracker，
+        新内容接在已生成的部分之后继续跟踪。
+        """
+        provider, settings = self._get_role_provider("slide_generation")
+        if settings.get("model"):
+            kwargs.setdefault("model", settings["model"])
+
+        tracker = tracker or HTMLStreamTracker()
+        received = False
+        pending = ""
+        last_flush = time.monotonic()
+        usage: Dict[str, Any] = {}
+
+        def flush():
+            nonlocal pending, last_flush
+            if html_stream_callback and pending:
+                html_stream_callback({
+                    'type': 'slide_chunk',
+                    'page_number': page_number,
+                    'title': slide_data.get('title', f'第{page_number}页'),
+                    'attempt': attempt + 1,
+                    'content': pending
+                })
+            pending = ""
+            last_flush = time.monotonic()
+
+        stream = provider.stream_chat_completion(messages=messages, on_usage=usage.update, **kwargs)
+        try:
+            while True:
+                # 首个内容块之前不限时（不支持流式的provider会一次性返回完整结果）
+                timeout = self.html_stream_idle_timeout if received else None
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    logger.warning(f"Streaming HTML for slide {page_number} stalled for "
+                                   f"{self.html_stream_idle_timeout:.0f}s, ending attempt early")
+                    break
+
+                received = True
+                tracker.feed(chunk)
+                pending += chunk or ""
+                # 合并小块，避免每个token都推送一次SSE事件
+                if len(pending) >= 512 or time.monotonic() - last_flush >= 0.2:
+                    flush()
+
+                if tracker.complete:
+                    logger.info(f"Streamed HTML for slide {page_number} closed after {len(tracker.text)} chars")
+                    await self._wait_for_stream_usage(stream, usage)
+                    break
+                if tracker.looks_invalid:
+                    logger.warning(f"Streamed output for slide {page_number} contains no HTML, ending attempt early")
+                    break
+        finally:
+            flush()
+            try:
+                await stream.aclose()
+            except Exception:  # noqa: BLE001
+                pass
+
+        if usage:
+            self._record_prompt_cache_usage(usage, page_number)
+        return tracker
+
+    async def _wait_for_stream_usage(self, stream, usage: Dict[str, Any]):
+        """文档已闭合：丢弃剩余输出，最多等待 html_stream_usage_grace 秒直到收到用量统计"""
+        deadline = time.monotonic() + self.html_stream_usage_grace
+        try:
+            while not usage:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.wait_for(stream.__anext__(), timeout=remaining)
+        except Exception:  # noqa: BLE001
+            # 输出结束、超时或出错都不影响已完整的文档
+            pass
+
+    # 单次生成尝试中续写被截断HTML的最大轮数
+    html_continuation_max_rounds: int = 2
+
+    async def _continue_truncated_html(self, messages: List[AIMessage], tracker: HTMLStreamTracker,
+                                       truncated: bool, slide_data: Dict[str, Any], page_number: int,
+                                       attempt: int, streaming: bool,
+                                       html_stream_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                       **kwargs) -> HTMLStreamTracker:
+        """
+        续写被截断的HTML，而不是整页重新生成
+
+        已生成的部分作为助手消息发回，要求模型从截断处继续输出，续写内容去重后接在后面。
+        只有已经出现HTML文档开头的输出才续写；完全不是HTML的输出由调用方重新生成。
+
+        Args:
+            messages: 本次生成使用的消息（续写时原样保留，共享前缀仍可命中缓存）
+            tracker: 已生成内容的跟踪器
+            truncated: 输出是否因长度限制被截断（非流式时取自 AIResponse.finish_reason）
+        """
+        rounds = 0
+        while truncated and tracker.started and not tracker.complete and rounds < self.html_continuation_max_rounds:
+            rounds += 1
+            self.html_continuation_stats["continuations"] += 1
+            partial = tracker.text
+            logger.info(f"HTML for slide {page_number} was cut off after {len(partial)} chars "
+                        f"(unclosed: {', '.join(tracker.open_tags[-5:]) or 'none'}), continuing (round {rounds})")
+
+            continuation_messages = list(messages) + [
+                AIMessage(role=MessageRole.ASSISTANT, content=partial),
+                AIMessage(role=MessageRole.USER, content=prompts_manager.get_html_continuation_prompt(tracker.open_tags))
+            ]
+
+            if streaming:
+                if html_stream_callback:
+                    html_stream_callback({
+                        'type': 'slide_reset',
+                        'page_number': page_number,
+                        'attempt': attempt + 1,
+                        'content': partial,
+                        'message': f'第{page_number}页输出被截断，正在续写'
+                    })
+                continued = HTMLStreamTracker()
+                continued.feed(partial)
+                continued = await self._stream_slide_html(
+                    continuation_messages, slide_data, page_number, attempt, html_stream_callback,
+                    tracker=continued, **kwargs
+                )
+                continuation = continued.text[len(partial):]
+            else:
+                response = await self._chat_completion_for_role("slide_generation",
+                    messages=continuation_messages, **kwargs
+                )
+                self._record_prompt_cache_usage(response, page_number)
+                continuation = response.content
+                truncated = response.truncated
+
+            tracker = HTMLStreamTracker()
+            tracker.feed(stitch_html_continuation(partial, continuation))
+            if streaming:
+                # 流式输出拿不到finish_reason，文档仍未闭合即视为再次截断
+                truncated = not tracker.complete
+                if html_stream_callback:
+                    # 用去重拼接后的内容同步前端预览
+                    html_stream_callback({
+                        'type': 'slide_reset',
+                        'page_number': page_number,
+                        'attempt': attempt + 1,
+                        'content': tracker.text,
+                        'message': f'第{page_number}页续写中'
+                    })
+
+        if rounds and tracker.complete:
+            self.html_continuation_stats["recovered"] += 1
+            logger.info(f"Recovered truncated HTML for slide {page_number} after {rounds} continuation round(s)")
+        return tracker
+
+    def _record_prompt_cache_usage(self, response: Any, page_number: int):
+        """累计幻灯片生成的提示词缓存命中情况（response 为 AIResponse 或流式输出的用量字典）"""
+        usage = response if isinstance(response, dict) else getattr(response, "usage", None) or {}
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        cached_tokens = usage.get("cached_tokens") or 0
+        stats = self.prompt_cache_stats
+        stats["requests"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["cached_tokens"] += cached_tokens
+        if cached_tokens:
+            stats["cache_hits"] += 1
+            logger.info(f"第{page_number}页提示词缓存命中: {cached_tokens}/{prompt_tokens} tokens")
+
     @staticmethod
     def _strip_think_tags(raw_content: Optional[str]) -> str:
         """Remove <think>...</think> sections that some providers prepend."""
-        if not raw_content:
-            return ""
-
-        import re
-
-        cleaned = re.sub(
-            r"<\s*think[^>]*>.*?<\s*/\s*think\s*>",
-            "",
-            raw_content,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
-        return cleaned.strip()
+        return strip_think_tags(raw_content)
 
     @staticmethod
     def _should_skip_layout_repair(inspection_report: str) -> bool:
@@ -4559,133 +4769,23 @@ Please fully utilize the above research information to enrich the PPT content, e
 
     def _clean_html_response(self, raw_content: str) -> str:
         """Clean and extract HTML content from AI response with robust markdown handling"""
-        import re
-
-        raw_content = self._strip_think_tags(raw_content)
-
-        if not raw_content:
-            logger.warning("Received empty response from AI")
-            return ""
-
-        content = raw_content.strip()
-        logger.debug(f"Raw AI response length: {len(content)}, preview: {content[:200]}...")
-
-        # Check if response is suspiciously short or contains error indicators
-        if len(content) < 100:
-            logger.warning(f"AI response is very short ({len(content)} chars), might be incomplete")
-
-        if any(error_indicator in content.lower() for error_indicator in ['error', 'sorry', 'cannot', 'unable']):
-            logger.warning("AI response contains error indicators")
-
-        # Step 1: Look for markdown code blocks first (most reliable)
-        # Pattern to match ```html...``` blocks
-        html_block_pattern = r'```html\s*\n(.*?)\n```'
-        html_match = re.search(html_block_pattern, content, re.DOTALL | re.IGNORECASE)
-
-        if html_match:
-            extracted_html = html_match.group(1).strip()
-            logger.debug("Found HTML in markdown code block")
-            return extracted_html
-
-        # Step 2: Look for generic code blocks ```...```
-        generic_block_pattern = r'```\s*\n(.*?)\n```'
-        generic_match = re.search(generic_block_pattern, content, re.DOTALL)
-
-        if generic_match:
-            potential_html = generic_match.group(1).strip()
-            # Check if it looks like HTML
-            if (potential_html.lower().startswith('<!doctype html') or
-                potential_html.lower().startswith('<html')):
-                logger.debug("Found HTML in generic code block")
-                return potential_html
-
-        # Step 3: Remove common AI response prefixes and try direct extraction
-        prefixes_to_remove = [
-            "这是生成的HTML代码：",
-            "以下是HTML代码：",
-            "HTML代码如下：",
-            "生成的完整HTML页面：",
-            "Here's the HTML code:",
-            "The HTML code is:",
-            "```html",
-            "```",
-        ]
-
-        for prefix in prefixes_to_remove:
-            if content.startswith(prefix):
-                content = content[len(prefix):].strip()
-
-        # Remove trailing markdown markers
-        if content.endswith('```'):
-            content = content[:-3].strip()
-
-        # Step 4: Extract HTML using DOCTYPE or html tag patterns
-        # Look for complete HTML document with DOCTYPE
-        doctype_pattern = r'<!DOCTYPE html.*?</html>'
-        doctype_match = re.search(doctype_pattern, content, re.DOTALL | re.IGNORECASE)
-
-        if doctype_match:
-            extracted_html = doctype_match.group(0)
-            logger.debug("Found HTML using DOCTYPE pattern")
-            return extracted_html
-
-        # Look for html tag without DOCTYPE
-        html_pattern = r'<html.*?</html>'
-        html_match = re.search(html_pattern, content, re.DOTALL | re.IGNORECASE)
-
-        if html_match:
-            extracted_html = html_match.group(0)
-            logger.debug("Found HTML using html tag pattern")
-            return extracted_html
-
-        # Step 5: Line-by-line extraction as fallback
-        lines = content.split('\n')
-        html_lines = []
-        in_html = False
-
-        for line in lines:
-            line_stripped = line.strip()
-            line_lower = line_stripped.lower()
-
-            # Skip empty lines and common non-HTML prefixes
-            if not line_stripped or line_stripped.startswith('#') or line_stripped.startswith('//'):
-                continue
-
-            # Start collecting when we see HTML start
-            if line_lower.startswith('<!doctype') or line_lower.startswith('<html'):
-                in_html = True
-                html_lines.append(line)
-                continue
-
-            # Collect lines if we're in HTML
-            if in_html:
-                html_lines.append(line)
-
-                # Stop when we see HTML end
-                if line_lower.strip().endswith('</html>'):
-                    break
-
-        if html_lines:
-            extracted_html = '\n'.join(html_lines)
-            logger.debug("Found HTML using line-by-line extraction")
-            return extracted_html
-
-        # Step 6: If all else fails, check if content looks like HTML at all
-        if '<' in content and '>' in content:
-            logger.warning("Could not extract HTML using any method, but content contains HTML tags, returning cleaned content")
-            return content
-
-        logger.error("Failed to extract HTML from AI response")
-        return ""
+        return clean_html_response(raw_content)
 
     async def _apply_auto_layout_repair(
         self,
         html_content: str,
         slide_data: Dict[str, Any],
         page_number: int,
-        total_pages: int
+        total_pages: int,
+        require_geometry_issues: bool = True
     ) -> str:
-        """Invoke multimodal vision model to inspect and repair layout when feature flag is enabled."""
+        """
+        Invoke multimodal vision model to inspect and repair layout when feature flag is enabled.
+
+        A DOM geometry check runs first; the vision and repair calls only happen when it
+        finds problems. Pass require_geometry_issues=False to always run the vision
+        inspection (e.g. when the user explicitly requests a repair).
+        """
         feature_flag_enabled = getattr(ai_config, "enable_auto_layout_repair", False)
         env_override = os.getenv("ENABLE_AUTO_LAYOUT_REPAIR")
         if env_override is not None:
@@ -4748,12 +4848,37 @@ Please fully utilize the above research information to enrich the PPT content, e
 
                 html_path.write_text(html_content, encoding="utf-8")
 
-                screenshot_ok = await pdf_converter.screenshot_html(
-                    str(html_path),
-                    str(screenshot_path),
-                    width=1280,
-                    height=720
-                )
+                geometry_report = None
+                if require_geometry_issues and getattr(ai_config, "enable_layout_geometry_check", True):
+                    geometry_report = await pdf_converter.inspect_layout_html(
+                        str(html_path),
+                        width=1280,
+                        height=720,
+                        screenshot_path=str(screenshot_path)
+                    )
+
+                if geometry_report is not None:
+                    geometry_issues = geometry_report.get("issues") or []
+                    if not geometry_issues:
+                        logger.info(
+                            "Layout geometry check passed for slide %s, skipping vision inspection",
+                            page_number
+                        )
+                        return html_content
+                    logger.info(
+                        "Layout geometry check found %s issue(s) for slide %s: %s",
+                        len(geometry_issues),
+                        page_number,
+                        ", ".join(sorted({issue.get("type", "") for issue in geometry_issues}))
+                    )
+                    screenshot_ok = bool(geometry_report.get("screenshot"))
+                else:
+                    screenshot_ok = await pdf_converter.screenshot_html(
+                        str(html_path),
+                        str(screenshot_path),
+                        width=1280,
+                        height=720
+                    )
 
                 if not screenshot_ok or not screenshot_path.exists():
                     logger.warning("Auto layout repair skipped: screenshot capture failed")
@@ -4785,7 +4910,13 @@ Please fully utilize the above research information to enrich the PPT content, e
 
                 screenshot_b64 = base64.b64encode(screenshot_path.read_bytes()).decode("utf-8")
 
+            geometry_summary = self._format_layout_geometry_report(geometry_report)
             inspection_prompt = self._build_layout_inspection_prompt(slide_data, page_number, total_pages)
+            if geometry_summary:
+                inspection_prompt += (
+                    "\n自动几何检测已发现以下问题（坐标基于1280x720画布），请结合截图确认并给出修复建议：\n"
+                    f"{geometry_summary}\n"
+                )
 
             messages = [
                 AIMessage(
@@ -4839,13 +4970,18 @@ Please fully utilize the above research information to enrich the PPT content, e
                 logger.debug("Vision analysis returned empty report, keeping original HTML")
                 return html_content
 
-            if self._should_skip_layout_repair(inspection_report):
+            has_severe_geometry_issues = any(
+                issue.get("severity") == "high" for issue in (geometry_report or {}).get("issues", [])
+            )
+            if not has_severe_geometry_issues and self._should_skip_layout_repair(inspection_report):
                 logger.info(
                     "Skipping auto layout repair for slide %s due to low-severity findings",
                     page_number
                 )
                 return html_content
 
+            if geometry_summary:
+                inspection_report = f"{inspection_report}\n\n【几何检测结果】\n{geometry_summary}"
             repair_prompt = self._build_layout_repair_prompt(html_content, inspection_report)
             repair_response = None
             for attempt in range(3):
@@ -4885,7 +5021,7 @@ Please fully utilize the above research information to enrich the PPT content, e
                 repair_content[:1000]
             )
 
-            repaired_html = self._clean_html_response(repair_content)
+            repaired_html = await run_cpu_bound(clean_html_response, repair_content)
             if repaired_html and repaired_html.strip() and repaired_html.strip() != html_content.strip():
                 logger.info(f"Auto layout repair applied for slide {page_number}")
                 return repaired_html
@@ -4897,6 +5033,39 @@ Please fully utilize the above research information to enrich the PPT content, e
 
         return html_content
 
+    @staticmethod
+    def _format_layout_geometry_report(geometry_report: Optional[Dict[str, Any]]) -> str:
+        """Render DOM geometry issues as a compact list for the vision and repair prompts."""
+        if not geometry_report:
+            return ""
+
+        type_labels = {
+            "page_scroll": "页面出现滚动条",
+            "scrollbar": "容器出现滚动条",
+            "out_of_canvas": "超出画布",
+            "clipped": "被容器裁剪",
+            "overlap": "文字重叠",
+            "chart_clipped": "图表显示不全",
+            "chart_collapsed": "图表尺寸为0",
+        }
+        lines = []
+        for issue in geometry_report.get("issues") or []:
+            rect = issue.get("rect") or {}
+            amount_label = "重叠" if issue.get("type") == "overlap" else "超出"
+            line = (
+                f"- [{issue.get('severity', 'medium')}] {type_labels.get(issue.get('type'), issue.get('type'))}: "
+                f"{issue.get('element', '')} (x={rect.get('x')}, y={rect.get('y')}, "
+                f"w={rect.get('width')}, h={rect.get('height')}, {amount_label}{issue.get('overflow', 0)}px)"
+            )
+            if issue.get("container"):
+                line += f"，裁剪容器 {issue['container']}"
+            if issue.get("other"):
+                line += f"，与 {issue['other']}「{issue.get('other_text', '')}」重叠"
+            if issue.get("text"):
+                line += f"，文本「{issue['text']}」"
+            lines.append(line)
+        return "\n".join(lines)
+
     def _build_layout_inspection_prompt(
         self,
         slide_data: Dict[str, Any],
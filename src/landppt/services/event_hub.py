@@ -0,0 +1,236 @@
+"""
+项目事件推送中心
+待办阶段进度、幻灯片保存和演讲稿生成进度在发生时推送到项目所有者的事件流（SSE），
+页面订阅事件后按需刷新，不再定时轮询接口或整页重新加载。
+多worker部署时事件同时写入 project_events 中转表，连接在其他 uvicorn worker 上的页面也能收到。
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import delete, func, select
+
+from ..core.config import ai_config
+from ..database.database import AsyncSessionLocal
+from ..database.models import Project, ProjectEvent
+from .task_store import get_worker_id
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectEventHub:
+    """按用户分发项目事件，每个打开的页面连接对应一个订阅队列"""
+
+    # 单个订阅队列的容量，消费过慢时丢弃最旧的事件
+    queue_size: int = 256
+    # 拉取其他worker事件的间隔（秒）
+    relay_interval: float = 1.0
+    # 中转表中事件的保留时间（秒）
+    retention_seconds: float = 300.0
+    # 清理中转表过期事件的间隔（秒）
+    prune_interval: float = 60.0
+    # 项目所有者缓存的最大条数
+    owner_cache_size: int = 2048
+
+    def __init__(self):
+        self.worker_id = get_worker_id()
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._owners: Dict[str, str] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._relay_task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        self._last_event_id: Optional[int] = None
+        self._last_prune = 0.0
+        self._stats = {'published': 0, 'delivered': 0, 'dropped': 0, 'relayed': 0, 'failed': 0}
+
+    @property
+    def relay_enabled(self) -> bool:
+        """是否通过中转表在worker之间转发事件；单worker部署时事件只在进程内分发，不写数据库"""
+        mode = str(ai_config.project_event_relay or 'auto').strip().lower()
+        if mode == 'auto':
+            try:
+                return int(os.environ.get('WEB_CONCURRENCY', '1')) > 1
+            except ValueError:
+                return False
+        return mode in ('true', '1', 'yes', 'on')
+
+    def subscribe(self, username: str) -> asyncio.Queue:
+        """为用户注册一个订阅队列（需在事件循环中调用）"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(username, set()).add(queue)
+        self._loop = asyncio.get_running_loop()
+        if self.relay_enabled and (self._relay_task is None or self._relay_task.done()):
+            self._relay_task = asyncio.create_task(self._relay_loop())
+        return queue
+
+    def unsubscribe(self, username: str, queue: asyncio.Queue):
+        """注销订阅队列，页面断开连接时调用"""
+        queues = self._subscribers.get(username)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            self._subscribers.pop(username, None)
+
+    def _deliver(self, username: str, event: Dict[str, Any]):
+        for queue in list(self._subscribers.get(username, ())):
+            if queue.full():
+                # 页面只根据事件刷新数据，丢弃最旧的事件不影响最终状态
+                try:
+                    queue.get_nowait()
+                    self._stats['dropped'] += 1
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
+            self._stats['delivered'] += 1
+
+    async def _get_owner(self, project_id: str) -> Optional[str]:
+        owner = self._owners.get(project_id)
+        if owner:
+            return owner
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(Project.username).where(Project.project_id == project_id))
+            owner = result.scalar_one_or_none()
+        if owner:
+            if len(self._owners) >= self.owner_cache_size:
+                self._owners.clear()
+            self._owners[project_id] = owner
+        return owner
+
+    async def publish(self, project_id: str, event_type: str, data: Optional[Dict[str, Any]] = None):
+        """
+        发布项目事件，失败只记录日志，不影响调用方
+
+        Args:
+            project_id: 项目ID，事件推送给项目所有者
+            event_type: 事件类型（stage / project / slides / speech_progress）
+            data: 附加字段，合并到事件中
+        """
+        relay = self.relay_enabled
+        if not relay and not self._subscribers:
+            # 没有页面在订阅，也不需要转发给其他worker
+            return
+        try:
+            owner = await self._get_owner(project_id)
+            if not owner:
+                return
+            event = {'type': event_type, 'project_id': project_id, 'timestamp': time.time(), **(data or {})}
+            self._stats['published'] += 1
+            self._deliver(owner, event)
+            if relay:
+                await self._store_event(owner, event)
+        except Exception as e:
+            self._stats['failed'] += 1
+            logger.debug(f"发布项目事件失败 {event_type} ({project_id}): {e}")
+
+    def publish_nowait(self, project_id: Optional[str], event_type: str, data: Optional[Dict[str, Any]] = None):
+        """在后台发布事件，不阻塞调用方；可在同步代码和其他线程中调用"""
+        if not project_id:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            self._loop = loop
+            self._spawn(project_id, event_type, data)
+        elif self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._spawn, project_id, event_type, data)
+
+    def _spawn(self, project_id: str, event_type: str, data: Optional[Dict[str, Any]]):
+        task = asyncio.create_task(self.publish(project_id, event_type, data))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _store_event(self, username: str, event: Dict[str, Any]):
+        """写入中转表供其他worker转发，并定期清理过期事件"""
+        now = time.time()
+        async with AsyncSessionLocal() as session:
+            session.add(ProjectEvent(
+                username=username,
+                project_id=event['project_id'],
+                event_type=event['type'],
+                payload=event,
+                worker_id=self.worker_id,
+                created_at=now
+            ))
+            await self._maybe_prune(session, now)
+            await session.commit()
+
+    async def _maybe_prune(self, session, now: float):
+        """删除超过保留时间的中转事件（每个worker每 prune_interval 秒最多执行一次）"""
+        if now - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = now
+        await session.execute(delete(ProjectEvent).where(ProjectEvent.created_at < now - self.retention_seconds))
+
+    async def _relay_loop(self):
+        """有订阅者期间拉取其他worker写入的事件"""
+        try:
+            while self._subscribers:
+                try:
+                    await self._relay_once()
+                except Exception as e:
+                    logger.debug(f"拉取项目事件失败: {e}")
+                await asyncio.sleep(self.relay_interval)
+        finally:
+            # 重新开始订阅时从最新事件开始，不补发无人订阅期间的事件
+            self._last_event_id = None
+
+    async def _relay_once(self):
+        async with AsyncSessionLocal() as session:
+            if self._last_event_id is None:
+                result = await session.execute(select(func.max(ProjectEvent.id)))
+                self._last_event_id = result.scalar() or 0
+                return
+
+            result = await session.execute(
+                select(ProjectEvent)
+                .where(
+                    ProjectEvent.id > self._last_event_id,
+                    ProjectEvent.worker_id != self.worker_id,
+                    ProjectEvent.username.in_(list(self._subscribers))
+                )
+                .order_by(ProjectEvent.id)
+                .limit(500)
+            )
+            rows = result.scalars().all()
+
+            # 只订阅不发布的worker也负责清理过期事件
+            now = time.time()
+            if now - self._last_prune >= self.prune_interval:
+                await self._maybe_prune(session, now)
+                await session.commit()
+
+        for row in rows:
+            self._last_event_id = row.id
+            self._deliver(row.username, row.payload)
+            self._stats['relayed'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取事件中心状态"""
+        return {
+            'worker_id': self.worker_id,
+            'users': len(self._subscribers),
+            'connections': sum(len(queues) for queues in self._subscribers.values()),
+            'relay_enabled': self.relay_enabled,
+            'relay_running': self._relay_task is not None and not self._relay_task.done(),
+            **self._stats
+        }
+
+    async def close(self):
+        """停止转发任务和未完成的发布任务"""
+        tasks = [task for task in [self._relay_task, *self._pending] if task and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._relay_task = None
+        self._subscribers.clear()
+
+
+# 全局项目事件中心实例
+project_event_hub = ProjectEventHub()
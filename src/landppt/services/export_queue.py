@@ -0,0 +1,190 @@
+"""
+导出任务队列
+PDF、PPTX、HTML 等导出共享有限数量的执行槽位，按优先级和用户公平性调度，
+队列满时拒绝新任务，避免并发导出启动大量 Chromium 实例拖慢整个服务
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+
+from ..core.config import ai_config
+
+logger = logging.getLogger(__name__)
+
+
+class ExportPriority(IntEnum):
+    """导出优先级，数值越小越先执行"""
+    INTERACTIVE = 0  # 用户同步等待的预览/下载
+    NORMAL = 1
+    BULK = 2  # 后台批量导出（如PPTX转换）
+
+
+class ExportQueueFullError(Exception):
+    """导出队列已满或用户排队任务过多"""
+
+    def __init__(self, message: str, retry_after: int = 30):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class ExportJob:
+    """排队中的导出任务"""
+    job_id: str
+    export_type: str
+    user_key: str
+    priority: ExportPriority
+    sequence: int
+    enqueued_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class ExportQueue:
+    """带优先级、用户公平性和准入控制的导出执行队列"""
+
+    def __init__(self):
+        self._waiting: List[ExportJob] = []
+        self._running: Dict[str, ExportJob] = {}
+        self._sequence = itertools.count()
+        self._lock = asyncio.Lock()
+        self._stats = {'completed': 0, 'failed': 0, 'rejected': 0}
+
+    @property
+    def max_workers(self) -> int:
+        return max(1, ai_config.export_max_concurrent)
+
+    @property
+    def max_queue_size(self) -> int:
+        return max(0, ai_config.export_max_queue_size)
+
+    @property
+    def max_jobs_per_user(self) -> int:
+        return max(1, ai_config.export_max_jobs_per_user)
+
+    def _user_job_count(self, user_key: str) -> int:
+        return (sum(1 for job in self._waiting if job.user_key == user_key)
+                + sum(1 for job in self._running.values() if job.user_key == user_key))
+
+    def _sort_key(self, job: ExportJob):
+        # 同优先级下，当前运行任务少的用户优先，再按入队顺序
+        running_for_user = sum(1 for running in self._running.values() if running.user_key == job.user_key)
+        return job.priority, running_for_user, job.sequence
+
+    def _dispatch(self):
+        """在有空闲槽位时启动下一个任务（调用方持有锁）"""
+        while self._waiting and len(self._running) < self.max_workers:
+            job = min(self._waiting, key=self._sort_key)
+            self._waiting.remove(job)
+            job.started_at = time.time()
+            self._running[job.job_id] = job
+            job.ready.set()
+
+    def check_admission(self, user_key: str):
+        """提交后台导出前的准入检查，超限时抛出 ExportQueueFullError"""
+        if self._user_job_count(user_key) >= self.max_jobs_per_user:
+            self._stats['rejected'] += 1
+            raise ExportQueueFullError(
+                f"您已有 {self.max_jobs_per_user} 个导出任务在进行中，请等待完成后再试"
+            )
+        if len(self._running) >= self.max_workers and len(self._waiting) >= self.max_queue_size:
+            self._stats['rejected'] += 1
+            raise ExportQueueFullError("导出队列已满，请稍后再试")
+
+    async def _acquire(self, export_type: str, user_key: str, priority: ExportPriority,
+                       job_id: Optional[str]) -> ExportJob:
+        async with self._lock:
+            self.check_admission(user_key)
+
+            job = ExportJob(
+                job_id=job_id or str(uuid.uuid4()),
+                export_type=export_type,
+                user_key=user_key,
+                priority=priority,
+                sequence=next(self._sequence)
+            )
+            self._waiting.append(job)
+            self._dispatch()
+
+        if not job.ready.is_set():
+            logger.info(f"导出任务排队: {job.job_id} ({export_type}), 位置 {self.get_position(job.job_id)}")
+        try:
+            await job.ready.wait()
+        except asyncio.CancelledError:
+            async with self._lock:
+                if job in self._waiting:
+                    self._waiting.remove(job)
+                else:
+                    self._running.pop(job.job_id, None)
+                    self._dispatch()
+            raise
+        return job
+
+    async def _release(self, job: ExportJob):
+        async with self._lock:
+            self._running.pop(job.job_id, None)
+            self._dispatch()
+
+    async def run(self, export_type: str, func: Callable, *args,
+                  user_key: Optional[str] = None,
+                  priority: ExportPriority = ExportPriority.NORMAL,
+                  job_id: Optional[str] = None,
+                  **kwargs) -> Any:
+        """
+        排队并执行导出函数（同步函数在线程池中执行）
+
+        Raises:
+            ExportQueueFullError: 超出队列容量或用户并发上限
+        """
+        job = await self._acquire(export_type, user_key or "anonymous", priority, job_id)
+        wait_time = job.started_at - job.enqueued_at
+        logger.info(f"开始导出任务: {job.job_id} ({export_type}), 排队 {wait_time:.1f}s")
+        try:
+            if asyncio.iscoroutinefunction(func):
+                result = await func(*args, **kwargs)
+            else:
+                from ..utils.thread_pool import run_blocking_io
+                result = await run_blocking_io(func, *args, **kwargs)
+            self._stats['completed'] += 1
+            return result
+        except Exception:
+            self._stats['failed'] += 1
+            raise
+        finally:
+            await self._release(job)
+
+    def get_position(self, job_id: str) -> Optional[int]:
+        """获取任务的排队位置（1开始），运行中返回0，未知任务返回None"""
+        if job_id in self._running:
+            return 0
+        ordered = sorted(self._waiting, key=self._sort_key)
+        for index, job in enumerate(ordered, 1):
+            if job.job_id == job_id:
+                return index
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取队列状态"""
+        return {
+            'max_workers': self.max_workers,
+            'max_queue_size': self.max_queue_size,
+            'max_jobs_per_user': self.max_jobs_per_user,
+            'running': len(self._running),
+            'waiting': len(self._waiting),
+            'running_jobs': [
+                {'job_id': job.job_id, 'export_type': job.export_type,
+                 'elapsed': time.time() - (job.started_at or job.enqueued_at)}
+                for job in self._running.values()
+            ],
+            **self._stats
+        }
+
+
+# 全局导出队列实例
+export_queue = ExportQueue()
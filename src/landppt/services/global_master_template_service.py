@@ -4,20 +4,28 @@ Global Master Template Service for managing reusable master templates
 
 import json
 import logging
+import re
 import time
 import base64
 from typing import Dict, Any, List, Optional
 from io import BytesIO
 
+from sqlalchemy import inspect as sa_inspect
+
 from ..ai import get_ai_provider, get_role_provider, AIMessage, MessageRole
 from ..ai.base import TextContent, ImageContent, MessageContentType
 from ..core.config import ai_config
 from ..database.service import DatabaseService
 from ..database.database import AsyncSessionLocal
+from .inline_image_service import inline_image_service
+from .slide_thumbnail_service import slide_thumbnail_service
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
 
+# 模板预览图地址，v 为模板更新时间，模板修改后地址随之变化
+TEMPLATE_PREVIEW_URL = "/landppt/api/global-master-templates/{template_id}/preview-image?v={version}"
+
 
 class GlobalMasterTemplateService:
     """Service for managing global master templates"""
@@ -69,6 +77,43 @@ class GlobalMasterTemplateService:
             response = await provider.chat_completion(messages=messages, **kwargs)
             yield response.content
 
+    @staticmethod
+    def _preview_version(updated_at: Optional[float]) -> str:
+        return str(int((updated_at or 0) * 1000))
+
+    def _preview_url(self, template_id: int, updated_at: Optional[float]) -> str:
+        return TEMPLATE_PREVIEW_URL.format(template_id=template_id, version=self._preview_version(updated_at))
+
+    def _preview_for(self, template) -> str:
+        """
+        模板的预览图地址：优先返回用户提供的预览图，未提供时返回渲染预览图的URL
+
+        旧数据中的 data URL 是以前生成的占位图（保存时用户的base64图片已转存到图片缓存），按未提供处理。
+        """
+        if 'preview_image' in sa_inspect(template).unloaded:
+            stored = template.list_preview_image
+        else:
+            stored = template.preview_image
+        if stored and not stored.startswith('data:'):
+            return stored
+        return self._preview_url(template.id, template.updated_at)
+
+    def _to_list_item(self, template) -> Dict[str, Any]:
+        """列表项：只包含卡片需要的字段，预览图以URL返回"""
+        return {
+            "id": template.id,
+            "template_name": template.template_name,
+            "description": template.description,
+            "preview_image": self._preview_for(template),
+            "tags": template.tags,
+            "is_default": template.is_default,
+            "is_active": template.is_active,
+            "usage_count": template.usage_count,
+            "created_by": template.created_by,
+            "created_at": template.created_at,
+            "updated_at": template.updated_at
+        }
+
     async def create_template(self, template_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new global master template"""
         try:
@@ -86,9 +131,14 @@ class GlobalMasterTemplateService:
                 if existing:
                     raise ValueError(f"Template name '{template_data['template_name']}' already exists")
 
+            # Lift inline base64 images into the image cache
+            await self._extract_inline_images(template_data)
+
             # Generate preview image if not provided
             if not template_data.get('preview_image'):
-                template_data['preview_image'] = await self._generate_preview_image(template_data['html_template'])
+                template_data['preview_image'] = await self._generate_preview_image(
+                    template_data['html_template'], template_data['template_name']
+                )
 
             # Extract style config if not provided
             if not template_data.get('style_config'):
@@ -106,19 +156,7 @@ class GlobalMasterTemplateService:
                 db_service = DatabaseService(session)
                 template = await db_service.create_global_master_template(template_data)
 
-                return {
-                    "id": template.id,
-                    "template_name": template.template_name,
-                    "description": template.description,
-                    "preview_image": template.preview_image,
-                    "tags": template.tags,
-                    "is_default": template.is_default,
-                    "is_active": template.is_active,
-                    "usage_count": template.usage_count,
-                    "created_by": template.created_by,
-                    "created_at": template.created_at,
-                    "updated_at": template.updated_at
-                }
+                return self._to_list_item(template)
 
         except Exception as e:
             logger.error(f"Failed to create global master template: {e}")
@@ -131,22 +169,7 @@ class GlobalMasterTemplateService:
                 db_service = DatabaseService(session)
                 templates = await db_service.get_all_global_master_templates(active_only)
 
-                return [
-                    {
-                        "id": template.id,
-                        "template_name": template.template_name,
-                        "description": template.description,
-                        "preview_image": template.preview_image,
-                        "tags": template.tags,
-                        "is_default": template.is_default,
-                        "is_active": template.is_active,
-                        "usage_count": template.usage_count,
-                        "created_by": template.created_by,
-                        "created_at": template.created_at,
-                        "updated_at": template.updated_at
-                    }
-                    for template in templates
-                ]
+                return [self._to_list_item(template) for template in templates]
 
         except Exception as e:
             logger.error(f"Failed to get global master templates: {e}")
@@ -180,22 +203,7 @@ class GlobalMasterTemplateService:
                 has_next = page < total_pages
                 has_prev = page > 1
 
-                template_list = [
-                    {
-                        "id": template.id,
-                        "template_name": template.template_name,
-                        "description": template.description,
-                        "preview_image": template.preview_image,
-                        "tags": template.tags,
-                        "is_default": template.is_default,
-                        "is_active": template.is_active,
-                        "usage_count": template.usage_count,
-                        "created_by": template.created_by,
-                        "created_at": template.created_at,
-                        "updated_at": template.updated_at
-                    }
-                    for template in templates
-                ]
+                template_list = [self._to_list_item(template) for template in templates]
 
                 return {
                     "templates": template_list,
@@ -227,7 +235,7 @@ class GlobalMasterTemplateService:
                     "template_name": template.template_name,
                     "description": template.description,
                     "html_template": template.html_template,
-                    "preview_image": template.preview_image,
+                    "preview_image": self._preview_for(template),
                     "style_config": template.style_config,
                     "tags": template.tags,
                     "is_default": template.is_default,
@@ -253,9 +261,12 @@ class GlobalMasterTemplateService:
                     if existing and existing.id != template_id:
                         raise ValueError(f"Template name '{update_data['template_name']}' already exists")
 
-            # Update preview image if HTML template is updated
+            # Lift inline base64 images into the image cache
+            await self._extract_inline_images(update_data)
+
+            # A stored preview no longer matches changed HTML; fall back to the rendered preview unless a new one is supplied
             if 'html_template' in update_data and 'preview_image' not in update_data:
-                update_data['preview_image'] = await self._generate_preview_image(update_data['html_template'])
+                update_data['preview_image'] = None
 
             # Update style config if HTML template is updated
             if 'html_template' in update_data and 'style_config' not in update_data:
@@ -263,7 +274,14 @@ class GlobalMasterTemplateService:
 
             async with AsyncSessionLocal() as session:
                 db_service = DatabaseService(session)
-                return await db_service.update_global_master_template(template_id, update_data)
+                updated = await db_service.update_global_master_template(template_id, update_data)
+
+            # 预览图中包含模板名称，名称或HTML变化后在后台重新生成
+            if updated and ('html_template' in update_data or 'template_name' in update_data):
+                source = await self.get_preview_source(template_id)
+                if source:
+                    slide_thumbnail_service.prefetch(source["html"])
+            return updated
 
         except Exception as e:
             logger.error(f"Failed to update global master template {template_id}: {e}")
@@ -325,7 +343,7 @@ class GlobalMasterTemplateService:
                     "template_name": template.template_name,
                     "description": template.description,
                     "html_template": template.html_template,
-                    "preview_image": template.preview_image,
+                    "preview_image": self._preview_for(template),
                     "style_config": template.style_config,
                     "tags": template.tags,
                     "is_default": template.is_default,
@@ -979,18 +997,58 @@ class GlobalMasterTemplateService:
             logger.error(f"HTML validation failed with exception: {e}")
             return False
 
-    async def _generate_preview_image(self, html_template: str) -> str:
-        """Generate preview image for template (placeholder implementation)"""
-        # This is a placeholder implementation
-        placeholder_svg = """
-        <svg width="320" height="180" xmlns="http://www.w3.org/2000/svg">
-            <rect width="320" height="180" fill="#f3f4f6"/>
-            <text x="160" y="90" text-anchor="middle" font-family="Arial" font-size="14" fill="#6b7280">
-                模板预览
-            </text>
-        </svg>
+    async def _extract_inline_images(self, template_data: Dict[str, Any]):
+        """Replace inline base64 images in template HTML and preview with image cache URLs"""
+        try:
+            if template_data.get('html_template'):
+                template_data['html_template'] = await inline_image_service.extract_inline_images(
+                    template_data['html_template'], "template"
+                )
+            preview_image = template_data.get('preview_image')
+            if preview_image and preview_image.startswith('data:image/'):
+                preview_url = await inline_image_service.store_data_url(preview_image, "template_preview")
+                if preview_url:
+                    template_data['preview_image'] = preview_url
+        except Exception as e:
+            logger.warning(f"Failed to extract inline images from template: {e}")
+
+    @staticmethod
+    def build_preview_html(html_template: str, title: str = "") -> str:
+        """用示例内容填充模板占位符，得到渲染预览图用的完整页面（与前端 iframe 预览一致）"""
+        preview_html = re.sub(r'\{\{\s*title\s*\}\}', lambda _: title or '模板预览', html_template)
+        preview_html = re.sub(r'\{\{\s*content\s*\}\}', '预览内容', preview_html)
+        preview_html = re.sub(r'\{\{\s*slide_number\s*\}\}', '1', preview_html)
+        preview_html = re.sub(r'\{\{\s*total_slides\s*\}\}', '1', preview_html)
+        if '<html' not in preview_html:
+            preview_html = (
+                '<!DOCTYPE html>\n<html>\n<head><meta charset="UTF-8"><style>'
+                'body { width: 1280px; height: 720px; margin: 0; padding: 0; }</style></head>\n'
+                f'<body>{preview_html}</body>\n</html>'
+            )
+        return preview_html
+
+    async def get_preview_source(self, template_id: int) -> Optional[Dict[str, str]]:
+        """获取渲染模板预览图所需的页面HTML和版本号（不加载其他字段）"""
+        async with AsyncSessionLocal() as session:
+            db_service = DatabaseService(session)
+            source = await db_service.get_global_master_template_preview_source(template_id)
+        if not source:
+            return None
+        template_name, html_template, updated_at = source
+        return {
+            "html": self.build_preview_html(html_template, template_name),
+            "version": self._preview_version(updated_at)
+        }
+
+    async def _generate_preview_image(self, html_template: str, title: str = "") -> Optional[str]:
+        """
+        在后台用无头浏览器把模板渲染成预览图（写入缩略图缓存），只在用户没有提供预览图时调用
+
+        渲染的预览图通过 /{template_id}/preview-image 按URL提供，不再以base64存入数据库，
+        因此总是返回None（清空旧的占位图）；用户提供的预览图保存在 preview_image 中并优先返回。
         """
-        return f"data:image/svg+xml;base64,{base64.b64encode(placeholder_svg.encode()).decode()}"
+        slide_thumbnail_service.prefetch(self.build_preview_html(html_template, title))
+        return None
 
     def _extract_style_config(self, html_content: str) -> Dict[str, Any]:
         """Extract style configuration from HTML"""
@@ -1031,22 +1089,7 @@ class GlobalMasterTemplateService:
                 db_service = DatabaseService(session)
                 templates = await db_service.get_global_master_templates_by_tags(tags, active_only)
 
-                return [
-                    {
-                        "id": template.id,
-                        "template_name": template.template_name,
-                        "description": template.description,
-                        "preview_image": template.preview_image,
-                        "tags": template.tags,
-                        "is_default": template.is_default,
-                        "is_active": template.is_active,
-                        "usage_count": template.usage_count,
-                        "created_by": template.created_by,
-                        "created_at": template.created_at,
-                        "updated_at": template.updated_at
-                    }
-                    for template in templates
-                ]
+                return [self._to_list_item(template) for template in templates]
 
         except Exception as e:
             logger.error(f"Failed to get global master templates by tags: {e}")
@@ -1082,22 +1125,7 @@ class GlobalMasterTemplateService:
                 has_next = page < total_pages
                 has_prev = page > 1
 
-                template_list = [
-                    {
-                        "id": template.id,
-                        "template_name": template.template_name,
-                        "description": template.description,
-                        "preview_image": template.preview_image,
-                        "tags": template.tags,
-                        "is_default": template.is_default,
-                        "is_active": template.is_active,
-                        "usage_count": template.usage_count,
-                        "created_by": template.created_by,
-                        "created_at": template.created_at,
-                        "updated_at": template.updated_at
-                    }
-                    for template in templates
-                ]
+                template_list = [self._to_list_item(template) for template in templates]
 
                 return {
                     "templates": template_list,
@@ -1114,6 +1142,23 @@ class GlobalMasterTemplateService:
             logger.error(f"Failed to get paginated templates by tags: {e}")
             raise
 
+    async def get_all_tags(self, active_only: bool = True) -> List[str]:
+        """Get all distinct template tags (for tag filters)"""
+        try:
+            async with AsyncSessionLocal() as session:
+                db_service = DatabaseService(session)
+                return await db_service.get_global_master_template_tags(active_only)
+
+        except Exception as e:
+            logger.error(f"Failed to get global master template tags: {e}")
+            raise
+
+    async def rebuild_tag_index(self) -> int:
+        """Index the tags of templates saved before the tag table existed"""
+        async with AsyncSessionLocal() as session:
+            db_service = DatabaseService(session)
+            return await db_service.rebuild_global_master_template_tag_index()
+
     async def increment_template_usage(self, template_id: int) -> bool:
         """Increment template usage count"""
         try:
@@ -251,6 +251,18 @@ class ImageCacheManager:
             logger.error(f"Failed to get cached image {cache_key}: {e}")
             return None
     
+    async def find_by_content(self, image_data: bytes) -> Optional[ImageInfo]:
+        """按内容哈希查找已缓存的图片，用于避免重复入库"""
+        content_hash = self._generate_content_hash(image_data)
+        cache_info = self._cache_index.get(content_hash)
+        if not cache_info or not Path(cache_info.file_path).exists():
+            return None
+
+        image_info = await self._load_image_metadata(content_hash)
+        if image_info:
+            cache_info.update_access()
+        return image_info
+
     async def is_cached(self, image_info: ImageInfo, image_data: bytes = None) -> Optional[str]:
         """检查图片是否已缓存"""
         # 如果有图片数据，使用内容哈希检查
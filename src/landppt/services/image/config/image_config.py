@@ -134,6 +134,15 @@ class ImageServiceConfig:
                 'theme': 'simple'  # 主题
             },
             
+            # 多提供者搜索编排配置
+            'search': {
+                'provider_timeout': 8,  # 单个提供者的超时（秒）
+                'deadline': 12,  # 整次搜索的截止时间（秒），到时返回已收集的结果
+                'good_score': 0.2,  # 匹配分数达到该值的图片计为可用结果，收集够一页后提前返回
+                'failure_threshold': 3,  # 连续失败多少次后熔断
+                'cooldown': 60  # 熔断冷却时间（秒）
+            },
+
             # 缓存配置 - 简化配置，图片永久有效
             'cache': {
                 'base_dir': 'temp/images_cache',
@@ -151,6 +160,20 @@ class ImageServiceConfig:
                 'watermark_text': 'LandPPT',
                 'watermark_opacity': 0.3
             },
+
+            # 缩略图配置：图片缓存后在后台生成，请求时按 Accept 头选择格式
+            'thumbnails': {
+                'sizes': {
+                    'gallery': (300, 200),  # 图床列表
+                    'strip': (160, 120),  # 编辑器图片库
+                    'preview': (1280, 960)  # 详情预览
+                },
+                'default_size': 'gallery',
+                'formats': ['avif', 'webp'],  # 按优先级排列，JPEG 始终生成作为兜底
+                'quality': 80,
+                'workers': 2,  # 同时生成缩略图的后台任务数
+                'wait_timeout': 10  # 请求尚未生成的缩略图时最多等待的秒数，超时返回原图
+            },
             
             # 智能匹配配置
             'matching': {
@@ -15,8 +15,10 @@ from .models import (
 )
 from .providers.base import provider_registry, ImageSearchProvider, ImageGenerationProvider, LocalStorageProvider
 from .processors.image_processor import ImageProcessor
+from .processors.thumbnail_generator import ThumbnailGenerator
 from .cache.image_cache import ImageCacheManager
 from .matching.image_matcher import ImageMatcher
+from .search_orchestrator import ImageSearchOrchestrator
 from .adapters.ppt_prompt_adapter import PPTPromptAdapter, PPTSlideContext
 
 logger = logging.getLogger(__name__)
@@ -43,9 +45,17 @@ class ImageService:
         # 初始化组件
         self.processor = ImageProcessor(config.get('processing', {}))
         self.cache_manager = ImageCacheManager(config.get('cache', {}))
+        self.thumbnails = ThumbnailGenerator(config.get('thumbnails', {}), self.cache_manager.thumbnails_dir)
+        self._thumbnail_backfill: Optional[asyncio.Task] = None
         self.matcher = ImageMatcher(config.get('matching', {}))
+        self.search_orchestrator = ImageSearchOrchestrator(config.get('search', {}))
         self.ppt_adapter = PPTPromptAdapter(config.get('ppt_adapter', {}))
 
+        # 本地图库（缓存图片）的相关度索引，搜索时按缓存索引增量同步
+        self.cached_image_index = self.matcher.create_index()
+        self._indexed_cache_keys: Dict[str, str] = {}  # cache_key -> image_id
+        self._cached_index_lock = asyncio.Lock()
+
         # 服务状态
         self.initialized = False
 
@@ -66,11 +76,49 @@ class ImageService:
             
             logger.debug("Image service initialized successfully")
             self.initialized = True
+            self._start_thumbnail_backfill()
             
         except Exception as e:
             logger.error(f"Failed to initialize image service: {e}")
             raise
     
+    def _start_thumbnail_backfill(self):
+        """在后台为缩略图功能上线前已缓存的图片补齐缩略图（每个进程执行一次）"""
+        if self._thumbnail_backfill is not None:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._thumbnail_backfill = asyncio.create_task(self._backfill_thumbnails())
+
+    async def _backfill_thumbnails(self):
+        try:
+            cache_index = self.cache_manager._cache_index
+            keys = list(cache_index)
+            images = []
+            for start in range(0, len(keys), 100):
+                batch = keys[start:start + 100]
+                infos = await asyncio.gather(
+                    *(self.cache_manager._load_image_metadata(key) for key in batch),
+                    return_exceptions=True
+                )
+                for key, info in zip(batch, infos):
+                    cache_info = cache_index.get(key)
+                    if cache_info is None:
+                        continue
+                    # 没有元数据的图片以缓存键作为ID（与 get_cached_image 一致）
+                    image_id = info.image_id if isinstance(info, ImageInfo) else key
+                    images.append((image_id, cache_info.file_path))
+
+            queued = await self.thumbnails.backfill(images)
+            if queued:
+                logger.info(f"Backfilled thumbnails for {queued} cached images")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to backfill thumbnails: {e}")
+
     async def _initialize_providers(self):
         """初始化图片提供者"""
         try:
@@ -282,29 +330,12 @@ class ImageService:
             if not request.preferred_providers:
                 search_providers = self._sort_providers_by_preference(search_providers)
             
-            # 并行搜索
-            search_tasks = []
-            for provider in search_providers:
-                task = asyncio.create_task(self._search_with_provider(provider, request))
-                search_tasks.append(task)
-            
-            # 等待所有搜索完成
-            results = await asyncio.gather(*search_tasks, return_exceptions=True)
-            
-            # 处理结果
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    logger.error(f"Search failed for provider {search_providers[i].provider}: {result}")
-                    continue
-                
-                if isinstance(result, ImageSearchResult):
-                    all_images.extend(result.images)
-                    provider_results[search_providers[i].provider.value] = len(result.images)
-            
-            # 使用智能匹配器排序和过滤结果
-            if all_images:
-                all_images = await self.matcher.rank_images(request.query, all_images)
-            
+            # 并行搜索：各提供者的结果到达后立即打分，收集到足够的可用图片或到达截止时间即返回
+            all_images, provider_results = await self.search_orchestrator.search(
+                search_providers, request,
+                lambda images: self.matcher.score_images(request.query, images)
+            )
+
             # 分页处理
             total_count = len(all_images)
             start_idx = (request.page - 1) * request.per_page
@@ -330,24 +361,6 @@ class ImageService:
                 search_time=time.time() - start_time
             )
     
-    async def _search_with_provider(self, provider: ImageSearchProvider, request: ImageSearchRequest) -> ImageSearchResult:
-        """使用特定提供者搜索"""
-        try:
-            result = await provider.search(request)
-
-            # 不再自动缓存搜索到的图片，避免重复缓存
-            # 缓存将在实际使用图片时进行
-
-            return result
-
-        except Exception as e:
-            logger.error(f"Search failed for provider {provider.provider}: {e}")
-            return ImageSearchResult(
-                images=[], total_count=0, page=request.page,
-                per_page=request.per_page, has_next=False, has_prev=False,
-                search_time=0.0
-            )
-    
     async def _cache_image_from_provider(self, provider: ImageSearchProvider, image_info: ImageInfo):
         """从提供者缓存图片"""
         import uuid
@@ -381,7 +394,7 @@ class ImageService:
                 return
 
             # 缓存图片
-            await self.cache_manager.cache_image(image_info, image_data)
+            await self._cache_image(image_info, image_data)
             logger.debug(f"Successfully cached image from provider: {image_info.image_id}")
 
         except Exception as e:
@@ -447,7 +460,7 @@ class ImageService:
                     image_data = f.read()
                 
                 # 缓存图片
-                cache_key = await self.cache_manager.cache_image(result.image_info, image_data)
+                cache_key = await self._cache_image(result.image_info, image_data)
                 logger.info(f"Generated image cached: {cache_key}")
             
             return result
@@ -484,7 +497,7 @@ class ImageService:
             
             # 如果上传成功，缓存图片
             if result.success and result.image_info:
-                cache_key = await self.cache_manager.cache_image(result.image_info, file_data)
+                cache_key = await self._cache_image(result.image_info, file_data)
                 logger.info(f"Uploaded image cached: {cache_key}")
             
             return result
@@ -497,6 +510,23 @@ class ImageService:
                 error_code="upload_error"
             )
     
+    async def find_image_by_content(self, file_data: bytes) -> Optional[ImageInfo]:
+        """按内容查找已存在的图片（基于内容哈希）"""
+        if not self.initialized:
+            await self.initialize()
+
+        try:
+            return await self.cache_manager.find_by_content(file_data)
+        except Exception as e:
+            logger.error(f"Failed to find image by content: {e}")
+            return None
+
+    async def _cache_image(self, image_info: ImageInfo, image_data: bytes) -> str:
+        """缓存图片，并把缩略图生成加入后台队列"""
+        cache_key = await self.cache_manager.cache_image(image_info, image_data)
+        self.thumbnails.schedule(image_info.image_id, image_info.local_path)
+        return cache_key
+
     async def get_image(self, image_id: str) -> Optional[ImageInfo]:
         """获取图片信息"""
         if not self.initialized:
@@ -569,7 +599,7 @@ class ImageService:
                 with open(output_path, 'rb') as f:
                     processed_data = f.read()
                 
-                await self.cache_manager.cache_image(result.image_info, processed_data)
+                await self._cache_image(result.image_info, processed_data)
             
             return result
             
@@ -795,6 +825,49 @@ class ImageService:
 
         return True
 
+    async def search_cached_images(self, query: str, limit: int = 10,
+                                   min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        按相关度搜索本地图库中的图片
+
+        Returns:
+            (image_id, 分数) 列表，按分数从高到低排列
+        """
+        if not self.initialized:
+            await self.initialize()
+
+        try:
+            await self._sync_cached_image_index()
+            return self.matcher.search(self.cached_image_index, query, limit, min_score)
+        except Exception as e:
+            logger.error(f"Failed to search cached images: {e}")
+            return []
+
+    async def _sync_cached_image_index(self):
+        """把缓存中新增和已删除的图片同步到相关度索引（只加载新增图片的元数据）"""
+        async with self._cached_index_lock:
+            cache_index = self.cache_manager._cache_index
+            for cache_key in [key for key in self._indexed_cache_keys if key not in cache_index]:
+                self.cached_image_index.remove(self._indexed_cache_keys.pop(cache_key))
+
+            new_keys = [key for key in list(cache_index) if key not in self._indexed_cache_keys]
+            if not new_keys:
+                return
+            image_infos = await asyncio.gather(
+                *(self.cache_manager._load_image_metadata(key) for key in new_keys),
+                return_exceptions=True
+            )
+            for cache_key, image_info in zip(new_keys, image_infos):
+                if isinstance(image_info, ImageInfo):
+                    self.cached_image_index.add(image_info)
+                    self._indexed_cache_keys[cache_key] = image_info.image_id
+            logger.debug(f"Indexed {len(self._indexed_cache_keys)} cached images")
+
+    def update_cached_image_index(self, image_info: ImageInfo):
+        """图片标题、描述或标签修改后更新相关度索引"""
+        if image_info.image_id in self.cached_image_index:
+            self.cached_image_index.add(image_info)
+
     async def delete_image(self, image_id: str) -> bool:
         """删除图片"""
         if not self.initialized:
@@ -817,72 +890,52 @@ class ImageService:
 
             # 从缓存中删除
             await self.cache_manager.remove_from_cache(cache_key)
+            # 先取消排队中的生成任务，否则删除后仍会生成缩略图并被当作不可变资源返回
+            self.thumbnails.cancel(image_id)
+            await asyncio.get_event_loop().run_in_executor(None, self.thumbnails.remove, image_id)
             return True
 
         except Exception as e:
             logger.error(f"Failed to delete image {image_id}: {e}")
             return False
 
-    async def get_thumbnail(self, image_id: str) -> Optional[str]:
-        """获取图片缩略图路径"""
+    async def get_thumbnail(self, image_id: str, size: Optional[str] = None,
+                            accept: str = '') -> Optional[Tuple[str, str]]:
+        """
+        获取图片缩略图
+
+        Args:
+            size: 缩略图尺寸名称（gallery、strip、preview），默认 gallery
+            accept: 请求的 Accept 头，用于选择 AVIF / WebP / JPEG
+
+        Returns:
+            (缩略图路径, MIME类型)；图片不存在或缩略图未能及时生成时返回None
+        """
+        size = size or self.thumbnails.default_size
+        if size not in self.thumbnails.sizes:
+            raise ValueError(f"Unknown thumbnail size: {size}")
+
+        # 已生成的缩略图直接返回，不需要加载图片元数据
+        found = self.thumbnails.find(image_id, size, accept)
+        if found is not None:
+            return str(found[0]), found[1]
+
         if not self.initialized:
             await self.initialize()
 
         try:
-            # 查找图片信息
             image_info = await self.get_image(image_id)
             if not image_info:
                 return None
 
-            # 生成缩略图路径
-            thumbnail_dir = self.cache_manager.thumbnails_dir
-            thumbnail_path = thumbnail_dir / f"{image_id}_thumb.jpg"
-
-            # 如果缩略图已存在，直接返回
-            if thumbnail_path.exists():
-                return str(thumbnail_path)
-
-            # 如果原图存在，生成缩略图
-            if image_info.local_path and Path(image_info.local_path).exists():
-                try:
-                    from PIL import Image
-
-                    # 创建缩略图目录
-                    thumbnail_dir.mkdir(parents=True, exist_ok=True)
-
-                    # 生成缩略图
-                    with Image.open(image_info.local_path) as img:
-                        # 如果是RGBA模式，转换为RGB以支持JPEG保存
-                        if img.mode in ('RGBA', 'LA', 'P'):
-                            # 创建白色背景
-                            background = Image.new('RGB', img.size, (255, 255, 255))
-                            if img.mode == 'P':
-                                img = img.convert('RGBA')
-                            # 将原图粘贴到白色背景上
-                            if img.mode == 'RGBA':
-                                background.paste(img, mask=img.split()[-1])
-                            else:
-                                background.paste(img)
-                            img = background
-
-                        img.thumbnail((300, 200), Image.Resampling.LANCZOS)
-                        img.save(str(thumbnail_path), "JPEG", quality=85)
-
-                    return str(thumbnail_path)
-
-                except ImportError:
-                    logger.warning("PIL not available, cannot generate thumbnail")
-                    return image_info.local_path
-                except Exception as e:
-                    logger.warning(f"Failed to generate thumbnail for {image_id}: {e}")
-                    return image_info.local_path
-
-            return None
+            # 在后台工作任务中生成（不在事件循环中解码图片），等待超时返回None
+            found = await self.thumbnails.get(image_id, image_info.local_path, size, accept)
+            return (str(found[0]), found[1]) if found is not None else None
 
         except Exception as e:
             logger.error(f"Failed to get thumbnail for {image_id}: {e}")
             return None
-    
+
     async def cleanup_cache(self) -> Dict[str, int]:
         """清理缓存 - 由于图片永久有效，此方法仅返回统计信息"""
         return {
@@ -932,6 +985,9 @@ class ImageService:
             'service_initialized': self.initialized,
             'providers': provider_health,
             'cache': cache_stats,
+            'search': self.search_orchestrator.get_stats(),
+            'cached_image_index': self.cached_image_index.get_stats(),
+            'thumbnails': self.thumbnails.get_stats(),
             'status': 'healthy' if self.initialized else 'not_initialized'
         }
 
@@ -1006,6 +1062,13 @@ class ImageService:
         """为PPT幻灯片创建图片生成提示词"""
         return await self.ppt_adapter.generate_image_prompt(slide_context)
 
+    async def close(self):
+        """停止后台缩略图生成"""
+        if self._thumbnail_backfill is not None and not self._thumbnail_backfill.done():
+            self._thumbnail_backfill.cancel()
+            await asyncio.gather(self._thumbnail_backfill, return_exceptions=True)
+        await self.thumbnails.close()
+
 
 # 全局图片服务实例
 _global_image_service = None
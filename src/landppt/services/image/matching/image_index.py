@@ -0,0 +1,308 @@
+"""
+图片相关度索引
+图片的标题、标签、关键词和描述只在入库时分词一次，按词项保存倒排表（稀疏的 图片×词项 TF 矩阵），
+查询时用 IDF 加权的查询向量与倒排表做一次稀疏矩阵-向量乘法，得到所有图片的余弦相似度。
+新图片增量写入；同一图片再次写入时旧行标记为失效，失效行过多时整体压缩。
+中文等CJK文本按二元组（bigram）切分，不依赖分词词典。
+"""
+
+import logging
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..models import ImageInfo
+
+logger = logging.getLogger(__name__)
+
+_LATIN_RE = re.compile(r'[a-z0-9]+')
+_CJK_RE = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]+')
+
+# 失效行超过该数量且多于有效行时压缩索引
+_COMPACT_MIN_DEAD = 64
+
+
+def tokenize(text: Optional[str], stop_words: Set[str]) -> List[str]:
+    """
+    把文本切分为词项：拉丁字母/数字按单词切分，CJK文本在单字停用词处断开后按二元组切分
+
+    例如 "数据分析 Chart" -> ['chart', '数据', '据分', '分析']
+    """
+    if not text:
+        return []
+    text = text.lower()
+    tokens = [word for word in _LATIN_RE.findall(text) if len(word) > 1 and word not in stop_words]
+
+    for run in _CJK_RE.findall(text):
+        segment = []
+        for char in run + ' ':
+            if char != ' ' and char not in stop_words:
+                segment.append(char)
+                continue
+            if len(segment) == 1:
+                tokens.append(segment[0])
+            else:
+                tokens.extend(
+                    bigram for bigram in (segment[i] + segment[i + 1] for i in range(len(segment) - 1))
+                    if bigram not in stop_words
+                )
+            segment = []
+    return tokens
+
+
+class ImageIndex:
+    """图片TF-IDF倒排索引"""
+
+    def __init__(self,
+                 stop_words: Set[str],
+                 field_weights: Dict[str, float],
+                 popularity_weight: float = 0.0,
+                 max_images: Optional[int] = None):
+        """
+        Args:
+            stop_words: 停用词
+            field_weights: 各字段在图片向量中的权重（keywords、tags、text）
+            popularity_weight: 使用热度在最终分数中的权重
+            max_images: 最多保留的图片数量，超出时淘汰最早写入的图片；None 表示不限制
+        """
+        self.stop_words = stop_words
+        self.field_weights = field_weights
+        self.popularity_weight = popularity_weight
+        self.max_images = max_images
+
+        # image_id -> 行号（按写入顺序排列，用于淘汰最早的图片）
+        self._rows: Dict[str, int] = {}
+        self._row_ids: List[Optional[str]] = []
+        # 每行的版本（updated_at, usage_count）和归一化后的词项权重，失效行为 None
+        self._row_versions: List[Optional[Tuple[float, int]]] = []
+        self._row_vectors: List[Optional[Dict[str, float]]] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._popularity = np.zeros(0, dtype=np.float32)
+
+        # 词项 -> (行号列表, 权重列表)，以及按需生成的数组缓存
+        self._postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._posting_arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # 词项 -> 包含该词项的有效图片数
+        self._doc_freq: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, image_id: str) -> bool:
+        return image_id in self._rows
+
+    def ids(self) -> List[str]:
+        return list(self._rows)
+
+    def add(self, image: ImageInfo) -> int:
+        """写入图片（内容未变时直接返回已有行），返回行号"""
+        version = (image.updated_at, image.usage_count)
+        row = self._rows.get(image.image_id)
+        if row is not None:
+            if self._row_versions[row] == version:
+                return row
+            self._remove_row(row)
+
+        row = len(self._row_ids)
+        vector = self._vectorize(image)
+        self._rows[image.image_id] = row
+        self._row_ids.append(image.image_id)
+        self._row_versions.append(version)
+        self._row_vectors.append(vector)
+        self._grow(row + 1)
+        self._alive[row] = True
+        self._popularity[row] = min(math.log(image.usage_count + 1) / math.log(100), 1.0)
+        self._add_postings(row, vector)
+
+        if self.max_images is not None and len(self._rows) > self.max_images:
+            for image_id in list(self._rows)[:len(self._rows) - self.max_images]:
+                self._remove_row(self._rows[image_id])
+        self._maybe_compact()
+        return self._rows.get(image.image_id, row)
+
+    def add_many(self, images: Iterable[ImageInfo]) -> List[Optional[int]]:
+        """批量写入图片，返回与输入顺序对应的行号（超出容量被淘汰的图片为 None）"""
+        images = list(images)
+        for image in images:
+            self.add(image)
+        # 写入过程中可能发生压缩，行号在全部写入后再查
+        return self.rows_for(image.image_id for image in images)
+
+    def remove(self, image_id: str) -> bool:
+        row = self._rows.get(image_id)
+        if row is None:
+            return False
+        self._remove_row(row)
+        self._maybe_compact()
+        return True
+
+    def clear(self):
+        self.__init__(self.stop_words, self.field_weights, self.popularity_weight, self.max_images)
+
+    def query_vector(self, query: str) -> Dict[str, float]:
+        """查询向量：词频 × IDF，L2归一化（索引中不存在的词项不参与计算）"""
+        counts = Counter(token for token in tokenize(query, self.stop_words) if self._doc_freq.get(token))
+        if not counts:
+            return {}
+        total = len(self._rows)
+        weights = {
+            term: count * (math.log((1 + total) / (1 + self._doc_freq[term])) + 1.0)
+            for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def similarity(self, query: str) -> np.ndarray:
+        """查询与所有行的余弦相似度（失效行为0）"""
+        scores = np.zeros(len(self._row_ids), dtype=np.float32)
+        for term, weight in self.query_vector(query).items():
+            rows, values = self._posting_array(term)
+            # 同一词项在每行最多出现一次，直接按行号累加
+            scores[rows] += weight * values
+        # 倒排表在压缩前仍保留失效行的条目
+        scores[~self._alive[:len(scores)]] = 0.0
+        return scores
+
+    def score(self, query: str, matched_only: bool = False) -> np.ndarray:
+        """
+        所有行的最终分数：相似度按字段权重之和缩放后加上热度分数
+
+        Args:
+            matched_only: 为真时与查询没有共同词项的图片记0分（不因热度被选中）
+        """
+        similarity = self.similarity(query)
+        scores = similarity * sum(self.field_weights.values())
+        size = len(scores)
+        if self.popularity_weight:
+            scores += self._popularity[:size] * self.popularity_weight
+        scores[~self._alive[:size]] = 0.0
+        if matched_only:
+            scores[similarity <= 0] = 0.0
+        return scores
+
+    def coverage(self, terms: Iterable[str]) -> np.ndarray:
+        """每行包含给定词项的比例（用于内容类型、主题等词表匹配）"""
+        tokens = set()
+        for term in terms:
+            tokens.update(tokenize(term, self.stop_words))
+        if not tokens:
+            return np.zeros(len(self._row_ids), dtype=np.float32)
+        counts = np.zeros(len(self._row_ids), dtype=np.float32)
+        for token in tokens:
+            if token in self._postings:
+                counts[self._posting_array(token)[0]] += 1.0
+        counts[~self._alive[:len(counts)]] = 0.0
+        return counts / len(tokens)
+
+    def rows_for(self, image_ids: Iterable[str]) -> List[Optional[int]]:
+        return [self._rows.get(image_id) for image_id in image_ids]
+
+    def top(self, scores: np.ndarray, limit: int, min_score: float = 0.0) -> List[Tuple[str, float]]:
+        """从分数向量中取前 limit 个有效图片，返回 (image_id, 分数)"""
+        if limit <= 0 or not len(scores):
+            return []
+        candidates = np.flatnonzero(scores > min_score)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        # 分数相同时先写入的图片在前
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(self._row_ids[row], float(scores[row])) for row in candidates]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'images': len(self._rows),
+            'rows': len(self._row_ids),
+            'terms': len(self._doc_freq)
+        }
+
+    def _vectorize(self, image: ImageInfo) -> Dict[str, float]:
+        """图片向量：各字段内按词频归一化后乘以字段权重，再整体L2归一化"""
+        vector: Counter = Counter()
+
+        def add_field(tokens: List[str], weight: float):
+            if tokens and weight > 0:
+                share = weight / len(tokens)
+                for token in tokens:
+                    vector[token] += share
+
+        keyword_tokens = []
+        for keyword in image.keywords:
+            keyword_tokens.extend(tokenize(keyword, self.stop_words))
+        add_field(keyword_tokens, self.field_weights.get('keywords', 0.0))
+
+        for tag in image.tags:
+            tag_tokens = tokenize(tag.name, self.stop_words)
+            add_field(tag_tokens, self.field_weights.get('tags', 0.0) * tag.confidence / max(len(image.tags), 1))
+
+        text = ' '.join(part for part in (image.title, image.description, image.alt_text) if part)
+        add_field(tokenize(text, self.stop_words), self.field_weights.get('text', 0.0))
+
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if not norm:
+            return {}
+        return {term: weight / norm for term, weight in vector.items()}
+
+    def _grow(self, size: int):
+        if size <= len(self._alive):
+            return
+        capacity = max(size, len(self._alive) * 2, 64)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        popularity = np.zeros(capacity, dtype=np.float32)
+        popularity[:len(self._popularity)] = self._popularity
+        self._alive, self._popularity = alive, popularity
+
+    def _add_postings(self, row: int, vector: Dict[str, float]):
+        for term, weight in vector.items():
+            rows, weights = self._postings.setdefault(term, ([], []))
+            rows.append(row)
+            weights.append(weight)
+            self._posting_arrays.pop(term, None)
+            self._doc_freq[term] += 1
+
+    def _remove_row(self, row: int):
+        image_id = self._row_ids[row]
+        vector = self._row_vectors[row] or {}
+        for term in vector:
+            self._doc_freq[term] -= 1
+            if self._doc_freq[term] <= 0:
+                del self._doc_freq[term]
+        self._rows.pop(image_id, None)
+        self._row_ids[row] = None
+        self._row_versions[row] = None
+        self._row_vectors[row] = None
+        self._alive[row] = False
+        self._popularity[row] = 0.0
+
+    def _posting_array(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._posting_arrays.get(term)
+        if arrays is None:
+            rows, weights = self._postings.get(term, ([], []))
+            arrays = (np.asarray(rows, dtype=np.int64), np.asarray(weights, dtype=np.float32))
+            self._posting_arrays[term] = arrays
+        return arrays
+
+    def _maybe_compact(self):
+        dead = len(self._row_ids) - len(self._rows)
+        if dead < _COMPACT_MIN_DEAD or dead <= len(self._rows):
+            return
+
+        live = [row for row in range(len(self._row_ids)) if self._row_ids[row] is not None]
+        row_ids = [self._row_ids[row] for row in live]
+        versions = [self._row_versions[row] for row in live]
+        vectors = [self._row_vectors[row] for row in live]
+        popularity = self._popularity[live] if live else np.zeros(0, dtype=np.float32)
+
+        self._rows = {image_id: row for row, image_id in enumerate(row_ids)}
+        self._row_ids, self._row_versions, self._row_vectors = row_ids, versions, vectors
+        self._alive = np.ones(len(live), dtype=bool)
+        self._popularity = popularity.astype(np.float32)
+        self._postings = {}
+        self._posting_arrays = {}
+        self._doc_freq = Counter()
+        for row, vector in enumerate(vectors):
+            self._add_postings(row, vector)
+        logger.debug(f"图片索引已压缩: {dead} 个失效行, {len(live)} 张图片")
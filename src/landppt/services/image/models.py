@@ -261,7 +261,7 @@ class ImageSearchResult(BaseModel):
     # 搜索统计
     search_time: float
     provider_results: Dict[str, int] = Field(default_factory=dict)
-    provider: ImageProvider
+    provider: Optional[ImageProvider] = None  # 多个提供者的合并结果为None
     error: Optional[str] = None
 
 
@@ -0,0 +1,297 @@
+"""
+图片缩略图生成
+图片缓存（上传、生成、下载）后由后台工作任务一次解码原图，生成多个尺寸的 AVIF / WebP 缩略图和 JPEG 兜底版本，
+请求时按 Accept 头选择浏览器支持的最佳格式。JPEG 原图用 draft() 在解码阶段直接缩小，避免解码整张大图。
+"""
+
+import asyncio
+import io
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from ....utils.thread_pool import run_blocking_io
+
+logger = logging.getLogger(__name__)
+
+# 格式 -> (Pillow格式名, 文件后缀, MIME类型)
+THUMBNAIL_FORMATS = {
+    'avif': ('AVIF', 'avif', 'image/avif'),
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+}
+
+DEFAULT_SIZES = {
+    'gallery': (300, 200),
+    'strip': (160, 120),
+    'preview': (1280, 960),
+}
+
+
+def _can_save(pil_format: str) -> bool:
+    """当前Pillow是否支持编码该格式（AVIF 需要 Pillow 11.2+ 或 pillow-avif-plugin）"""
+    if pil_format == 'AVIF':
+        try:
+            import pillow_avif  # noqa: F401
+        except ImportError:
+            pass
+    Image.init()
+    return pil_format in Image.SAVE
+
+
+def _accepts(accept: str, mime_type: str) -> bool:
+    for part in accept.split(','):
+        name, _, params = part.strip().partition(';')
+        if name.strip().lower() == mime_type and params.strip().replace(' ', '') not in ('q=0', 'q=0.0'):
+            return True
+    return False
+
+
+def _write_file(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _render_variants(source_path: str,
+                     targets: List[Tuple[Tuple[int, int], List[Tuple[str, Path]]]],
+                     quality: int) -> int:
+    """
+    解码一次原图，从大到小依次生成各尺寸、各格式的缩略图（在线程池中执行）
+
+    Args:
+        targets: [((宽, 高), [(格式, 输出路径), ...]), ...]，按尺寸从大到小排列
+
+    Returns:
+        生成的文件数量
+    """
+    longest = max(max(size) for size, _ in targets)
+    with Image.open(source_path) as source:
+        # 只对JPEG生效：按 1/2、1/4、1/8 缩小解码，保证结果仍不小于最大的缩略图
+        source.draft('RGB', (longest, longest))
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    written = 0
+    for size, outputs in targets:
+        # 每个尺寸都从上一个（更大的）尺寸缩小，越往后越快
+        image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        flattened = None
+        for fmt, path in outputs:
+            frame = image
+            if fmt == 'jpeg' and has_alpha:
+                if flattened is None:
+                    flattened = Image.new('RGB', image.size, (255, 255, 255))
+                    flattened.paste(image, mask=image.getchannel('A'))
+                frame = flattened
+            output = io.BytesIO()
+            if fmt == 'avif':
+                frame.save(output, 'AVIF', quality=quality, speed=8)
+            elif fmt == 'webp':
+                frame.save(output, 'WEBP', quality=quality, method=4)
+            else:
+                frame.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+            _write_file(path, output.getvalue())
+            written += 1
+    return written
+
+
+class ThumbnailGenerator:
+    """多尺寸、多格式缩略图的后台生成器"""
+
+    def __init__(self, config: Dict[str, object], thumbnails_dir: Path):
+        self.thumbnails_dir = Path(thumbnails_dir)
+        self.sizes: Dict[str, Tuple[int, int]] = {
+            name: (int(size[0]), int(size[1]))
+            for name, size in (config.get('sizes') or DEFAULT_SIZES).items()
+        }
+        self.default_size = config.get('default_size', 'gallery')
+        self.quality = int(config.get('quality', 80))
+        # 同时生成缩略图的工作任务数（每个任务占用一个线程解码和编码图片）
+        self.workers = max(1, int(config.get('workers', 2)))
+        # 请求尚未生成的缩略图时等待的最长时间（秒），超时后返回原图
+        self.wait_timeout = float(config.get('wait_timeout', 10.0))
+
+        # 按优先级排列的现代格式，JPEG 始终生成，作为不支持它们的浏览器的兜底
+        self.formats = [
+            fmt for fmt in config.get('formats', ['avif', 'webp'])
+            if fmt in THUMBNAIL_FORMATS and fmt != 'jpeg' and _can_save(THUMBNAIL_FORMATS[fmt][0])
+        ] + ['jpeg']
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._jobs: Dict[str, asyncio.Future] = {}
+        self._stats = {'generated': 0, 'failed': 0, 'waited': 0, 'timeouts': 0, 'cancelled': 0, 'backfilled': 0}
+
+    def variant_path(self, image_id: str, size: str, fmt: str) -> Path:
+        return self.thumbnails_dir / size / f"{image_id}.{THUMBNAIL_FORMATS[fmt][1]}"
+
+    def find(self, image_id: str, size: str, accept: str = '') -> Optional[Tuple[Path, str]]:
+        """
+        查找已生成的缩略图，按 Accept 头选择浏览器支持的最佳格式
+
+        Returns:
+            (文件路径, MIME类型)；尚未生成时返回None
+        """
+        for fmt in self.formats:
+            mime_type = THUMBNAIL_FORMATS[fmt][2]
+            if fmt != 'jpeg' and not _accepts(accept, mime_type):
+                continue
+            path = self.variant_path(image_id, size, fmt)
+            if path.exists():
+                return path, mime_type
+        return None
+
+    def schedule(self, image_id: str, source_path: Optional[str]) -> Optional[asyncio.Future]:
+        """把图片加入后台生成队列（图片缓存后调用，不等待结果）；同一图片的任务只排队一次"""
+        if not image_id or not source_path:
+            return None
+        job = self._jobs.get(image_id)
+        if job is not None:
+            return job
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+        self._start_workers()
+        job = loop.create_future()
+        self._jobs[image_id] = job
+        self._queue.put_nowait((image_id, source_path, job))
+        return job
+
+    def cancel(self, image_id: str):
+        """取消图片尚未完成的生成任务（删除图片时调用）；正在生成的任务完成后会删除其输出"""
+        job = self._jobs.pop(image_id, None)
+        if job is None:
+            return
+        self._stats['cancelled'] += 1
+        if not job.done():
+            job.set_result(None)
+
+    async def backfill(self, images: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """
+        为已有图片补齐缺失的缩略图
+
+        分批排队，每批完成后再排下一批，新缓存的图片不会排在大量补齐任务之后。
+
+        Args:
+            images: (image_id, 原图路径)
+
+        Returns:
+            需要补齐的图片数量
+        """
+        candidates = [(image_id, path) for image_id, path in images if image_id and path]
+        missing = await run_blocking_io(self._find_missing, candidates)
+        batch_size = self.workers * 4
+        for start in range(0, len(missing), batch_size):
+            jobs = [self.schedule(image_id, path) for image_id, path in missing[start:start + batch_size]]
+            await asyncio.gather(*(job for job in jobs if job is not None), return_exceptions=True)
+        self._stats['backfilled'] += len(missing)
+        return len(missing)
+
+    def _find_missing(self, images: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        # JPEG 兜底版本每个尺寸都会生成，缺少任一尺寸即需要补齐
+        return [
+            (image_id, path) for image_id, path in images
+            if Path(path).exists()
+            and not all(self.variant_path(image_id, size, 'jpeg').exists() for size in self.sizes)
+        ]
+
+    async def get(self, image_id: str, source_path: Optional[str], size: str,
+                  accept: str = '') -> Optional[Tuple[Path, str]]:
+        """获取缩略图，尚未生成时加入队列并等待（最多 wait_timeout 秒）"""
+        found = self.find(image_id, size, accept)
+        if found is not None:
+            return found
+        if not source_path or not Path(source_path).exists():
+            return None
+
+        job = self.schedule(image_id, source_path)
+        if job is None:
+            return None
+        self._stats['waited'] += 1
+        try:
+            # shield：等待超时不取消生成，生成后的缩略图供下次请求使用
+            await asyncio.wait_for(asyncio.shield(job), self.wait_timeout)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            return None
+        return self.find(image_id, size, accept)
+
+    def _start_workers(self):
+        self._worker_tasks = [task for task in self._worker_tasks if not task.done()]
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self):
+        while True:
+            image_id, source_path, job = await self._queue.get()
+            if self._jobs.get(image_id) is not job:
+                # 排队期间图片已被删除
+                self._queue.task_done()
+                continue
+            try:
+                targets = [
+                    (size, [(fmt, self.variant_path(image_id, name, fmt)) for fmt in self.formats])
+                    for name, size in sorted(self.sizes.items(), key=lambda item: item[1][0] * item[1][1],
+                                             reverse=True)
+                ]
+                started = time.monotonic()
+                written = await run_blocking_io(_render_variants, source_path, targets, self.quality)
+                if self._jobs.get(image_id) is not job:
+                    # 生成期间图片已被删除，不保留孤立的缩略图
+                    await run_blocking_io(self.remove, image_id)
+                    continue
+                self._stats['generated'] += 1
+                logger.debug(f"Generated {written} thumbnails for {image_id} "
+                             f"in {time.monotonic() - started:.2f}s")
+            except Exception as e:
+                self._stats['failed'] += 1
+                logger.warning(f"Failed to generate thumbnails for {image_id}: {e}")
+            finally:
+                if self._jobs.get(image_id) is job:
+                    del self._jobs[image_id]
+                if not job.done():
+                    job.set_result(None)
+                self._queue.task_done()
+
+    def remove(self, image_id: str):
+        """删除图片的全部缩略图"""
+        for size in self.sizes:
+            for fmt in THUMBNAIL_FORMATS:
+                try:
+                    self.variant_path(image_id, size, fmt).unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    logger.debug(f"Failed to remove thumbnail {image_id}/{size}.{fmt}: {e}")
+
+    def get_stats(self) -> Dict[str, object]:
+        """获取缩略图生成统计信息"""
+        return {
+            'formats': self.formats,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'pending': len(self._jobs),
+            **self._stats
+        }
+
+    async def close(self):
+        """停止后台工作任务"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        for job in self._jobs.values():
+            if not job.done():
+                job.cancel()
+        self._jobs.clear()
+        self._queue = None
@@ -10,6 +10,7 @@ from pathlib import Path
 import aiohttp
 import json
 
+from ....utils.http_client import http_clients
 from .base import ImageGenerationProvider
 from ..models import (
     ImageInfo, ImageGenerationRequest, ImageOperationResult, 
@@ -65,7 +66,7 @@ class DalleProvider(ImageGenerationProvider):
             api_request = self._prepare_api_request(request)
             
             # 调用DALL-E API
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.post(
                     f"{self.api_base}/images/generations",
                     headers={
@@ -184,7 +185,7 @@ class DalleProvider(ImageGenerationProvider):
         image_path = save_dir / filename
         
         # 下载图片
-        async with aiohttp.ClientSession() as session:
+        async with http_clients.session() as session:
             async with session.get(image_url) as response:
                 if response.status != 200:
                     raise Exception(f"Failed to download image: {response.status}")
@@ -299,7 +300,7 @@ class DalleProvider(ImageGenerationProvider):
         
         try:
             # 简单的API连通性检查
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.get(
                     f"{self.api_base}/models",
                     headers={"Authorization": f"Bearer {self.api_key}"},
@@ -11,6 +11,7 @@ import aiohttp
 import json
 import base64
 
+from ....utils.http_client import http_clients
 from .base import ImageGenerationProvider
 from ..models import (
     ImageInfo, ImageGenerationRequest, ImageOperationResult,
@@ -99,7 +100,7 @@ class GeminiImageProvider(ImageGenerationProvider):
             # 调用Gemini API
             url = f"{self.api_base}/models/{self.model}:generateContent?key={self.api_key}"
 
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.post(
                     url,
                     headers={
@@ -348,7 +349,7 @@ class GeminiImageProvider(ImageGenerationProvider):
         try:
             # 简单的API连通性检查
             url = f"{self.api_base}/models?key={self.api_key}"
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.get(
                     url,
                     timeout=aiohttp.ClientTimeout(total=10)
@@ -12,6 +12,7 @@ import aiohttp
 import json
 import base64
 
+from ....utils.http_client import http_clients
 from .base import ImageGenerationProvider
 from ..models import (
     ImageInfo, ImageGenerationRequest, ImageOperationResult,
@@ -68,7 +69,7 @@ class OpenAIImageProvider(ImageGenerationProvider):
             # 调用OpenAI Images API
             url = f"{self.api_base.rstrip('/')}/images/generations"
 
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.post(
                     url,
                     headers={
@@ -212,7 +213,7 @@ class OpenAIImageProvider(ImageGenerationProvider):
         image_path = save_dir / filename
 
         # 下载图片
-        async with aiohttp.ClientSession() as session:
+        async with http_clients.session() as session:
             async with session.get(image_url) as response:
                 if response.status != 200:
                     raise Exception(f"Failed to download image: {response.status}")
@@ -318,7 +319,7 @@ class OpenAIImageProvider(ImageGenerationProvider):
         try:
             # 简单的API连通性检查
             url = f"{self.api_base.rstrip('/')}/models"
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.get(
                     url,
                     headers={"Authorization": f"Bearer {self.api_key}"},
@@ -15,6 +15,7 @@ import aiohttp
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+from ....utils.http_client import http_clients
 from .base import ImageSearchProvider
 from ..models import (
     ImageProvider, ImageSearchRequest, ImageSearchResult,
@@ -128,7 +129,7 @@ class PixabaySearchProvider(ImageSearchProvider):
             
             # 发送请求
             logger.debug(f"Pixabay search: {url} with params: {params}")
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            async with http_clients.session(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
                 async with session.get(url, params=params) as response:
                     # 处理API响应头中的频率限制信息
                     self._process_rate_limit_headers(response.headers)
@@ -399,28 +400,26 @@ class PixabaySearchProvider(ImageSearchProvider):
             # 创建保存目录
             save_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # 下载图片
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60)) as session:
-                async with session.get(image_info.original_url) as response:
-                    if response.status == 200:
-                        with open(save_path, 'wb') as f:
-                            async for chunk in response.content.iter_chunked(8192):
-                                f.write(chunk)
+            # 下载图片（流式写入磁盘，复用共享连接池）
+            downloaded = await http_clients.download_to_file(
+                image_info.original_url, save_path,
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+            if downloaded is None:
+                return ImageOperationResult(
+                    success=False,
+                    message="Download failed: unexpected HTTP status",
+                    error_code="download_failed"
+                )
 
-                        # 更新本地路径
-                        image_info.local_path = str(save_path)
+            # 更新本地路径
+            image_info.local_path = str(save_path)
 
-                        return ImageOperationResult(
-                            success=True,
-                            message="Image downloaded successfully",
-                            image_info=image_info
-                        )
-                    else:
-                        return ImageOperationResult(
-                            success=False,
-                            message=f"Download failed: HTTP {response.status}",
-                            error_code="download_failed"
-                        )
+            return ImageOperationResult(
+                success=True,
+                message="Image downloaded successfully",
+                image_info=image_info
+            )
 
         except Exception as e:
             logger.error(f"Failed to download Pixabay image: {e}")
@@ -11,6 +11,7 @@ from typing import Dict, Any, List, Optional
 from pathlib import Path
 import aiohttp
 
+from ....utils.http_client import http_clients
 from ..models import (
     ImageProvider, ImageGenerationRequest, ImageOperationResult,
     ImageInfo, ImageFormat, ImageLicense, ImageSourceType, ImageMetadata, ImageTag
@@ -72,7 +73,7 @@ class PollinationsProvider(ImageGenerationProvider):
                 headers['Authorization'] = f'Bearer {self.api_token}'
 
             # 发送请求
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            async with http_clients.session(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
                 async with session.get(api_url, headers=headers) as response:
                     if response.status == 200:
                         # 读取图片数据
@@ -260,7 +261,7 @@ class PollinationsProvider(ImageGenerationProvider):
                 headers['Authorization'] = f'Bearer {self.api_token}'
 
             # 简单的健康检查 - 尝试访问API基础URL
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+            async with http_clients.session(timeout=aiohttp.ClientTimeout(total=10)) as session:
                 # 使用一个简单的测试提示词
                 test_url = f"{self.api_base}/prompt/test?width=64&height=64"
                 async with session.head(test_url, headers=headers) as response:
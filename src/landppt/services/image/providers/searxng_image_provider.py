@@ -11,6 +11,7 @@ from pathlib import Path
 import hashlib
 import re
 
+from ....utils.http_client import http_clients
 from ..models import (
     ImageInfo, ImageSearchRequest, ImageSearchResult, ImageOperationResult,
     ImageProvider, ImageSourceType, ImageMetadata, ImageLicense
@@ -79,7 +80,7 @@ class SearXNGSearchProvider(ImageSearchProvider):
             self._request_times.append(time.time())
             
             # 发送请求
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            async with http_clients.session(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
                 async with session.get(search_url, params=params) as response:
                     if response.status != 200:
                         error_msg = f"SearXNG API returned status {response.status}"
@@ -263,7 +264,7 @@ class SearXNGSearchProvider(ImageSearchProvider):
                     message="No original URL available for download"
                 )
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            async with http_clients.session(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
                 async with session.get(image_info.original_url) as response:
                     if response.status != 200:
                         return ImageOperationResult(
@@ -10,6 +10,7 @@ from pathlib import Path
 import aiohttp
 import json
 
+from ....utils.http_client import http_clients
 from .base import ImageGenerationProvider
 from ..models import (
     ImageInfo, ImageGenerationRequest, ImageOperationResult, 
@@ -66,7 +67,7 @@ class SiliconFlowProvider(ImageGenerationProvider):
             api_request = self._prepare_api_request(request)
             
             # 调用SiliconFlow API
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.post(
                     f"{self.api_base}/images/generations",
                     headers={
@@ -189,7 +190,7 @@ class SiliconFlowProvider(ImageGenerationProvider):
         image_path = save_dir / filename
         
         # 下载图片
-        async with aiohttp.ClientSession() as session:
+        async with http_clients.session() as session:
             async with session.get(image_url) as response:
                 if response.status != 200:
                     raise Exception(f"Failed to download image: {response.status}")
@@ -303,7 +304,7 @@ class SiliconFlowProvider(ImageGenerationProvider):
 
         try:
             # 简单的API连通性检查
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.get(
                     f"{self.api_base}/models",
                     headers={"Authorization": f"Bearer {self.api_key}"},
@@ -11,6 +11,7 @@ from pathlib import Path
 import aiohttp
 import json
 
+from ....utils.http_client import http_clients
 from .base import ImageGenerationProvider
 from ..models import (
     ImageInfo, ImageGenerationRequest, ImageOperationResult, 
@@ -70,7 +71,7 @@ class StableDiffusionProvider(ImageGenerationProvider):
             api_request = self._prepare_api_request(request)
             
             # 调用Stable Diffusion API
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.post(
                     f"{self.api_base}/generation/{self.engine_id}/text-to-image",
                     headers={
@@ -323,7 +324,7 @@ class StableDiffusionProvider(ImageGenerationProvider):
         
         try:
             # 检查引擎列表
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session() as session:
                 async with session.get(
                     f"{self.api_base}/engines/list",
                     headers={"Authorization": f"Bearer {self.api_key}"},
@@ -10,6 +10,7 @@ from pathlib import Path
 import aiohttp
 import hashlib
 
+from ....utils.http_client import http_clients
 from ..models import (
     ImageInfo, ImageSearchRequest, ImageSearchResult, ImageOperationResult,
     ImageSourceType, ImageProvider, ImageFormat, ImageMetadata, ImageTag, ImageLicense
@@ -83,7 +84,7 @@ class UnsplashSearchProvider(ImageSearchProvider):
             
             # 发送请求
             logger.debug(f"Unsplash search: {url} with params: {params}")
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            async with http_clients.session(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -233,7 +234,7 @@ class UnsplashSearchProvider(ImageSearchProvider):
             url = f"{self.api_base}/photos/{unsplash_id}"
             params = {'client_id': self.api_key}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            async with http_clients.session(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -259,28 +260,26 @@ class UnsplashSearchProvider(ImageSearchProvider):
             # 创建保存目录
             save_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # 下载图片
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60)) as session:
-                async with session.get(image_info.original_url) as response:
-                    if response.status == 200:
-                        with open(save_path, 'wb') as f:
-                            async for chunk in response.content.iter_chunked(8192):
-                                f.write(chunk)
-                        
-                        # 更新本地路径
-                        image_info.local_path = str(save_path)
-                        
-                        return ImageOperationResult(
-                            success=True,
-                            message="Image downloaded successfully",
-                            image_info=image_info
-                        )
-                    else:
-                        return ImageOperationResult(
-                            success=False,
-                            message=f"Download failed: HTTP {response.status}",
-                            error_code="download_failed"
-                        )
+            # 下载图片（流式写入磁盘，复用共享连接池）
+            downloaded = await http_clients.download_to_file(
+                image_info.original_url, save_path,
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+            if downloaded is None:
+                return ImageOperationResult(
+                    success=False,
+                    message="Download failed: unexpected HTTP status",
+                    error_code="download_failed"
+                )
+
+            # 更新本地路径
+            image_info.local_path = str(save_path)
+
+            return ImageOperationResult(
+                success=True,
+                message="Image downloaded successfully",
+                image_info=image_info
+            )
                         
         except Exception as e:
             logger.error(f"Failed to download Unsplash image: {e}")
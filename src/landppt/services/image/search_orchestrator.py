@@ -0,0 +1,186 @@
+"""
+图片搜索编排
+并行调用各网络搜索提供者：每个提供者有独立的超时，整次搜索有总截止时间，
+收集到足够多匹配度达标的图片后立即返回，不再等待最慢的提供者；
+连续失败或超时的提供者暂时熔断，冷却期内直接跳过。
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .models import ImageInfo, ImageSearchRequest, ImageSearchResult
+from .providers.base import ImageSearchProvider
+
+logger = logging.getLogger(__name__)
+
+# 对一批图片打分的函数（与传入图片一一对应）
+ScoreFunction = Callable[[List[ImageInfo]], List[float]]
+
+
+class ProviderCircuitBreaker:
+    """按提供者统计连续失败次数，达到阈值后熔断，冷却结束后只放行一次试探请求"""
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._probing: Set[str] = set()
+
+    def allow(self, name: str) -> bool:
+        """提供者当前是否可以调用"""
+        opened_at = self._opened_at.get(name)
+        if opened_at is None:
+            return True
+        if time.monotonic() - opened_at < self.cooldown or name in self._probing:
+            return False
+        # 半开状态：放行一次试探，成功后恢复，失败后重新计时
+        self._probing.add(name)
+        return True
+
+    def record_success(self, name: str):
+        self._failures.pop(name, None)
+        self._opened_at.pop(name, None)
+        self._probing.discard(name)
+
+    def record_failure(self, name: str):
+        self._probing.discard(name)
+        failures = self._failures.get(name, 0) + 1
+        self._failures[name] = failures
+        if failures >= self.failure_threshold:
+            if name not in self._opened_at:
+                logger.warning(f"图片搜索提供者 {name} 连续失败 {failures} 次，暂停调用 {self.cooldown:g} 秒")
+            self._opened_at[name] = time.monotonic()
+
+    def release(self, name: str):
+        """试探请求被取消（未得出结果）时释放试探名额"""
+        self._probing.discard(name)
+
+    def get_state(self) -> Dict[str, Dict[str, object]]:
+        now = time.monotonic()
+        return {
+            name: {
+                'failures': failures,
+                'open': name in self._opened_at and now - self._opened_at[name] < self.cooldown
+            }
+            for name, failures in self._failures.items()
+        }
+
+
+class ImageSearchOrchestrator:
+    """多提供者图片搜索编排器"""
+
+    def __init__(self, config: Dict[str, object]):
+        # 单个提供者的超时（秒）
+        self.provider_timeout = float(config.get('provider_timeout', 8.0))
+        # 整次搜索的截止时间（秒），到时返回已收集的结果
+        self.deadline = float(config.get('deadline', 12.0))
+        # 匹配分数达到该值的图片计为可用结果
+        self.good_score = float(config.get('good_score', 0.2))
+        self.breaker = ProviderCircuitBreaker(
+            int(config.get('failure_threshold', 3)),
+            float(config.get('cooldown', 60.0))
+        )
+        self._stats = {'searches': 0, 'early_returns': 0, 'deadline_hits': 0,
+                       'provider_timeouts': 0, 'provider_failures': 0, 'skipped_open': 0}
+
+    async def search(self,
+                     providers: List[ImageSearchProvider],
+                     request: ImageSearchRequest,
+                     score_images: ScoreFunction) -> Tuple[List[ImageInfo], Dict[str, int]]:
+        """
+        并行搜索并按匹配分数排序
+
+        Args:
+            providers: 按优先级排列的搜索提供者
+            request: 搜索请求，收集到 page * per_page 张可用图片后提前返回
+            score_images: 打分函数，每个提供者的结果到达时立即打分
+
+        Returns:
+            (按分数从高到低排列的图片, 各提供者返回的图片数量)
+        """
+        self._stats['searches'] += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        wanted = max(1, request.page * request.per_page)
+
+        tasks: Dict[asyncio.Task, Tuple[int, str]] = {}
+        for rank, provider in enumerate(providers):
+            name = provider.provider.value
+            if not self.breaker.allow(name):
+                self._stats['skipped_open'] += 1
+                logger.debug(f"图片搜索提供者 {name} 处于熔断状态，本次跳过")
+                continue
+            task = asyncio.create_task(self._search_provider(provider, request))
+            tasks[task] = (rank, name)
+
+        scored: List[Tuple[float, int, int, ImageInfo]] = []
+        provider_results: Dict[str, int] = {}
+        good = 0
+        pending = set(tasks)
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self._stats['deadline_hits'] += 1
+                    logger.info(f"图片搜索达到截止时间，{len(pending)} 个提供者未返回: "
+                                f"{[tasks[task][1] for task in pending]}")
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    rank, name = tasks[task]
+                    result = task.result()
+                    if result is None or not result.images:
+                        continue
+                    provider_results[name] = len(result.images)
+                    scores = score_images(result.images)
+                    for index, (score, image) in enumerate(zip(scores, result.images)):
+                        scored.append((score, rank, index, image))
+                        if score >= self.good_score:
+                            good += 1
+                if pending and good >= wanted:
+                    self._stats['early_returns'] += 1
+                    logger.debug(f"已收集 {good} 张可用图片，不再等待 {len(pending)} 个提供者")
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+                self.breaker.release(tasks[task][1])
+
+        # 分数相同时保持提供者优先级和提供者内部的原始顺序
+        scored.sort(key=lambda item: (-item[0], item[1], item[2]))
+        return [image for _, _, _, image in scored], provider_results
+
+    async def _search_provider(self, provider: ImageSearchProvider,
+                               request: ImageSearchRequest) -> Optional[ImageSearchResult]:
+        """调用单个提供者，超时和错误计入熔断统计，不向外抛出"""
+        name = provider.provider.value
+        try:
+            result = await asyncio.wait_for(provider.search(request), self.provider_timeout)
+        except asyncio.TimeoutError:
+            self._stats['provider_timeouts'] += 1
+            logger.warning(f"图片搜索提供者 {name} 超时（{self.provider_timeout:g}秒）")
+            self.breaker.record_failure(name)
+            return None
+        except Exception as e:
+            self._stats['provider_failures'] += 1
+            logger.error(f"Search failed for provider {name}: {e}")
+            self.breaker.record_failure(name)
+            return None
+
+        if result.error and not result.images:
+            # 限流、未配置密钥等错误同样计为失败
+            self._stats['provider_failures'] += 1
+            logger.warning(f"图片搜索提供者 {name} 返回错误: {result.error}")
+            self.breaker.record_failure(name)
+            return None
+
+        self.breaker.record_success(name)
+        return result
+
+    def get_stats(self) -> Dict[str, object]:
+        """获取搜索编排统计信息和各提供者的熔断状态"""
+        return {**self._stats, 'providers': self.breaker.get_state()}
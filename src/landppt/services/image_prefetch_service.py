@@ -0,0 +1,240 @@
+"""
+幻灯片图片预取服务
+大纲确认后为整套幻灯片规划配图：按批次用一次AI调用分析多页的图片需求，
+并在后台并发完成搜索、生成、下载和缓存。生成幻灯片时只需等待本页的图片结果，
+图片获取不再串行地压在每一页HTML生成的关键路径上。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .models.slide_image_info import SlideImagesCollection, SlideImageRequirements
+
+logger = logging.getLogger(__name__)
+
+
+# 批量分析未覆盖的页面，在获取任务中单独分析
+_NOT_ANALYZED = object()
+
+
+def slide_signature(slide_data: Dict[str, Any]) -> str:
+    """根据标题和内容要点计算页面签名，大纲修改后签名变化，对应的预取结果不再使用"""
+    raw = json.dumps(
+        [slide_data.get('title', ''), slide_data.get('content_points', [])],
+        ensure_ascii=False, sort_keys=True, default=str
+    )
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class DeckImagePlan:
+    """一个项目的整套幻灯片配图计划"""
+    project_id: str
+    total_pages: int
+    futures: Dict[int, asyncio.Future] = field(default_factory=dict)
+    signatures: Dict[int, str] = field(default_factory=dict)
+    task: Optional[asyncio.Task] = None
+    created_at: float = field(default_factory=time.time)
+
+
+class ImagePrefetchService:
+    """整套幻灯片的图片预取调度"""
+
+    # 等待单页预取结果的最长时间（秒），超时后由调用方自行处理该页图片
+    wait_timeout: float = 300.0
+    # 计划保留时间（秒），超时后取消并清理
+    plan_ttl: float = 3600.0
+
+    def __init__(self):
+        self._plans: Dict[str, DeckImagePlan] = {}
+
+    def _get_image_config(self) -> Dict[str, Any]:
+        from .config_service import config_service
+        return config_service.get_config_by_category('image_service')
+
+    @staticmethod
+    def _config_int(image_config: Dict[str, Any], key: str, default: int) -> int:
+        try:
+            return max(1, int(image_config.get(key, default)))
+        except (TypeError, ValueError):
+            return default
+
+    def _prune(self):
+        now = time.time()
+        for project_id, plan in list(self._plans.items()):
+            if now - plan.created_at > self.plan_ttl or not plan.futures:
+                self.cancel(project_id)
+
+    def start(self, project_id: str, slides: List[Dict[str, Any]], confirmed_requirements: Dict[str, Any],
+              image_processor, pages: Optional[Iterable[int]] = None) -> bool:
+        """
+        为项目启动后台图片预取（需在事件循环中调用）
+
+        Args:
+            slides: 大纲中的全部幻灯片
+            image_processor: 用于分析和获取图片的 PPTImageProcessor
+            pages: 只预取这些页码（从1开始），默认全部
+
+        Returns:
+            是否有可用的预取计划
+        """
+        image_config = self._get_image_config()
+        if not image_config.get('enable_image_service', False) or not image_config.get('enable_image_prefetch', True):
+            return False
+        enabled_sources = image_processor._get_enabled_image_sources(image_config)
+        if not enabled_sources:
+            return False
+
+        self._prune()
+
+        total_pages = len(slides)
+        page_filter = set(pages) if pages is not None else None
+        targets = [
+            (index + 1, slide) for index, slide in enumerate(slides)
+            if isinstance(slide, dict) and (page_filter is None or index + 1 in page_filter)
+        ]
+        if not targets:
+            return False
+
+        # 已有覆盖这些页面且内容未变的计划时直接复用
+        plan = self._plans.get(project_id)
+        if plan and plan.total_pages == total_pages and all(
+            plan.signatures.get(page_number) == slide_signature(slide) and page_number in plan.futures
+            for page_number, slide in targets
+        ):
+            return True
+        if plan:
+            self.cancel(project_id)
+
+        loop = asyncio.get_running_loop()
+        plan = DeckImagePlan(project_id=project_id, total_pages=total_pages)
+        for page_number, slide in targets:
+            plan.futures[page_number] = loop.create_future()
+            plan.signatures[page_number] = slide_signature(slide)
+        plan.task = asyncio.create_task(
+            self._run_plan(plan, targets, confirmed_requirements, image_processor, image_config, enabled_sources)
+        )
+        self._plans[project_id] = plan
+        logger.info(f"项目 {project_id} 启动图片预取: {len(targets)}/{total_pages}页")
+        return True
+
+    async def _run_plan(self, plan: DeckImagePlan, targets: List[Tuple[int, Dict[str, Any]]],
+                        confirmed_requirements: Dict[str, Any], image_processor,
+                        image_config: Dict[str, Any], enabled_sources: List[Any]):
+        batch_size = self._config_int(image_config, 'image_prefetch_batch_size', 8)
+        semaphore = asyncio.Semaphore(self._config_int(image_config, 'image_prefetch_concurrency', 4))
+        project_topic = confirmed_requirements.get('project_topic', '')
+        project_scenario = confirmed_requirements.get('project_scenario', 'general')
+        fetch_tasks: List[asyncio.Task] = []
+        started_at = time.time()
+
+        async def fetch(page_number: int, slide: Dict[str, Any], requirements):
+            future = plan.futures[page_number]
+            try:
+                async with semaphore:
+                    if requirements is _NOT_ANALYZED:
+                        requirements = await image_processor._ai_analyze_image_requirements(
+                            slide, project_topic, project_scenario, page_number, plan.total_pages,
+                            "", enabled_sources, image_config
+                        )
+                    collection = None
+                    if requirements and requirements.requirements:
+                        collection = await image_processor.collect_slide_images(
+                            requirements, slide, confirmed_requirements, page_number, plan.total_pages,
+                            "", image_config, enabled_sources
+                        )
+                if not future.done():
+                    future.set_result(collection)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                logger.warning(f"第{page_number}页图片预取失败，将在生成时重新处理: {e}")
+                # 取消的future表示预取未命中，调用方回退到逐页处理
+                future.cancel()
+
+        try:
+            # 按页码顺序分批分析，前面的页面先开始获取图片
+            for start in range(0, len(targets), batch_size):
+                batch = targets[start:start + batch_size]
+                analyzed: Dict[int, Optional[SlideImageRequirements]] = {}
+                if len(batch) > 1:
+                    analyzed = await image_processor.analyze_deck_image_requirements(
+                        batch, confirmed_requirements, plan.total_pages, enabled_sources, image_config
+                    )
+                for page_number, slide in batch:
+                    requirements = analyzed.get(page_number, _NOT_ANALYZED)
+                    fetch_tasks.append(asyncio.create_task(fetch(page_number, slide, requirements)))
+
+            await asyncio.gather(*fetch_tasks, return_exceptions=True)
+            ready = sum(1 for f in plan.futures.values() if f.done() and not f.cancelled() and f.result())
+            logger.info(f"项目 {plan.project_id} 图片预取完成: {ready}页有配图, "
+                        f"耗时 {time.time() - started_at:.1f}s")
+        except asyncio.CancelledError:
+            for task in fetch_tasks:
+                task.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"项目 {plan.project_id} 图片预取出错: {e}")
+            await asyncio.gather(*fetch_tasks, return_exceptions=True)
+        finally:
+            for future in plan.futures.values():
+                if not future.done():
+                    future.cancel()
+
+    async def get_slide_images(self, project_id: Optional[str], page_number: int,
+                               slide_data: Dict[str, Any]) -> Tuple[bool, Optional[SlideImagesCollection]]:
+        """
+        等待某页的预取结果（每页结果只会被取走一次，之后的重新生成会重新获取图片）
+
+        Returns:
+            (是否命中预取, 图片集合)，未命中时调用方应自行处理该页图片
+        """
+        plan = self._plans.get(project_id) if project_id else None
+        if not plan:
+            return False, None
+        future = plan.futures.get(page_number)
+        if future is None or plan.signatures.get(page_number) != slide_signature(slide_data):
+            return False, None
+
+        try:
+            collection = await asyncio.wait_for(asyncio.shield(future), timeout=self.wait_timeout)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            plan.futures.pop(page_number, None)
+            return False, None
+        except asyncio.TimeoutError:
+            logger.warning(f"等待第{page_number}页图片预取超时，改为直接处理")
+            return False, None
+
+        plan.futures.pop(page_number, None)
+        if not plan.futures:
+            self._plans.pop(project_id, None)
+        return True, collection
+
+    def cancel(self, project_id: str):
+        """取消项目的预取计划（大纲重新生成或项目删除时调用）"""
+        plan = self._plans.pop(project_id, None)
+        if plan and plan.task and not plan.task.done():
+            plan.task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            project_id: {
+                'total_pages': plan.total_pages,
+                'pending': sum(1 for f in plan.futures.values() if not f.done()),
+                'ready': sum(1 for f in plan.futures.values() if f.done() and not f.cancelled()),
+                'age': time.time() - plan.created_at
+            }
+            for project_id, plan in self._plans.items()
+        }
+
+
+# 全局图片预取服务实例
+image_prefetch_service = ImagePrefetchService()
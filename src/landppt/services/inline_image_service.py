@@ -0,0 +1,209 @@
+"""
+Inline Image Service
+Lifts inline base64 images out of slide/template HTML into the image cache
+and restores them for offline exports
+"""
+
+import base64
+import binascii
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .image.models import ImageUploadRequest, ImageSourceType
+from ..utils.thread_pool import run_blocking_io
+
+logger = logging.getLogger(__name__)
+
+
+# data:image/png;base64,.... （SVG 体积小且图床不支持，保持内联）
+DATA_URL_PATTERN = re.compile(
+    r'data:image/(png|jpe?g|gif|webp);base64,([A-Za-z0-9+/]+={0,2})',
+    re.IGNORECASE
+)
+
+# http(s)://host/landppt/api/image/view/{image_id} 或相对路径
+IMAGE_VIEW_URL_PATTERN = re.compile(
+    r'(?:https?://[^\s"\'()<>]+?)?(?:/landppt)?/api/image/view/([A-Za-z0-9_-]+)'
+)
+
+_EXTENSION_MAP = {
+    'png': 'png',
+    'jpeg': 'jpg',
+    'jpg': 'jpg',
+    'gif': 'gif',
+    'webp': 'webp',
+}
+
+_MIME_MAP = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+
+
+class InlineImageService:
+    """Service for moving inline base64 images between HTML and the image cache"""
+
+    def __init__(self, min_inline_bytes: int = 2048):
+        # 小于该阈值的图片（图标、1px占位等）保持内联，避免额外请求
+        self.min_inline_bytes = min_inline_bytes
+
+    def _get_image_service(self):
+        from .image.image_service import get_image_service
+        return get_image_service()
+
+    def has_inline_images(self, html: Optional[str]) -> bool:
+        """Quick check whether HTML contains liftable inline images"""
+        return bool(html) and 'base64,' in html and DATA_URL_PATTERN.search(html) is not None
+
+    async def store_data_url(self, data_url: str, title: str = "inline_image") -> Optional[str]:
+        """
+        Store a single data URL in the image cache
+
+        Returns:
+            The cacheable image URL, or None if the payload was kept inline
+        """
+        match = DATA_URL_PATTERN.fullmatch(data_url.strip())
+        if not match:
+            return None
+        return await self._store_match(match, title)
+
+    async def _store_match(self, match: re.Match, title: str) -> Optional[str]:
+        image_type = match.group(1).lower()
+        try:
+            image_bytes = base64.b64decode(match.group(2), validate=True)
+        except (binascii.Error, ValueError) as e:
+            logger.warning(f"Invalid inline base64 image skipped: {e}")
+            return None
+
+        if len(image_bytes) < self.min_inline_bytes:
+            return None
+
+        image_service = self._get_image_service()
+
+        # 相同内容的图片只入库一次
+        existing = await image_service.find_image_by_content(image_bytes)
+        if existing:
+            image_id = existing.image_id
+        else:
+            file_extension = _EXTENSION_MAP.get(image_type, 'png')
+            upload_request = ImageUploadRequest(
+                filename=f"{title}.{file_extension}",
+                content_type=f"image/{'jpeg' if file_extension == 'jpg' else file_extension}",
+                file_size=len(image_bytes),
+                title=title,
+                description="Extracted from inline slide HTML",
+                tags=["inline_extracted"],
+                category="inline_extracted",
+                source_type=ImageSourceType.LOCAL_STORAGE
+            )
+            result = await image_service.upload_image(upload_request, image_bytes)
+            if not result.success or not result.image_info:
+                logger.warning(f"Failed to store inline image: {result.message}")
+                return None
+            image_id = result.image_info.image_id
+
+        from .url_service import build_image_url
+        return build_image_url(image_id)
+
+    async def extract_inline_images(self, html: Optional[str], title: str = "inline_image") -> Optional[str]:
+        """
+        Replace inline base64 images in HTML with cacheable image URLs
+
+        Images that cannot be stored are left untouched, so this never loses content.
+        """
+        if not self.has_inline_images(html):
+            return html
+
+        replacements: Dict[str, Optional[str]] = {}
+        for match in DATA_URL_PATTERN.finditer(html):
+            data_url = match.group(0)
+            if data_url in replacements:
+                continue
+            try:
+                replacements[data_url] = await self._store_match(match, f"{title}_{len(replacements) + 1}")
+            except Exception as e:
+                logger.warning(f"Failed to extract inline image: {e}")
+                replacements[data_url] = None
+
+        replaced = 0
+
+        def _replace(match: re.Match) -> str:
+            nonlocal replaced
+            url = replacements.get(match.group(0))
+            if url:
+                replaced += 1
+                return url
+            return match.group(0)
+
+        new_html = DATA_URL_PATTERN.sub(_replace, html)
+        if replaced:
+            logger.info(f"Extracted {replaced} inline images from HTML ({len(html)} -> {len(new_html)} chars)")
+        return new_html
+
+    async def extract_slides(self, slides_data: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """Extract inline images from every slide's html_content (in place)"""
+        if not slides_data:
+            return slides_data
+
+        for i, slide in enumerate(slides_data):
+            if not isinstance(slide, dict):
+                continue
+            html_content = slide.get('html_content')
+            if self.has_inline_images(html_content):
+                slide['html_content'] = await self.extract_inline_images(html_content, f"slide_{i + 1}")
+        return slides_data
+
+    async def inline_cached_images(self, html: Optional[str]) -> Optional[str]:
+        """
+        Reverse transform for offline exports: embed cached images as data URLs
+        """
+        if not html or '/api/image/view/' not in html:
+            return html
+
+        image_service = self._get_image_service()
+        data_urls: Dict[str, Optional[str]] = {}
+
+        for match in IMAGE_VIEW_URL_PATTERN.finditer(html):
+            image_id = match.group(1)
+            if image_id in data_urls:
+                continue
+            data_urls[image_id] = None
+            try:
+                image_info = await image_service.get_image(image_id)
+                if not image_info or not image_info.local_path:
+                    continue
+                image_path = Path(image_info.local_path)
+                if not image_path.exists():
+                    continue
+                image_bytes = await run_blocking_io(image_path.read_bytes)
+                mime_type = _MIME_MAP.get(image_path.suffix.lower(), 'image/jpeg')
+                data_urls[image_id] = f"data:{mime_type};base64,{base64.b64encode(image_bytes).decode('ascii')}"
+            except Exception as e:
+                logger.warning(f"Failed to inline cached image {image_id}: {e}")
+
+        def _replace(match: re.Match) -> str:
+            return data_urls.get(match.group(1)) or match.group(0)
+
+        return IMAGE_VIEW_URL_PATTERN.sub(_replace, html)
+
+    async def inline_slides(self, slides_data: Optional[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of slides_data with cached images embedded as data URLs"""
+        if not slides_data:
+            return slides_data
+
+        inlined = []
+        for slide in slides_data:
+            if isinstance(slide, dict) and slide.get('html_content'):
+                slide = dict(slide)
+                slide['html_content'] = await self.inline_cached_images(slide['html_content'])
+            inlined.append(slide)
+        return inlined
+
+
+# Global instance
+inline_image_service = InlineImageService()
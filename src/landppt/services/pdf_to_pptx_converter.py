@@ -305,6 +305,20 @@ class PDFToPPTXConverter:
 
         output_path_obj.parent.mkdir(parents=True, exist_ok=True)
 
+        from .pdf_to_pptx_pool import pdf_to_pptx_pool
+        if pdf_to_pptx_pool.enabled:
+            logger.info(f"[Worker Pool] Converting PDF to PPTX: {pdf_path_obj} -> {output_path_obj}")
+            success, result = await pdf_to_pptx_pool.convert(str(pdf_path_obj), str(output_path_obj), timeout)
+            if not success:
+                logger.error(f"[Worker Pool] PDF to PPTX conversion failed: {result}")
+                return False, result
+            if not output_path_obj.exists() or output_path_obj.stat().st_size == 0:
+                error_msg = f"Worker reported success but output file is missing or empty: {output_path_obj}"
+                logger.error(error_msg)
+                return False, error_msg
+            logger.info(f"[Worker Pool] PDF to PPTX conversion successful: {output_path_obj}")
+            return True, str(output_path_obj)
+
         command = [
             sys.executable,
             '-m',
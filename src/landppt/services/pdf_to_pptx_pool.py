@@ -0,0 +1,299 @@
+"""
+Warm worker pool for PDF to PPTX conversion
+
+Keeps a few long-lived ``pdf_to_pptx_worker --serve`` processes around so each
+conversion skips interpreter start-up, package import and Apryse SDK
+initialisation. Workers are health-checked before reuse, recycled after a
+number of jobs or when their memory grows too large, and killed when a job
+exceeds its timeout.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import ai_config
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledWorker:
+    """A single long-lived converter process"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.worker_id = next(self._ids)
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.jobs_done = 0
+        self.rss_bytes: Optional[int] = None
+        self.last_used = 0.0
+        # Set when the pool is rebuilt while this worker is busy; stopped on check-in
+        self.retired = False
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._request_ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        # A worker being respawned (crash, failed health check) still has the
+        # drain task of its previous process
+        self._stop_stderr_drain()
+        env = os.environ.copy()
+        src_path = str(Path(__file__).resolve().parents[2])
+        pythonpath = env.get('PYTHONPATH')
+        if pythonpath:
+            existing = pythonpath.split(os.pathsep)
+            if src_path not in existing:
+                env['PYTHONPATH'] = os.pathsep.join([src_path, pythonpath])
+        else:
+            env['PYTHONPATH'] = src_path
+
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, '-m', 'landppt.services.pdf_to_pptx_worker', '--serve',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            cwd=str(Path(__file__).resolve().parents[3]),
+        )
+        self.jobs_done = 0
+        self.rss_bytes = None
+        self.last_used = time.time()
+        # Drain stderr so a chatty SDK can never block the worker on a full pipe
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+        logger.info(f"Started PDF to PPTX worker #{self.worker_id} (pid {self.process.pid})")
+
+    async def _drain_stderr(self):
+        try:
+            while self.process and self.process.stderr:
+                line = await self.process.stderr.readline()
+                if not line:
+                    break
+                logger.debug(f"[PPTX worker #{self.worker_id}] {line.decode('utf-8', errors='ignore').rstrip()}")
+        except Exception:
+            pass
+
+    async def request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send one request and wait for its reply"""
+        payload = dict(payload, id=next(self._request_ids))
+        self.process.stdin.write((json.dumps(payload) + "\n").encode('utf-8'))
+        await self.process.stdin.drain()
+
+        while True:
+            line = await asyncio.wait_for(self.process.stdout.readline(), timeout=timeout)
+            if not line:
+                raise ConnectionError(f"PDF to PPTX worker #{self.worker_id} exited unexpectedly")
+            reply = json.loads(line)
+            if reply.get('id') == payload['id']:
+                self.rss_bytes = reply.get('rss_bytes')
+                self.last_used = time.time()
+                return reply
+
+    async def stop(self):
+        if self.alive:
+            try:
+                self.process.stdin.write(b'{"cmd": "exit"}\n')
+                await self.process.stdin.drain()
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except Exception:
+                self.kill()
+        self._stop_stderr_drain()
+
+    def _stop_stderr_drain(self):
+        if self._stderr_task:
+            self._stderr_task.cancel()
+            self._stderr_task = None
+
+    def kill(self):
+        if self.alive:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+
+
+class PDFToPPTXWorkerPool:
+    """Pool of warm converter processes"""
+
+    # Idle workers are pinged before reuse after this many seconds
+    health_check_after: float = 60.0
+
+    def __init__(self):
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[_PooledWorker] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Callers currently blocked on the idle queue
+        self._waiters = 0
+        self._stats = {'jobs': 0, 'failures': 0, 'timeouts': 0, 'recycled': 0}
+
+    @property
+    def size(self) -> int:
+        return max(0, ai_config.pdf_to_pptx_pool_size)
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def _ensure_pool(self):
+        loop = asyncio.get_running_loop()
+        if self._idle is None or self._loop is not loop or len(self._workers) != self.size:
+            # (Re)build the slot list; processes are started lazily on first use
+            self._retire_pool()
+            self._workers = [_PooledWorker() for _ in range(self.size)]
+            self._idle = asyncio.Queue()
+            for worker in self._workers:
+                self._idle.put_nowait(worker)
+            self._loop = loop
+
+    def _retire_pool(self):
+        """Drop the current workers: idle ones are killed, busy ones are stopped when checked in"""
+        old_idle = self._idle
+        idle_workers = []
+        if old_idle is not None:
+            while not old_idle.empty():
+                worker = old_idle.get_nowait()
+                if worker is not None:
+                    idle_workers.append(worker)
+        for worker in self._workers:
+            worker.retired = True
+            if worker in idle_workers:
+                worker.kill()
+                worker._stop_stderr_drain()
+        self._workers = []
+        self._idle = None
+        if old_idle is not None:
+            # Wake callers waiting on the old queue; they retry against the new pool
+            for _ in range(self._waiters):
+                old_idle.put_nowait(None)
+
+    async def _acquire(self) -> _PooledWorker:
+        while True:
+            self._ensure_pool()
+            if not self._workers:
+                raise RuntimeError("PDF to PPTX worker pool is disabled")
+            idle = self._idle
+            self._waiters += 1
+            try:
+                worker = await idle.get()
+            finally:
+                self._waiters -= 1
+            if worker is not None:
+                return worker
+            # The pool was rebuilt while waiting (received None); retry against the new one
+
+    def _release_idle(self, worker: _PooledWorker):
+        if worker.retired or worker not in self._workers:
+            worker.kill()
+            worker._stop_stderr_drain()
+        else:
+            self._idle.put_nowait(worker)
+
+    async def _checkout(self) -> _PooledWorker:
+        worker = await self._acquire()
+        try:
+            if not worker.alive:
+                await worker.start()
+                reply = await worker.request({'cmd': 'ping'}, timeout=120)
+                if not reply.get('success'):
+                    raise RuntimeError(reply.get('result') or "PDF to PPTX worker failed to initialise")
+            elif time.time() - worker.last_used > self.health_check_after:
+                try:
+                    reply = await worker.request({'cmd': 'ping'}, timeout=10)
+                    healthy = bool(reply.get('success'))
+                except Exception:
+                    healthy = False
+                if not healthy:
+                    logger.warning(f"PDF to PPTX worker #{worker.worker_id} failed health check, restarting")
+                    worker.kill()
+                    await worker.start()
+            return worker
+        except BaseException:
+            worker.kill()
+            self._release_idle(worker)
+            raise
+
+    async def _checkin(self, worker: _PooledWorker):
+        max_jobs = max(1, ai_config.pdf_to_pptx_worker_max_jobs)
+        max_rss = max(1, ai_config.pdf_to_pptx_worker_max_memory_mb) * 1024 * 1024
+        if worker.alive and (worker.jobs_done >= max_jobs or (worker.rss_bytes or 0) > max_rss):
+            logger.info(f"Recycling PDF to PPTX worker #{worker.worker_id} "
+                        f"(jobs={worker.jobs_done}, rss={(worker.rss_bytes or 0) // (1024 * 1024)}MB)")
+            self._stats['recycled'] += 1
+            await worker.stop()
+        if worker.retired or worker not in self._workers:
+            # Pool was resized while this worker was busy
+            await worker.stop()
+        else:
+            self._idle.put_nowait(worker)
+
+    async def convert(self, pdf_path: str, output_path: str, timeout: Optional[float] = None) -> Tuple[bool, str]:
+        """Convert a PDF on a warm worker"""
+        timeout = timeout or ai_config.pdf_to_pptx_timeout
+        try:
+            # A stuck pool (all workers busy or hung while starting) must not block an export forever
+            worker = await asyncio.wait_for(self._checkout(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            error_msg = f"Timed out after {timeout} seconds waiting for a PDF to PPTX worker"
+            logger.error(error_msg)
+            return False, error_msg
+        except (RuntimeError, asyncio.TimeoutError, ConnectionError, ValueError, OSError) as e:
+            # Worker could not be started or failed its initial ping
+            self._stats['failures'] += 1
+            error_msg = str(e) or f"PDF to PPTX worker failed to start ({type(e).__name__})"
+            logger.error(f"Failed to get a PDF to PPTX worker: {error_msg}")
+            return False, error_msg
+        self._stats['jobs'] += 1
+        try:
+            reply = await worker.request(
+                {'cmd': 'convert', 'input': pdf_path, 'output': output_path},
+                timeout=timeout
+            )
+            worker.jobs_done += 1
+            if not reply.get('success'):
+                self._stats['failures'] += 1
+            return bool(reply.get('success')), str(reply.get('result') or '')
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            worker.kill()
+            error_msg = f"PDF to PPTX conversion timed out after {timeout} seconds"
+            logger.error(error_msg)
+            return False, error_msg
+        except (ConnectionError, ValueError) as e:
+            self._stats['failures'] += 1
+            worker.kill()
+            logger.error(f"PDF to PPTX worker #{worker.worker_id} failed: {e}")
+            return False, str(e)
+        finally:
+            await self._checkin(worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'size': self.size,
+            'workers': [
+                {'worker_id': w.worker_id, 'alive': w.alive, 'jobs_done': w.jobs_done,
+                 'rss_mb': (w.rss_bytes or 0) // (1024 * 1024)}
+                for w in self._workers
+            ],
+            **self._stats
+        }
+
+    async def close(self):
+        """Stop all worker processes"""
+        workers = list(self._workers)
+        for worker in workers:
+            await worker.stop()
+        self._retire_pool()
+
+
+# Global worker pool instance
+pdf_to_pptx_pool = PDFToPPTXWorkerPool()
@@ -3,9 +3,12 @@ Worker entrypoint to run PDF->PPTX conversion in a separate process.
 """
 
 import argparse
+import json
 import logging
+import os
 import sys
 from pathlib import Path
+from typing import Optional
 
 from .pdf_to_pptx_converter import PDFToPPTXConverter
 
@@ -18,23 +21,98 @@ def configure_logging(level: int) -> None:
     )
 
 
+def _peak_rss_bytes() -> Optional[int]:
+    """Peak resident memory of this process, if the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def serve() -> int:
+    """
+    Long-lived worker mode: one JSON request per stdin line, one JSON reply per line.
+
+    Requests: {"id": ..., "cmd": "ping"} or
+              {"id": ..., "cmd": "convert", "input": "...", "output": "..."}
+    The SDK is initialised once and reused for every conversion.
+    """
+    # Keep the protocol channel clean: anything else written to stdout
+    # (including native SDK output) goes to stderr instead.
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8", buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    converter = PDFToPPTXConverter()
+    ready = converter.is_available()
+
+    def reply(payload: dict) -> None:
+        payload["rss_bytes"] = _peak_rss_bytes()
+        protocol.write(json.dumps(payload) + "\n")
+        protocol.flush()
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError:
+            reply({"id": None, "success": False, "result": "Invalid request"})
+            continue
+
+        request_id = request.get("id")
+        command = request.get("cmd")
+        if command == "ping":
+            reply({"id": request_id, "success": ready, "result": "pong" if ready else "SDK not available"})
+        elif command == "convert":
+            try:
+                output_path = Path(request["output"])
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                success, result = converter.convert_pdf_to_pptx(request["input"], str(output_path))
+            except Exception as e:
+                # Keep serving: an unanswered request would leave the pool waiting until its timeout
+                logging.getLogger(__name__).exception("PDF to PPTX conversion failed")
+                success, result = False, str(e)
+            reply({"id": request_id, "success": success, "result": result})
+        elif command == "exit":
+            break
+        else:
+            reply({"id": request_id, "success": False, "result": f"Unknown command: {command}"})
+
+    return 0
+
+
 def main() -> int:
     """CLI entry point."""
     parser = argparse.ArgumentParser(
         description="Convert PDF to PPTX using Apryse SDK."
     )
-    parser.add_argument("--input", required=True, help="Path to the source PDF file.")
+    parser.add_argument("--input", help="Path to the source PDF file.")
     parser.add_argument("--output", help="Path for the output PPTX file.")
     parser.add_argument(
         "--log-level",
         default="INFO",
         help="Logging level (default: INFO)."
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a long-lived worker reading JSON requests from stdin."
+    )
     args = parser.parse_args()
 
     log_level = getattr(logging, args.log_level.upper(), logging.INFO)
     configure_logging(log_level)
 
+    if args.serve:
+        return serve()
+    if not args.input:
+        parser.error("--input is required unless --serve is given")
+
     pdf_path = Path(args.input).expanduser().resolve()
     if not pdf_path.exists():
         print(f"Input PDF not found: {pdf_path}", file=sys.stderr)
@@ -5,13 +5,14 @@ PPT图片处理器
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Tuple
 import aiohttp
 import json
 import asyncio
 from pathlib import Path
 import re
 
+from ..utils.http_client import http_clients
 from ..ai import get_role_provider
 from ..core.config import ai_config
 
@@ -50,6 +51,28 @@ class PPTImageProcessor:
                 kwargs.setdefault("model", role_settings["model"])
         return await provider.text_completion(prompt=prompt, **kwargs)
 
+    async def _batched_completion(self, kind: str, prompt: str, temperature: float,
+                                  validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        通过决策合并器调用模型，短时间窗口内（如整套幻灯片并发预取时）的同类请求合并为一次调用
+
+        Returns:
+            该请求的回复文本
+        """
+        from .decision_batcher import decision_batcher
+
+        async def complete(text: str) -> str:
+            response = await self._text_completion(prompt=text, temperature=temperature)
+            return response.content
+
+        key = (kind, self.provider_override, id(self.ai_provider) if self.ai_provider else None, temperature)
+        return await decision_batcher.run(key, prompt, complete, validate)
+
+    def _is_image_requirements_answer(self, content: str) -> bool:
+        """校验图片需求分析的回复是否为包含 needs_images 的JSON"""
+        json_content = self._extract_json_from_response(content.strip())
+        return bool(json_content) and 'needs_images' in json.loads(json_content)
+
     def _get_base_url(self) -> str:
         """获取基础URL，用于构建绝对图片链接"""
         from .url_service import get_current_base_url
@@ -87,9 +110,6 @@ class PPTImageProcessor:
             # 获取项目信息
             project_topic = confirmed_requirements.get('project_topic', '')
             project_scenario = confirmed_requirements.get('project_scenario', 'general')
-            slide_title = slide_data.get('title', f'第{page_number}页')
-            slide_content = slide_data.get('content_points', [])
-            slide_content_text = '\n'.join(slide_content) if isinstance(slide_content, list) else str(slide_content)
 
             # 检查启用的图片来源
             enabled_sources = self._get_enabled_image_sources(image_config)
@@ -107,6 +127,27 @@ class PPTImageProcessor:
                 logger.info(f"AI判断第{page_number}页不需要添加图片，跳过图片处理")
                 return None
 
+            return await self.collect_slide_images(
+                image_requirements, slide_data, confirmed_requirements, page_number, total_pages,
+                template_html, image_config, enabled_sources
+            )
+
+        except Exception as e:
+            logger.error(f"处理幻灯片图片失败: {e}")
+            return None
+
+    async def collect_slide_images(self, image_requirements: SlideImageRequirements, slide_data: Dict[str, Any],
+                                   confirmed_requirements: Dict[str, Any], page_number: int, total_pages: int,
+                                   template_html: str, image_config: Dict[str, Any],
+                                   enabled_sources: List[ImageSource]) -> Optional[SlideImagesCollection]:
+        """按已确定的图片需求获取图片（本地选择/网络搜索/AI生成）"""
+        try:
+            project_topic = confirmed_requirements.get('project_topic', '')
+            project_scenario = confirmed_requirements.get('project_scenario', 'general')
+            slide_title = slide_data.get('title', f'第{page_number}页')
+            slide_content = slide_data.get('content_points', [])
+            slide_content_text = '\n'.join(slide_content) if isinstance(slide_content, list) else str(slide_content)
+
             logger.info(f"第{page_number}页图片需求: 总计{image_requirements.total_images_needed}张图片")
 
             # 创建图片集合
@@ -170,22 +211,11 @@ class PPTImageProcessor:
             image_config = {}
 
         max_retries = 3
+        raw_content = ""
         for attempt in range(max_retries):
             try:
-                # 获取各来源的最大数量限制
-                max_local = image_config.get('max_local_images_per_slide', 2)
-                max_network = image_config.get('max_network_images_per_slide', 2)
-                max_ai = image_config.get('max_ai_images_per_slide', 1)
-                max_total = image_config.get('max_total_images_per_slide', 3)
-
-                # 构建启用来源的说明
-                enabled_sources_desc = []
-                if ImageSource.LOCAL in enabled_sources:
-                    enabled_sources_desc.append(f"local: 本地图床中的图片，适合通用性图片 (最多{max_local}张)")
-                if ImageSource.NETWORK in enabled_sources:
-                    enabled_sources_desc.append(f"network: 网络搜索图片，适合特定主题的高质量图片 (最多{max_network}张)")
-                if ImageSource.AI_GENERATED in enabled_sources:
-                    enabled_sources_desc.append(f"ai_generated: AI生成图片，适合定制化、创意性图片 (最多{max_ai}张)")
+                # 构建启用来源的说明和配图判断标准
+                requirement_rules = self._build_image_requirement_rules(enabled_sources, image_config)
 
                 # 构建包含模板HTML的提示词
                 template_context = ""
@@ -211,45 +241,7 @@ class PPTImageProcessor:
 
 {template_context}
 
-【可用图片来源及限制】
-{chr(10).join(enabled_sources_desc)}
-
-【图片用途说明】
-1. decoration: 装饰性图片，美化页面
-2. illustration: 说明性图片，辅助理解内容
-3. background: 背景图片，营造氛围
-4. icon: 图标，简化表达
-5. chart_support: 图表辅助，支持数据展示
-6. content_visual: 内容可视化，直观展示概念
-
-【配图适用性判断标准】
-请首先判断该页面是否需要或适合配图，考虑以下因素：
-1. 内容类型：纯文字列表、目录页、致谢页等通常不需要配图
-2. 内容密度：文字过多的页面可能不适合添加图片
-3. 页面功能：导航页、索引页、参考文献页等功能性页面通常不需要配图
-4. 内容抽象度：过于抽象或概念性的内容可能不适合配图
-5. 版面空间：内容已经很满的页面不适合再添加图片
-
-【不适合配图的典型情况】
-- 纯文字列表或条目
-- 目录、索引、导航页面
-- 致谢、参考文献页面
-- 纯数据表格页面
-- 文字密集的详细说明页面
-- 过于抽象的理论概念页面
-
-【分析要求】
-如果判断适合配图，请综合考虑以下因素来决定图片需求：
-1. 内容复杂度：复杂内容需要更多说明性图片
-2. 页面类型：封面页、章节页通常需要装饰性图片
-3. 视觉平衡：文字密集的页面需要图片调节
-4. 主题匹配：根据主题选择合适的图片来源
-5. 设计风格：根据模板风格决定图片类型
-
-【重要限制】
-- 总图片数量不能超过{max_total}张
-- 只能使用已启用的图片来源
-- 每种来源都有数量限制，请严格遵守
+{requirement_rules}
 
 请以JSON格式返回分析结果，格式如下：
 {{
@@ -279,14 +271,13 @@ class PPTImageProcessor:
 
 请直接返回纯JSON格式的结果："""
 
-                response = await self._text_completion(
-                    prompt=prompt,
-                    temperature=0.7
+                content = await self._batched_completion(
+                    "image_requirements", prompt, 0.7, validate=self._is_image_requirements_answer
                 )
 
                 # 解析AI响应
                 # 清理AI响应内容
-                raw_content = response.content.strip()
+                raw_content = content.strip()
                 logger.debug(f"AI原始响应内容: {raw_content}")
 
                 # 尝试提取JSON部分
@@ -297,30 +288,11 @@ class PPTImageProcessor:
 
                 result = json.loads(json_content)
 
-                if not result.get('needs_images', False) or result.get('total_images', 0) == 0:
-                    reasoning = result.get('reasoning', '未提供理由')
-                    logger.info(f"AI判断第{page_number}页不需要或不适合配图: {reasoning}")
-                    return None
-
-                # 创建需求对象
-                requirements = SlideImageRequirements(page_number=page_number, requirements=[])
-
-                for req_data in result.get('requirements', []):
-                    requirement = ImageRequirement(
-                        source=ImageSource(req_data['source']),
-                        count=req_data['count'],
-                        purpose=ImagePurpose(req_data['purpose']),
-                        description=req_data['description'],
-                        priority=req_data.get('priority', 1)
-                    )
-                    requirements.add_requirement(requirement)
-
-                logger.info(f"AI分析第{page_number}页图片需求: {result.get('reasoning', '')}")
-                return requirements
+                return self._parse_image_requirements(result, page_number)
 
             except (json.JSONDecodeError, KeyError, ValueError) as e:
                 logger.warning(f"第{attempt + 1}次尝试解析AI图片需求分析结果失败: {e}")
-                logger.debug(f"AI响应内容: {response.content}")
+                logger.debug(f"AI响应内容: {raw_content}")
                 if attempt < max_retries - 1:
                     logger.info(f"等待1秒后进行第{attempt + 2}次重试...")
                     import asyncio
@@ -345,6 +317,204 @@ class PPTImageProcessor:
         logger.error("AI分析图片需求失败，已达到最大重试次数")
         return None
 
+    async def analyze_deck_image_requirements(self, slides: List[Tuple[int, Dict[str, Any]]],
+                                              confirmed_requirements: Dict[str, Any], total_pages: int,
+                                              enabled_sources: List[ImageSource], image_config: Dict[str, Any],
+                                              template_html: str = "") -> Dict[int, Optional[SlideImageRequirements]]:
+        """
+        一次AI调用分析多页幻灯片的图片需求
+
+        Returns:
+            页码到需求对象的映射（不需要配图的页面为None）；
+            未返回或解析失败的页面不在结果中，由调用方逐页回退分析
+        """
+        if not slides:
+            return {}
+
+        project_topic = confirmed_requirements.get('project_topic', '')
+        project_scenario = confirmed_requirements.get('project_scenario', 'general')
+
+        slides_desc = []
+        for page_number, slide_data in slides:
+            slide_content = slide_data.get('content_points', [])
+            slide_content_text = '\n'.join(slide_content) if isinstance(slide_content, list) else str(slide_content)
+            content_points_count = len(slide_content) if isinstance(slide_content, list) else 0
+            slides_desc.append(f"""--- 第{page_number}页 ---
+- 标题：{slide_data.get('title', '')}
+- 内容要点数量：{content_points_count}个
+- 内容字数：{len(slide_content_text.strip())}字
+- 具体内容：
+{slide_content_text}""")
+
+        template_context = ""
+        if template_html.strip():
+            template_context = f"""
+当前PPT模板HTML参考：
+{template_html[:500]}...
+"""
+
+        requirement_rules = self._build_image_requirement_rules(enabled_sources, image_config)
+
+        prompt = f"""作为专业的PPT设计师，请逐页分析以下{len(slides)}页幻灯片的图片需求。对每一页，首先判断该页面内容是否需要或适合配图，如果不需要或不适合配图则返回0。
+
+【项目信息】
+- 主题：{project_topic}
+- 场景：{project_scenario}
+- 总页数：{total_pages}
+
+【幻灯片内容】
+{chr(10).join(slides_desc)}
+
+{template_context}
+
+{requirement_rules}
+- 以上数量限制针对每一页分别计算
+
+请以JSON格式返回分析结果，slides数组中每页对应一项，格式如下：
+{{
+    "slides": [
+        {{
+            "page_number": 页码,
+            "needs_images": true/false,
+            "total_images": 数字,
+            "requirements": [
+                {{
+                    "source": "仅限已启用的来源",
+                    "count": 数字,
+                    "purpose": "decoration/illustration/background/icon/chart_support/content_visual",
+                    "description": "具体需求描述",
+                    "priority": 1-5
+                }}
+            ],
+            "reasoning": "分析理由，包括是否适合配图的判断依据"
+        }}
+    ]
+}}
+
+【重要要求】：
+- 必须为上面的每一页返回一项，page_number与页码一致
+- 如果某页不需要或不适合配图，设置needs_images为false，total_images为0，requirements为空数组
+- 每种来源可以有多个需求项，支持不同用途
+- 优先级1-5，5为最高优先级
+- 严格遵守数量限制，避免页面过于拥挤
+- 必须返回有效的JSON格式，不要添加任何解释文字
+- 不要使用markdown代码块包装
+- 确保所有字符串值都用双引号包围
+- 确保布尔值使用true/false（小写）
+
+请直接返回纯JSON格式的结果："""
+
+        try:
+            response = await self._text_completion(
+                prompt=prompt,
+                temperature=0.7
+            )
+            raw_content = response.content.strip()
+            json_content = self._extract_json_from_response(raw_content)
+            if not json_content:
+                raise json.JSONDecodeError("无法提取有效JSON", raw_content, 0)
+            result = json.loads(json_content)
+        except Exception as e:
+            logger.warning(f"批量分析{len(slides)}页图片需求失败，将逐页分析: {e}")
+            return {}
+
+        expected_pages = {page_number for page_number, _ in slides}
+        analyzed: Dict[int, Optional[SlideImageRequirements]] = {}
+        for item in result.get('slides') or []:
+            try:
+                page_number = int(item['page_number'])
+                if page_number not in expected_pages or page_number in analyzed:
+                    continue
+                analyzed[page_number] = self._parse_image_requirements(item, page_number)
+            except (KeyError, ValueError, TypeError, AttributeError) as e:
+                logger.warning(f"批量图片需求分析结果中有一项解析失败: {e}")
+
+        missing = expected_pages - analyzed.keys()
+        if missing:
+            logger.info(f"批量图片需求分析缺少第{sorted(missing)}页的结果，将逐页分析")
+        return analyzed
+
+    def _build_image_requirement_rules(self, enabled_sources: List[ImageSource],
+                                       image_config: Dict[str, Any]) -> str:
+        """构建图片来源限制和配图判断标准（单页分析与批量分析共用）"""
+        # 获取各来源的最大数量限制
+        max_local = image_config.get('max_local_images_per_slide', 2)
+        max_network = image_config.get('max_network_images_per_slide', 2)
+        max_ai = image_config.get('max_ai_images_per_slide', 1)
+        max_total = image_config.get('max_total_images_per_slide', 3)
+
+        # 构建启用来源的说明
+        enabled_sources_desc = []
+        if ImageSource.LOCAL in enabled_sources:
+            enabled_sources_desc.append(f"local: 本地图床中的图片，适合通用性图片 (最多{max_local}张)")
+        if ImageSource.NETWORK in enabled_sources:
+            enabled_sources_desc.append(f"network: 网络搜索图片，适合特定主题的高质量图片 (最多{max_network}张)")
+        if ImageSource.AI_GENERATED in enabled_sources:
+            enabled_sources_desc.append(f"ai_generated: AI生成图片，适合定制化、创意性图片 (最多{max_ai}张)")
+
+        return f"""【可用图片来源及限制】
+{chr(10).join(enabled_sources_desc)}
+
+【图片用途说明】
+1. decoration: 装饰性图片，美化页面
+2. illustration: 说明性图片，辅助理解内容
+3. background: 背景图片，营造氛围
+4. icon: 图标，简化表达
+5. chart_support: 图表辅助，支持数据展示
+6. content_visual: 内容可视化，直观展示概念
+
+【配图适用性判断标准】
+请首先判断该页面是否需要或适合配图，考虑以下因素：
+1. 内容类型：纯文字列表、目录页、致谢页等通常不需要配图
+2. 内容密度：文字过多的页面可能不适合添加图片
+3. 页面功能：导航页、索引页、参考文献页等功能性页面通常不需要配图
+4. 内容抽象度：过于抽象或概念性的内容可能不适合配图
+5. 版面空间：内容已经很满的页面不适合再添加图片
+
+【不适合配图的典型情况】
+- 纯文字列表或条目
+- 目录、索引、导航页面
+- 致谢、参考文献页面
+- 纯数据表格页面
+- 文字密集的详细说明页面
+- 过于抽象的理论概念页面
+
+【分析要求】
+如果判断适合配图，请综合考虑以下因素来决定图片需求：
+1. 内容复杂度：复杂内容需要更多说明性图片
+2. 页面类型：封面页、章节页通常需要装饰性图片
+3. 视觉平衡：文字密集的页面需要图片调节
+4. 主题匹配：根据主题选择合适的图片来源
+5. 设计风格：根据模板风格决定图片类型
+
+【重要限制】
+- 总图片数量不能超过{max_total}张
+- 只能使用已启用的图片来源
+- 每种来源都有数量限制，请严格遵守"""
+
+    def _parse_image_requirements(self, result: Dict[str, Any], page_number: int) -> Optional[SlideImageRequirements]:
+        """将AI返回的单页需求JSON转换为需求对象，不需要配图时返回None"""
+        if not result.get('needs_images', False) or result.get('total_images', 0) == 0:
+            reasoning = result.get('reasoning', '未提供理由')
+            logger.info(f"AI判断第{page_number}页不需要或不适合配图: {reasoning}")
+            return None
+
+        # 创建需求对象
+        requirements = SlideImageRequirements(page_number=page_number, requirements=[])
+
+        for req_data in result.get('requirements', []):
+            requirement = ImageRequirement(
+                source=ImageSource(req_data['source']),
+                count=req_data['count'],
+                purpose=ImagePurpose(req_data['purpose']),
+                description=req_data['description'],
+                priority=req_data.get('priority', 1)
+            )
+            requirements.add_requirement(requirement)
+
+        logger.info(f"AI分析第{page_number}页图片需求: {result.get('reasoning', '')}")
+        return requirements
+
     def _extract_json_from_response(self, content: str) -> Optional[str]:
         """从AI响应中提取JSON内容"""
         try:
@@ -717,26 +887,11 @@ class PPTImageProcessor:
             if not self.image_service:
                 return []
 
-            # 获取所有本地图片
-            gallery_result = await self.image_service.list_cached_images(page=1, per_page=100)
-            if not gallery_result.get('images'):
-                return []
-
-            # 将关键词分割成列表
-            keyword_list = keywords.lower().split()
-
-            # 计算所有图片的匹配分数
-            scored_images = []
-            for img in gallery_result['images']:
-                score = self._calculate_image_match_score(img, keyword_list)
-                if score > 0:
-                    scored_images.append((img.get('image_id'), score))
-
-            # 按分数排序并选择前N张
-            scored_images.sort(key=lambda x: x[1], reverse=True)
-            selected_images = [img_id for img_id, _ in scored_images[:count]]
+            # 在本地图库的相关度索引中搜索（覆盖全部缓存图片）
+            scored_images = await self.image_service.search_cached_images(keywords, count)
+            selected_images = [img_id for img_id, _ in scored_images]
 
-            logger.info(f"从{len(gallery_result['images'])}张本地图片中选择了{len(selected_images)}张")
+            logger.info(f"从{len(self.image_service.cached_image_index)}张本地图片中选择了{len(selected_images)}张")
             return selected_images
 
         except Exception as e:
@@ -872,10 +1027,10 @@ class PPTImageProcessor:
                 return None
 
             # 下载图片数据
-            async with aiohttp.ClientSession() as session:
+            async with http_clients.session(timeout=aiohttp.ClientTimeout(total=60)) as session:
                 async with session.get(image_url) as response:
                     if response.status == 200:
-                        image_data_bytes = await response.read()
+                        image_data_bytes = await http_clients.read_limited(response)
 
                         # 获取文件扩展名
                         content_type = response.headers.get('content-type', 'image/jpeg')
@@ -1119,39 +1274,6 @@ class PPTImageProcessor:
             logger.error(f"获取本地图片详细信息失败: {e}")
             return {}
 
-    def _calculate_image_match_score(self, img: Dict[str, Any], keyword_list: List[str]) -> int:
-        """计算图片匹配分数"""
-        score = 0
-
-        # 处理标题、文件名、标签
-        title = (img.get('title') or '').lower()
-        filename = (img.get('filename') or '').lower()
-
-        tags = img.get('tags', [])
-        if tags and len(tags) > 0 and hasattr(tags[0], 'name'):
-            tag_names = [tag.name.lower() for tag in tags]
-        else:
-            tag_names = [str(tag).lower() for tag in tags if tag]
-
-        # 标题匹配（权重最高）
-        for keyword in keyword_list:
-            if keyword in title:
-                score += 3
-
-        # 标签匹配（权重中等）
-        for keyword in keyword_list:
-            for tag in tag_names:
-                if keyword in tag or tag in keyword:
-                    score += 2
-                    break  # 每个关键词只匹配一次
-
-        # 文件名匹配（权重较低）
-        for keyword in keyword_list:
-            if keyword in filename:
-                score += 1
-
-        return score
-
     async def _ai_generate_local_search_keywords(self, slide_title: str, slide_content: str,
                                                project_topic: str, project_scenario: str,
                                                requirement: ImageRequirement = None) -> Optional[str]:
@@ -1185,12 +1307,9 @@ class PPTImageProcessor:
 示例格式：商务 会议 图表 business chart
 请只回复关键词，不要其他内容："""
 
-            response = await self._text_completion(
-                prompt=prompt,
-                temperature=0.5
-            )
+            content = await self._batched_completion("local_search_keywords", prompt, 0.5)
 
-            search_keywords = response.content.strip()
+            search_keywords = content.strip()
             logger.info(f"AI生成本地搜索关键词: {search_keywords}")
             return search_keywords
 
@@ -1339,12 +1458,9 @@ class PPTImageProcessor:
 示例格式：{example_format}
 请只回复关键词，不要其他内容："""
 
-            response = await self._text_completion(
-                prompt=prompt,
-                temperature=0.5
-            )
+            content = await self._batched_completion("network_search_query", prompt, 0.5)
 
-            search_query = response.content.strip()
+            search_query = content.strip()
 
             # 根据不同提供商截断查询
             from .config_service import get_config_service
@@ -1535,12 +1651,9 @@ class PPTImageProcessor:
 3. 考虑PPT演示的整体效果
 4. 只回复对应的数字编号或尺寸值（如 1792x1024），不要其他内容"""
 
-            response = await self._text_completion(
-                prompt=prompt,
-                temperature=0.3
-            )
+            content = await self._batched_completion("image_dimensions", prompt, 0.3)
 
-            choice_text = response.content.strip()
+            choice_text = content.strip()
 
             # 先尝试解析显式的尺寸值
             selected_dimensions = available_dimensions[0]
@@ -1633,12 +1746,9 @@ class PPTImageProcessor:
 
 请生成一个完整的英文提示词（不超过120词），直接输出提示词，不要添加任何其他内容"""
 
-            response = await self._text_completion(
-                prompt=prompt,
-                temperature=0.7
-            )
+            content = await self._batched_completion("image_generation_prompt", prompt, 0.7)
 
-            image_prompt = response.content.strip()
+            image_prompt = content.strip()
             logger.info(f"AI生成第{image_index}张图片提示词: {image_prompt}")
             return image_prompt
 
@@ -1698,12 +1808,9 @@ class PPTImageProcessor:
 
 请基于以上标准进行专业判断，只回复"是"或"否"："""
 
-            response = await self._text_completion(
-                prompt=prompt,
-                temperature=0.7
-            )
-            # logger.info(f"AI判断是否需要图片的回复: {response.content}")
-            decision = response.content.strip().lower()
+            content = await self._batched_completion("should_add_image", prompt, 0.7)
+            # logger.info(f"AI判断是否需要图片的回复: {content}")
+            decision = content.strip().lower()
             should_add = decision in ['是', 'yes', 'true', '需要', '适合']
 
             logger.info(f"AI判断第{page_number}页是否需要图片: {decision} -> {should_add}")
@@ -1,11 +1,21 @@
 """
 Progress Tracker for Speech Script Generation
+
+Progress is written through to the shared task store so that any worker
+process can answer progress polls, not just the one running the generation.
+Store writes run off the event loop and bursts of updates are merged; finished
+scripts are appended as separate items instead of rewriting the whole list.
+Each change is also pushed to the project owner's event stream.
 """
 
+import asyncio
 import time
+import logging
 import threading
 from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -24,6 +34,7 @@ class ProgressInfo:
     start_time: float = 0
     last_update: float = 0
     error_details: list = None
+    completed_scripts: list = None  # Scripts streamed as soon as each slide finishes
     
     def __post_init__(self):
         if self.start_time == 0:
@@ -31,6 +42,8 @@ class ProgressInfo:
         self.last_update = time.time()
         if self.error_details is None:
             self.error_details = []
+        if self.completed_scripts is None:
+            self.completed_scripts = []
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -52,13 +65,133 @@ class ProgressInfo:
         """Get elapsed time in seconds"""
         return time.time() - self.start_time
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ProgressInfo':
+        """Rebuild from a persisted dictionary"""
+        known = {f.name for f in fields(cls)}
+        progress = cls(**{k: v for k, v in data.items() if k in known})
+        # __post_init__ resets last_update, restore the persisted value
+        progress.last_update = data.get('last_update', progress.last_update)
+        return progress
+
 
 class ProgressTracker:
     """Thread-safe progress tracker for speech script generation"""
+
+    TASK_TYPE = "speech_script_generation"
+    # A running task whose owner has not written progress for this long is considered lost
+    LEASE_SECONDS = 600
     
-    def __init__(self):
+    def __init__(self, store=None):
+        # Tasks owned by this process; other workers read them from the store
         self._progress_data: Dict[str, ProgressInfo] = {}
         self._lock = threading.Lock()
+        self._store = store
+        # Store writes waiting to be flushed, and the task flushing them, per task id.
+        # Updates that arrive while a write is in flight are merged into the next one.
+        self._pending_writes: Dict[str, Dict[str, Any]] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
+        self._write_lock = threading.Lock()
+
+    def _get_store(self):
+        if self._store is None:
+            from .task_store import task_store
+            self._store = task_store
+        return self._store
+
+    @staticmethod
+    def _snapshot(progress: ProgressInfo) -> Dict[str, Any]:
+        """Progress fields to persist; completed scripts are stored as separate items"""
+        data = {f.name: getattr(progress, f.name) for f in fields(progress) if f.name != 'completed_scripts'}
+        data['error_details'] = list(progress.error_details)
+        return data
+
+    def _persist(self, snapshot: Dict[str, Any], create: bool = False,
+                 script: Optional[Dict[str, Any]] = None, script_seq: int = 0):
+        """
+        Queue a write-through of the progress snapshot to the shared task store and notify
+        subscribers. Called after releasing self._lock; the store write runs off the event loop.
+        """
+        task_id = snapshot['task_id']
+        with self._write_lock:
+            pending = self._pending_writes.setdefault(
+                task_id, {'create': False, 'snapshot': None, 'scripts': [], 'script_seq': 0}
+            )
+            pending['create'] = pending['create'] or create
+            pending['snapshot'] = snapshot
+            if script is not None:
+                if not pending['scripts']:
+                    pending['script_seq'] = script_seq
+                pending['scripts'].append(script)
+
+            flush_now = False
+            if task_id not in self._writers:
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    # Called from a worker thread: write synchronously, the loop is not blocked
+                    flush_now = True
+                else:
+                    self._writers[task_id] = loop.create_task(self._drain_writes(task_id))
+
+        if flush_now:
+            with self._write_lock:
+                pending = self._pending_writes.pop(task_id, None)
+            if pending is not None:
+                self._write(task_id, pending)
+
+        # Push the change to open editor pages; completed scripts are fetched separately
+        from .event_hub import project_event_hub
+        total = snapshot['total_slides']
+        project_event_hub.publish_nowait(snapshot['project_id'], "speech_progress", {
+            'task_id': task_id,
+            'progress': {
+                'status': snapshot['status'],
+                'message': snapshot['message'],
+                'progress_percentage': snapshot['completed_slides'] / total * 100 if total else 0,
+                'completed_slides': snapshot['completed_slides'],
+                'failed_slides': snapshot['failed_slides'],
+                'skipped_slides': snapshot['skipped_slides'],
+                'total_slides': total
+            }
+        })
+
+    async def _drain_writes(self, task_id: str):
+        from ..utils.thread_pool import run_blocking_io
+        while True:
+            with self._write_lock:
+                pending = self._pending_writes.pop(task_id, None)
+                if pending is None:
+                    self._writers.pop(task_id, None)
+                    return
+            await run_blocking_io(self._write, task_id, pending)
+
+    def _write(self, task_id: str, pending: Dict[str, Any]):
+        """Write merged progress changes to the store (blocking)"""
+        try:
+            from .task_store import get_worker_id
+            store = self._get_store()
+            snapshot = pending['snapshot']
+            if pending['scripts']:
+                store.append_items(task_id, pending['scripts'], pending['script_seq'])
+
+            fields_to_save: Dict[str, Any] = {}
+            if pending['create']:
+                fields_to_save['metadata'] = {'project_id': snapshot['project_id']}
+            total = snapshot['total_slides']
+            store.save(
+                task_id,
+                task_type=self.TASK_TYPE if pending['create'] else None,
+                status=snapshot['status'],
+                progress=snapshot['completed_slides'] / total * 100 if total else 0,
+                error=snapshot['message'] if snapshot['status'] == "failed" else None,
+                progress_data=snapshot,
+                worker_id=get_worker_id(),
+                lease_seconds=self.LEASE_SECONDS,
+                **fields_to_save
+            )
+        except Exception as e:
+            logger.warning(f"Failed to persist progress for task {task_id}: {e}")
     
     def create_task(self, task_id: str, project_id: str, total_slides: int) -> ProgressInfo:
         """Create a new progress tracking task"""
@@ -74,7 +207,9 @@ class ProgressTracker:
                 message="开始生成演讲稿..."
             )
             self._progress_data[task_id] = progress
-            return progress
+            snapshot = self._snapshot(progress)
+        self._persist(snapshot, create=True)
+        return progress
     
     def update_progress(self, task_id: str, **kwargs) -> Optional[ProgressInfo]:
         """Update progress for a task"""
@@ -90,12 +225,45 @@ class ProgressTracker:
                     setattr(progress, key, value)
             
             progress.last_update = time.time()
-            return progress
+            snapshot = self._snapshot(progress)
+        self._persist(snapshot)
+        return progress
     
     def get_progress(self, task_id: str) -> Optional[ProgressInfo]:
-        """Get progress for a task"""
+        """Get progress for a task, falling back to the shared store for tasks owned by other workers"""
         with self._lock:
-            return self._progress_data.get(task_id)
+            progress = self._progress_data.get(task_id)
+        if progress is not None:
+            return progress
+        return self._load_progress(task_id)
+
+    async def get_progress_async(self, task_id: str) -> Optional[ProgressInfo]:
+        """Same as get_progress, but reads the shared store off the event loop"""
+        with self._lock:
+            progress = self._progress_data.get(task_id)
+        if progress is not None:
+            return progress
+        from ..utils.thread_pool import run_blocking_io
+        return await run_blocking_io(self._load_progress, task_id)
+
+    def _load_progress(self, task_id: str) -> Optional[ProgressInfo]:
+        store = self._get_store()
+        record = store.get(task_id)
+        if not record or record.get('task_type') != self.TASK_TYPE or not record.get('progress_data'):
+            return None
+        try:
+            progress = ProgressInfo.from_dict(record['progress_data'])
+        except Exception as e:
+            logger.warning(f"Failed to load progress for task {task_id}: {e}")
+            return None
+        scripts = store.get_items(task_id)
+        if scripts:
+            progress.completed_scripts = scripts
+        if record['status'] == "failed" and progress.status == "running":
+            # Owner worker went away without finishing
+            progress.status = "failed"
+            progress.message = record.get('error') or progress.message
+        return progress
     
     def complete_task(self, task_id: str, message: str = "生成完成") -> Optional[ProgressInfo]:
         """Mark task as completed"""
@@ -113,20 +281,25 @@ class ProgressTracker:
             message=f"生成失败: {error_message}"
         )
     
-    def add_slide_completed(self, task_id: str, slide_index: int, slide_title: str) -> Optional[ProgressInfo]:
-        """Mark a slide as completed"""
+    def add_slide_completed(self, task_id: str, slide_index: int, slide_title: str,
+                            script: Optional[Dict[str, Any]] = None) -> Optional[ProgressInfo]:
+        """Mark a slide as completed, optionally recording its finished script"""
         with self._lock:
             if task_id not in self._progress_data:
                 return None
             
             progress = self._progress_data[task_id]
             progress.completed_slides += 1
+            script_seq = len(progress.completed_scripts)
+            if script is not None:
+                progress.completed_scripts.append(script)
             progress.current_slide = slide_index
             progress.current_slide_title = slide_title
             progress.message = f"已完成第{slide_index + 1}页: {slide_title}"
             progress.last_update = time.time()
-            
-            return progress
+            snapshot = self._snapshot(progress)
+        self._persist(snapshot, script=script, script_seq=script_seq)
+        return progress
     
     def add_slide_failed(self, task_id: str, slide_index: int, slide_title: str, error: str) -> Optional[ProgressInfo]:
         """Mark a slide as failed"""
@@ -145,8 +318,9 @@ class ProgressTracker:
                 'error': error
             })
             progress.last_update = time.time()
-            
-            return progress
+            snapshot = self._snapshot(progress)
+        self._persist(snapshot)
+        return progress
     
     def add_slide_skipped(self, task_id: str, slide_index: int, slide_title: str, reason: str) -> Optional[ProgressInfo]:
         """Mark a slide as skipped"""
@@ -160,8 +334,9 @@ class ProgressTracker:
             progress.current_slide_title = slide_title
             progress.message = f"第{slide_index + 1}页已跳过: {slide_title}"
             progress.last_update = time.time()
-            
-            return progress
+            snapshot = self._snapshot(progress)
+        self._persist(snapshot)
+        return progress
     
     def cleanup_old_tasks(self, max_age_seconds: int = 3600):
         """Clean up old completed/failed tasks"""
@@ -3,7 +3,7 @@ PPT设计基因和视觉指导相关提示词
 包含所有用于设计分析和视觉指导的提示词模板
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -212,12 +212,18 @@ class DesignPrompts:
 请提供具体的设计实施方案。"""
 
     @staticmethod
-    def get_creative_template_context_prompt(slide_data: Dict[str, Any], template_html: str,
-                                           slide_title: str, slide_type: str, page_number: int,
-                                           total_pages: int, context_info: str, style_genes: str,
-                                           unified_design_guide: str, project_topic: str,
-                                           project_type: str, project_audience: str, project_style: str) -> str:
-        """获取创意模板上下文提示词"""
+    def get_creative_template_context_prompt_parts(slide_data: Dict[str, Any], template_html: str,
+                                                 slide_title: str, slide_type: str, page_number: int,
+                                                 total_pages: int, context_info: str, style_genes: str,
+                                                 unified_design_guide: str, project_topic: str,
+                                                 project_type: str, project_audience: str,
+                                                 project_style: str) -> Tuple[str, str]:
+        """
+        获取创意模板上下文提示词，拆分为(整套PPT共享的前缀, 当前页面后缀)
+
+        前缀只包含模板、设计基因、项目信息和固定规范，同一项目的每一页逐字节相同，
+        便于支持提示词缓存的模型复用；页面相关内容全部放在后缀中。
+        """
 
         # 处理图片信息 - 只有在图片服务启用且有图片信息时才包含
         images_info = ""
@@ -235,17 +241,7 @@ class DesignPrompts:
 - 可以使用CSS对图片进行适当的样式调整（大小、位置、边框等）
 """
 
-        return f"""你是一位富有创意的设计师，需要为第{page_number}页创建一个既保持风格一致性又充满创意的PPT页面。
-
-**严格内容约束**：
-- 页面标题：{slide_title}
-- 页面类型：{slide_type}
-- 总页数：{total_pages}
-
-**完整页面数据参考**：
-{slide_data}
-
-{images_info}
+        prefix = f"""你是一位富有创意的设计师，需要为这套PPT逐页创建既保持风格一致性又充满创意的页面。以下是整套PPT共用的风格模板和设计规范，当前页面的具体任务在最后给出。
 
 **风格模板（页眉和页脚必须完全保持原样）**：
 ```html
@@ -269,8 +265,6 @@ class DesignPrompts:
 - AI生成过程中不应对页眉和页脚模板区域进行任何样式修改
 - "完全保持原样"意味着这些区域的所有视觉属性都不能改变
 
-{context_info}
-
 **核心设计原则**
 
 1.  **固定画布**：所有设计都必须在`1280x720`像素的固定尺寸画布内完成。最终页面应水平和垂直居中显示。
@@ -336,9 +330,6 @@ class DesignPrompts:
 **核心设计基因（必须保持）**：
 {style_genes}
 
-**统一创意设计指导**：
-{unified_design_guide}
-
 **项目背景**：
 - 主题：{project_topic}
 - 类型：{project_type}
@@ -372,7 +363,7 @@ class DesignPrompts:
 - 使用Tailwind CSS或内联CSS，确保美观的设计
 - 页面尺寸自适应：html {{ height: 100%; display: flex; align-items: center; justify-content: center; }} body {{ width: 100%; height: 100%; position: relative; overflow: hidden; }}
 - 支持使用Chart.js和Font Awesome库
-- 页码显示为：{page_number}/{total_pages}
+- 页码显示为：当前页码/总页数（见下方当前页面任务）
 - **页眉页脚风格延续**：
   * 页眉区域：延续参考模板的标题风格和视觉特征
   * 页脚区域：保持页码和装饰元素的一致性
@@ -390,11 +381,40 @@ class DesignPrompts:
 - 不要在代码块前后添加任何解释文字
 """
 
+        suffix = f"""
+**当前页面任务**：为第{page_number}页创建一个既保持风格一致性又充满创意的PPT页面。
+
+**严格内容约束**：
+- 页面标题：{slide_title}
+- 页面类型：{slide_type}
+- 总页数：{total_pages}
+
+**完整页面数据参考**：
+{slide_data}
+
+{images_info}
+
+{context_info}
+
+**统一创意设计指导**：
+{unified_design_guide}
+
+- 页码显示为：{page_number}/{total_pages}
+- 请严格遵循上述风格模板和设计规范，直接返回```html代码块
+"""
+        return prefix, suffix
+
     @staticmethod
-    def get_single_slide_html_prompt(slide_data: Dict[str, Any], confirmed_requirements: Dict[str, Any],
-                                   page_number: int, total_pages: int, context_info: str,
-                                   style_genes: str, unified_design_guide: str, template_html: str) -> str:
-        """获取单页HTML生成提示词"""
+    def get_creative_template_context_prompt(*args, **kwargs) -> str:
+        """获取创意模板上下文提示词"""
+        return "".join(DesignPrompts.get_creative_template_context_prompt_parts(*args, **kwargs))
+
+    @staticmethod
+    def get_single_slide_html_prompt_parts(slide_data: Dict[str, Any], confirmed_requirements: Dict[str, Any],
+                                         page_number: int, total_pages: int, context_info: str,
+                                         style_genes: str, unified_design_guide: str,
+                                         template_html: str) -> Tuple[str, str]:
+        """获取单页HTML生成提示词，拆分为(整套PPT共享的前缀, 当前页面后缀)，前缀在同一项目内逐字节相同"""
 
         # 处理图片信息 - 只有在图片服务启用且有图片信息时才包含
         images_info = ""
@@ -411,19 +431,14 @@ class DesignPrompts:
 - 可以使用CSS对图片进行适当的样式调整（大小、位置、边框等）
 """
 
-        return f"""
-根据项目信息，为第{page_number}页生成完整的HTML代码。
+        prefix = f"""
+根据项目信息，为这套PPT逐页生成完整的HTML代码。以下是整套PPT共用的风格模板和设计规范，当前页面的具体信息在最后给出。
 
 项目信息：
 - 主题：{confirmed_requirements.get('topic', '')}
 - 目标受众：{confirmed_requirements.get('target_audience', '')}
 - 其他说明：{confirmed_requirements.get('description', '无')}
 
-当前页面信息：
-{slide_data}
-
-{images_info}
-
 **风格模板（页眉和页脚必须完全保持原样）**：
 ```html
 {template_html}
@@ -494,20 +509,6 @@ class DesignPrompts:
 
 
 
-{f'''
-**图片集成指导**：
-- 图片资源: {slide_data.get('image_url', '无')}
-- 如果有图片资源，请必须合理地将图片融入页面设计中：
-  * 根据图片的实际尺寸（宽度x高度）优化布局和比例设计
-  * 考虑图片文件大小，对大文件图片进行适当的压缩显示
-  * 根据图片格式（PNG/JPEG/WebP等）选择合适的显示方式
-  * 图片大小和位置应与页面布局协调，不影响文字阅读
-  * 可以作为背景图、装饰图或内容配图等各种方式使用
-  * 确保图片不会导致页面内容溢出或布局混乱
-  * 图片应使用响应式设计，适配不同屏幕尺寸
-
-''' if _is_image_service_enabled() else ''}
-
 **富文本支持**：
 - 支持数学公式（使用MathJax）、代码高亮（使用Prism.js）、图表（使用Chart.js）等富文本元素
 - 根据内容需要自动添加相应的库和样式
@@ -529,9 +530,6 @@ class DesignPrompts:
 **核心设计基因（必须保持）**：
 {style_genes}
 
-**统一创意设计指导**：
-{unified_design_guide}
-
 **重要输出格式要求：**
 - 必须使用markdown代码块格式返回HTML代码
 - 格式：```html\\n[HTML代码]\\n```
@@ -542,6 +540,45 @@ class DesignPrompts:
 - **页眉页脚保持原样**：生成的HTML中页眉和页脚部分必须与参考模板完全一致，不允许任何修改
 """
 
+        suffix = f"""
+**当前页面任务**：为第{page_number}页（共{total_pages}页）生成完整的HTML代码。
+
+当前页面信息：
+{slide_data}
+
+{images_info}
+
+{f'''
+**图片集成指导**：
+- 图片资源: {slide_data.get('image_url', '无')}
+- 如果有图片资源，请必须合理地将图片融入页面设计中：
+  * 根据图片的实际尺寸（宽度x高度）优化布局和比例设计
+  * 考虑图片文件大小，对大文件图片进行适当的压缩显示
+  * 根据图片格式（PNG/JPEG/WebP等）选择合适的显示方式
+  * 图片大小和位置应与页面布局协调，不影响文字阅读
+  * 可以作为背景图、装饰图或内容配图等各种方式使用
+  * 确保图片不会导致页面内容溢出或布局混乱
+  * 图片应使用响应式设计，适配不同屏幕尺寸
+
+''' if _is_image_service_enabled() else ''}
+
+**统一创意设计指导**：
+{unified_design_guide}
+
+- 请严格遵循上述风格模板和设计规范，直接返回```html代码块
+"""
+        return prefix, suffix
+
+    @staticmethod
+    def get_single_slide_html_prompt(slide_data: Dict[str, Any], confirmed_requirements: Dict[str, Any],
+                                   page_number: int, total_pages: int, context_info: str,
+                                   style_genes: str, unified_design_guide: str, template_html: str) -> str:
+        """获取单页HTML生成提示词"""
+        return "".join(DesignPrompts.get_single_slide_html_prompt_parts(
+            slide_data, confirmed_requirements, page_number, total_pages,
+            context_info, style_genes, unified_design_guide, template_html
+        ))
+
     @staticmethod
     def get_slide_context_prompt(page_number: int, total_pages: int) -> str:
         """获取幻灯片上下文提示词（特殊页面设计要求）"""
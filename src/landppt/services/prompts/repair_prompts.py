@@ -189,6 +189,17 @@ class RepairPrompts:
 
 请提供详细的质量评估报告和改进建议。"""
 
+    @staticmethod
+    def get_html_continuation_prompt(unclosed_tags: List[str]) -> str:
+        """获取HTML续写提示词（上一条助手消息是被截断的输出）"""
+        unclosed = ", ".join(f"<{tag}>" for tag in unclosed_tags[-8:]) or "无"
+        return f"""你上一次的输出在中途被截断了，HTML代码没有写完。请从截断处紧接着继续输出剩余的代码：
+
+- 直接从上一次输出的最后一个字符之后开始续写，不要重复任何已经输出的内容
+- 不要重新开始生成文档，不要添加解释文字，不要以```html开头
+- 当前未闭合的标签（由外到内）：{unclosed}
+- 保持已有的样式和结构，完成剩余内容并依次闭合标签，一直输出到</html>为止"""
+
     @staticmethod
     def get_error_recovery_prompt(error_info: str, context: Dict[str, Any]) -> str:
         """获取错误恢复提示词"""
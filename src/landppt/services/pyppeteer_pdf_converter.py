@@ -27,6 +27,189 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+# 幻灯片布局几何检测脚本：测量元素包围盒与画布的关系，不依赖截图和视觉模型
+_LAYOUT_GEOMETRY_SCRIPT = '''(canvas) => {
+    const W = canvas.width, H = canvas.height, TOL = canvas.tolerance;
+    const MAX_ISSUES = 30;
+    const SKIP_TAGS = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'BR', 'HEAD', 'META', 'LINK', 'TITLE']);
+    const MEDIA_TAGS = new Set(['IMG', 'CANVAS', 'SVG', 'VIDEO', 'TABLE', 'IFRAME']);
+    const CLIPPING = new Set(['hidden', 'clip', 'auto', 'scroll']);
+    const SCROLLING = new Set(['auto', 'scroll']);
+    const issues = [];
+
+    const describe = (el) => {
+        let name = el.tagName.toLowerCase();
+        if (el.id) {
+            name += '#' + el.id;
+        } else if (el.classList && el.classList.length) {
+            name += '.' + Array.from(el.classList).slice(0, 2).join('.');
+        }
+        return name;
+    };
+    const textOf = (el) => (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim().slice(0, 60);
+    const round = (r) => ({x: Math.round(r.left), y: Math.round(r.top), width: Math.round(r.width), height: Math.round(r.height)});
+    const isChart = (el) => el.tagName.toUpperCase() === 'CANVAS' || el.hasAttribute('_echarts_instance_')
+        || (el.tagName.toUpperCase() === 'SVG' && el.getBoundingClientRect().width >= 120);
+    const severityOf = (amount) => amount >= 24 ? 'high' : 'medium';
+    const add = (issue) => {
+        if (issues.length < MAX_ISSUES) {
+            issues.push(issue);
+        }
+    };
+
+    // 元素自身文本节点的实际包围盒（块级元素的盒子往往比文字宽得多）
+    const ownTextRect = (el) => {
+        let left = Infinity, top = Infinity, right = -Infinity, bottom = -Infinity;
+        for (const node of el.childNodes) {
+            if (node.nodeType !== 3 || !node.textContent.trim()) {
+                continue;
+            }
+            const range = document.createRange();
+            range.selectNodeContents(node);
+            for (const r of range.getClientRects()) {
+                if (r.width < 1 || r.height < 1) {
+                    continue;
+                }
+                left = Math.min(left, r.left);
+                top = Math.min(top, r.top);
+                right = Math.max(right, r.right);
+                bottom = Math.max(bottom, r.bottom);
+            }
+        }
+        if (left === Infinity) {
+            return null;
+        }
+        return {left, top, right, bottom, width: right - left, height: bottom - top};
+    };
+
+    // 从 start 开始向上查找会裁剪该盒子的容器，以及被裁掉的像素数
+    const clippedBy = (start, r) => {
+        for (let parent = start; parent && parent !== document.documentElement; parent = parent.parentElement) {
+            const style = getComputedStyle(parent);
+            if (!CLIPPING.has(style.overflowX) && !CLIPPING.has(style.overflowY)) {
+                continue;
+            }
+            const p = parent.getBoundingClientRect();
+            const amount = Math.max(
+                CLIPPING.has(style.overflowX) ? Math.max(r.right - p.right, p.left - r.left) : 0,
+                CLIPPING.has(style.overflowY) ? Math.max(r.bottom - p.bottom, p.top - r.top) : 0
+            );
+            if (amount > TOL) {
+                return {parent, amount};
+            }
+        }
+        return null;
+    };
+
+    // 页面级滚动条
+    const root = document.documentElement;
+    const body = document.body;
+    if (!body) {
+        return {width: W, height: H, issues: [], element_count: 0};
+    }
+    const rootStyle = getComputedStyle(root);
+    const bodyStyle = getComputedStyle(body);
+    const scrollWidth = Math.max(root.scrollWidth, body.scrollWidth);
+    const scrollHeight = Math.max(root.scrollHeight, body.scrollHeight);
+    const pageClipsX = CLIPPING.has(rootStyle.overflowX) && !SCROLLING.has(rootStyle.overflowX)
+        || CLIPPING.has(bodyStyle.overflowX) && !SCROLLING.has(bodyStyle.overflowX);
+    const pageClipsY = CLIPPING.has(rootStyle.overflowY) && !SCROLLING.has(rootStyle.overflowY)
+        || CLIPPING.has(bodyStyle.overflowY) && !SCROLLING.has(bodyStyle.overflowY);
+    if ((scrollWidth > W + TOL && !pageClipsX) || (scrollHeight > H + TOL && !pageClipsY)) {
+        add({type: 'page_scroll', severity: 'high', element: 'document', text: '',
+             rect: {x: 0, y: 0, width: scrollWidth, height: scrollHeight},
+             overflow: Math.round(Math.max(scrollWidth - W, scrollHeight - H))});
+    }
+
+    const textItems = [];
+    const elements = body.querySelectorAll('*');
+    for (const el of elements) {
+        const tag = el.tagName.toUpperCase();
+        if (SKIP_TAGS.has(tag) || el.getAttribute('aria-hidden') === 'true') {
+            continue;
+        }
+        if (tag !== 'SVG' && el.parentElement && el.parentElement.closest('svg')) {
+            continue;
+        }
+        const style = getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden' || parseFloat(style.opacity || '1') < 0.05) {
+            continue;
+        }
+        const r = el.getBoundingClientRect();
+        const chart = isChart(el);
+
+        if (chart && (r.width < 10 || r.height < 10)) {
+            add({type: 'chart_collapsed', severity: 'high', element: describe(el), text: '', rect: round(r), overflow: 0});
+            continue;
+        }
+        if (r.width < 1 || r.height < 1) {
+            continue;
+        }
+
+        // 可滚动容器中内容放不下时会出现滚动条（hidden 的裁剪由下面逐个内容元素检查，避免装饰元素误报）
+        if (el !== body && (SCROLLING.has(style.overflowX) || SCROLLING.has(style.overflowY))) {
+            const amount = Math.max(
+                SCROLLING.has(style.overflowX) ? el.scrollWidth - el.clientWidth : 0,
+                SCROLLING.has(style.overflowY) ? el.scrollHeight - el.clientHeight : 0
+            );
+            if (amount > TOL) {
+                add({type: 'scrollbar', severity: 'high', element: describe(el), text: textOf(el),
+                     rect: round(r), overflow: Math.round(amount)});
+            }
+        }
+
+        const isMedia = (MEDIA_TAGS.has(tag) && r.width >= 24 && r.height >= 24) || chart;
+        const textRect = isMedia ? null : ownTextRect(el);
+        if (!isMedia && !textRect) {
+            continue;
+        }
+        const box = textRect || r;
+
+        const outside = Math.max(box.right - W, box.bottom - H, -box.left, -box.top);
+        if (outside > TOL) {
+            add({type: chart ? 'chart_clipped' : 'out_of_canvas', severity: chart ? 'high' : severityOf(outside),
+                 element: describe(el), text: isMedia ? '' : textOf(el), rect: round(box), overflow: Math.round(outside)});
+            continue;
+        }
+        // 文字可能被元素自身裁剪（如 text-overflow），图片和图表只看祖先
+        const clip = clippedBy(textRect ? el : el.parentElement, box);
+        if (clip) {
+            add({type: chart ? 'chart_clipped' : 'clipped', severity: chart ? 'high' : severityOf(clip.amount),
+                 element: describe(el), text: isMedia ? '' : textOf(el), rect: round(box),
+                 overflow: Math.round(clip.amount), container: describe(clip.parent)});
+            continue;
+        }
+        if (textRect && textItems.length < 300) {
+            textItems.push({el, box: textRect});
+        }
+    }
+
+    // 文字块之间的重叠（嵌套元素不算）
+    for (let i = 0; i < textItems.length; i++) {
+        const a = textItems[i];
+        for (let j = i + 1; j < textItems.length; j++) {
+            const b = textItems[j];
+            if (a.el.contains(b.el) || b.el.contains(a.el)) {
+                continue;
+            }
+            const w = Math.min(a.box.right, b.box.right) - Math.max(a.box.left, b.box.left);
+            const h = Math.min(a.box.bottom, b.box.bottom) - Math.max(a.box.top, b.box.top);
+            if (w <= TOL || h <= TOL) {
+                continue;
+            }
+            const smaller = Math.min(a.box.width * a.box.height, b.box.width * b.box.height);
+            if (w * h > 0.2 * smaller) {
+                add({type: 'overlap', severity: 'high', element: describe(a.el), text: textOf(a.el), rect: round(a.box),
+                     overflow: Math.round(Math.min(w, h)), other: describe(b.el), other_text: textOf(b.el)});
+            }
+        }
+    }
+
+    return {width: W, height: H, scroll_width: scrollWidth, scroll_height: scrollHeight,
+            element_count: elements.length, issues: issues};
+}'''
+
+
 class PlaywrightPDFConverter:
     """
     PDF converter using Playwright
@@ -2214,6 +2397,80 @@ class PlaywrightPDFConverter:
                 except Exception:  # noqa: BLE001
                     logger.debug("Page already closed or closing failed, ignoring.")
 
+    async def inspect_layout_html(
+        self,
+        html_file_path: str,
+        width: int = 1280,
+        height: int = 720,
+        screenshot_path: Optional[str] = None,
+        tolerance: int = 4,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Measure rendered element geometry against the slide canvas
+
+        Checks text and media bounding boxes for canvas overflow, clipping by
+        containers, scrollbars, overlapping text and collapsed or clipped charts.
+        This is a deterministic in-browser pass, no vision model involved.
+
+        Args:
+            html_file_path: Path to HTML file
+            width: Canvas width in pixels
+            height: Canvas height in pixels
+            screenshot_path: If given, also capture a screenshot from the same page
+                load, but only when problems were found
+            tolerance: Pixels of overflow ignored as rounding noise
+
+        Returns:
+            Report dict with an ``issues`` list, or None if the page could not be inspected
+        """
+        if not os.path.exists(html_file_path):
+            logger.error(f"❌ HTML file not found: {html_file_path}")
+            return None
+
+        page = None
+        try:
+            await self._get_or_create_browser()
+            page = await self.context.new_page()
+            await page.set_viewport_size({'width': width, 'height': height})
+
+            absolute_html_path = Path(html_file_path).resolve()
+            await page.goto(f"file://{absolute_html_path}",
+                            wait_until='networkidle',
+                            timeout=60000)
+
+            # Geometry only depends on fonts and chart containers, shorter waits than screenshots
+            await self._wait_for_fonts_and_resources(page, max_wait_time=10000)
+            await self._force_chart_initialization(page)
+            await self._wait_for_charts_and_dynamic_content(page, max_wait_time=15000)
+
+            report = await page.evaluate(
+                _LAYOUT_GEOMETRY_SCRIPT,
+                {'width': width, 'height': height, 'tolerance': tolerance}
+            )
+            report['screenshot'] = False
+
+            if screenshot_path and report.get('issues'):
+                await page.screenshot(
+                    path=screenshot_path,
+                    type='png',
+                    full_page=False,
+                    clip={'x': 0, 'y': 0, 'width': width, 'height': height}
+                )
+                report['screenshot'] = True
+
+            logger.info(f"📐 Layout geometry check: {len(report.get('issues', []))} issue(s) in {html_file_path}")
+            return report
+
+        except Exception as e:
+            logger.error(f"❌ Layout geometry check failed: {e}")
+            return None
+        finally:
+            if page:
+                try:
+                    await page.close()
+                except Exception:  # noqa: BLE001
+                    logger.debug("Page already closed or closing failed, ignoring.")
+
 
 # Global converter instance
 _pdf_converter = None
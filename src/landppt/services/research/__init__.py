@@ -4,11 +4,15 @@ Research module for LandPPT
 This module provides comprehensive research functionality including:
 - SearXNG content search provider
 - Web content extraction pipeline
+- Per-provider rate limiting for concurrent research steps
+- Persistent cache for search results, extracted pages and step analyses
 - Enhanced research service with multiple providers
 """
 
 from .searxng_provider import SearXNGContentProvider, SearXNGSearchResult, SearXNGSearchResponse
 from .content_extractor import WebContentExtractor, ExtractedContent
+from .rate_limiter import AsyncRateLimiter, get_rate_limiter
+from .research_cache import ResearchCache, research_cache
 from .enhanced_research_service import (
     EnhancedResearchService, 
     EnhancedResearchStep, 
@@ -21,6 +25,10 @@ __all__ = [
     'SearXNGSearchResponse',
     'WebContentExtractor',
     'ExtractedContent',
+    'AsyncRateLimiter',
+    'get_rate_limiter',
+    'ResearchCache',
+    'research_cache',
     'EnhancedResearchService',
     'EnhancedResearchStep',
     'EnhancedResearchReport'
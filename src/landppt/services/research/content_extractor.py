@@ -12,10 +12,12 @@ import time
 from typing import Dict, List, Optional, Any, Set
 from urllib.parse import urljoin, urlparse
 import aiohttp
-from bs4 import BeautifulSoup, Comment
+from bs4 import BeautifulSoup, Comment, UnicodeDammit
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 from ...core.config import ai_config
+from ...utils.http_client import http_clients, ResponseTooLargeError
+from .research_cache import research_cache, hash_key
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +45,18 @@ class ExtractedContent:
             'word_count': self.word_count
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ExtractedContent':
+        """Rebuild from a dictionary produced by to_dict"""
+        extracted = cls(
+            url=data.get('url', ''),
+            title=data.get('title', ''),
+            content=data.get('content', ''),
+            metadata=data.get('metadata')
+        )
+        extracted.extraction_time = data.get('extraction_time', extracted.extraction_time)
+        return extracted
+
 
 class WebContentExtractor:
     """Web content extraction pipeline using BeautifulSoup"""
@@ -51,6 +65,7 @@ class WebContentExtractor:
         self.timeout = ai_config.research_extraction_timeout
         self.max_content_length = ai_config.research_max_content_length
         self.user_agent = "LandPPT Research Bot 1.0"
+        self.max_page_bytes = 5 * 1024 * 1024
         
         # Content selectors for different types of content
         self.content_selectors = [
@@ -80,6 +95,17 @@ class WebContentExtractor:
             separators=["\n\n", "\n", ". ", " ", ""]
         )
     
+    def _decode_html(self, html_bytes: bytes, declared_charset: Optional[str]) -> str:
+        """Decode page bytes: HTTP charset first, then BOM / <meta charset>, then chardet sniffing"""
+        dammit = UnicodeDammit(
+            html_bytes,
+            known_definite_encodings=[declared_charset] if declared_charset else [],
+            is_html=True
+        )
+        if dammit.unicode_markup is not None:
+            return dammit.unicode_markup
+        return html_bytes.decode('utf-8', errors='replace')
+
     def _clean_text(self, text: str) -> str:
         """Clean and normalize extracted text"""
         if not text:
@@ -170,6 +196,12 @@ class WebContentExtractor:
             ExtractedContent object or None if extraction fails
         """
         try:
+            # Fresh cached extraction is returned directly, stale ones are revalidated
+            cache_key = hash_key(url, self.max_content_length)
+            cached = await research_cache.get('page', cache_key, allow_expired=True)
+            if cached and not cached['expired']:
+                return ExtractedContent.from_dict(cached['value'])
+
             headers = {
                 'User-Agent': self.user_agent,
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -177,12 +209,22 @@ class WebContentExtractor:
                 'Accept-Encoding': 'gzip, deflate',
                 'Connection': 'keep-alive',
             }
+            if cached:
+                if cached.get('etag'):
+                    headers['If-None-Match'] = cached['etag']
+                if cached.get('last_modified'):
+                    headers['If-Modified-Since'] = cached['last_modified']
             
-            async with aiohttp.ClientSession(
+            async with http_clients.session(
                 timeout=aiohttp.ClientTimeout(total=self.timeout),
                 headers=headers
             ) as session:
                 async with session.get(url) as response:
+                    if response.status == 304 and cached:
+                        await research_cache.touch('page', cache_key, ai_config.research_cache_ttl)
+                        logger.info(f"Page not modified, using cached extraction: {url}")
+                        return ExtractedContent.from_dict(cached['value'])
+
                     if response.status != 200:
                         logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
                         return None
@@ -193,7 +235,11 @@ class WebContentExtractor:
                         logger.warning(f"Skipping non-HTML content: {url}")
                         return None
                     
-                    html_content = await response.text()
+                    # Cap the response size, pages far beyond this are not worth parsing
+                    html_bytes = await http_clients.read_limited(response, self.max_page_bytes)
+                    html_content = self._decode_html(html_bytes, response.charset)
+                    etag = response.headers.get('ETag')
+                    last_modified = response.headers.get('Last-Modified')
             
             # Parse HTML
             soup = BeautifulSoup(html_content, 'html.parser')
@@ -222,11 +268,17 @@ class WebContentExtractor:
             )
             
             logger.info(f"Extracted {extracted.word_count} words from {url}")
+            if extracted.content:
+                await research_cache.set('page', cache_key, extracted.to_dict(), ttl=ai_config.research_cache_ttl,
+                                         etag=etag, last_modified=last_modified)
             return extracted
             
         except asyncio.TimeoutError:
             logger.warning(f"Timeout extracting content from {url}")
             return None
+        except ResponseTooLargeError as e:
+            logger.warning(f"Skipping oversized page {url}: {e}")
+            return None
         except Exception as e:
             logger.warning(f"Error extracting content from {url}: {e}")
             return None
@@ -9,7 +9,7 @@ import asyncio
 import logging
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Callable
 from dataclasses import dataclass
 
 from langchain.schema import Document
@@ -19,6 +19,8 @@ from ...core.config import ai_config
 from ..deep_research_service import DEEPResearchService, ResearchReport, ResearchStep
 from .searxng_provider import SearXNGContentProvider, SearXNGSearchResponse
 from .content_extractor import WebContentExtractor, ExtractedContent
+from .rate_limiter import get_rate_limiter
+from .research_cache import research_cache, normalize_query, hash_key
 
 logger = logging.getLogger(__name__)
 
@@ -197,7 +199,8 @@ class EnhancedResearchService:
 
         return 0
     
-    async def conduct_enhanced_research(self, topic: str, language: str = "zh", context: Optional[Dict[str, Any]] = None) -> EnhancedResearchReport:
+    async def conduct_enhanced_research(self, topic: str, language: str = "zh", context: Optional[Dict[str, Any]] = None,
+                                        on_step_completed: Optional[Callable[[EnhancedResearchStep], Any]] = None) -> EnhancedResearchReport:
         """
         Conduct comprehensive enhanced research with multiple providers
 
@@ -205,6 +208,7 @@ class EnhancedResearchService:
             topic: Research topic
             language: Language for research and report
             context: Additional context information (scenario, audience, requirements, etc.)
+            on_step_completed: Optional callback (sync or async) invoked with each step as soon as it finishes
 
         Returns:
             EnhancedResearchReport with comprehensive findings
@@ -216,19 +220,11 @@ class EnhancedResearchService:
             # Step 1: Generate research plan with context
             research_plan = await self._generate_research_plan(topic, language, context)
 
-            # Step 2: Execute research steps with multiple providers
-            research_steps = []
+            # Step 2: Execute research steps concurrently with multiple providers
             provider_stats = {'tavily': 0, 'searxng': 0, 'content_extraction': 0}
-
-            for i, step_plan in enumerate(research_plan, 1):
-                step = await self._execute_enhanced_research_step(
-                    i, step_plan, topic, language, provider_stats
-                )
-                research_steps.append(step)
-
-                # Add delay between steps
-                if i < len(research_plan):
-                    await asyncio.sleep(1)
+            research_steps = await self._execute_steps_concurrently(
+                research_plan, topic, language, provider_stats, on_step_completed
+            )
 
             # Step 3: Analyze all collected content
             content_analysis = await self._analyze_collected_content(research_steps, topic, language)
@@ -330,6 +326,55 @@ class EnhancedResearchService:
             logger.error(f"Failed to generate AI research plan: {e}")
             raise Exception(f"Unable to generate research plan for topic '{topic}': {e}")
     
+    async def _execute_steps_concurrently(self, research_plan: List[Dict[str, str]], topic: str, language: str,
+                                          provider_stats: Dict[str, int],
+                                          on_step_completed: Optional[Callable[[EnhancedResearchStep], Any]] = None
+                                          ) -> List[EnhancedResearchStep]:
+        """
+        Run research steps concurrently; provider rate limits are enforced per request
+        by the shared limiters, results are returned in plan order
+        """
+        semaphore = asyncio.Semaphore(max(1, ai_config.research_step_concurrency))
+
+        async def run_step(step_number: int, step_plan: Dict[str, str]) -> EnhancedResearchStep:
+            async with semaphore:
+                try:
+                    return await self._execute_enhanced_research_step(
+                        step_number, step_plan, topic, language, provider_stats
+                    )
+                except Exception as e:
+                    logger.error(f"Enhanced research step {step_number} failed: {e}")
+                    return EnhancedResearchStep(
+                        step_number=step_number,
+                        query=step_plan.get('query', ''),
+                        description=step_plan.get('description', ''),
+                        analysis=f"研究步骤执行失败: {str(e)}"
+                    )
+
+        tasks = [asyncio.create_task(run_step(i, step_plan)) for i, step_plan in enumerate(research_plan, 1)]
+        research_steps = []
+        try:
+            # Stream partial results as they arrive
+            for finished in asyncio.as_completed(tasks):
+                step = await finished
+                research_steps.append(step)
+                logger.info(f"Research progress: {len(research_steps)}/{len(tasks)} steps completed")
+                if on_step_completed:
+                    try:
+                        callback_result = on_step_completed(step)
+                        if asyncio.iscoroutine(callback_result):
+                            await callback_result
+                    except Exception as e:
+                        logger.warning(f"Research step callback failed: {e}")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        # Merge results in plan order
+        research_steps.sort(key=lambda step: step.step_number)
+        return research_steps
+
     async def _execute_enhanced_research_step(self, step_number: int, step_plan: Dict[str, str],
                                             topic: str, language: str, 
                                             provider_stats: Dict[str, int]) -> EnhancedResearchStep:
@@ -406,7 +451,19 @@ class EnhancedResearchService:
     async def _search_with_searxng(self, query: str, language: str) -> Optional[SearXNGSearchResponse]:
         """Search using SearXNG provider"""
         try:
-            return await self.searxng_provider.search(query, language)
+            cache_key = hash_key('searxng', normalize_query(query), language,
+                                 self.searxng_provider.host, self.searxng_provider.max_results)
+            cached_response = await research_cache.get_value('search', cache_key)
+            if cached_response is not None:
+                logger.info(f"SearXNG search cache hit for query: {query}")
+                return SearXNGSearchResponse(cached_response)
+
+            async with get_rate_limiter('searxng').limit():
+                response = await self.searxng_provider.search(query, language)
+
+            if response and response.results:
+                await research_cache.set('search', cache_key, response.to_dict(), ttl=ai_config.research_cache_ttl)
+            return response
         except Exception as e:
             logger.warning(f"SearXNG search failed: {e}")
             return None
@@ -490,6 +547,12 @@ class EnhancedResearchService:
 - 语言使用{language}
 """
 
+        # Identical collected content yields an identical analysis, reuse it
+        cache_key = hash_key('step_analysis', getattr(self.ai_provider, 'model', None), analysis_prompt)
+        cached_analysis = await research_cache.get_value('analysis', cache_key)
+        if cached_analysis is not None:
+            return cached_analysis
+
         try:
             analysis_response = await self.ai_provider.text_completion(
                 prompt=analysis_prompt,
@@ -498,6 +561,8 @@ class EnhancedResearchService:
             )
             # Extract text content from AIResponse object
             analysis = analysis_response.content if hasattr(analysis_response, 'content') else str(analysis_response)
+            if analysis:
+                await research_cache.set('analysis', cache_key, analysis)
             return analysis
         except Exception as e:
             logger.warning(f"Failed to generate step analysis: {e}")
@@ -0,0 +1,72 @@
+"""
+Per-provider rate limiting for research requests
+
+Research steps run concurrently, so instead of sleeping between steps each
+search provider gets its own limiter that bounds in-flight requests and
+spaces request starts by a minimum interval.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from ...core.config import ai_config
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRateLimiter:
+    """Bounds concurrent requests and enforces a minimum interval between request starts"""
+
+    def __init__(self, name: str, max_concurrent: int = 2, min_interval: float = 1.0):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = max(0.0, min_interval)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._interval_lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def _wait_for_slot(self):
+        """Reserve the next start time and sleep until it arrives"""
+        async with self._interval_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_start)
+            self._next_start = start_at + self.min_interval
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def limit(self):
+        """Async context manager wrapping a single rate-limited request"""
+        async with self._semaphore:
+            await self._wait_for_slot()
+            yield
+
+
+_limiters: Dict[str, AsyncRateLimiter] = {}
+
+
+def get_rate_limiter(provider: str) -> AsyncRateLimiter:
+    """Get (or lazily create) the shared limiter for a research provider"""
+    limiter = _limiters.get(provider)
+    max_concurrent = ai_config.research_provider_max_concurrent
+    min_interval = ai_config.research_provider_min_interval
+    if (limiter is None or limiter.max_concurrent != max(1, max_concurrent)
+            or limiter.min_interval != max(0.0, min_interval)):
+        # 配置变更后重新创建限流器
+        limiter = AsyncRateLimiter(provider, max_concurrent, min_interval)
+        _limiters[provider] = limiter
+        logger.debug(f"Created rate limiter for {provider}: "
+                     f"max_concurrent={limiter.max_concurrent}, min_interval={limiter.min_interval}s")
+    return limiter
+
+
+def reset_rate_limiters(provider: Optional[str] = None):
+    """Drop cached limiters so they are recreated with the latest configuration"""
+    if provider:
+        _limiters.pop(provider, None)
+    else:
+        _limiters.clear()
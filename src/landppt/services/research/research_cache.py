@@ -0,0 +1,263 @@
+"""
+Persistent research cache
+
+Stores search results, extracted page content and per-step AI analyses in a
+local SQLite database so repeated research on the same topic (regenerated
+outlines, other users) does not re-run the whole search/extract/analyze pipeline.
+
+Namespaces:
+- search:   keyed by (provider, normalized query, language, search parameters), expires after the TTL
+- page:     keyed by URL, revalidated with ETag / Last-Modified once the TTL has passed
+- analysis: keyed by a hash of the full analysis prompt and model, content-addressed
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ...core.config import ai_config
+from ...utils.thread_pool import run_blocking_io
+
+logger = logging.getLogger(__name__)
+
+
+NAMESPACES = ('search', 'page', 'analysis')
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query so trivially different spellings share a cache entry"""
+    query = unicodedata.normalize('NFKC', query or '')
+    return ' '.join(query.lower().split())
+
+
+def hash_key(*parts: Any) -> str:
+    """Build a stable cache key from arbitrary JSON-serializable parts"""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResearchCache:
+    """SQLite-backed research cache with TTL and a total size cap"""
+
+    def __init__(self, db_path: str = "temp/research_cache/research_cache.db"):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return ai_config.research_cache_enabled
+
+    @property
+    def max_size_bytes(self) -> int:
+        return max(1, ai_config.research_cache_max_size_mb) * 1024 * 1024
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS research_cache (
+                    namespace TEXT NOT NULL,
+                    cache_key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    last_accessed REAL NOT NULL,
+                    PRIMARY KEY (namespace, cache_key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_research_cache_accessed ON research_cache (last_accessed)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    # ---- synchronous operations (run in the thread pool) ----
+
+    def _get_sync(self, namespace: str, key: str, allow_expired: bool) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            conn = self._get_conn()
+            row = conn.execute(
+                "SELECT value, etag, last_modified, expires_at FROM research_cache "
+                "WHERE namespace = ? AND cache_key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, etag, last_modified, expires_at = row
+            now = time.time()
+            expired = expires_at is not None and expires_at < now
+            if expired and not allow_expired:
+                return None
+
+            conn.execute(
+                "UPDATE research_cache SET last_accessed = ? WHERE namespace = ? AND cache_key = ?",
+                (now, namespace, key)
+            )
+            conn.commit()
+            return {
+                'value': json.loads(value),
+                'etag': etag,
+                'last_modified': last_modified,
+                'expired': expired
+            }
+
+    def _set_sync(self, namespace: str, key: str, value: Any, ttl: Optional[int],
+                  etag: Optional[str], last_modified: Optional[str]):
+        payload = json.dumps(value, ensure_ascii=False, default=str)
+        size = len(payload.encode('utf-8'))
+        if size > self.max_size_bytes:
+            return
+
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO research_cache "
+                "(namespace, cache_key, value, size, etag, last_modified, created_at, expires_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (namespace, key, payload, size, etag, last_modified, now, expires_at, now)
+            )
+            self._enforce_size_cap(conn)
+            conn.commit()
+
+    def _touch_sync(self, namespace: str, key: str, ttl: Optional[int]):
+        """Extend an entry's lifetime after a successful revalidation (HTTP 304)"""
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute(
+                "UPDATE research_cache SET expires_at = ?, last_accessed = ? WHERE namespace = ? AND cache_key = ?",
+                (now + ttl if ttl else None, now, namespace, key)
+            )
+            conn.commit()
+
+    def _enforce_size_cap(self, conn: sqlite3.Connection):
+        """Evict least recently used entries until the cache fits the size cap"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM research_cache").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        # 淘汰到上限的90%，避免每次写入都触发淘汰
+        target = int(self.max_size_bytes * 0.9)
+        evicted = 0
+        rows = conn.execute(
+            "SELECT namespace, cache_key, size FROM research_cache ORDER BY last_accessed ASC"
+        ).fetchall()
+        for namespace, key, size in rows:
+            if total <= target:
+                break
+            conn.execute("DELETE FROM research_cache WHERE namespace = ? AND cache_key = ?", (namespace, key))
+            total -= size
+            evicted += 1
+
+        self._stats['evictions'] += evicted
+        logger.info(f"Research cache evicted {evicted} entries to stay under size cap")
+
+    def _purge_sync(self, namespace: Optional[str], expired_only: bool) -> int:
+        with self._lock:
+            conn = self._get_conn()
+            conditions = []
+            params = []
+            if namespace:
+                conditions.append("namespace = ?")
+                params.append(namespace)
+            if expired_only:
+                conditions.append("expires_at IS NOT NULL AND expires_at < ?")
+                params.append(time.time())
+            where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+            deleted = conn.execute(f"DELETE FROM research_cache{where}", params).rowcount
+            conn.commit()
+            if not namespace and not expired_only:
+                conn.execute("VACUUM")
+            return deleted
+
+    def _stats_sync(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._get_conn()
+            rows = conn.execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM research_cache GROUP BY namespace"
+            ).fetchall()
+        namespaces = {ns: {'entries': 0, 'size_bytes': 0} for ns in NAMESPACES}
+        for namespace, count, size in rows:
+            namespaces[namespace] = {'entries': count, 'size_bytes': size}
+        return {
+            'enabled': self.enabled,
+            'db_path': str(self.db_path),
+            'max_size_mb': ai_config.research_cache_max_size_mb,
+            'ttl': ai_config.research_cache_ttl,
+            'total_size_bytes': sum(ns['size_bytes'] for ns in namespaces.values()),
+            'namespaces': namespaces,
+            **self._stats
+        }
+
+    # ---- async API ----
+
+    async def get(self, namespace: str, key: str, allow_expired: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Look up an entry
+
+        Returns:
+            Dict with value, etag, last_modified and expired, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        try:
+            entry = await run_blocking_io(self._get_sync, namespace, key, allow_expired)
+        except Exception as e:
+            logger.warning(f"Research cache read failed: {e}")
+            return None
+        self._stats['hits' if entry else 'misses'] += 1
+        return entry
+
+    async def get_value(self, namespace: str, key: str) -> Optional[Any]:
+        """Look up a fresh (non-expired) value"""
+        entry = await self.get(namespace, key)
+        return entry['value'] if entry else None
+
+    async def set(self, namespace: str, key: str, value: Any, ttl: Optional[int] = None,
+                  etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store an entry; ttl=None keeps it until evicted or purged"""
+        if not self.enabled:
+            return
+        try:
+            await run_blocking_io(self._set_sync, namespace, key, value, ttl, etag, last_modified)
+            self._stats['writes'] += 1
+        except Exception as e:
+            logger.warning(f"Research cache write failed: {e}")
+
+    async def touch(self, namespace: str, key: str, ttl: Optional[int] = None):
+        if not self.enabled:
+            return
+        try:
+            await run_blocking_io(self._touch_sync, namespace, key, ttl)
+        except Exception as e:
+            logger.warning(f"Research cache touch failed: {e}")
+
+    async def purge(self, namespace: Optional[str] = None, expired_only: bool = False) -> int:
+        """Delete cached entries, optionally restricted to a namespace or to expired entries"""
+        if namespace and namespace not in NAMESPACES:
+            raise ValueError(f"Unknown research cache namespace: {namespace}")
+        deleted = await run_blocking_io(self._purge_sync, namespace, expired_only)
+        logger.info(f"Purged {deleted} research cache entries (namespace={namespace or 'all'}, expired_only={expired_only})")
+        return deleted
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return await run_blocking_io(self._stats_sync)
+
+
+# Global research cache instance
+research_cache = ResearchCache()
@@ -13,6 +13,7 @@ from urllib.parse import urljoin, urlparse
 import aiohttp
 
 from ...core.config import ai_config
+from ...utils.http_client import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -142,7 +143,7 @@ class SearXNGContentProvider:
             
             logger.info(f"Searching SearXNG for: {query}")
             
-            async with aiohttp.ClientSession(
+            async with http_clients.session(
                 timeout=aiohttp.ClientTimeout(total=self.timeout)
             ) as session:
                 async with session.get(search_url, params=params) as response:
@@ -0,0 +1,388 @@
+"""
+幻灯片缩略图服务
+用 Playwright 的常驻页面池把幻灯片渲染成小尺寸 WebP，代替浏览器里逐页执行整页HTML的缩放 iframe。
+缩略图按幻灯片HTML内容的哈希存放（内容寻址），内容不变时永远复用；幻灯片保存后在后台补齐缺失的缩略图，
+首次访问尚未生成的缩略图时按需渲染。全局母版模板的预览图也由该服务渲染和缓存。
+缓存目录定期清理：删除长期未访问的缩略图，总大小超过上限时按最近访问时间淘汰。
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from ..database.database import AsyncSessionLocal
+from ..database.repositories import SlideDataRepository
+from ..utils.thread_pool import run_blocking_io
+from .pyppeteer_pdf_converter import get_pdf_converter
+
+logger = logging.getLogger(__name__)
+
+# 项目根目录下的temp文件夹
+THUMBNAIL_CACHE_DIR = Path(__file__).parent.parent.parent.parent / "temp" / "slide_thumbnails"
+
+SLIDE_WIDTH = 1280
+SLIDE_HEIGHT = 720
+
+
+def _png_to_webp(png_bytes: bytes, width: int, quality: int) -> bytes:
+    """把截图缩放到缩略图宽度并编码为WebP（Pillow 在缩放和编码时释放GIL，放在线程池中执行）"""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png_bytes)) as image:
+        image = image.convert("RGB")
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, "WEBP", quality=quality, method=4)
+        return output.getvalue()
+
+
+def _write_file(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _prune_cache_dir(cache_dir: Path, max_bytes: int, max_age_seconds: float) -> int:
+    """
+    清理缩略图缓存目录（在线程池中执行）
+
+    文件的修改时间即最近访问时间（命中时会刷新）：超过保留时间的文件全部删除；
+    总大小超过上限时从最久未访问的文件开始删除，直到降到上限的90%。
+
+    Returns:
+        删除的文件数量
+    """
+    now = time.time()
+    entries = []
+    for path in cache_dir.glob("*/*.webp"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort()
+
+    total = sum(size for _, size, _ in entries)
+    over_cap = total > max_bytes
+    target = int(max_bytes * 0.9)
+    removed = 0
+    for mtime, size, path in entries:
+        if now - mtime <= max_age_seconds and (not over_cap or total <= target):
+            break
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.debug(f"删除缩略图缓存失败 {path}: {e}")
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+class SlideThumbnailService:
+    """渲染并缓存幻灯片缩略图"""
+
+    # 缩略图宽度（侧边栏约240px，按2倍屏渲染）
+    thumbnail_width: int = 480
+    webp_quality: int = 75
+    # 常驻渲染页面数量，同时也是渲染并发数
+    pool_size: int = 2
+    # 按需渲染时等待的最长时间（秒），超时后由前端回退到 iframe
+    render_timeout: float = 30.0
+    # 幻灯片保存后延迟生成的时间（秒），生成过程中的连续保存合并为一次
+    schedule_delay: float = 3.0
+    # 缓存目录的大小上限（MB）和未访问缩略图的保留时间（天）
+    cache_max_mb: int = 500
+    cache_max_age_days: float = 30.0
+    # 两次清理缓存目录之间的最短间隔（秒）
+    prune_interval: float = 3600.0
+    # 命中的缩略图距离上次刷新访问时间超过该值（秒）才再次刷新，避免每次命中都写文件元数据
+    touch_interval: float = 86400.0
+
+    def __init__(self, cache_dir: Path = THUMBNAIL_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._context = None
+        self._browser = None
+        self._pages: List = []
+        self._idle_pages: Optional[asyncio.Queue] = None
+        self._pool_lock = asyncio.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._scheduled: Dict[str, asyncio.TimerHandle] = {}
+        self._background: Dict[str, asyncio.Task] = {}
+        self._prefetching: Set[asyncio.Task] = set()
+        # 正在等待空闲页面的渲染任务数（页面池重建时用于唤醒它们）
+        self._page_waiters = 0
+        self._prune_task: Optional[asyncio.Task] = None
+        self._last_prune = 0.0
+        self._stats = {'rendered': 0, 'cache_hits': 0, 'failed': 0, 'timeouts': 0, 'pruned': 0}
+
+    @staticmethod
+    def content_key(html_content: str) -> str:
+        """缩略图的内容寻址键（幻灯片HTML的哈希）"""
+        return hashlib.sha256(html_content.encode("utf-8")).hexdigest()[:32]
+
+    def thumbnail_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.webp"
+
+    def is_available(self) -> bool:
+        return get_pdf_converter().is_available()
+
+    async def get_thumbnail(self, html_content: str) -> Optional[Path]:
+        """
+        获取幻灯片缩略图文件，尚未生成时渲染（同一内容的并发请求共用一次渲染）
+
+        Returns:
+            WebP文件路径；Playwright不可用、渲染失败或超时时返回None
+        """
+        key = self.content_key(html_content)
+        path = self.thumbnail_path(key)
+        if self._touch_cached(path):
+            self._stats['cache_hits'] += 1
+            return path
+        if not html_content or not self.is_available():
+            return None
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._render(key, html_content))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        try:
+            # shield：等待超时不取消渲染，生成后的缩略图供下次请求使用
+            return await asyncio.wait_for(asyncio.shield(task), self.render_timeout)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            return None
+
+    def _touch_cached(self, path: Path) -> bool:
+        """缩略图存在时返回True，并按 touch_interval 刷新其访问时间（供缓存清理按最近访问淘汰）"""
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return False
+        if time.time() - mtime > self.touch_interval:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return True
+
+    def _maybe_prune_cache(self):
+        """距离上次清理超过 prune_interval 时在后台清理缓存目录"""
+        now = time.time()
+        if now - self._last_prune < self.prune_interval:
+            return
+        if self._prune_task is not None and not self._prune_task.done():
+            return
+        self._last_prune = now
+        self._prune_task = asyncio.create_task(self._prune_cache())
+
+    async def _prune_cache(self):
+        try:
+            removed = await run_blocking_io(
+                _prune_cache_dir, self.cache_dir,
+                self.cache_max_mb * 1024 * 1024, self.cache_max_age_days * 86400
+            )
+        except Exception as e:
+            logger.warning(f"清理幻灯片缩略图缓存失败: {e}")
+            return
+        if removed:
+            self._stats['pruned'] += removed
+            logger.info(f"已清理 {removed} 张幻灯片缩略图缓存")
+
+    async def _render(self, key: str, html_content: str) -> Optional[Path]:
+        try:
+            page = await self._acquire_page()
+        except Exception as e:
+            self._stats['failed'] += 1
+            logger.warning(f"创建缩略图渲染页面失败: {e}")
+            return None
+
+        converter = get_pdf_converter()
+        healthy = True
+        try:
+            await page.set_content(html_content, wait_until="load", timeout=15000)
+            await converter._wait_for_fonts_and_resources(page, max_wait_time=5000)
+            await converter._force_chart_initialization(page)
+            await converter._wait_for_charts_and_dynamic_content(page, max_wait_time=5000)
+            png_bytes = await page.screenshot(
+                type="png",
+                full_page=False,
+                clip={'x': 0, 'y': 0, 'width': SLIDE_WIDTH, 'height': SLIDE_HEIGHT}
+            )
+        except Exception as e:
+            healthy = False
+            self._stats['failed'] += 1
+            logger.warning(f"渲染幻灯片缩略图失败 {key}: {e}")
+            return None
+        finally:
+            await self._release_page(page, healthy)
+
+        try:
+            webp_bytes = await run_blocking_io(_png_to_webp, png_bytes, self.thumbnail_width, self.webp_quality)
+            path = self.thumbnail_path(key)
+            await run_blocking_io(_write_file, path, webp_bytes)
+        except Exception as e:
+            self._stats['failed'] += 1
+            logger.warning(f"保存幻灯片缩略图失败 {key}: {e}")
+            return None
+
+        self._stats['rendered'] += 1
+        self._maybe_prune_cache()
+        return path
+
+    async def _acquire_page(self):
+        """从页面池取一个渲染页面，池未满时新建"""
+        while True:
+            async with self._pool_lock:
+                converter = get_pdf_converter()
+                await converter._get_or_create_browser()
+                if self._browser is not converter.browser:
+                    # 共享浏览器被关闭重建后，旧的上下文和页面都已失效
+                    self._reset_pool(converter.browser)
+                if self._context is None:
+                    # 缩略图只需要1倍像素，使用单独的上下文
+                    self._context = await self._browser.new_context(
+                        viewport={'width': SLIDE_WIDTH, 'height': SLIDE_HEIGHT},
+                        device_scale_factor=1,
+                        ignore_https_errors=True
+                    )
+                if self._idle_pages.empty() and len(self._pages) < self.pool_size:
+                    page = await self._context.new_page()
+                    self._pages.append(page)
+                    return page
+                idle_pages = self._idle_pages
+
+            self._page_waiters += 1
+            try:
+                page = await idle_pages.get()
+            finally:
+                self._page_waiters -= 1
+            if page is not None:
+                return page
+            # 等待期间页面池已重建（收到None），从新页面池重新申请
+
+    def _reset_pool(self, browser):
+        old_idle_pages = self._idle_pages
+        self._browser = browser
+        self._context = None
+        self._pages = []
+        self._idle_pages = asyncio.Queue()
+        if old_idle_pages is not None:
+            # 旧页面不会再归还到旧队列，唤醒所有仍在等待旧队列的渲染任务
+            for _ in range(self._page_waiters):
+                old_idle_pages.put_nowait(None)
+
+    async def _release_page(self, page, healthy: bool):
+        if page not in self._pages:
+            # 浏览器已重建，页面属于旧的上下文
+            return
+        if healthy:
+            self._idle_pages.put_nowait(page)
+            return
+        # 渲染出错的页面关闭并换成新页面，避免排队等待页面的渲染任务一直拿不到页面
+        self._pages.remove(page)
+        try:
+            await page.close()
+        except Exception:  # noqa: BLE001
+            logger.debug("Thumbnail page already closed, ignoring.")
+        try:
+            replacement = await self._context.new_page()
+        except Exception as e:
+            logger.debug(f"Failed to replace thumbnail page: {e}")
+            return
+        self._pages.append(replacement)
+        self._idle_pages.put_nowait(replacement)
+
+    def prefetch(self, html_content: str):
+        """在后台生成缩略图，不等待结果（如模板保存后预先生成预览图）"""
+        if not html_content or not self.is_available():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = asyncio.create_task(self.get_thumbnail(html_content))
+        self._prefetching.add(task)
+        task.add_done_callback(self._prefetching.discard)
+
+    def schedule_project(self, project_id: Optional[str]):
+        """幻灯片保存后调用：稍后在后台为项目中还没有缩略图的页面生成缩略图"""
+        if not project_id or not self.is_available():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        handle = self._scheduled.pop(project_id, None)
+        if handle is not None:
+            handle.cancel()
+        self._scheduled[project_id] = loop.call_later(self.schedule_delay, self._start_project, project_id)
+
+    def _start_project(self, project_id: str):
+        self._scheduled.pop(project_id, None)
+        running = self._background.get(project_id)
+        if running is not None and not running.done():
+            # 正在生成时再次保存：当前批次结束后重新检查一次
+            self.schedule_project(project_id)
+            return
+        task = asyncio.create_task(self._render_project(project_id))
+        self._background[project_id] = task
+        task.add_done_callback(lambda _: self._background.pop(project_id, None))
+
+    async def _render_project(self, project_id: str):
+        try:
+            async with AsyncSessionLocal() as session:
+                slides = await SlideDataRepository(session).get_slides_by_project_id(project_id)
+                contents = [slide.html_content for slide in slides if slide.html_content]
+
+            missing = [html for html in contents if not self.thumbnail_path(self.content_key(html)).exists()]
+            for html_content in missing:
+                await self.get_thumbnail(html_content)
+            if missing:
+                logger.info(f"项目 {project_id} 生成了 {len(missing)} 张幻灯片缩略图")
+        except Exception as e:
+            logger.warning(f"后台生成项目 {project_id} 的缩略图失败: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取缩略图服务统计信息"""
+        return {
+            'pages': len(self._pages),
+            'rendering': len(self._inflight),
+            'scheduled_projects': len(self._scheduled) + len(self._background),
+            **self._stats
+        }
+
+    async def close(self):
+        """取消后台任务并关闭渲染上下文（共享浏览器由PDF转换器负责关闭）"""
+        for handle in self._scheduled.values():
+            handle.cancel()
+        self._scheduled.clear()
+        tasks = [task for task in [*self._background.values(), *self._inflight.values(), *self._prefetching,
+                                   self._prune_task]
+                 if task is not None and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._context is not None:
+            try:
+                await self._context.close()
+            except Exception:  # noqa: BLE001
+                logger.debug("Thumbnail context already closed, ignoring.")
+        self._context = None
+        self._browser = None
+        self._pages = []
+
+
+# 全局幻灯片缩略图服务实例
+slide_thumbnail_service = SlideThumbnailService()
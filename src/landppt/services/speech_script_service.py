@@ -3,10 +3,11 @@ Speech Script Generation Service
 Provides AI-powered speech script generation for PPT presentations
 """
 
+import asyncio
 import logging
 import time
 import uuid
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
 from dataclasses import dataclass
 from enum import Enum
 
@@ -193,47 +194,36 @@ class SpeechScriptService:
                     error_message="No slides data available"
                 )
             
-            scripts = []
-            total_duration_seconds = 0
-            
-            for i, slide_index in enumerate(slide_indices):
+            semaphore = asyncio.Semaphore(max(1, ai_config.speech_script_concurrency))
+
+            async def generate_one(position: int, slide_index: int) -> Optional[SlideScriptData]:
                 if slide_index >= len(project.slides_data):
-                    continue
-                
+                    return None
+
                 slide = project.slides_data[slide_index]
-                
-                # Get context from previous slide in the sequence
-                previous_slide_context = ""
-                if i > 0:
-                    prev_index = slide_indices[i - 1]
-                    if prev_index < len(project.slides_data):
-                        prev_slide = project.slides_data[prev_index]
-                        previous_slide_context = self._extract_slide_context(prev_slide)
-                elif slide_index > 0:
-                    # Use actual previous slide if this is the first in selection
-                    prev_slide = project.slides_data[slide_index - 1]
-                    previous_slide_context = self._extract_slide_context(prev_slide)
-                
-                # Generate script
-                script_content = await self._generate_script_for_slide(
-                    slide, slide_index, len(project.slides_data),
-                    project, previous_slide_context, customization
-                )
-                
-                # Estimate duration
-                estimated_duration = self._estimate_speaking_duration(script_content)
-                duration_seconds = self._parse_duration_to_seconds(estimated_duration)
-                total_duration_seconds += duration_seconds
-                
-                slide_script = SlideScriptData(
+                previous_slide_context = self._get_previous_slide_context(project, slide_indices, position)
+
+                async with semaphore:
+                    script_content = await self._generate_script_for_slide(
+                        slide, slide_index, len(project.slides_data),
+                        project, previous_slide_context, customization
+                    )
+
+                return SlideScriptData(
                     slide_index=slide_index,
                     slide_title=slide.get('title', f'第{slide_index + 1}页'),
                     script_content=script_content,
-                    estimated_duration=estimated_duration
+                    estimated_duration=self._estimate_speaking_duration(script_content)
                 )
-                
-                scripts.append(slide_script)
-            
+
+            results = await asyncio.gather(
+                *(generate_one(position, slide_index) for position, slide_index in enumerate(slide_indices))
+            )
+            scripts = [script for script in results if script is not None]
+            total_duration_seconds = sum(
+                self._parse_duration_to_seconds(script.estimated_duration) for script in scripts
+            )
+
             total_duration = self._format_duration_from_seconds(total_duration_seconds)
             
             return SpeechScriptResult(
@@ -260,7 +250,8 @@ class SpeechScriptService:
         project: PPTProject,
         customization: SpeechScriptCustomization,
         progress_callback=None,
-        task_id: str = None
+        task_id: str = None,
+        on_script_generated: Optional[Callable[[SlideScriptData], Awaitable[None]]] = None
     ) -> SpeechScriptResult:
         """Generate speech scripts for the entire presentation with retry mechanism"""
         try:
@@ -274,7 +265,8 @@ class SpeechScriptService:
             # Generate scripts for all slides with retry mechanism
             slide_indices = list(range(len(project.slides_data)))
             result = await self.generate_multi_slide_scripts_with_retry(
-                project, slide_indices, customization, progress_callback, task_id=task_id
+                project, slide_indices, customization, progress_callback, task_id=task_id,
+                on_script_generated=on_script_generated
             )
 
             # 不再自动添加开场白和结束语，完全按照选择的页面生成演讲稿
@@ -297,9 +289,19 @@ class SpeechScriptService:
         customization: SpeechScriptCustomization,
         progress_callback=None,
         max_retries: int = 5,
-        task_id: str = None
+        task_id: str = None,
+        on_script_generated: Optional[Callable[[SlideScriptData], Awaitable[None]]] = None,
+        concurrency: Optional[int] = None
     ) -> SpeechScriptResult:
-        """Generate speech scripts for multiple slides with retry mechanism"""
+        """
+        Generate speech scripts for multiple slides with retry mechanism
+
+        Slides are generated concurrently (bounded by ``concurrency``, default
+        ``ai_config.speech_script_concurrency``). The only cross-slide input is the
+        previous slide's content, so slides do not wait on each other's scripts.
+        Each finished script is reported to the progress tracker and passed to
+        ``on_script_generated`` (e.g. for immediate persistence) as soon as it is ready.
+        """
         try:
             if not project.slides_data:
                 return SpeechScriptResult(
@@ -309,7 +311,6 @@ class SpeechScriptService:
                 )
 
             total_slides = len(slide_indices)
-            successful_scripts = []
             failed_slides = []
             skipped_slides = []
 
@@ -323,113 +324,75 @@ class SpeechScriptService:
                 total_slides=total_slides
             )
 
-            # Track progress
+            concurrency = max(1, concurrency or ai_config.speech_script_concurrency)
+            semaphore = asyncio.Semaphore(concurrency)
             completed_count = 0
 
-            for i, slide_index in enumerate(slide_indices):
+            async def generate_one(position: int, slide_index: int) -> Optional[SlideScriptData]:
+                nonlocal completed_count
+
                 if slide_index >= len(project.slides_data):
                     failed_slides.append({
                         'slide_index': slide_index,
                         'error': 'Slide index out of range'
                     })
-                    continue
+                    return None
 
                 slide = project.slides_data[slide_index]
                 slide_title = slide.get('title', f'第{slide_index + 1}页')
+                previous_slide_context = self._get_previous_slide_context(project, slide_indices, position)
+
+                async with semaphore:
+                    # Update progress
+                    progress_tracker.update_progress(
+                        task_id,
+                        current_slide=slide_index,
+                        current_slide_title=slide_title,
+                        message=f'正在生成第{slide_index + 1}页演讲稿...'
+                    )
+
+                    if progress_callback:
+                        progress_callback({
+                            'type': 'progress',
+                            'current_slide': slide_index + 1,
+                            'total_slides': total_slides,
+                            'completed': completed_count,
+                            'failed': len(failed_slides),
+                            'skipped': len(skipped_slides),
+                            'message': f'正在生成第{slide_index + 1}页演讲稿...'
+                        })
 
-                # Update progress
-                progress_tracker.update_progress(
-                    task_id,
-                    current_slide=slide_index,
-                    current_slide_title=slide_title,
-                    message=f'正在生成第{slide_index + 1}页演讲稿...'
-                )
-
-                if progress_callback:
-                    progress_callback({
-                        'type': 'progress',
-                        'current_slide': slide_index + 1,
-                        'total_slides': total_slides,
-                        'completed': completed_count,
-                        'failed': len(failed_slides),
-                        'skipped': len(skipped_slides),
-                        'message': f'正在生成第{slide_index + 1}页演讲稿...'
-                    })
-
-                # Try to generate script with retries
-                script_generated = False
-                last_error = None
-
-                for retry_count in range(max_retries):
-                    try:
-                        # Get previous slide context for better coherence
-                        previous_slide_context = ""
-                        if slide_index > 0 and successful_scripts:
-                            # Find the most recent successful script before this slide
-                            for prev_script in reversed(successful_scripts):
-                                if prev_script.slide_index < slide_index:
-                                    prev_content = prev_script.script_content
-                                    if len(prev_content) > 200:
-                                        previous_slide_context = prev_content[-200:]
-                                    else:
-                                        previous_slide_context = prev_content
-                                    break
-
-                        # Generate script
-                        script_content = await self._generate_script_for_slide(
-                            slide, slide_index, len(project.slides_data),
-                            project, previous_slide_context, customization
-                        )
-
-                        # Estimate duration
-                        estimated_duration = self._estimate_speaking_duration(script_content)
-
-                        slide_script = SlideScriptData(
-                            slide_index=slide_index,
-                            slide_title=slide_title,
-                            script_content=script_content,
-                            estimated_duration=estimated_duration
-                        )
-
-                        successful_scripts.append(slide_script)
-                        script_generated = True
-                        completed_count += 1
-
-                        # Update progress tracker
-                        progress_tracker.add_slide_completed(task_id, slide_index, slide_title)
-
-                        # Update progress callback
-                        if progress_callback:
-                            progress_callback({
-                                'type': 'slide_completed',
-                                'slide_index': slide_index,
-                                'slide_title': slide_title,
-                                'completed': completed_count,
-                                'total_slides': total_slides
-                            })
-
-                        break  # Success, exit retry loop
-
-                    except Exception as e:
-                        last_error = str(e)
-                        logger.warning(f"Retry {retry_count + 1}/{max_retries} failed for slide {slide_index + 1}: {e}")
-
-                        # Update progress with retry info
-                        if progress_callback:
-                            progress_callback({
-                                'type': 'retry',
-                                'slide_index': slide_index,
-                                'retry_count': retry_count + 1,
-                                'max_retries': max_retries,
-                                'error': str(e)
-                            })
-
-                        # Wait a bit before retrying
-                        import asyncio
-                        await asyncio.sleep(1)
+                    # Try to generate script with retries
+                    last_error = None
+                    for retry_count in range(max_retries):
+                        try:
+                            script_content = await self._generate_script_for_slide(
+                                slide, slide_index, len(project.slides_data),
+                                project, previous_slide_context, customization
+                            )
+                            break
+
+                        except Exception as e:
+                            last_error = str(e)
+                            logger.warning(f"Retry {retry_count + 1}/{max_retries} failed for slide {slide_index + 1}: {e}")
+
+                            # Update progress with retry info
+                            if progress_callback:
+                                progress_callback({
+                                    'type': 'retry',
+                                    'slide_index': slide_index,
+                                    'retry_count': retry_count + 1,
+                                    'max_retries': max_retries,
+                                    'error': str(e)
+                                })
+
+                            # Wait a bit before retrying
+                            await asyncio.sleep(1)
+                    else:
+                        script_content = None
 
-                # If all retries failed, mark as failed or skipped
-                if not script_generated:
+                if script_content is None:
+                    # All retries failed, mark as failed or skipped
                     if max_retries > 0:
                         failed_slides.append({
                             'slide_index': slide_index,
@@ -457,6 +420,52 @@ class SpeechScriptService:
 
                         # Update progress tracker
                         progress_tracker.add_slide_skipped(task_id, slide_index, slide_title, 'Max retries exceeded')
+                    return None
+
+                slide_script = SlideScriptData(
+                    slide_index=slide_index,
+                    slide_title=slide_title,
+                    script_content=script_content,
+                    estimated_duration=self._estimate_speaking_duration(script_content)
+                )
+
+                # Persist immediately so finished slides survive later failures
+                if on_script_generated:
+                    try:
+                        await on_script_generated(slide_script)
+                    except Exception as e:
+                        logger.error(f"Failed to persist speech script for slide {slide_index + 1}: {e}")
+
+                completed_count += 1
+
+                # Stream the finished script through the progress tracker
+                progress_tracker.add_slide_completed(
+                    task_id, slide_index, slide_title,
+                    script={
+                        'slide_index': slide_index,
+                        'slide_title': slide_title,
+                        'script_content': script_content,
+                        'estimated_duration': slide_script.estimated_duration
+                    }
+                )
+
+                if progress_callback:
+                    progress_callback({
+                        'type': 'slide_completed',
+                        'slide_index': slide_index,
+                        'slide_title': slide_title,
+                        'completed': completed_count,
+                        'total_slides': total_slides
+                    })
+
+                return slide_script
+
+            results = await asyncio.gather(
+                *(generate_one(position, slide_index) for position, slide_index in enumerate(slide_indices))
+            )
+
+            # Merge results in the requested slide order
+            successful_scripts = [script for script in results if script is not None]
 
             # Calculate total duration
             total_duration = self._calculate_total_duration([s.estimated_duration for s in successful_scripts])
@@ -495,6 +504,7 @@ class SpeechScriptService:
                 generation_metadata={
                     "generation_time": time.time(),
                     "customization": customization.__dict__,
+                    "concurrency": concurrency,
                     "successful_slides": len(successful_scripts),
                     "failed_slides": len(failed_slides),
                     "skipped_slides": len(skipped_slides),
@@ -511,6 +521,21 @@ class SpeechScriptService:
                 error_message=str(e)
             )
 
+    def _get_previous_slide_context(self, project: PPTProject, slide_indices: List[int], position: int) -> str:
+        """Get context from the previous slide in the sequence (derived from slide content, not scripts)"""
+        slide_index = slide_indices[position]
+        if position > 0:
+            prev_index = slide_indices[position - 1]
+        elif slide_index > 0:
+            # Use actual previous slide if this is the first in selection
+            prev_index = slide_index - 1
+        else:
+            return ""
+
+        if 0 <= prev_index < len(project.slides_data):
+            return self._extract_slide_context(project.slides_data[prev_index])
+        return ""
+
     async def _generate_script_for_slide(
         self,
         slide: Dict[str, Any],
@@ -692,8 +717,12 @@ class SpeechScriptService:
     ) -> List[SlideScriptData]:
         """Add opening and closing remarks for full presentation"""
         try:
-            # Generate opening remarks
-            opening_script = await self._generate_opening_remarks(project, customization)
+            # Opening and closing remarks are independent, generate them in parallel
+            opening_script, closing_script = await asyncio.gather(
+                self._generate_opening_remarks(project, customization),
+                self._generate_closing_remarks(project, customization)
+            )
+
             opening_slide = SlideScriptData(
                 slide_index=-1,  # Special index for opening
                 slide_title="开场白",
@@ -701,8 +730,6 @@ class SpeechScriptService:
                 estimated_duration=self._estimate_speaking_duration(opening_script)
             )
 
-            # Generate closing remarks
-            closing_script = await self._generate_closing_remarks(project, customization)
             closing_slide = SlideScriptData(
                 slide_index=len(scripts),  # Special index for closing
                 slide_title="结束语",
@@ -783,10 +810,10 @@ class SpeechScriptService:
             )
         )
 
+        return response.content.strip()
+
     def _build_request_kwargs(self, **kwargs) -> Dict[str, Any]:
         """Merge base kwargs with role-specific model override if configured."""
         if self.provider_settings and self.provider_settings.get("model"):
             kwargs.setdefault("model", self.provider_settings["model"])
         return kwargs
-
-        return response.content.strip()
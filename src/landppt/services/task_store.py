@@ -0,0 +1,285 @@
+"""
+后台任务持久化存储
+将任务状态、进度、结果和结果文件引用保存在数据库中，
+使多个 uvicorn worker 都能查询同一任务，并在进程重启后保留已完成的结果
+"""
+
+import json
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_
+
+from ..database.database import SessionLocal
+from ..database.models import BackgroundTaskItem, BackgroundTaskRecord
+
+logger = logging.getLogger(__name__)
+
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+ACTIVE_STATUSES = ("pending", "running")
+
+
+def get_worker_id() -> str:
+    """当前worker的标识（主机名:进程号）"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _to_json_safe(value: Any) -> Any:
+    """确保结果可以写入JSON列"""
+    if value is None:
+        return None
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
+
+
+class TaskStore:
+    """基于数据库的任务存储，所有方法都是短事务，可跨worker共享"""
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+
+    def _record_to_dict(self, record: BackgroundTaskRecord) -> Dict[str, Any]:
+        return {
+            "task_id": record.task_id,
+            "task_type": record.task_type,
+            "status": record.status,
+            "progress": record.progress or 0.0,
+            "result": record.result,
+            "error": record.error,
+            "metadata": record.task_metadata or {},
+            "progress_data": record.progress_data,
+            "result_files": record.result_files or [],
+            "worker_id": record.worker_id,
+            "lease_expires_at": record.lease_expires_at,
+            "heartbeat_at": record.heartbeat_at,
+            "cancel_requested": bool(record.cancel_requested),
+            "created_at": record.created_at,
+            "updated_at": record.updated_at,
+        }
+
+    def save(self, task_id: str, task_type: Optional[str] = None, **fields) -> bool:
+        """
+        插入或更新任务记录
+
+        fields 可包含 status、progress、result、error、metadata、progress_data、
+        result_files、worker_id、lease_seconds
+        """
+        now = time.time()
+        db = self._session_factory()
+        try:
+            record = db.query(BackgroundTaskRecord).filter(BackgroundTaskRecord.task_id == task_id).first()
+            if record is None:
+                if task_type is None:
+                    return False
+                record = BackgroundTaskRecord(task_id=task_id, task_type=task_type, created_at=now)
+                db.add(record)
+
+            lease_seconds = fields.pop("lease_seconds", None)
+            if lease_seconds:
+                record.lease_expires_at = now + lease_seconds
+                record.heartbeat_at = now
+            if "metadata" in fields:
+                record.task_metadata = _to_json_safe(fields.pop("metadata"))
+            for key in ("result", "progress_data", "result_files"):
+                if key in fields:
+                    setattr(record, key, _to_json_safe(fields.pop(key)))
+            for key, value in fields.items():
+                setattr(record, key, value)
+
+            record.updated_at = now
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"保存任务记录失败 {task_id}: {e}")
+            return False
+        finally:
+            db.close()
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务记录，租约过期的执行中任务会被标记为失败"""
+        db = self._session_factory()
+        try:
+            record = db.query(BackgroundTaskRecord).filter(BackgroundTaskRecord.task_id == task_id).first()
+            if record is None:
+                return None
+
+            if (record.status in ACTIVE_STATUSES and record.lease_expires_at
+                    and record.lease_expires_at < time.time()):
+                # 执行该任务的worker已退出（重启或崩溃）
+                record.status = "failed"
+                record.error = record.error or f"任务执行进程已退出 (worker: {record.worker_id})"
+                record.updated_at = time.time()
+                db.commit()
+                logger.warning(f"任务租约过期，标记为失败: {task_id}")
+
+            return self._record_to_dict(record)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"读取任务记录失败 {task_id}: {e}")
+            return None
+        finally:
+            db.close()
+
+    def append_items(self, task_id: str, items: List[Any], start_seq: int) -> bool:
+        """追加任务的增量结果，序号从 start_seq 开始（已存在的序号忽略）"""
+        if not items:
+            return True
+        db = self._session_factory()
+        try:
+            existing = {
+                seq for (seq,) in db.query(BackgroundTaskItem.seq).filter(
+                    and_(BackgroundTaskItem.task_id == task_id, BackgroundTaskItem.seq >= start_seq)
+                )
+            }
+            now = time.time()
+            for offset, item in enumerate(items):
+                if start_seq + offset not in existing:
+                    db.add(BackgroundTaskItem(task_id=task_id, seq=start_seq + offset,
+                                              data=_to_json_safe(item), created_at=now))
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"保存任务增量结果失败 {task_id}: {e}")
+            return False
+        finally:
+            db.close()
+
+    def get_items(self, task_id: str, since: int = 0) -> List[Any]:
+        """按序号读取任务的增量结果（从第 since 条开始）"""
+        db = self._session_factory()
+        try:
+            rows = db.query(BackgroundTaskItem.data).filter(
+                and_(BackgroundTaskItem.task_id == task_id, BackgroundTaskItem.seq >= since)
+            ).order_by(BackgroundTaskItem.seq).all()
+            return [data for (data,) in rows]
+        except Exception as e:
+            logger.warning(f"读取任务增量结果失败 {task_id}: {e}")
+            return []
+        finally:
+            db.close()
+
+    def renew_lease(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        心跳续约
+
+        Returns:
+            是否已请求取消该任务
+        """
+        now = time.time()
+        db = self._session_factory()
+        try:
+            record = db.query(BackgroundTaskRecord).filter(BackgroundTaskRecord.task_id == task_id).first()
+            if record is None:
+                return False
+            record.worker_id = worker_id
+            record.heartbeat_at = now
+            record.lease_expires_at = now + lease_seconds
+            db.commit()
+            return bool(record.cancel_requested)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"任务续约失败 {task_id}: {e}")
+            return False
+        finally:
+            db.close()
+
+    def request_cancel(self, task_id: str) -> bool:
+        """请求取消任务（由持有租约的worker在下次心跳时执行取消）"""
+        db = self._session_factory()
+        try:
+            record = db.query(BackgroundTaskRecord).filter(BackgroundTaskRecord.task_id == task_id).first()
+            if record is None or record.status not in ACTIVE_STATUSES:
+                return False
+            record.cancel_requested = True
+            record.updated_at = time.time()
+            db.commit()
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"请求取消任务失败 {task_id}: {e}")
+            return False
+        finally:
+            db.close()
+
+    def fail_worker_tasks(self, worker_id: str, error: str) -> int:
+        """将指定worker仍在执行的任务标记为失败（进程关闭时调用）"""
+        db = self._session_factory()
+        try:
+            updated = db.query(BackgroundTaskRecord).filter(
+                and_(
+                    BackgroundTaskRecord.worker_id == worker_id,
+                    BackgroundTaskRecord.status.in_(ACTIVE_STATUSES)
+                )
+            ).update({"status": "failed", "error": error, "updated_at": time.time()},
+                     synchronize_session=False)
+            db.commit()
+            return updated
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"标记worker任务失败时出错: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def cleanup_expired(self, max_age_seconds: float) -> int:
+        """删除过期的已结束任务及其结果文件，以及租约早已过期的遗留任务"""
+        cutoff = time.time() - max_age_seconds
+        db = self._session_factory()
+        try:
+            records: List[BackgroundTaskRecord] = db.query(BackgroundTaskRecord).filter(
+                and_(
+                    BackgroundTaskRecord.updated_at < cutoff,
+                    or_(
+                        BackgroundTaskRecord.status.in_(TERMINAL_STATUSES),
+                        BackgroundTaskRecord.lease_expires_at < cutoff
+                    )
+                )
+            ).all()
+
+            for record in records:
+                for path in record.result_files or []:
+                    try:
+                        if path and os.path.exists(path):
+                            os.unlink(path)
+                    except OSError as e:
+                        logger.warning(f"删除任务结果文件失败 {path}: {e}")
+                db.delete(record)
+
+            task_ids = [record.task_id for record in records]
+            if task_ids:
+                db.query(BackgroundTaskItem).filter(
+                    BackgroundTaskItem.task_id.in_(task_ids)
+                ).delete(synchronize_session=False)
+
+            db.commit()
+            return len(records)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"清理过期任务失败: {e}")
+            return 0
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """按状态统计任务数量"""
+        stats = {"total": 0, "pending": 0, "running": 0, "completed": 0, "failed": 0, "cancelled": 0}
+        db = self._session_factory()
+        try:
+            rows = db.query(BackgroundTaskRecord.status, func.count()).group_by(BackgroundTaskRecord.status).all()
+            for status, count in rows:
+                stats[status] = count
+                stats["total"] += count
+        except Exception as e:
+            logger.warning(f"统计任务失败: {e}")
+        finally:
+            db.close()
+        return stats
+
+
+# 全局任务存储实例
+task_store = TaskStore()
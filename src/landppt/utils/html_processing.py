@@ -0,0 +1,584 @@
+"""
+幻灯片HTML的CPU密集型处理：从AI响应中提取HTML、校验格式完整性、用解析器自动修复
+
+这些都是无状态的模块级函数，可以放到进程池中执行（lxml/BeautifulSoup 解析几百KB的HTML
+会长时间占用GIL，在事件循环上执行会阻塞SSE推送和其他请求）。process_html_response
+把提取、校验和修复合并为一次调用，严格解析的结果和恢复解析得到的文档树在校验与修复之间共享；
+process_html_response_async 在进程池中执行并按内容哈希缓存结果。
+HTMLStreamTracker 在流式生成时增量跟踪标签平衡，用于尽早发现截断；
+stitch_html_continuation 把续写内容接到被截断的输出之后。
+"""
+
+import hashlib
+import logging
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def strip_think_tags(raw_content: Optional[str]) -> str:
+    """Remove <think>...</think> sections that some providers prepend."""
+    if not raw_content:
+        return ""
+
+    cleaned = re.sub(
+        r"<\s*think[^>]*>.*?<\s*/\s*think\s*>",
+        "",
+        raw_content,
+        flags=re.IGNORECASE | re.DOTALL,
+    )
+    return cleaned.strip()
+
+
+def clean_html_response(raw_content: str) -> str:
+    """Clean and extract HTML content from AI response with robust markdown handling"""
+    raw_content = strip_think_tags(raw_content)
+
+    if not raw_content:
+        logger.warning("Received empty response from AI")
+        return ""
+
+    content = raw_content.strip()
+    logger.debug(f"Raw AI response length: {len(content)}, preview: {content[:200]}...")
+
+    # Check if response is suspiciously short or contains error indicators
+    if len(content) < 100:
+        logger.warning(f"AI response is very short ({len(content)} chars), might be incomplete")
+
+    if any(error_indicator in content.lower() for error_indicator in ['error', 'sorry', 'cannot', 'unable']):
+        logger.warning("AI response contains error indicators")
+
+    # Step 1: Look for markdown code blocks first (most reliable)
+    # Pattern to match ```html...``` blocks
+    html_block_pattern = r'```html\s*\n(.*?)\n```'
+    html_match = re.search(html_block_pattern, content, re.DOTALL | re.IGNORECASE)
+
+    if html_match:
+        extracted_html = html_match.group(1).strip()
+        logger.debug("Found HTML in markdown code block")
+        return extracted_html
+
+    # Step 2: Look for generic code blocks ```...```
+    generic_block_pattern = r'```\s*\n(.*?)\n```'
+    generic_match = re.search(generic_block_pattern, content, re.DOTALL)
+
+    if generic_match:
+        potential_html = generic_match.group(1).strip()
+        # Check if it looks like HTML
+        if (potential_html.lower().startswith('<!doctype html') or
+            potential_html.lower().startswith('<html')):
+            logger.debug("Found HTML in generic code block")
+            return potential_html
+
+    # Step 3: Remove common AI response prefixes and try direct extraction
+    prefixes_to_remove = [
+        "这是生成的HTML代码：",
+        "以下是HTML代码：",
+        "HTML代码如下：",
+        "生成的完整HTML页面：",
+        "Here's the HTML code:",
+        "The HTML code is:",
+        "```html",
+        "```",
+    ]
+
+    for prefix in prefixes_to_remove:
+        if content.startswith(prefix):
+            content = content[len(prefix):].strip()
+
+    # Remove trailing markdown markers
+    if content.endswith('```'):
+        content = content[:-3].strip()
+
+    # Step 4: Extract HTML using DOCTYPE or html tag patterns
+    # Look for complete HTML document with DOCTYPE
+    doctype_pattern = r'<!DOCTYPE html.*?</html>'
+    doctype_match = re.search(doctype_pattern, content, re.DOTALL | re.IGNORECASE)
+
+    if doctype_match:
+        extracted_html = doctype_match.group(0)
+        logger.debug("Found HTML using DOCTYPE pattern")
+        return extracted_html
+
+    # Look for html tag without DOCTYPE
+    html_pattern = r'<html.*?</html>'
+    html_match = re.search(html_pattern, content, re.DOTALL | re.IGNORECASE)
+
+    if html_match:
+        extracted_html = html_match.group(0)
+        logger.debug("Found HTML using html tag pattern")
+        return extracted_html
+
+    # Step 5: Line-by-line extraction as fallback
+    lines = content.split('\n')
+    html_lines = []
+    in_html = False
+
+    for line in lines:
+        line_stripped = line.strip()
+        line_lower = line_stripped.lower()
+
+        # Skip empty lines and common non-HTML prefixes
+        if not line_stripped or line_stripped.startswith('#') or line_stripped.startswith('//'):
+            continue
+
+        # Start collecting when we see HTML start
+        if line_lower.startswith('<!doctype') or line_lower.startswith('<html'):
+            in_html = True
+            html_lines.append(line)
+            continue
+
+        # Collect lines if we're in HTML
+        if in_html:
+            html_lines.append(line)
+
+            # Stop when we see HTML end
+            if line_lower.strip().endswith('</html>'):
+                break
+
+    if html_lines:
+        extracted_html = '\n'.join(html_lines)
+        logger.debug("Found HTML using line-by-line extraction")
+        return extracted_html
+
+    # Step 6: If all else fails, check if content looks like HTML at all
+    if '<' in content and '>' in content:
+        logger.warning("Could not extract HTML using any method, but content contains HTML tags, returning cleaned content")
+        return content
+
+    logger.error("Failed to extract HTML from AI response")
+    return ""
+
+
+def basic_html_syntax_check(html_content: str, validation_result: Dict[str, Any]) -> None:
+    """
+    Basic HTML syntax checking when lxml is not available.
+    Uses regex patterns to detect common HTML syntax errors.
+    """
+    # Check for malformed tags (tags containing other tags)
+    malformed_tags = re.findall(r'<[^>]*<[^>]*>', html_content)
+    if malformed_tags:
+        validation_result['errors'].append('发现格式错误的标签')
+
+    # Check for unclosed critical HTML tags using tag counting
+    # Define critical HTML tags that must be properly closed
+    critical_tags = {'html', 'head', 'body', 'div', 'p', 'span'}
+
+    # Find all opening and closing tags
+    open_tags = re.findall(r'<([a-zA-Z][a-zA-Z0-9]*)[^>]*>', html_content)
+    close_tags = re.findall(r'</([a-zA-Z][a-zA-Z0-9]*)>', html_content)
+
+    # Self-closing tags that don't need closing tags
+    self_closing_tags = {'meta', 'link', 'img', 'br', 'hr', 'input', 'area', 'base', 'col', 'embed', 'source', 'track', 'wbr'}
+
+    # Filter to only check critical tags, excluding self-closing tags
+    open_tags_filtered = [tag.lower() for tag in open_tags
+                         if tag.lower() in critical_tags and tag.lower() not in self_closing_tags]
+    close_tags_lower = [tag.lower() for tag in close_tags if tag.lower() in critical_tags]
+
+    # Count occurrences of each tag
+    open_tag_counts = Counter(open_tags_filtered)
+    close_tag_counts = Counter(close_tags_lower)
+
+    # Check for unclosed critical tags
+    unclosed_critical_tags = []
+    for tag, open_count in open_tag_counts.items():
+        close_count = close_tag_counts.get(tag, 0)
+        if open_count > close_count:
+            unclosed_critical_tags.append(f"{tag}({open_count - close_count}个未闭合)")
+
+    if unclosed_critical_tags:
+        validation_result['errors'].append(f'未闭合的关键HTML标签: {", ".join(unclosed_critical_tags)}')
+
+
+def _strict_parse_error(html_content: str) -> Optional[str]:
+    """
+    Uses lxml's strict parser to check if the HTML is well-formed.
+
+    Returns:
+        The parser error message, or None when the HTML is well-formed
+
+    Raises:
+        ImportError: lxml is not available
+    """
+    from lxml import etree
+
+    try:
+        # Create a parser that does NOT recover from errors. This makes it strict.
+        parser = etree.HTMLParser(recover=False, encoding='utf-8')
+        etree.fromstring(html_content.encode('utf-8'), parser)
+        return None
+    except Exception as e:
+        # This error is triggered by unclosed tags, malformed tags, etc.
+        return str(e)
+
+
+def _recover_parse(html_content: str):
+    """使用 lxml 的恢复解析器构建文档树，校验结构和自动修复共用这一棵树"""
+    from lxml import etree
+
+    parser = etree.HTMLParser(recover=True, encoding='utf-8')
+    return etree.fromstring(html_content.encode('utf-8'), parser)
+
+
+def check_html_well_formedness(html_content: str, validation_result: Dict[str, Any],
+                               strict_error: Optional[str] = None, strict_checked: bool = False) -> None:
+    """
+    Check well-formedness with lxml's strict parser (falls back to regex checks without lxml).
+    This is the definitive check for syntax errors like unclosed tags.
+    Modifies the validation_result dictionary in place.
+    """
+    if not strict_checked:
+        try:
+            strict_error = _strict_parse_error(html_content)
+        except ImportError:
+            # lxml not available, fall back to basic regex checks
+            logger.warning("lxml not available, using basic HTML validation")
+            basic_html_syntax_check(html_content, validation_result)
+            return
+
+    if strict_error is not None:
+        validation_result['errors'].append(f'HTML语法错误: {strict_error}')
+
+
+def _check_structure_with_tree(root, validation_result: Dict[str, Any]) -> None:
+    """基于 lxml 文档树检查结构（与 BeautifulSoup 'lxml' 解析结果一致）"""
+    # 2. Check for essential structural elements (Missing elements)
+    for tag_name in ('html', 'head', 'body'):
+        if next(root.iter(tag_name), None) is None:
+            validation_result['missing_elements'].append(tag_name)
+
+    # 3. Check for correct structure order: <head> before <body> (Warning)
+    head_tag = next(root.iter('head'), None)
+    body_tag = next(root.iter('body'), None)
+    if head_tag is not None and body_tag is not None:
+        if not any(sibling.tag == 'head' for sibling in body_tag.itersiblings(preceding=True)):
+            validation_result['warnings'].append('HTML结构顺序不正确：<body>标签出现在<head>标签之前')
+
+    # 4. Check for unescaped special characters in human-readable text (Warning)
+    text_content = ''.join(root.xpath('//text()[not(ancestor::script) and not(ancestor::style)]'))
+    if '<' in text_content or '>' in text_content:
+        validation_result['warnings'].append('文本内容中可能包含未转义的特殊字符（\'<\'或\'>\'）')
+
+
+def _check_structure_with_soup(html_content: str, validation_result: Dict[str, Any]) -> None:
+    """lxml 不可用时使用 BeautifulSoup 检查结构"""
+    from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
+    import warnings
+
+    # Suppress BeautifulSoup warnings about markup that looks like a file path
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
+        soup = BeautifulSoup(html_content, 'html.parser')
+
+    for tag_name in ('html', 'head', 'body'):
+        if not soup.find(tag_name):
+            validation_result['missing_elements'].append(tag_name)
+
+    head_tag = soup.find('head')
+    body_tag = soup.find('body')
+    if head_tag and body_tag:
+        if not body_tag.find_previous_sibling('head'):
+            validation_result['warnings'].append('HTML结构顺序不正确：<body>标签出现在<head>标签之前')
+
+    text_content = soup.get_text()
+    if '<' in text_content or '>' in text_content:
+        validation_result['warnings'].append('文本内容中可能包含未转义的特殊字符（\'<\'或\'>\'）')
+
+
+def _serialize_fixed_html(html_content: str, tree) -> str:
+    """将恢复解析得到的文档树序列化，保留原始的 DOCTYPE 声明"""
+    from lxml import etree
+
+    fixed_html = etree.tostring(tree, encoding='unicode', method='html', pretty_print=True)
+
+    # 如果原始 HTML 有 DOCTYPE，添加回去
+    doctype_match = re.search(r'<!DOCTYPE[^>]*>', html_content, re.IGNORECASE)
+    if doctype_match and not fixed_html.lower().startswith('<!doctype'):
+        fixed_html = doctype_match.group(0) + '\n' + fixed_html
+    return fixed_html
+
+
+def _analyze_html(html_content: str, fix: bool) -> Dict[str, Any]:
+    """校验HTML并按需修复，严格解析和恢复解析各最多执行一次"""
+    validation_result = {
+        'is_complete': False,
+        'errors': [],
+        'warnings': [],
+        'missing_elements': []
+    }
+    analysis = {'validation': validation_result, 'fixed_html': None}
+
+    if not html_content or not html_content.strip():
+        validation_result['errors'].append('HTML内容为空或仅包含空白字符')
+        return analysis
+
+    # --- Primary Validation using Strict Parsing ---
+    try:
+        strict_error = _strict_parse_error(html_content)
+        lxml_available = True
+    except ImportError:
+        strict_error = None
+        lxml_available = False
+    check_html_well_formedness(html_content, validation_result,
+                               strict_error=strict_error, strict_checked=lxml_available)
+
+    # --- Secondary Validation for structural best practices ---
+    # This part runs even if there are syntax errors to provide more feedback
+    # 1. Check for DOCTYPE declaration (Missing element)
+    if not html_content.strip().lower().startswith('<!doctype'):
+        validation_result['missing_elements'].append('doctype')
+
+    tree = None
+    try:
+        if lxml_available:
+            tree = _recover_parse(html_content)
+        if tree is not None:
+            _check_structure_with_tree(tree, validation_result)
+        else:
+            _check_structure_with_soup(html_content, validation_result)
+    except Exception as e:
+        validation_result['errors'].append(f'HTML结构解析过程中发生意外错误: {e}')
+
+    # missing_elements are treated as warnings only, not errors
+    validation_result['is_complete'] = len(validation_result['errors']) == 0
+
+    # 严格解析失败时，复用恢复解析得到的文档树进行修复
+    if fix and lxml_available and strict_error is not None and tree is not None:
+        try:
+            analysis['fixed_html'] = _serialize_fixed_html(html_content, tree)
+        except Exception as e:
+            logger.warning(f"解析器自动修复失败: {str(e)}")
+
+    return analysis
+
+
+def validate_html_completeness(html_content: str) -> Dict[str, Any]:
+    """
+    Validate HTML format correctness and tag closure using lxml (BeautifulSoup without lxml).
+
+    This validator checks for:
+    1. Presence of essential elements (<!DOCTYPE>, <html>, <head>, <body>) as warnings
+    2. Correct structural order (<head> before <body>) as a warning
+    3. Well-formedness and tag closure using strict parsing, reported as errors
+    4. Unescaped special characters ('<' or '>') in text content as a warning
+
+    Returns:
+        Dict with 'is_complete', 'errors', 'warnings', 'missing_elements' keys
+    """
+    return _analyze_html(html_content, fix=False)['validation']
+
+
+def auto_fix_html_with_parser(html_content: str) -> str:
+    """
+    使用 lxml 的恢复解析器自动修复 HTML 错误
+
+    Returns:
+        修复后的 HTML 内容，如果无需修复或修复失败则返回原始内容
+    """
+    try:
+        if _strict_parse_error(html_content) is None:
+            logger.debug("HTML 已经是有效的，无需修复")
+            return html_content
+        tree = _recover_parse(html_content)
+        if tree is None:
+            return html_content
+        fixed_html = _serialize_fixed_html(html_content, tree)
+        logger.info("使用 lxml 解析器自动修复 HTML 成功")
+        return fixed_html
+    except ImportError:
+        logger.warning("lxml 不可用，无法使用解析器自动修复")
+        return html_content
+    except Exception as e:
+        logger.warning(f"解析器自动修复失败: {str(e)}")
+        return html_content
+
+
+def process_html_response(raw_content: str) -> Dict[str, Any]:
+    """
+    从AI响应中提取HTML并完成校验和修复（可在子进程中执行）
+
+    Returns:
+        Dict with 'html' (提取出的HTML), 'validation' (校验结果，HTML过短时为None)
+        and 'fixed_html' (存在语法错误时解析器修复后的HTML，否则为None)
+    """
+    html_content = clean_html_response(raw_content)
+    if not html_content or len(html_content.strip()) < 50:
+        return {'html': html_content, 'validation': None, 'fixed_html': None}
+
+    analysis = _analyze_html(html_content, fix=True)
+    return {'html': html_content, **analysis}
+
+
+# 按内容哈希缓存处理结果，重试和重复内容无需再次解析
+_RESULT_CACHE_SIZE = 128
+_result_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+async def process_html_response_async(raw_content: str) -> Dict[str, Any]:
+    """在进程池中执行 process_html_response，结果按内容哈希缓存"""
+    from .process_pool import run_cpu_bound
+
+    key = hashlib.sha256((raw_content or "").encode('utf-8', errors='ignore')).hexdigest()
+    cached = _result_cache.get(key)
+    if cached is not None:
+        _result_cache.move_to_end(key)
+        return dict(cached)
+
+    result = await run_cpu_bound(process_html_response, raw_content)
+
+    _result_cache[key] = result
+    while len(_result_cache) > _RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+    return dict(result)
+
+
+# 不需要闭合的空元素
+_VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr',
+})
+# 内容按原始文本处理的元素，其中的 '<' 不是标签
+_RAW_TEXT_ELEMENTS = frozenset({'script', 'style', 'textarea', 'title'})
+_STREAM_TAG_PATTERN = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9-]*)\b[^<>]*?(/?)>')
+_STREAM_DOC_START_PATTERN = re.compile(r'<!doctype\s+html|<html[\s>]', re.IGNORECASE)
+# 原始文本元素的结束标签（不区分大小写，从扫描位置开始搜索，无需整体转小写）
+_RAW_TEXT_CLOSE_PATTERNS = {
+    name: re.compile(f'</{name}', re.IGNORECASE) for name in _RAW_TEXT_ELEMENTS
+}
+
+
+class HTMLStreamTracker:
+    """
+    流式输出的增量标签平衡跟踪器
+
+    逐块喂入模型输出，只扫描新到达的部分，维护未闭合标签栈。用于在流式生成过程中
+    尽早判断：文档是否已经完整（可以停止读取）、输出是否明显不是HTML（可以提前重试）、
+    流结束时是否被截断。这只是轻量的提前判断，完整性校验仍在最终文档上进行。
+    """
+
+    def __init__(self, max_preamble_chars: int = 6000):
+        self.max_preamble_chars = max_preamble_chars
+        self.text = ""
+        self.open_tags = []
+        self.started = False
+        self.complete = False
+        self._pos = 0
+        self._raw_text_tag: Optional[str] = None
+
+    def feed(self, chunk: str) -> None:
+        """追加一段输出并扫描新增部分"""
+        if not chunk or self.complete:
+            self.text += chunk or ""
+            return
+        self.text += chunk
+
+        if not self.started:
+            match = _STREAM_DOC_START_PATTERN.search(self.text)
+            if not match:
+                return
+            self.started = True
+            self._pos = match.start()
+
+        self._scan()
+
+    def _scan(self) -> None:
+        text = self.text
+        while not self.complete:
+            if self._raw_text_tag:
+                close_match = _RAW_TEXT_CLOSE_PATTERNS[self._raw_text_tag].search(text, self._pos)
+                if close_match is None:
+                    # 保留可能被截断在块边界上的结束标签
+                    self._pos = max(self._pos, len(text) - len(self._raw_text_tag) - 2)
+                    return
+                self._pos = close_match.start()
+                self._raw_text_tag = None
+
+            lt = text.find('<', self._pos)
+            if lt == -1:
+                self._pos = len(text)
+                return
+            if text.startswith('<!--', lt):
+                end = text.find('-->', lt + 4)
+                if end == -1:
+                    self._pos = lt
+                    return
+                self._pos = end + 3
+                continue
+            if text.startswith('<!', lt) or text.startswith('<?', lt):
+                end = text.find('>', lt)
+                if end == -1:
+                    self._pos = lt
+                    return
+                self._pos = end + 1
+                continue
+
+            match = _STREAM_TAG_PATTERN.match(text, lt)
+            if not match:
+                if text.find('>', lt) == -1 and text.find('<', lt + 1) == -1:
+                    # 标签还没有传输完整
+                    self._pos = lt
+                    return
+                self._pos = lt + 1
+                continue
+
+            self._pos = match.end()
+            closing, name, self_closing = match.group(1), match.group(2).lower(), match.group(3)
+            if closing:
+                if name in self.open_tags:
+                    # HTML允许省略部分结束标签，弹出到匹配的开始标签为止
+                    while self.open_tags and self.open_tags.pop() != name:
+                        pass
+                if name == 'html':
+                    self.complete = True
+            elif name not in _VOID_ELEMENTS and not self_closing:
+                self.open_tags.append(name)
+                if name in _RAW_TEXT_ELEMENTS:
+                    self._raw_text_tag = name
+
+    @property
+    def looks_invalid(self) -> bool:
+        """输出已经很长却仍未出现HTML文档开头"""
+        return not self.started and len(strip_think_tags(self.text)) > self.max_preamble_chars
+
+    def truncation_reason(self) -> Optional[str]:
+        """流结束时调用：文档未完整时返回原因，否则返回None"""
+        if self.complete:
+            return None
+        if not self.started:
+            return "输出中没有HTML文档"
+        unclosed = ", ".join(self.open_tags[-5:]) or "无"
+        return f"输出在</html>之前中断（未闭合标签: {unclosed}）"
+
+    def finalized_text(self) -> str:
+        """提前停止读取时补齐未闭合的markdown代码块，便于后续提取HTML"""
+        if self.text.count("```") % 2 == 1:
+            return self.text.rstrip() + "\n```"
+        return self.text
+
+
+_CONTINUATION_THINK_PATTERN = re.compile(r'^\s*<\s*think[^>]*>.*?<\s*/\s*think\s*>\s*', re.IGNORECASE | re.DOTALL)
+_CONTINUATION_FENCE_PATTERN = re.compile(r'^\s*```[a-zA-Z]*[ \t]*\n?')
+
+
+def stitch_html_continuation(partial: str, continuation: str,
+                             min_overlap: int = 12, max_overlap: int = 1000) -> str:
+    """
+    把续写内容接到被截断的输出之后
+
+    去掉续写开头多余的代码块标记，以及与已有输出末尾重复的部分（模型常会重复截断前的最后几十个字符）。
+    续写内容重新从文档开头开始时，说明模型没有按要求续写，直接使用续写内容。
+    """
+    # 不能strip：续写可能从一个词或属性的中间开始，首尾空白都有意义
+    tail = _CONTINUATION_THINK_PATTERN.sub('', continuation or '', count=1)
+    tail = _CONTINUATION_FENCE_PATTERN.sub('', tail, count=1)
+    if _STREAM_DOC_START_PATTERN.match(tail.lstrip()):
+        return tail
+
+    limit = min(max_overlap, len(partial), len(tail))
+    for size in range(limit, min_overlap - 1, -1):
+        if partial.endswith(tail[:size]):
+            return partial + tail[size:]
+    return partial + tail
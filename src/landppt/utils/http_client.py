@@ -0,0 +1,243 @@
+"""
+共享HTTP客户端，复用连接池、DNS缓存和keep-alive连接
+
+研究内容抓取、SearXNG搜索、图片提供者和图片下载都通过这里获取会话，
+避免每个URL都新建 aiohttp.ClientSession 并重新进行 TCP/TLS 握手。
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Union
+
+import aiohttp
+
+from .thread_pool import run_blocking_io
+
+logger = logging.getLogger(__name__)
+
+# 下载写盘时每批写入的字节数
+_WRITE_BATCH_BYTES = 1024 * 1024
+
+
+class ResponseTooLargeError(Exception):
+    """响应体超过大小上限"""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class _SessionView:
+    """共享会话的轻量视图，为每个请求注入默认超时和请求头，且不会关闭底层会话"""
+
+    def __init__(self, session: aiohttp.ClientSession,
+                 timeout: Optional[aiohttp.ClientTimeout] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        self._session = session
+        self._timeout = timeout
+        self._headers = headers
+
+    def _prepare(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self._timeout is not None:
+            kwargs.setdefault('timeout', self._timeout)
+        if self._headers:
+            headers = dict(self._headers)
+            headers.update(kwargs.get('headers') or {})
+            kwargs['headers'] = headers
+        return kwargs
+
+    def request(self, method: str, url: str, **kwargs):
+        return self._session.request(method, url, **self._prepare(kwargs))
+
+    def get(self, url: str, **kwargs):
+        return self._session.get(url, **self._prepare(kwargs))
+
+    def post(self, url: str, **kwargs):
+        return self._session.post(url, **self._prepare(kwargs))
+
+    def head(self, url: str, **kwargs):
+        return self._session.head(url, **self._prepare(kwargs))
+
+
+class HTTPClientRegistry:
+    """应用级HTTP客户端注册表（按名称复用 aiohttp 会话）"""
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(HTTPClientRegistry, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+
+        # 连接池配置
+        self.pool_limit = _env_int('HTTP_POOL_LIMIT', 100)
+        self.pool_limit_per_host = _env_int('HTTP_POOL_LIMIT_PER_HOST', 10)
+        self.dns_cache_ttl = _env_int('HTTP_DNS_CACHE_TTL', 300)
+        self.keepalive_timeout = _env_int('HTTP_KEEPALIVE_TIMEOUT', 30)
+        # 默认响应体上限（字节）
+        self.max_response_bytes = _env_int('HTTP_MAX_RESPONSE_BYTES', 20 * 1024 * 1024)
+
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._session_loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._initialized = True
+
+    def _create_session(self, name: str) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_limit,
+            limit_per_host=self.pool_limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=300, sock_connect=30)
+        )
+        logger.debug(f"Created shared HTTP session '{name}' "
+                     f"(limit={self.pool_limit}, per_host={self.pool_limit_per_host})")
+        return session
+
+    def get_session(self, name: str = "default") -> aiohttp.ClientSession:
+        """获取共享会话，必须在事件循环中调用"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(name)
+        if session is None or session.closed or self._session_loops.get(name) is not loop:
+            # 会话与事件循环绑定，循环变化（如脚本中多次 asyncio.run）时重新创建
+            session = self._create_session(name)
+            self._sessions[name] = session
+            self._session_loops[name] = loop
+        return session
+
+    @asynccontextmanager
+    async def session(self, timeout: Optional[aiohttp.ClientTimeout] = None,
+                      headers: Optional[Dict[str, str]] = None,
+                      name: str = "default") -> AsyncIterator[_SessionView]:
+        """
+        以上下文管理器形式使用共享会话，退出时不关闭连接
+
+        用法:
+            async with http_clients.session(timeout=aiohttp.ClientTimeout(total=30)) as session:
+                async with session.get(url) as response:
+                    ...
+        """
+        yield _SessionView(self.get_session(name), timeout=timeout, headers=headers)
+
+    async def read_limited(self, response: aiohttp.ClientResponse,
+                           max_bytes: Optional[int] = None) -> bytes:
+        """读取响应体，超过上限时抛出 ResponseTooLargeError"""
+        max_bytes = max_bytes or self.max_response_bytes
+        if response.content_length is not None and response.content_length > max_bytes:
+            raise ResponseTooLargeError(
+                f"Response too large: {response.content_length} bytes (limit {max_bytes})"
+            )
+
+        chunks = []
+        total = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            total += len(chunk)
+            if total > max_bytes:
+                raise ResponseTooLargeError(f"Response exceeded {max_bytes} bytes")
+            chunks.append(chunk)
+        return b''.join(chunks)
+
+    async def fetch_bytes(self, url: str, *, max_bytes: Optional[int] = None,
+                          timeout: Optional[aiohttp.ClientTimeout] = None,
+                          headers: Optional[Dict[str, str]] = None) -> Optional[tuple]:
+        """
+        GET请求并返回 (content_type, body)，非200状态返回None
+
+        Raises:
+            ResponseTooLargeError: 响应体超过大小上限
+        """
+        async with self.session(timeout=timeout, headers=headers) as session:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    logger.warning(f"HTTP {response.status} fetching {url}")
+                    return None
+                body = await self.read_limited(response, max_bytes)
+                return response.headers.get('content-type', ''), body
+
+    async def download_to_file(self, url: str, dest_path: Union[str, Path], *,
+                               max_bytes: Optional[int] = None,
+                               timeout: Optional[aiohttp.ClientTimeout] = None,
+                               headers: Optional[Dict[str, str]] = None) -> Optional[int]:
+        """
+        流式下载到磁盘，返回写入的字节数；非200状态返回None
+
+        超过大小上限时删除不完整文件并抛出 ResponseTooLargeError。
+        """
+        max_bytes = max_bytes or self.max_response_bytes
+        dest_path = Path(dest_path)
+        await run_blocking_io(dest_path.parent.mkdir, parents=True, exist_ok=True)
+        tmp_path = dest_path.with_name(dest_path.name + '.part')
+
+        async with self.session(timeout=timeout, headers=headers) as session:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    logger.warning(f"HTTP {response.status} downloading {url}")
+                    return None
+                if response.content_length is not None and response.content_length > max_bytes:
+                    raise ResponseTooLargeError(
+                        f"Response too large: {response.content_length} bytes (limit {max_bytes})"
+                    )
+
+                total = 0
+                # 文件写入在线程池中执行，按 1MB 批量写入以减少线程切换
+                buffer = bytearray()
+                f = await run_blocking_io(open, tmp_path, 'wb')
+                try:
+                    try:
+                        async for chunk in response.content.iter_chunked(64 * 1024):
+                            total += len(chunk)
+                            if total > max_bytes:
+                                raise ResponseTooLargeError(f"Download exceeded {max_bytes} bytes")
+                            buffer += chunk
+                            if len(buffer) >= _WRITE_BATCH_BYTES:
+                                await run_blocking_io(f.write, bytes(buffer))
+                                buffer.clear()
+                        if buffer:
+                            await run_blocking_io(f.write, bytes(buffer))
+                    finally:
+                        await run_blocking_io(f.close)
+                    await run_blocking_io(os.replace, tmp_path, dest_path)
+                except BaseException:
+                    tmp_path.unlink(missing_ok=True)
+                    raise
+                return total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取连接池统计信息"""
+        return {
+            name: {
+                'closed': session.closed,
+                'limit': session.connector.limit if session.connector else None,
+                'limit_per_host': session.connector.limit_per_host if session.connector else None,
+            }
+            for name, session in self._sessions.items()
+        }
+
+    async def close(self):
+        """关闭所有共享会话（应用关闭时调用）"""
+        for name, session in list(self._sessions.items()):
+            if not session.closed:
+                try:
+                    await session.close()
+                except Exception as e:
+                    logger.warning(f"Error closing HTTP session '{name}': {e}")
+        self._sessions.clear()
+        self._session_loops.clear()
+        logger.info("Shared HTTP sessions closed")
+
+
+# 全局HTTP客户端注册表
+http_clients = HTTPClientRegistry()
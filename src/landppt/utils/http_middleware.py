@@ -0,0 +1,227 @@
+"""
+响应压缩与条件请求中间件（纯ASGI实现）
+
+- 幂等请求（GET）的完整响应自动添加弱ETag，If-None-Match 命中时直接返回304
+- 文本类响应（HTML、JSON、JS、CSS、SVG等）超过阈值时按 Accept-Encoding 使用 brotli（已安装时）或 gzip 压缩
+- 流式响应逐块压缩并立即刷新；SSE（text/event-stream）和已经压缩的响应不做处理
+"""
+
+import hashlib
+import zlib
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/xhtml+xml",
+    "image/svg+xml",
+)
+SKIPPED_TYPES = ("text/event-stream",)
+
+# 304响应中保留的头
+NOT_MODIFIED_HEADERS = ("cache-control", "content-location", "date", "etag", "expires", "vary", "last-modified")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """弱比较 If-None-Match 与 ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag.strip()
+    target = target[2:] if target.startswith("W/") else target
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        candidate = candidate[2:] if candidate.startswith("W/") else candidate
+        if candidate == target:
+            return True
+    return False
+
+
+def accepted_encodings(headers: Headers) -> List[str]:
+    """Accept-Encoding 中可接受的编码（排除 q=0），小写"""
+    accepted = []
+    for part in headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.append(name.strip().lower())
+    return accepted
+
+
+class _Encoder:
+    """gzip / brotli 增量压缩器"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        """压缩一块数据；flush 为真时刷新缓冲，使已压缩的数据可以立即发送"""
+        if self.encoding == "br":
+            out = self._compressor.process(data) if data else b""
+            return out + self._compressor.flush() if flush else out
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionETagMiddleware:
+    """为响应添加弱ETag/304处理，并压缩文本类响应"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024,
+                 gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "POST", "PUT", "PATCH", "DELETE"):
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, scope, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _Responder:
+    """处理单个请求的响应消息"""
+
+    def __init__(self, middleware: CompressionETagMiddleware, scope: Scope, send: Send):
+        self.middleware = middleware
+        self.send_downstream = send
+        self.method = scope["method"]
+        self.request_headers = Headers(scope=scope)
+        self.start_message: Optional[Message] = None
+        self.started = False
+        self.passthrough = False
+        self.encoder: Optional[_Encoder] = None
+
+    def _choose_encoding(self, headers: MutableHeaders) -> Optional[str]:
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return None
+        content_type = headers.get("content-type", "").lower()
+        if content_type.startswith(SKIPPED_TYPES) or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return None
+        accepted = accepted_encodings(self.request_headers)
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    @staticmethod
+    def _add_vary(headers: MutableHeaders):
+        vary = headers.get("vary", "")
+        if "accept-encoding" not in vary.lower():
+            headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+    async def send(self, message: Message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "").lower()
+            if content_type.startswith(SKIPPED_TYPES):
+                # SSE 必须逐条送达，不缓冲也不压缩
+                self.passthrough = True
+                await self.send_downstream(message)
+            else:
+                self.start_message = message
+            return
+
+        if self.passthrough or message_type != "http.response.body":
+            if self.start_message is not None and not self.started:
+                self.started = True
+                await self.send_downstream(self.start_message)
+            await self.send_downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if more_body:
+                await self._start_streaming(body)
+            else:
+                await self._send_complete(body)
+            return
+
+        if self.encoder is not None:
+            body = self.encoder.compress(body, flush=True)
+            if not more_body:
+                body += self.encoder.finish()
+        await self.send_downstream({"type": "http.response.body", "body": body, "more_body": more_body})
+
+    @staticmethod
+    def _compressible(status: int, headers: MutableHeaders) -> bool:
+        # 只压缩完整响应：206 等范围响应的 Content-Range 按未压缩字节计算，压缩后会损坏断点续传
+        return status == 200 and "content-range" not in headers
+
+    async def _start_streaming(self, body: bytes):
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        content_length = headers.get("content-length")
+        too_small = content_length is not None and content_length.isdigit() \
+            and int(content_length) < self.middleware.minimum_size
+        if self._compressible(self.start_message["status"], headers) and not too_small:
+            encoding = self._choose_encoding(headers)
+            if encoding:
+                self.encoder = _Encoder(encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+                del headers["content-length"]
+                headers["Content-Encoding"] = encoding
+                self._add_vary(headers)
+                body = self.encoder.compress(body, flush=True)
+        await self.send_downstream(self.start_message)
+        await self.send_downstream({"type": "http.response.body", "body": body, "more_body": True})
+
+    async def _send_complete(self, body: bytes):
+        message = self.start_message
+        headers = MutableHeaders(raw=message["headers"])
+        status = message["status"]
+        encoding = None
+        if len(body) >= self.middleware.minimum_size and self._compressible(status, headers):
+            encoding = self._choose_encoding(headers)
+            if encoding:
+                self._add_vary(headers)
+
+        if self.method == "GET" and status == 200:
+            etag = headers.get("etag")
+            cache_control = headers.get("cache-control", "")
+            if etag is None and body and "no-store" not in cache_control and "set-cookie" not in headers:
+                etag = f'W/"{hashlib.md5(body).hexdigest()}"'
+                headers["ETag"] = etag
+            if etag and etag_matches(self.request_headers.get("if-none-match", ""), etag):
+                not_modified = MutableHeaders()
+                for name in NOT_MODIFIED_HEADERS:
+                    if name in headers:
+                        not_modified[name] = headers[name]
+                await self.send_downstream({"type": "http.response.start", "status": 304,
+                                            "headers": not_modified.raw})
+                await self.send_downstream({"type": "http.response.body", "body": b"", "more_body": False})
+                return
+
+        if encoding:
+            encoder = _Encoder(encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            body = encoder.compress(body) + encoder.finish()
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+
+        await self.send_downstream(message)
+        await self.send_downstream({"type": "http.response.body", "body": body, "more_body": False})
@@ -0,0 +1,110 @@
+"""
+进程池工具类，用于执行CPU密集型的纯函数（如解析大段HTML）
+
+线程池中的CPU密集型任务仍然持有GIL，会拖慢事件循环；这些任务放到独立进程中执行。
+提交的函数及参数必须可以被pickle（模块级函数）。进程池大小为0或进程池不可用时回退到线程池。
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar('T')
+
+logger = logging.getLogger(__name__)
+
+
+def _default_pool_size() -> int:
+    try:
+        return int(os.environ.get('CPU_PROCESS_POOL_SIZE', min(4, os.cpu_count() or 1)))
+    except (TypeError, ValueError):
+        return 2
+
+
+class ProcessPoolManager:
+    """进程池管理器，懒加载全局进程池"""
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(ProcessPoolManager, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, max_workers: Optional[int] = None):
+        if self._initialized:
+            return
+
+        self.max_workers = max_workers if max_workers is not None else _default_pool_size()
+        self.executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.stats = {
+            "total_tasks": 0,
+            "completed_tasks": 0,
+            "failed_tasks": 0,
+            "thread_fallbacks": 0
+        }
+        self._initialized = True
+
+    def _get_executor(self) -> Optional[concurrent.futures.ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        if self.executor is None:
+            # 使用spawn启动子进程，避免fork带有事件循环和线程的主进程
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"进程池初始化完成，最大工作进程数: {self.max_workers}")
+        return self.executor
+
+    async def run_in_process(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """在进程池中运行同步函数，进程池不可用时回退到线程池"""
+        self.stats["total_tasks"] += 1
+        call = functools.partial(func, *args, **kwargs)
+        try:
+            executor = self._get_executor()
+            if executor is not None:
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(executor, call)
+                    self.stats["completed_tasks"] += 1
+                    return result
+                except BrokenProcessPool as e:
+                    # 工作进程异常退出，重建进程池并在线程池中完成本次任务
+                    logger.warning(f"进程池已损坏，重建后回退到线程池执行: {e}")
+                    self.executor = None
+                    executor.shutdown(wait=False)
+
+            from .thread_pool import run_blocking_io
+            self.stats["thread_fallbacks"] += 1
+            result = await run_blocking_io(call)
+            self.stats["completed_tasks"] += 1
+            return result
+        except Exception:
+            self.stats["failed_tasks"] += 1
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取进程池统计信息"""
+        return {"max_workers": self.max_workers, "started": self.executor is not None, **self.stats}
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+            self.executor = None
+            logger.info("进程池已关闭")
+
+
+# 全局进程池实例
+process_pool = ProcessPoolManager()
+
+
+async def run_cpu_bound(func: Callable[..., T], *args, **kwargs) -> T:
+    """运行CPU密集型的同步函数（func 必须是可pickle的模块级函数）"""
+    return await process_pool.run_in_process(func, *args, **kwargs)
@@ -0,0 +1,156 @@
+"""
+静态资源指纹与缓存工具
+
+模板通过 static_url('js/pages/xxx.js') 引用静态资源，URL 中带有文件内容哈希（?v=...），
+内容不变时浏览器长期缓存（immutable），文件改动后哈希变化自动失效。
+较大的文本资源在启动时预先生成 .gz / .br（安装了 brotli 时）压缩副本，按 Accept-Encoding 直接返回。
+"""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from .http_middleware import accepted_encodings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "web" / "static"
+STATIC_URL_PREFIX = "/landppt/static/"
+
+# 带版本号的资源缓存一年，其余资源每次向服务器确认（ETag / Last-Modified）
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# 需要预压缩的文本资源类型及最小体积
+COMPRESSIBLE_SUFFIXES = (".js", ".css", ".svg", ".json", ".html")
+MIN_COMPRESS_SIZE = 1024
+
+# 按优先级排列的压缩编码及对应的文件后缀
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# 文件路径 -> ((mtime, size), 内容哈希)
+_hash_cache: Dict[str, Tuple[Tuple[float, int], str]] = {}
+
+
+def _file_hash(path: Path) -> Optional[str]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    key = (stat.st_mtime, stat.st_size)
+    cached = _hash_cache.get(str(path))
+    if cached and cached[0] == key:
+        return cached[1]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+    _hash_cache[str(path)] = (key, digest)
+    return digest
+
+
+def static_url(asset_path: str) -> str:
+    """返回带内容哈希的静态资源URL（Jinja 全局函数），文件不存在时返回不带版本号的URL"""
+    asset_path = asset_path.lstrip("/")
+    digest = _file_hash(STATIC_DIR / asset_path)
+    url = STATIC_URL_PREFIX + asset_path
+    return f"{url}?v={digest}" if digest else url
+
+
+def precompress_static_assets(directory: Path = STATIC_DIR) -> int:
+    """
+    为静态目录中较大的文本资源生成 .gz / .br 压缩副本（已是最新时跳过）
+
+    Returns:
+        本次新生成的压缩文件数量
+    """
+    created = 0
+    for path in directory.rglob("*"):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        try:
+            stat = path.stat()
+            if stat.st_size < MIN_COMPRESS_SIZE:
+                continue
+            data = None
+            for encoding, suffix in _ENCODINGS:
+                if encoding == "br" and brotli is None:
+                    continue
+                target = path.with_name(path.name + suffix)
+                if target.exists() and target.stat().st_mtime >= stat.st_mtime:
+                    continue
+                if data is None:
+                    data = path.read_bytes()
+                compressed = brotli.compress(data, quality=11) if encoding == "br" else gzip.compress(data, 9, mtime=0)
+                tmp = target.with_name(target.name + ".tmp")
+                tmp.write_bytes(compressed)
+                os.replace(tmp, target)
+                created += 1
+        except OSError as e:
+            # 静态目录只读等情况下直接返回原文件
+            logger.warning(f"生成静态资源压缩副本失败 {path}: {e}")
+            return created
+    if created:
+        logger.info(f"已生成 {created} 个静态资源压缩副本")
+    return created
+
+
+class CachedStaticFiles(StaticFiles):
+    """在 StaticFiles 基础上增加缓存策略和预压缩副本"""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        request_headers = Headers(scope=scope)
+        response = await self._get_precompressed_response(path, scope, request_headers)
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        if response.status_code in (200, 304):
+            versioned = b"v=" in scope.get("query_string", b"")
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL
+            if Path(path).suffix in COMPRESSIBLE_SUFFIXES:
+                response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    async def _get_precompressed_response(self, path: str, scope: Scope,
+                                          request_headers: Headers) -> Optional[Response]:
+        if scope["method"] not in ("GET", "HEAD") or Path(path).suffix not in COMPRESSIBLE_SUFFIXES:
+            return None
+        accepted = accepted_encodings(request_headers)
+        if not accepted:
+            return None
+
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None:
+            return None
+
+        for encoding, suffix in _ENCODINGS:
+            if encoding not in accepted:
+                continue
+            compressed_path, compressed_stat = self.lookup_path(path + suffix)
+            # 原文件修改后压缩副本过期，回退到原文件
+            if compressed_stat is None or compressed_stat.st_mtime < stat_result.st_mtime:
+                continue
+            media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+            response = FileResponse(
+                compressed_path,
+                stat_result=compressed_stat,
+                media_type=media_type,
+                headers={"Content-Encoding": encoding},
+                method=scope["method"]
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+        return None
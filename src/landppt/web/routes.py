@@ -3,7 +3,7 @@ Web interface routes for LandPPT
 """
 
 from fastapi import APIRouter, Request, Form, UploadFile, File, HTTPException, Depends
-from fastapi.responses import HTMLResponse, StreamingResponse, FileResponse, JSONResponse
+from fastapi.responses import HTMLResponse, StreamingResponse, FileResponse, JSONResponse, Response
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 import json
@@ -33,6 +33,8 @@ from ..database.models import User
 from ..database.database import get_db
 from sqlalchemy.orm import Session
 from ..utils.thread_pool import run_blocking_io, to_thread
+from ..utils.static_assets import static_url
+from ..utils.http_middleware import etag_matches
 import re
 from bs4 import BeautifulSoup
 
@@ -65,6 +67,8 @@ def strftime_filter(timestamp, format_string="%Y-%m-%d %H:%M"):
 # Register custom filters
 templates.env.filters["timestamp_to_datetime"] = timestamp_to_datetime
 templates.env.filters["strftime"] = strftime_filter
+# 带内容哈希的静态资源URL，可被浏览器长期缓存
+templates.env.globals["static_url"] = static_url
 
 # Import shared service instances to ensure data consistency
 from ..services.service_instances import ppt_service
@@ -739,29 +743,34 @@ async def web_project_fullscreen(
 ):
     """Fullscreen preview of project PPT with modern presentation interface"""
     try:
-        # 直接从数据库获取最新的项目数据，确保数据实时性
+        # 只读取幻灯片清单（不含HTML），各页内容由浏览器按需加载当前页和相邻页
         from ..services.db_project_manager import DatabaseProjectManager
         db_manager = DatabaseProjectManager()
-        project = await db_manager.get_project(project_id)
+        feed_state = await db_manager.get_slides_feed_state(project_id)
 
-        if not project:
+        if not feed_state:
             return templates.TemplateResponse("error.html", {
                 "request": request,
                 "error": "项目未找到"
             })
 
         # 检查是否有幻灯片数据
-        if not project.slides_data or len(project.slides_data) == 0:
+        if not feed_state["total_slides"]:
             return templates.TemplateResponse("error.html", {
                 "request": request,
                 "error": "PPT尚未生成或无幻灯片内容"
             })
 
+        api_base = _slides_api_base(project_id=project_id)
+        manifest = await db_manager.get_slides_manifest(project_id, feed_state)
+
         # 使用新的分享演示模板
         return templates.TemplateResponse("project_fullscreen_presentation.html", {
             "request": request,
-            "project": project,
-            "slides_count": len(project.slides_data)
+            "project": {"project_id": project_id, "title": feed_state["project_title"]},
+            "slides_count": feed_state["total_slides"],
+            "slides_manifest": _add_slide_urls(manifest, api_base),
+            "manifest_url": f"{api_base}/slides-manifest"
         })
 
     except Exception as e:
@@ -774,53 +783,40 @@ async def web_project_fullscreen(
 @router.get("/share/{share_token}", response_class=HTMLResponse)
 async def web_shared_presentation(
     request: Request,
-    share_token: str,
-    db: Session = Depends(get_db)
+    share_token: str
 ):
     """Public presentation view - no authentication required"""
     try:
-        from ..services.share_service import ShareService
-        share_service = ShareService(db)
-
-        # Validate share token and get project
-        project_model = share_service.validate_share_token(share_token)
+        # Validate share token on the async engine, without loading the project or slide HTML
+        from ..services.db_project_manager import DatabaseProjectManager
+        db_manager = DatabaseProjectManager()
+        project_id = await db_manager.get_shared_project_id(share_token)
+        feed_state = await db_manager.get_slides_feed_state(project_id) if project_id else None
 
-        if not project_model:
+        if not feed_state:
             return templates.TemplateResponse("error.html", {
                 "request": request,
                 "error": "分享链接无效或已失效"
             })
 
         # Check if project has slides
-        if not project_model.slides_data or len(project_model.slides_data) == 0:
+        if not feed_state["total_slides"]:
             return templates.TemplateResponse("error.html", {
                 "request": request,
                 "error": "演示文稿尚未生成"
             })
 
-        # Convert to PPTProject for template compatibility
-        from ..api.models import PPTProject
-        project = PPTProject(
-            project_id=project_model.project_id,
-            title=project_model.title,
-            scenario=project_model.scenario,
-            topic=project_model.topic,
-            requirements=project_model.requirements,
-            status=project_model.status,
-            outline=project_model.outline,
-            slides_html=project_model.slides_html,
-            slides_data=project_model.slides_data,
-            confirmed_requirements=project_model.confirmed_requirements,
-            version=project_model.version,
-            created_at=project_model.created_at,
-            updated_at=project_model.updated_at
-        )
+        api_base = _slides_api_base(share_token=share_token)
+        manifest = await db_manager.get_slides_manifest(project_id, feed_state)
 
         # Render presentation template
         return templates.TemplateResponse("project_fullscreen_presentation.html", {
             "request": request,
-            "project": project,
-            "slides_count": len(project.slides_data),
+            "project": {"project_id": project_id, "title": feed_state["project_title"]},
+            "slides_count": feed_state["total_slides"],
+            "slides_manifest": _add_slide_urls(manifest, api_base, public=True),
+            "manifest_url": f"{api_base}/slides-manifest",
+            "share_token": share_token,
             "is_shared": True  # Flag to indicate this is a shared view
         })
 
@@ -832,18 +828,333 @@ async def web_shared_presentation(
         })
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag (weak comparison)"""
+    return etag_matches(request.headers.get("if-none-match", ""), etag)
+
+
+def _slides_feed_headers(etag: str) -> Dict[str, str]:
+    # no-cache: 浏览器可以缓存，但每次使用前都要带If-None-Match重新验证
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+async def _slides_changes_response(request: Request, project_id: str, since: Optional[int]):
+    """Build a conditional slides change-feed response for a project"""
+    from ..services.db_project_manager import DatabaseProjectManager
+    db_manager = DatabaseProjectManager()
+
+    state = await db_manager.get_slides_feed_state(project_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="项目未找到")
+    headers = _slides_feed_headers(state["etag"])
+    if _etag_matches(request, state["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    changes = await db_manager.get_slides_changes(project_id, since, state)
+    changes["status"] = "success" if state["total_slides"] else "no_slides"
+    return JSONResponse(content=changes, headers=headers)
+
+
+# 带当前版本号（?v=<hash>）的单页HTML内容不会再变化，浏览器可以长期缓存
+SLIDE_IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def _slides_api_base(project_id: Optional[str] = None, share_token: Optional[str] = None) -> str:
+    """Base URL of the slide endpoints for the project owner or a public share link"""
+    if share_token:
+        return f"/landppt/api/share/{share_token}"
+    return f"/landppt/api/projects/{project_id}"
+
+
+def _add_slide_urls(manifest: Dict[str, Any], api_base: str, public: bool = False) -> Dict[str, Any]:
+    """Add per-slide HTML and thumbnail URLs to a slide manifest (public manifests omit slide metadata)"""
+    for slide in manifest["slides"]:
+        index = slide["page_number"] - 1
+        slide["index"] = index
+        slide["html_url"] = f"{api_base}/slides/{index}/html?v={slide['hash']}"
+        slide["thumbnail_url"] = f"{api_base}/slides/{index}/thumbnail?v={slide['hash']}"
+        if public:
+            slide.pop("metadata", None)
+    return manifest
+
+
+async def _slides_manifest_response(request: Request, project_id: str, api_base: str, public: bool = False):
+    """Build a conditional slide manifest response for a project"""
+    from ..services.db_project_manager import DatabaseProjectManager
+    db_manager = DatabaseProjectManager()
+
+    state = await db_manager.get_slides_feed_state(project_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="项目未找到")
+    headers = _slides_feed_headers(state["etag"])
+    if _etag_matches(request, state["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    manifest = _add_slide_urls(await db_manager.get_slides_manifest(project_id, state), api_base, public)
+    manifest["status"] = "success" if state["total_slides"] else "no_slides"
+    return JSONResponse(content=manifest, headers=headers)
+
+
+async def _slide_html_response(request: Request, project_id: str, slide_index: int, version: Optional[str]):
+    """Serve the HTML of a single slide; URLs carrying the current hash are cached as immutable"""
+    from ..services.db_project_manager import DatabaseProjectManager
+
+    slide = await DatabaseProjectManager().get_slide_content(project_id, slide_index)
+    if not slide:
+        raise HTTPException(status_code=404, detail="幻灯片不存在")
+
+    # 旧版本号的URL返回最新内容，但不能被长期缓存
+    cache_control = SLIDE_IMMUTABLE_CACHE_CONTROL if version == slide["hash"] else "private, no-cache"
+    headers = {"ETag": f'"{slide["hash"]}"', "Cache-Control": cache_control}
+    if _etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=slide["html_content"], headers=headers)
+
+
+async def _slide_thumbnail_response(request: Request, project_id: str, slide_index: int, version: Optional[str]):
+    """Serve the rendered WebP thumbnail of a single slide from the content-addressed thumbnail cache"""
+    from ..services.db_project_manager import DatabaseProjectManager
+    from ..services.slide_thumbnail_service import slide_thumbnail_service
+
+    slide = await DatabaseProjectManager().get_slide_content(project_id, slide_index)
+    if not slide:
+        raise HTTPException(status_code=404, detail="幻灯片不存在")
+
+    cache_control = SLIDE_IMMUTABLE_CACHE_CONTROL if version == slide["hash"] else "private, no-cache"
+    headers = {"ETag": f'"{slide_thumbnail_service.content_key(slide["html_content"])}"', "Cache-Control": cache_control}
+    if _etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    path = await slide_thumbnail_service.get_thumbnail(slide["html_content"])
+    if path is None:
+        # 缩略图不可用（未安装Playwright、渲染失败或超时），前端回退到缩放的iframe
+        raise HTTPException(status_code=404, detail="缩略图暂不可用", headers={"Cache-Control": "no-store"})
+    return FileResponse(path, media_type="image/webp", headers=headers)
+
+
+@router.get("/api/share/{share_token}/slides-manifest")
+async def get_shared_slides_manifest(request: Request, share_token: str):
+    """Slide manifest for public shared presentations - no authentication required
+
+    Lists every slide's title, revision, hash and per-slide HTML / thumbnail URLs without any slide HTML.
+    """
+    try:
+        from ..services.db_project_manager import DatabaseProjectManager
+        project_id = await DatabaseProjectManager().get_shared_project_id(share_token)
+        if not project_id:
+            raise HTTPException(status_code=404, detail="分享链接无效或已失效")
+        return await _slides_manifest_response(
+            request, project_id, _slides_api_base(share_token=share_token), public=True
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting shared slides manifest: {e}")
+        raise HTTPException(status_code=500, detail=f"获取幻灯片清单失败: {str(e)}")
+
+
+@router.get("/api/share/{share_token}/slides/{slide_index}/html", response_class=HTMLResponse)
+async def get_shared_slide_html(
+    request: Request,
+    share_token: str,
+    slide_index: int,
+    v: Optional[str] = None
+):
+    """HTML of a single slide of a public shared presentation - no authentication required"""
+    try:
+        from ..services.db_project_manager import DatabaseProjectManager
+        project_id = await DatabaseProjectManager().get_shared_project_id(share_token)
+        if not project_id:
+            raise HTTPException(status_code=404, detail="分享链接无效或已失效")
+        return await _slide_html_response(request, project_id, slide_index, v)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting shared slide html: {e}")
+        raise HTTPException(status_code=500, detail=f"获取幻灯片失败: {str(e)}")
+
+
+@router.get("/api/share/{share_token}/slides/{slide_index}/thumbnail")
+async def get_shared_slide_thumbnail(
+    request: Request,
+    share_token: str,
+    slide_index: int,
+    v: Optional[str] = None
+):
+    """Rendered WebP thumbnail of a slide of a public shared presentation - no authentication required"""
+    try:
+        from ..services.db_project_manager import DatabaseProjectManager
+        project_id = await DatabaseProjectManager().get_shared_project_id(share_token)
+        if not project_id:
+            raise HTTPException(status_code=404, detail="分享链接无效或已失效")
+        return await _slide_thumbnail_response(request, project_id, slide_index, v)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting shared slide thumbnail: {e}")
+        raise HTTPException(status_code=500, detail=f"获取幻灯片缩略图失败: {str(e)}")
+
+
+@router.get("/api/projects/{project_id}/slides-manifest")
+async def get_project_slides_manifest(
+    request: Request,
+    project_id: str,
+    user: User = Depends(get_current_user_required)
+):
+    """幻灯片清单 - 各页标题、修订号、哈希及单页HTML/缩略图地址（不含HTML），ETag未变化时返回304"""
+    try:
+        return await _slides_manifest_response(request, project_id, _slides_api_base(project_id=project_id))
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting slides manifest: {e}")
+        raise HTTPException(status_code=500, detail=f"获取幻灯片清单失败: {str(e)}")
+
+
+@router.get("/api/projects/{project_id}/slides/{slide_index}/html", response_class=HTMLResponse)
+async def get_project_slide_html(
+    request: Request,
+    project_id: str,
+    slide_index: int,
+    v: Optional[str] = None,
+    user: User = Depends(get_current_user_required)
+):
+    """单页幻灯片HTML - 带当前哈希（?v=）的地址可被浏览器长期缓存"""
+    try:
+        return await _slide_html_response(request, project_id, slide_index, v)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting slide html: {e}")
+        raise HTTPException(status_code=500, detail=f"获取幻灯片失败: {str(e)}")
+
+
+@router.get("/api/projects/{project_id}/slides/{slide_index}/thumbnail")
+async def get_project_slide_thumbnail(
+    request: Request,
+    project_id: str,
+    slide_index: int,
+    v: Optional[str] = None,
+    user: User = Depends(get_current_user_required)
+):
+    """单页幻灯片缩略图（服务端渲染的WebP）- 带当前哈希（?v=）的地址可被浏览器长期缓存"""
+    try:
+        return await _slide_thumbnail_response(request, project_id, slide_index, v)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting slide thumbnail: {e}")
+        raise HTTPException(status_code=500, detail=f"获取幻灯片缩略图失败: {str(e)}")
+
+
+@router.get("/api/share/{share_token}/slides-changes")
+async def get_shared_slides_changes(
+    request: Request,
+    share_token: str,
+    since: Optional[int] = None
+):
+    """Slides change feed for public shared presentations - no authentication required
+
+    Returns the slides whose revision is newer than `since` (all slides when omitted),
+    or 304 when the If-None-Match ETag is still current.
+    """
+    try:
+        from ..services.db_project_manager import DatabaseProjectManager
+        project_id = await DatabaseProjectManager().get_shared_project_id(share_token)
+        if not project_id:
+            raise HTTPException(status_code=404, detail="分享链接无效或已失效")
+        return await _slides_changes_response(request, project_id, since)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting shared slides changes: {e}")
+        raise HTTPException(status_code=500, detail=f"获取幻灯片变更失败: {str(e)}")
+
+
+@router.get("/api/projects/{project_id}/slides-changes")
+async def get_project_slides_changes(
+    request: Request,
+    project_id: str,
+    since: Optional[int] = None,
+    user: User = Depends(get_current_user_required)
+):
+    """幻灯片变更订阅 - 只返回修订号大于since的幻灯片，ETag未变化时返回304"""
+    try:
+        return await _slides_changes_response(request, project_id, since)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting slides changes: {e}")
+        raise HTTPException(status_code=500, detail=f"获取幻灯片变更失败: {str(e)}")
+
+
+@router.get("/api/events/stream")
+async def project_events_stream(
+    request: Request,
+    user: User = Depends(get_current_user_required)
+):
+    """当前用户所有项目的事件流（SSE）- 待办阶段、幻灯片保存和演讲稿进度变化时推送，页面据此刷新而不是轮询"""
+    from ..services.event_hub import project_event_hub
+
+    queue = project_event_hub.subscribe(user.username)
+
+    async def generate_events():
+        try:
+            # 连接（包括断线重连）建立后页面先同步一次当前状态
+            yield "retry: 5000\n\n"
+            yield f"data: {json.dumps({'type': 'connected'})}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=25)
+                except asyncio.TimeoutError:
+                    # 心跳，防止代理关闭空闲连接
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+        finally:
+            project_event_hub.unsubscribe(user.username, queue)
+
+    return StreamingResponse(
+        generate_events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/api/share/{share_token}/slides-data")
 async def get_shared_slides_data(
-    share_token: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    share_token: str
 ):
     """Get slides data for public shared presentation - no authentication required"""
     try:
-        from ..services.share_service import ShareService
-        share_service = ShareService(db)
+        # 先用轻量查询比较ETag，未变化时不加载整个项目
+        from ..services.db_project_manager import DatabaseProjectManager
+        db_manager = DatabaseProjectManager()
+        shared_project_id = await db_manager.get_shared_project_id(share_token)
+        feed_state = await db_manager.get_slides_feed_state(shared_project_id) if shared_project_id else None
+        if feed_state:
+            response.headers.update(_slides_feed_headers(feed_state["etag"]))
+            if _etag_matches(request, feed_state["etag"]):
+                return Response(status_code=304, headers=_slides_feed_headers(feed_state["etag"]))
+
+        if not shared_project_id:
+            raise HTTPException(status_code=404, detail="分享链接无效或已失效")
 
-        # Validate share token and get project
-        project = share_service.validate_share_token(share_token)
+        project = await db_manager.get_project(shared_project_id)
 
         if not project:
             raise HTTPException(status_code=404, detail="分享链接无效或已失效")
@@ -861,7 +1172,8 @@ async def get_shared_slides_data(
             "slides_data": project.slides_data,
             "total_slides": len(project.slides_data),
             "project_title": project.title,
-            "updated_at": project.updated_at
+            "updated_at": project.updated_at,
+            "revision": feed_state["revision"] if feed_state else 0
         }
 
     except HTTPException:
@@ -873,14 +1185,24 @@ async def get_shared_slides_data(
 
 @router.get("/api/projects/{project_id}/slides-data")
 async def get_project_slides_data(
+    request: Request,
+    response: Response,
     project_id: str,
     user: User = Depends(get_current_user_required)
 ):
-    """获取项目最新的幻灯片数据 - 用于分享演示实时更新"""
+    """获取项目最新的幻灯片数据 - 用于分享演示实时更新（增量更新请使用 slides-changes）"""
     try:
         # 直接从数据库获取最新数据
         from ..services.db_project_manager import DatabaseProjectManager
         db_manager = DatabaseProjectManager()
+
+        # 先用轻量查询比较ETag，未变化时不加载整个项目
+        feed_state = await db_manager.get_slides_feed_state(project_id)
+        if feed_state:
+            response.headers.update(_slides_feed_headers(feed_state["etag"]))
+            if _etag_matches(request, feed_state["etag"]):
+                return Response(status_code=304, headers=_slides_feed_headers(feed_state["etag"]))
+
         project = await db_manager.get_project(project_id)
 
         if not project:
@@ -899,7 +1221,8 @@ async def get_project_slides_data(
             "slides_data": project.slides_data,
             "total_slides": len(project.slides_data),
             "project_title": project.title,
-            "updated_at": project.updated_at
+            "updated_at": project.updated_at,
+            "revision": feed_state["revision"] if feed_state else 0
         }
 
     except Exception as e:
@@ -1260,7 +1583,7 @@ async def generate_outline(
         page_count_settings = confirmed_requirements.get('page_count_settings', {})
 
         # Generate outline using AI with page count settings
-        outline = await ppt_service.generate_outline(project_request, page_count_settings)
+        outline = await ppt_service.generate_outline(project_request, page_count_settings, project_id=project_id)
 
         # Convert outline to dict format
         outline_dict = {
@@ -1402,7 +1725,7 @@ async def regenerate_outline(
             }
         else:
             # Use standard outline generation
-            outline = await ppt_service.generate_outline(project_request, page_count_settings)
+            outline = await ppt_service.generate_outline(project_request, page_count_settings, project_id=project_id)
 
             # Convert outline to dict format
             outline_dict = {
@@ -1930,13 +2253,11 @@ async def edit_project_ppt(
             raise HTTPException(status_code=404, detail="Project not found")
 
         # 允许编辑器在PPT生成过程中显示，提供更好的用户体验
-        # 如果没有slides_data，创建一个空的结构供编辑器使用
-        if not project.slides_data:
-            project.slides_data = []
-
+        # 页面只渲染编辑器外壳，前端先获取 slides-manifest 清单，再按页加载可缓存的幻灯片HTML
         return templates.TemplateResponse("project_slides_editor.html", {
             "request": request,
             "project": project,
+            "slides_count": len(project.slides_data or []),
             "enable_auto_layout_repair": ai_config.enable_auto_layout_repair
         })
 
@@ -2345,11 +2666,13 @@ async def auto_repair_layout(
         slide_payload.setdefault("page_number", slide_index)
         slide_payload.setdefault("title", slide_payload.get("title", f"第{slide_index}页"))
 
+        # 用户主动请求修复时不经过几何预检，始终进行视觉检测
         repaired_html = await ppt_service._apply_auto_layout_repair(
             html_content,
             slide_payload,
             slide_index,
-            total_pages or slide_index
+            total_pages or slide_index,
+            require_geometry_issues=False
         )
 
         changed = repaired_html.strip() != html_content
@@ -3641,64 +3964,62 @@ async def generate_speech_script(
                 "error": "Invalid generation type"
             }
 
+        generation_params = {
+            'generation_type': request.generation_type,
+            'tone': customization.tone.value,
+            'target_audience': customization.target_audience.value,
+            'language_complexity': customization.language_complexity.value,
+            'custom_audience': request.customization.get('custom_audience'),
+            'custom_style_prompt': customization.custom_style_prompt,
+            'include_transitions': customization.include_transitions,
+            'include_timing_notes': customization.include_timing_notes,
+            'speaking_pace': customization.speaking_pace
+        }
+
         # Start async generation task
         async def generate_async():
+            from ..services.speech_script_repository import SpeechScriptRepository
+            from ..services.progress_tracker import progress_tracker
+
+            repo = SpeechScriptRepository()
+            save_lock = asyncio.Lock()
+            saved_count = 0
+
+            async def save_script(script):
+                """Persist each script as soon as it is generated"""
+                nonlocal saved_count
+                async with save_lock:
+                    await repo.save_speech_script(
+                        project_id=project_id,
+                        slide_index=script.slide_index,
+                        slide_title=script.slide_title,
+                        script_content=script.script_content,
+                        generation_params=generation_params,
+                        estimated_duration=script.estimated_duration
+                    )
+                    saved_count += 1
+                    logger.debug(f"Saved script for slide {script.slide_index} (task {task_id})")
+
             try:
                 logger.info(f"Starting async generation for task {task_id}")
 
                 # Generate scripts based on type
-                if request.generation_type == "single":
+                if request.generation_type in ("single", "multi"):
                     # Use multi_slide_scripts_with_retry for single slide to get progress tracking
                     result = await speech_service.generate_multi_slide_scripts_with_retry(
-                        project, request.slide_indices, customization, task_id=task_id
-                    )
-                elif request.generation_type == "multi":
-                    result = await speech_service.generate_multi_slide_scripts_with_retry(
-                        project, request.slide_indices, customization, task_id=task_id
+                        project, request.slide_indices, customization, task_id=task_id,
+                        on_script_generated=save_script
                     )
                 elif request.generation_type == "full":
                     result = await speech_service.generate_full_presentation_scripts(
-                        project, customization, progress_callback=None, task_id=task_id
+                        project, customization, progress_callback=None, task_id=task_id,
+                        on_script_generated=save_script
                     )
 
-                # Save scripts to database if successful
                 if result.success:
-                    logger.info(f"Generation successful for task {task_id}, saving to database")
-                    from ..services.speech_script_repository import SpeechScriptRepository
-                    repo = SpeechScriptRepository()
-
-                    generation_params = {
-                        'generation_type': request.generation_type,
-                        'tone': customization.tone.value,
-                        'target_audience': customization.target_audience.value,
-                        'language_complexity': customization.language_complexity.value,
-                        'custom_audience': request.customization.get('custom_audience'),
-                        'custom_style_prompt': customization.custom_style_prompt,
-                        'include_transitions': customization.include_transitions,
-                        'include_timing_notes': customization.include_timing_notes,
-                        'speaking_pace': customization.speaking_pace
-                    }
-
-                    saved_count = 0
-                    for script in result.scripts:
-                        await repo.save_speech_script(
-                            project_id=project_id,
-                            slide_index=script.slide_index,
-                            slide_title=script.slide_title,
-                            script_content=script.script_content,
-                            generation_params=generation_params,
-                            estimated_duration=script.estimated_duration
-                        )
-                        saved_count += 1
-                        logger.debug(f"Saved script {saved_count}/{len(result.scripts)} for slide {script.slide_index}")
-
-                    # Ensure all changes are committed before closing
-                    repo.db.commit()
-                    repo.close()
-                    logger.info(f"All {saved_count} scripts saved and committed to database for task {task_id}")
+                    logger.info(f"All {saved_count} scripts saved to database for task {task_id}")
 
                     # NOW mark the task as completed after database save
-                    from ..services.progress_tracker import progress_tracker
                     progress_tracker.complete_task(
                         task_id,
                         f"生成完成！成功 {saved_count} 页"
@@ -3709,8 +4030,9 @@ async def generate_speech_script(
 
             except Exception as e:
                 logger.error(f"Async speech script generation failed for task {task_id}: {e}")
-                from ..services.progress_tracker import progress_tracker
                 progress_tracker.fail_task(task_id, str(e))
+            finally:
+                repo.close()
 
         # Start the async task
         asyncio.create_task(generate_async())
@@ -3991,7 +4313,7 @@ async def get_speech_script_result(
             }
 
         # 获取进度信息
-        progress_info = progress_tracker.get_progress(task_id)
+        progress_info = await progress_tracker.get_progress_async(task_id)
 
         if not progress_info:
             return {
@@ -4080,9 +4402,10 @@ async def get_speech_script_result(
 async def get_speech_script_progress(
     project_id: str,
     task_id: str,
+    scripts_since: int = 0,
     user: User = Depends(get_current_user_required)
 ):
-    """获取演讲稿生成进度"""
+    """获取演讲稿生成进度，completed_scripts 仅返回第 scripts_since 条之后新完成的演讲稿"""
     try:
         from ..services.progress_tracker import progress_tracker
 
@@ -4095,7 +4418,7 @@ async def get_speech_script_progress(
             }
 
         # 获取进度信息
-        progress_info = progress_tracker.get_progress(task_id)
+        progress_info = await progress_tracker.get_progress_async(task_id)
 
         if not progress_info:
             return {
@@ -4110,9 +4433,13 @@ async def get_speech_script_progress(
                 "error": "Access denied"
             }
 
+        progress = progress_info.to_dict()
+        progress["scripts_total"] = len(progress["completed_scripts"])
+        progress["completed_scripts"] = progress["completed_scripts"][max(0, scripts_since):]
+
         return {
             "success": True,
-            "progress": progress_info.to_dict()
+            "progress": progress
         }
 
     except Exception as e:
@@ -4752,9 +5079,29 @@ async def batch_save_slides(
         return {"success": False, "error": str(e)}
 
 
+def _get_export_user_key(http_request: Optional[Request]) -> str:
+    """导出队列的用户公平性标识：登录用户名，否则客户端地址"""
+    if http_request is not None:
+        user = getattr(http_request.state, 'user', None)
+        if user is not None:
+            return user.username
+        if http_request.client:
+            return http_request.client.host
+    return "anonymous"
+
+
+def _export_queue_full_exception(e: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(e),
+        headers={"Retry-After": str(getattr(e, 'retry_after', 30))}
+    )
+
+
 @router.get("/api/projects/{project_id}/export/pdf")
-async def export_project_pdf(project_id: str, individual: bool = False):
+async def export_project_pdf(project_id: str, http_request: Request, individual: bool = False):
     """Export project as PDF using Pyppeteer"""
+    from ..services.export_queue import export_queue, ExportPriority, ExportQueueFullError
     try:
         project = await ppt_service.project_manager.get_project(project_id)
         if not project:
@@ -4778,7 +5125,14 @@ async def export_project_pdf(project_id: str, individual: bool = False):
         )
 
         logging.info("Generating PDF with Pyppeteer")
-        success = await _generate_pdf_with_pyppeteer(project, temp_pdf_path, individual)
+        try:
+            success = await export_queue.run(
+                "pdf", _generate_pdf_with_pyppeteer, project, temp_pdf_path, individual,
+                user_key=_get_export_user_key(http_request), priority=ExportPriority.INTERACTIVE
+            )
+        except ExportQueueFullError as e:
+            await run_blocking_io(lambda: os.unlink(temp_pdf_path) if os.path.exists(temp_pdf_path) else None)
+            raise _export_queue_full_exception(e)
 
         if not success:
             # Clean up temp file and raise error
@@ -4814,13 +5168,15 @@ async def export_project_pdf(project_id: str, individual: bool = False):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/projects/{project_id}/export/pdf/individual")
-async def export_project_pdf_individual(project_id: str):
+async def export_project_pdf_individual(project_id: str, http_request: Request):
     """Export project as individual PDF files for each slide"""
-    return await export_project_pdf(project_id, individual=True)
+    return await export_project_pdf(project_id, http_request, individual=True)
 
 @router.get("/api/projects/{project_id}/export/pptx")
-async def export_project_pptx(project_id: str):
+async def export_project_pptx(project_id: str, http_request: Request):
     """Export project as PPTX by first generating PDF then converting to PowerPoint"""
+    from ..services.export_queue import export_queue, ExportPriority, ExportQueueFullError
+    user_key = _get_export_user_key(http_request)
     try:
         project = await ppt_service.project_manager.get_project(project_id)
         if not project:
@@ -4851,7 +5207,17 @@ async def export_project_pptx(project_id: str):
             temp_pdf_path = temp_pdf_file.name
 
         logging.info("Step 1: Generating PDF for PPTX conversion")
-        pdf_success = await _generate_pdf_with_pyppeteer(project, temp_pdf_path, individual=False)
+        try:
+            pdf_success = await export_queue.run(
+                "pdf", _generate_pdf_with_pyppeteer, project, temp_pdf_path, individual=False,
+                user_key=user_key, priority=ExportPriority.NORMAL
+            )
+        except ExportQueueFullError as e:
+            try:
+                os.unlink(temp_pdf_path)
+            except:
+                pass
+            raise _export_queue_full_exception(e)
 
         if not pdf_success:
             # Clean up temp file and raise error
@@ -4928,16 +5294,24 @@ async def export_project_pptx(project_id: str):
                 }
 
 
+        async def queued_pdf_to_pptx_task():
+            """在导出队列中以批量优先级执行转换"""
+            return await export_queue.run(
+                "pdf_to_pptx", pdf_to_pptx_task,
+                user_key=user_key, priority=ExportPriority.BULK, job_id=task_id
+            )
+
         # 提交后台任务
-        task_id = task_manager.submit_task(
+        task_id = await task_manager.submit_task_async(
             task_type="pdf_to_pptx_conversion",
-            func=pdf_to_pptx_task,
+            func=queued_pdf_to_pptx_task,
             metadata={
                 "project_id": project_id,
                 "project_topic": project.topic,
                 "pdf_path": temp_pdf_path,
                 "pptx_path": temp_pptx_path
-            }
+            },
+            result_files=[temp_pdf_path, temp_pptx_path]
         )
 
         # 立即返回任务ID，不等待任务完成
@@ -4955,8 +5329,10 @@ async def export_project_pptx(project_id: str):
 
 
 @router.post("/api/projects/{project_id}/export/pptx-images")
-async def export_project_pptx_from_images(project_id: str, request: ImagePPTXExportRequest):
+async def export_project_pptx_from_images(project_id: str, request: ImagePPTXExportRequest, http_request: Request):
     """Export project as PPTX using high-quality Playwright screenshots"""
+    from ..services.export_queue import export_queue, ExportPriority, ExportQueueFullError
+    user_key = _get_export_user_key(http_request)
     try:
         from io import BytesIO
         from pptx import Presentation
@@ -4979,6 +5355,12 @@ async def export_project_pptx_from_images(project_id: str, request: ImagePPTXExp
                 detail="Screenshot service unavailable. Please ensure Playwright is installed."
             )
 
+        # 超出导出容量时直接拒绝，而不是创建注定排不上的任务
+        try:
+            export_queue.check_admission(user_key)
+        except ExportQueueFullError as e:
+            raise _export_queue_full_exception(e)
+
         # 创建后台任务
         from ..services.background_tasks import get_task_manager
         task_manager = get_task_manager()
@@ -5094,16 +5476,24 @@ async def export_project_pptx_from_images(project_id: str, request: ImagePPTXExp
                 except Exception as cleanup_error:
                     logging.warning(f"Failed to cleanup temp directory: {cleanup_error}")
 
+        async def queued_html_to_pptx_task():
+            """在导出队列中以批量优先级执行截图导出"""
+            return await export_queue.run(
+                "pptx_images", html_to_pptx_task,
+                user_key=user_key, priority=ExportPriority.BULK, job_id=task_id
+            )
+
         # 提交后台任务
-        task_id = task_manager.submit_task(
+        task_id = await task_manager.submit_task_async(
             task_type="html_to_pptx_screenshot",
-            func=html_to_pptx_task,
+            func=queued_html_to_pptx_task,
             metadata={
                 "project_id": project_id,
                 "project_topic": project.topic,
                 "slide_count": len(slides),
                 "pptx_path": temp_pptx_path
-            }
+            },
+            result_files=[temp_pptx_path]
         )
 
         # 立即返回任务ID
@@ -5130,7 +5520,7 @@ async def get_task_status(task_id: str):
     from ..services.background_tasks import get_task_manager
 
     task_manager = get_task_manager()
-    task = task_manager.get_task(task_id)
+    task = await task_manager.get_task_async(task_id)
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -5145,6 +5535,14 @@ async def get_task_status(task_id: str):
         "metadata": task.metadata
     }
 
+    # 在本进程导出队列中排队的任务，报告排队位置
+    if task.status.value in ("pending", "running"):
+        from ..services.export_queue import export_queue
+        queue_position = export_queue.get_position(task_id)
+        if queue_position is not None:
+            response["queue_position"] = queue_position
+            response["queued"] = queue_position > 0
+
     # 如果任务完成，添加结果信息
     if task.status.value == "completed" and task.result:
         response["result"] = task.result
@@ -5159,6 +5557,13 @@ async def get_task_status(task_id: str):
     return JSONResponse(response)
 
 
+@router.get("/api/landppt/export-queue/status")
+async def get_export_queue_status(user: User = Depends(get_current_user_required)):
+    """查询导出队列状态（本worker）"""
+    from ..services.export_queue import export_queue
+    return JSONResponse(export_queue.get_stats())
+
+
 @router.get("/api/landppt/tasks/{task_id}/download")
 async def download_task_result(task_id: str):
     """下载任务结果文件"""
@@ -5166,7 +5571,7 @@ async def download_task_result(task_id: str):
     from starlette.background import BackgroundTask
 
     task_manager = get_task_manager()
-    task = task_manager.get_task(task_id)
+    task = await task_manager.get_task_async(task_id)
 
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -5212,8 +5617,9 @@ async def download_task_result(task_id: str):
 
 
 @router.get("/api/projects/{project_id}/export/html")
-async def export_project_html(project_id: str):
+async def export_project_html(project_id: str, http_request: Request):
     """Export project as HTML ZIP package with slideshow index"""
+    from ..services.export_queue import export_queue, ExportPriority, ExportQueueFullError
     try:
         project = await ppt_service.project_manager.get_project(project_id)
         if not project:
@@ -5223,8 +5629,20 @@ async def export_project_html(project_id: str):
         if not project.slides_data or len(project.slides_data) == 0:
             raise HTTPException(status_code=400, detail="PPT not generated yet")
 
-        # Create temporary directory and generate files in thread pool
-        zip_content = await run_blocking_io(_generate_html_export_sync, project)
+        # Embed cached images so the exported package works offline
+        from ..services.inline_image_service import inline_image_service
+        project = project.model_copy(update={
+            "slides_data": await inline_image_service.inline_slides(project.slides_data)
+        })
+
+        # Create temporary directory and generate files in thread pool (through the export queue)
+        try:
+            zip_content = await export_queue.run(
+                "html_zip", _generate_html_export_sync, project,
+                user_key=_get_export_user_key(http_request), priority=ExportPriority.INTERACTIVE
+            )
+        except ExportQueueFullError as e:
+            raise _export_queue_full_exception(e)
 
         # URL encode the filename to handle Chinese characters
         zip_filename = f"{project.topic}_PPT.zip"
@@ -5239,6 +5657,8 @@ async def export_project_html(project_id: str):
             }
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -0,0 +1,120 @@
+// Shared project event stream: one EventSource per page, pushed by the server
+// whenever a todo stage, slide or speech script progress changes.
+const STREAM_URL = '/landppt/api/events/stream';
+
+const handlers = new Set();
+let source = null;
+
+function dispatch(event) {
+    handlers.forEach((handler) => {
+        try {
+            handler(event);
+        } catch (error) {
+            console.error('Project event handler failed:', error);
+        }
+    });
+}
+
+function connect() {
+    if (source || typeof EventSource === 'undefined') {
+        return;
+    }
+    source = new EventSource(STREAM_URL, { withCredentials: true });
+    source.onmessage = (message) => {
+        let event;
+        try {
+            event = JSON.parse(message.data);
+        } catch (error) {
+            return;
+        }
+        dispatch(event);
+    };
+    // EventSource reconnects on its own; a fresh 'connected' event follows each reconnect
+}
+
+function disconnect() {
+    if (source) {
+        source.close();
+        source = null;
+    }
+}
+
+/**
+ * Subscribe to project events.
+ *
+ * The handler also receives `{ type: 'connected' }` after every (re)connect so the
+ * page can resync anything it missed while disconnected.
+ *
+ * @param {(event: object) => void} handler
+ * @param {{ projectId?: string, types?: string[] }} [options] only deliver matching events
+ * @returns {() => void} unsubscribe
+ */
+export function subscribeProjectEvents(handler, { projectId, types } = {}) {
+    const typeFilter = types ? new Set(types) : null;
+    const wrapped = (event) => {
+        if (event.type !== 'connected') {
+            if (projectId && String(event.project_id) !== String(projectId)) {
+                return;
+            }
+            if (typeFilter && !typeFilter.has(event.type)) {
+                return;
+            }
+        }
+        handler(event);
+    };
+    handlers.add(wrapped);
+    connect();
+    return () => {
+        handlers.delete(wrapped);
+        if (!handlers.size) {
+            disconnect();
+        }
+    };
+}
+
+export function isProjectEventsSupported() {
+    return typeof EventSource !== 'undefined';
+}
+
+/**
+ * Reload the page after a relevant project change (list/dashboard pages that are
+ * rendered server side). Bursts of events cause a single reload, and a hidden tab
+ * waits until it becomes visible again.
+ *
+ * @param {(event: object) => boolean} isRelevant
+ * @param {number} [delay] debounce in milliseconds
+ */
+export function reloadOnProjectChanges(isRelevant, delay = 2000) {
+    let timer = null;
+    let pending = false;
+
+    const reloadWhenVisible = () => {
+        if (document.visibilityState === 'hidden') {
+            pending = true;
+            return;
+        }
+        window.location.reload();
+    };
+
+    document.addEventListener('visibilitychange', () => {
+        if (pending && document.visibilityState === 'visible') {
+            window.location.reload();
+        }
+    });
+
+    return subscribeProjectEvents((event) => {
+        if (event.type === 'connected' || !isRelevant(event) || timer) {
+            return;
+        }
+        timer = setTimeout(reloadWhenVisible, delay);
+    });
+}
+
+export default subscribeProjectEvents;
+
+// Inline (non-module) page scripts use the global
+window.ProjectEvents = {
+    subscribe: subscribeProjectEvents,
+    isSupported: isProjectEventsSupported,
+    reloadOnChanges: reloadOnProjectChanges
+};
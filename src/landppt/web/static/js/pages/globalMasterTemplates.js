@@ -182,7 +182,6 @@ function renderTemplates() {
     });
 
     dom.templatesGrid.appendChild(fragment);
-    setupPreviewObserver();
 }
 
 function buildTemplateCard(template) {
@@ -202,12 +201,12 @@ function buildTemplateCard(template) {
 
     card.innerHTML = `
         <div class="template-preview">
-            <iframe
-                class="template-preview-iframe"
-                title="${template.template_name}"
-                data-template-id="${template.id}"
+            <img
+                class="template-preview-image"
+                src="${template.preview_image}"
+                alt="${template.template_name}"
                 loading="lazy"
-            ></iframe>
+            >
             <div class="preview-overlay" data-action="preview" data-template-id="${template.id}" title="点击查看完整预览">
                 <div class="preview-overlay-text"><i class="fas fa-search-plus"></i> 点击放大预览</div>
             </div>
@@ -226,10 +225,25 @@ function buildTemplateCard(template) {
         </div>
     `;
 
+    const image = card.querySelector('.template-preview-image');
+    image.addEventListener('error', () => usePreviewIframe(image, template), { once: true });
+
     return card;
 }
 
-function setupPreviewObserver() {
+// The server renders previews with a headless browser; without one (or on failure)
+// fall back to rendering the template HTML in a scaled iframe
+function usePreviewIframe(image, template) {
+    const iframe = document.createElement('iframe');
+    iframe.className = 'template-preview-iframe';
+    iframe.title = template.template_name;
+    iframe.dataset.templateId = template.id;
+    iframe.loading = 'lazy';
+    image.replaceWith(iframe);
+    observePreviewIframe(iframe);
+}
+
+function observePreviewIframe(iframe) {
     if (!dom.templatesGrid) return;
     if (!previewObserver) {
         previewObserver = new IntersectionObserver((entries) => {
@@ -244,9 +258,7 @@ function setupPreviewObserver() {
         }, { root: dom.templatesGrid, rootMargin: '120px' });
     }
 
-    dom.templatesGrid.querySelectorAll('.template-preview-iframe').forEach((iframe) => {
-        previewObserver.observe(iframe);
-    });
+    previewObserver.observe(iframe);
 }
 
 async function loadTemplatePreview(templateId, iframe) {
@@ -336,26 +348,10 @@ function showLoading(show) {
 
 async function updateTagFilter() {
     if (!dom.tagFilter) return;
-    const allTags = new Set();
-    const maxPageSize = 100; // FastAPI constraint: page_size <= 100
-    let currentPage = 1;
-    let totalPages = 1;
 
     try {
-        do {
-            const data = await apiClient.get('/api/global-master-templates/', {
-                active_only: 'true',
-                page_size: maxPageSize,
-                page: currentPage
-            });
-
-            (data.templates || []).forEach((template) => {
-                (template.tags || []).forEach((tag) => allTags.add(tag.trim()));
-            });
-
-            totalPages = data.pagination?.total_pages || 1;
-            currentPage += 1;
-        } while (currentPage <= totalPages);
+        const data = await apiClient.get('/api/global-master-templates/tags', { active_only: 'true' });
+        const allTags = new Set((data.tags || []).map((tag) => tag.trim()));
 
         const currentValue = dom.tagFilter.value;
         dom.tagFilter.innerHTML = '<option value="">所有标签</option>';
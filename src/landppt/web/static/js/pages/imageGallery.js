@@ -771,7 +771,7 @@ async function showImageDetail(imageId) {
 
             // 填充详情信息
             document.getElementById('image-detail-title').textContent = data.image.title || data.image.filename;
-            document.getElementById('detail-image').src = `${window.location.origin}/landppt/api/image/view/${imageId}`;
+            document.getElementById('detail-image').src = `${window.location.origin}/landppt/api/image/thumbnail/${imageId}?size=preview`;
 
             // 填充可编辑的图片信息
             document.getElementById('display-title').textContent = data.image.title || '未设置';
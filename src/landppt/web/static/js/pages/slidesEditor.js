@@ -0,0 +1,6265 @@
+        let currentSlideIndex = 0;
+        let currentMode = 'preview';
+        const editorProject = JSON.parse(document.getElementById('projectDataScript').textContent);
+        const projectId = editorProject.projectId;
+        window.projectId = projectId;
+
+        // 页面只输出编辑器外壳，幻灯片数据在加载完成后通过接口获取（见 loadEditorSlides）
+        let slidesData = [];
+        window.slidesData = slidesData;
+        // 幻灯片HTML -> 服务端渲染的缩略图地址（只对与服务器一致、未在本地修改的内容有效）
+        const serverThumbnailUrls = new Map();
+        let slideshowIndex = 0;
+        let isSlideshow = false;
+
+        const projectMeta = JSON.parse(document.getElementById('projectMetaScript').textContent);
+        let projectStatus = projectMeta.status || '';
+        let projectOutline = projectMeta.outline || null;
+        window.projectOutline = projectOutline;
+
+        // AI编辑相关变量
+        let aiChatHistory = {}; // 改为对象，按幻灯片索引存储对话历史
+        let isAISending = false;
+        let isResizingSidebar = false;
+        let sidebarStartWidth = 500;
+        let sidebarStartX = 0;
+
+        // 图片上传相关变量
+        let uploadedImages = window.uploadedImages || [];
+        window.uploadedImages = uploadedImages;
+        let isImageUploadExpanded = false;
+        let isUploading = false;
+        let currentPreviewImage = null; // 当前预览的图片信息
+        let selectedLibraryImages = []; // 从图床选择的图片
+        let libraryImages = []; // 图床中的所有图片
+
+        // 视觉模式相关变量
+        let visionModeEnabled = false;
+        let filteredLibraryImages = []; // 搜索过滤后的图片
+        let currentSearchTerm = ''; // 当前搜索关键词
+        let currentPage = 1; // 当前页码
+        let totalPages = 1; // 总页数
+        let totalCount = 0; // 总图片数
+        let perPage = 1000; // 每页显示数量（设置为大值以获取所有图片）
+
+        // CodeMirror编辑器相关变量
+        let codeMirrorEditor = null;
+        let isCodeMirrorInitialized = false;
+
+        // 创建安全的data URL
+        function createDataUrl(html) {
+            try {
+                const encoded = btoa(unescape(encodeURIComponent(html)));
+                return `data:text/html;charset=utf-8;base64,${encoded}`;
+            } catch (error) {
+                throw error;
+            }
+        }
+
+        // 优化的iframe内容设置函数，减少卡顿
+        function prepareHtmlForPreview(html) {
+            if (typeof html !== 'string') {
+                return html;
+            }
+
+            let prepared = html.replace(/integrity="[^"]*"/gi, '')
+                               .replace(/crossorigin="[^"]*"/gi, '');
+
+            prepared = prepared.replace(
+                /<script\s+src="https:\/\/cdnjs\.cloudflare\.com\/ajax\/libs\/d3\/[\d\.]+\/d3\.min\.js"[^>]*><\/script>/gi,
+                '<' + 'script src="https://cdnjs.cloudflare.com/ajax/libs/d3/7.9.0/d3.min.js"></' + 'script>'
+            );
+
+            return prepared;
+        }
+
+        function setSafeIframeContent(iframe, html, options = {}) {
+            const { force = false } = options || {};
+
+            if (!iframe) {
+                return;
+            }
+
+            if (!html) {
+                return;
+            }
+
+            if (keepServerThumbnail(iframe, html)) {
+                return;
+            }
+
+            const preparedHtml = prepareHtmlForPreview(html);
+
+            if (!force && iframe.getAttribute('data-current-content') === preparedHtml) {
+                return;
+            }
+
+            // 先清理现有的Chart实例，防止重复渲染
+            cleanupIframeCharts(iframe);
+
+            // 使用requestAnimationFrame优化性能
+            requestAnimationFrame(() => {
+                try {
+                    // 直接设置srcdoc，减少延迟
+                    iframe.srcdoc = preparedHtml;
+                    iframe.setAttribute('data-current-content', preparedHtml);
+
+                    // 简化的加载完成处理
+                    iframe.onload = function() {
+                        // 减少延迟，提高响应速度
+                        setTimeout(() => {
+                            try {
+                                const iframeDoc = iframe.contentDocument || iframe.contentWindow.document;
+                                const chartElements = iframeDoc.querySelectorAll('canvas[id*="chart"], canvas[id*="Chart"]');
+
+                                if (chartElements.length > 0) {
+                                    const iframeWindow = iframe.contentWindow;
+                                    if (iframeWindow && iframeWindow.Chart) {
+                                        // Chart.js库已加载，图表正常渲染
+                                    }
+                                }
+                            } catch (e) {
+                                // 静默处理错误，避免控制台噪音
+                            }
+                        }, 50); // 减少延迟时间
+                    };
+                } catch (e) {
+                    // 设置iframe内容失败
+                }
+            });
+        }
+
+        // 侧边栏缩略图优先显示服务端渲染的图片；内容与图片不再一致（本地修改过）时换回实时渲染的iframe
+        function keepServerThumbnail(iframe, html) {
+            const image = iframe.parentElement && iframe.parentElement.querySelector('.slide-thumbnail-image');
+            if (!image) {
+                return false;
+            }
+            if (serverThumbnailUrls.get(html) === image.getAttribute('src')) {
+                return true;
+            }
+            image.remove();
+            iframe.style.display = '';
+            return false;
+        }
+
+        function refreshSlidePreview(index, options = {}) {
+            const { force = false } = options || {};
+            const targetIndex = typeof index === 'number' ? index : currentSlideIndex;
+
+            if (!slidesData || targetIndex < 0 || targetIndex >= slidesData.length) {
+                return;
+            }
+
+            const slideContent = slidesData[targetIndex]?.html_content;
+            if (!slideContent) {
+                return;
+            }
+
+            const slideFrame = document.getElementById('slideFrame');
+            if (slideFrame && targetIndex === currentSlideIndex) {
+                setSafeIframeContent(slideFrame, slideContent, { force });
+                setTimeout(() => {
+                    try {
+                        forceReinitializeIframeJS(slideFrame);
+                    } catch (e) {
+                        // 忽略重新初始化错误
+                    }
+                }, 300);
+            }
+
+            const thumbnailIframes = document.querySelectorAll('.slide-thumbnail .slide-preview iframe');
+            const thumbnailIframe = thumbnailIframes[targetIndex];
+            if (thumbnailIframe) {
+                setSafeIframeContent(thumbnailIframe, slideContent, { force });
+            }
+        }
+
+        function updateCodeEditorContent(newContent) {
+            if (typeof newContent !== 'string') {
+                newContent = newContent ?? '';
+            }
+
+            if (codeMirrorEditor && isCodeMirrorInitialized) {
+                try {
+                    codeMirrorEditor.setValue(newContent);
+                    return;
+                } catch (e) {
+                    // 如果CodeMirror更新失败，回退到textarea
+                }
+            }
+
+            const codeEditor = document.getElementById('codeEditor');
+            if (codeEditor) {
+                codeEditor.value = newContent;
+            }
+        }
+
+        // 清理iframe中的Chart实例，防止重复渲染
+        function cleanupIframeCharts(iframe) {
+            if (!iframe) return;
+
+            try {
+                const iframeWindow = iframe.contentWindow;
+                const iframeDoc = iframe.contentDocument || iframeWindow.document;
+
+                if (!iframeWindow || !iframeDoc) return;
+
+                // 检查是否有Chart.js
+                if (iframeWindow.Chart) {
+                    // 清理现有Chart实例
+
+                    // 方法1: 通过Chart.instances清理所有实例
+                    if (iframeWindow.Chart.instances) {
+                        Object.values(iframeWindow.Chart.instances).forEach(chart => {
+                            if (chart && typeof chart.destroy === 'function') {
+                                try {
+                                    chart.destroy();
+                                } catch (e) {
+                                    // 销毁Chart实例失败
+                                }
+                            }
+                        });
+                    }
+
+                    // 方法2: 通过canvas元素清理
+                    const canvasElements = iframeDoc.querySelectorAll('canvas[id*="chart"], canvas[id*="Chart"]');
+                    canvasElements.forEach((canvas, index) => {
+                        if (canvas.chart) {
+                            try {
+                                canvas.chart.destroy();
+                            } catch (e) {
+                                // 销毁Chart实例失败
+                            }
+                        }
+                        // 清理canvas的chart属性
+                        delete canvas.chart;
+                    });
+                }
+            } catch (e) {
+                // 清理Chart实例时出错
+            }
+        }
+
+        // 拖拽和右键菜单相关变量
+        let draggedSlideIndex = -1;
+        let copiedSlideData = null;
+        let contextMenuSlideIndex = -1;
+
+        // 检查是否有幻灯片数据
+        let hasSlidesData = slidesData && slidesData.length > 0;
+
+        // 检查PPT是否生成完成 - 简化逻辑
+        function isPPTGenerationCompleted() {
+            // 简单检查：有幻灯片数据就认为生成完成
+            return hasSlidesData && slidesData.length > 0;
+        }
+
+        // 手动检查更新并刷新页面
+        function checkForUpdates() {
+            showNotification('正在检查更新...', 'info');
+
+            // 直接刷新页面以获取最新数据
+            setTimeout(() => {
+                window.location.reload();
+            }, 500);
+        }
+
+        // 移除自动检查功能，只保留手动刷新
+        // function startAutoCheck() - 已移除定时自动检查逻辑
+
+        // 更新功能按钮状态
+        function updateFunctionButtonsState() {
+            const isCompleted = isPPTGenerationCompleted();
+
+            // 获取需要控制的按钮和菜单项
+            const contextMenu = document.getElementById('contextMenu');
+            if (contextMenu) {
+                const copyBtn = contextMenu.querySelector('[onclick="copySlide()"]');
+                const pasteBtn = contextMenu.querySelector('[onclick="pasteSlide()"]');
+                const insertBtn = contextMenu.querySelector('[onclick="insertNewSlide()"]');
+                const duplicateBtn = contextMenu.querySelector('[onclick="duplicateSlide()"]');
+                const deleteBtn = contextMenu.querySelector('[onclick="deleteSlide()"]');
+
+                // 禁用或启用按钮
+                [copyBtn, pasteBtn, insertBtn, duplicateBtn, deleteBtn].forEach(btn => {
+                    if (btn) {
+                        if (isCompleted) {
+                            btn.style.opacity = '1';
+                            btn.style.pointerEvents = 'auto';
+                            btn.style.color = '';
+                        } else {
+                            btn.style.opacity = '0.5';
+                            btn.style.pointerEvents = 'none';
+                            btn.style.color = '#999';
+                        }
+                    }
+                });
+
+                // 添加提示信息
+                if (!isCompleted) {
+                    [copyBtn, pasteBtn, insertBtn, duplicateBtn, deleteBtn].forEach(btn => {
+                        if (btn) {
+                            btn.title = 'PPT生成完成后才能使用此功能';
+                        }
+                    });
+                }
+            }
+        }
+
+        // 缓存缩放比例，避免重复计算
+        let cachedScale = null;
+        let lastContainerSize = null;
+
+        // 计算并应用iframe缩放，确保内容完全可见
+        function applyMainFrameScale() {
+            const wrapper = document.getElementById('slideFrameWrapper');
+            const iframe = document.getElementById('slideFrame');
+
+            if (!wrapper || !iframe) return;
+
+            // 获取容器的实际尺寸
+            const wrapperRect = wrapper.getBoundingClientRect();
+            const containerWidth = wrapperRect.width - 20; // 减去内边距
+            const containerHeight = wrapperRect.height - 20; // 减去内边距
+
+            // 检查容器尺寸是否变化，如果没有变化则使用缓存的缩放比例
+            const currentSize = `${containerWidth}x${containerHeight}`;
+            if (lastContainerSize === currentSize && cachedScale !== null) {
+                iframe.style.transform = `translate(-50%, -50%) scale(${cachedScale})`;
+                return;
+            }
+
+            // PPT标准尺寸
+            const pptWidth = 1280;
+            const pptHeight = 720;
+
+            // 计算缩放比例，确保内容完全可见
+            const scaleX = containerWidth / pptWidth;
+            const scaleY = containerHeight / pptHeight;
+            const scale = Math.min(scaleX, scaleY, 1); // 取较小值，且不超过1
+
+            // 缓存结果
+            cachedScale = scale;
+            lastContainerSize = currentSize;
+
+            // 应用缩放
+            iframe.style.transform = `translate(-50%, -50%) scale(${scale})`;
+        }
+
+        // Preview navigation
+        function navigatePreviewSlide(direction) {
+            if (!hasSlidesData) {
+                return;
+            }
+
+            const newIndex = currentSlideIndex + direction;
+            if (newIndex >= 0 && newIndex < slidesData.length) {
+                selectSlide(newIndex);
+                updatePreviewNavButtons();
+            }
+        }
+
+        function updatePreviewNavButtons() {
+            const prevBtn = document.getElementById('previewPrevBtn');
+            const nextBtn = document.getElementById('previewNextBtn');
+
+            if (prevBtn && nextBtn) {
+                prevBtn.disabled = currentSlideIndex <= 0;
+                nextBtn.disabled = currentSlideIndex >= slidesData.length - 1;
+            }
+        }
+
+        // 初始化iframe样式
+        function initializeMainFrame() {
+            const iframe = document.getElementById('slideFrame');
+            if (!iframe) return;
+
+            // 设置固定尺寸和居中定位
+            iframe.style.position = 'absolute';
+            iframe.style.top = '50%';
+            iframe.style.left = '50%';
+            iframe.style.width = '1280px';
+            iframe.style.height = '720px';
+            iframe.style.border = 'none';
+            iframe.style.background = 'white';
+            iframe.style.borderRadius = '8px';
+            iframe.style.transformOrigin = 'center center';
+
+            // 应用缩放
+            applyMainFrameScale();
+        }
+
+        function selectSlide(index) {
+            if (!hasSlidesData) {
+                return;
+            }
+
+            if (index < 0 || index >= slidesData.length) {
+                return;
+            }
+
+            // 如果选择的是当前幻灯片，直接返回
+            if (currentSlideIndex === index) {
+                return;
+            }
+
+            currentSlideIndex = index;
+
+            updatePreviewNavButtons();
+
+            // 更新AI编辑助手中的当前页数显示
+            updateAICurrentSlideInfo();
+
+            // 切换幻灯片时清除AI对话记录
+            clearAIMessagesForSlideSwitch();
+
+            // 切换幻灯片时清除图像选择状态
+            clearImageSelection();
+
+            // 使用requestAnimationFrame优化DOM操作
+            requestAnimationFrame(() => {
+                // Update active thumbnail with animation
+                document.querySelectorAll('.slide-thumbnail').forEach((thumb, i) => {
+                    if (i === index) {
+                        thumb.classList.add('active');
+                        // 使用更平滑的滚动
+                        thumb.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+                    } else {
+                        thumb.classList.remove('active');
+                    }
+                });
+
+                // Update preview and editor
+                if (slidesData[index]) {
+                    const slideFrame = document.getElementById('slideFrame');
+                    const codeEditor = document.getElementById('codeEditor');
+
+                    if (slideFrame) {
+                        // 简化过渡效果，减少卡顿
+                        slideFrame.style.opacity = '0.8';
+                        slideFrame.style.transition = 'opacity 0.2s ease';
+
+                        try {
+                            setSafeIframeContent(slideFrame, slidesData[index].html_content);
+                        } catch (error) {
+                            // Error setting iframe content
+                        }
+
+                        // 减少延迟时间，提高响应速度
+                        setTimeout(() => {
+                            slideFrame.style.opacity = '1';
+                            // 只在必要时重新应用缩放
+                            if (cachedScale === null) {
+                                applyMainFrameScale();
+                            }
+                            // 减少Chart.js重新初始化的频率
+                            setTimeout(() => {
+                                forceReinitializeIframeJS(slideFrame);
+
+                                // 如果当前是快速编辑模式，重新初始化可编辑元素
+                                if (currentMode === 'quickedit' && quickEditMode) {
+                                    setTimeout(() => {
+                                        initEditableElements();
+                                    }, 200);
+                                }
+                            }, 100);
+                        }, 150);
+                    }
+
+                    if (codeEditor) {
+                        if (codeMirrorEditor && isCodeMirrorInitialized) {
+                            codeMirrorEditor.setValue(slidesData[index].html_content);
+                        } else {
+                            codeEditor.value = slidesData[index].html_content;
+                        }
+                    }
+                }
+            });
+        }
+
+        // ==================== 快速编辑功能 ====================
+        let quickEditMode = false;
+        let currentInlineEditor = null;
+        let editableElements = [];
+
+        // 切换快速编辑模式
+        function toggleQuickEditMode() {
+            if (currentMode === 'quickedit') {
+                // 如果当前正在编辑，先完成编辑
+                if (currentInlineEditor) {
+                    finishDirectEdit(true);
+                }
+                // 退出快速编辑模式
+                setMode('preview');
+            } else {
+                // 进入快速编辑模式
+                setMode('quickedit');
+            }
+        }
+
+        // 启用快速编辑模式
+        function enableQuickEdit() {
+            quickEditMode = true;
+            const previewPane = document.getElementById('previewPane');
+            if (previewPane) {
+                previewPane.classList.add('quick-edit-mode');
+            }
+
+            // 等待iframe加载完成后初始化可编辑元素
+            setTimeout(() => {
+                initEditableElements();
+
+                // 重新初始化图像选择功能
+                const slideFrame = document.getElementById('slideFrame');
+                if (slideFrame) {
+                    try {
+                        const iframeWindow = slideFrame.contentWindow;
+                        const iframeDoc = slideFrame.contentDocument || iframeWindow.document;
+                        if (iframeWindow && iframeDoc) {
+                            initializeImageSelection(slideFrame, iframeWindow, iframeDoc);
+                        }
+                    } catch (e) {
+                        // 重新初始化图像选择功能失败
+                    }
+                }
+            }, 500);
+
+
+        }
+
+        // 禁用快速编辑模式
+        function disableQuickEdit() {
+            quickEditMode = false;
+            const previewPane = document.getElementById('previewPane');
+            if (previewPane) {
+                previewPane.classList.remove('quick-edit-mode');
+            }
+
+            // 清除所有编辑标识
+            clearEditableHighlights();
+
+            // 完成当前的直接编辑
+            if (currentInlineEditor) {
+                finishDirectEdit(true);
+            }
+
+            // 清除图像选择状态
+            clearImageSelection();
+
+            // 移除图像选择功能
+            const slideFrame = document.getElementById('slideFrame');
+            if (slideFrame) {
+                try {
+                    const iframeDoc = slideFrame.contentDocument || slideFrame.contentWindow.document;
+                    if (iframeDoc) {
+                        const selectableImages = iframeDoc.querySelectorAll('[data-image-selectable]');
+                        selectableImages.forEach(element => {
+                            element.removeAttribute('data-image-selectable');
+                            element.style.cursor = '';
+                            element.classList.remove('image-selected', 'image-selectable');
+                            element.style.outline = '';
+                            element.style.outlineOffset = '';
+                            element.style.boxShadow = '';
+                            element.style.transform = '';
+                        });
+                    }
+                } catch (e) {
+                    // 清理图像选择功能失败
+                }
+            }
+        }
+
+        // 初始化可编辑元素
+        function initEditableElements() {
+            const slideFrame = document.getElementById('slideFrame');
+            if (!slideFrame || !slideFrame.contentDocument) {
+                setTimeout(() => {
+                    initEditableElements();
+                }, 1000);
+                return;
+            }
+
+            try {
+                const iframeDoc = slideFrame.contentDocument;
+                editableElements = [];
+
+                // 查找可编辑的文本元素
+                const textSelectors = [
+                    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                    'p', 'span', 'div',
+                    'li', 'td', 'th',
+                    '.title', '.subtitle', '.content',
+                    '[contenteditable]'
+                ];
+
+                textSelectors.forEach(selector => {
+                    const elements = iframeDoc.querySelectorAll(selector);
+                    elements.forEach(element => {
+                        // 检查元素是否包含文本内容且不是容器元素
+                        if (element.textContent && element.textContent.trim().length > 0) {
+                            // 排除包含其他文本元素的容器
+                            const hasTextChildren = Array.from(element.children).some(child =>
+                                textSelectors.some(sel => child.matches(sel))
+                            );
+
+                            if (!hasTextChildren && !editableElements.includes(element)) {
+                                editableElements.push(element);
+                                addEditableHighlight(element);
+                            }
+                        }
+                    });
+                });
+
+
+            } catch (error) {
+                // 初始化可编辑元素时出错
+            }
+        }
+
+        // 为元素添加编辑高亮
+        function addEditableHighlight(element) {
+            element.classList.add('quick-edit-highlight');
+            element.style.cursor = 'text'; // 改为文本光标
+
+            // 添加点击事件
+            element.addEventListener('click', function(e) {
+                if (quickEditMode) {
+                    e.preventDefault();
+                    e.stopPropagation();
+                    makeElementDirectlyEditable(element, e);
+                }
+            });
+        }
+
+        // 清除所有编辑高亮
+        function clearEditableHighlights() {
+            const slideFrame = document.getElementById('slideFrame');
+            if (!slideFrame || !slideFrame.contentDocument) return;
+
+            try {
+                const iframeDoc = slideFrame.contentDocument;
+                const highlightedElements = iframeDoc.querySelectorAll('.quick-edit-highlight');
+                highlightedElements.forEach(element => {
+                    element.classList.remove('quick-edit-highlight');
+                    element.classList.remove('direct-editing');
+                    element.style.cursor = 'default';
+                    element.contentEditable = false;
+                });
+            } catch (error) {
+                // 清除编辑高亮时出错
+            }
+        }
+
+        // 使元素直接可编辑
+        function makeElementDirectlyEditable(element, clickEvent = null) {
+            // 如果已经有元素在编辑中，先完成编辑
+            if (currentInlineEditor) {
+                finishDirectEdit();
+            }
+
+            // 保存原始内容
+            const originalText = element.textContent;
+            const originalHTML = element.innerHTML;
+
+            // 设置当前编辑元素
+            currentInlineEditor = {
+                element: element,
+                originalText: originalText,
+                originalHTML: originalHTML
+            };
+
+            // 使元素可编辑
+            element.contentEditable = true;
+            element.classList.add('direct-editing');
+
+            // 确保iframe内的样式正确应用
+            const slideFrame = document.getElementById('slideFrame');
+            if (slideFrame && slideFrame.contentDocument) {
+                const iframeDoc = slideFrame.contentDocument;
+
+                // 在iframe内添加直接编辑样式
+                let styleElement = iframeDoc.getElementById('quick-edit-styles');
+                if (!styleElement) {
+                    styleElement = iframeDoc.createElement('style');
+                    styleElement.id = 'quick-edit-styles';
+                    styleElement.textContent = `
+                        .direct-editing {
+                            outline: 2px solid #4facfe !important;
+                            outline-offset: 2px !important;
+                            background: rgba(79, 172, 254, 0.1) !important;
+                            border-radius: 4px !important;
+                            padding: 2px 4px !important;
+                            transition: all 0.3s ease !important;
+                        }
+                        .direct-editing:focus {
+                            outline-color: #2980b9 !important;
+                            background: rgba(79, 172, 254, 0.15) !important;
+                        }
+                    `;
+                    iframeDoc.head.appendChild(styleElement);
+                }
+            }
+
+            // 聚焦元素并设置光标位置
+            element.focus();
+
+            // 设置光标位置
+            try {
+                if (clickEvent) {
+                    // 如果有点击事件，尝试根据点击位置设置光标
+                    const range = element.ownerDocument.createRange();
+                    const selection = element.ownerDocument.getSelection();
+
+                    // 使用点击位置设置光标
+                    if (element.ownerDocument.caretRangeFromPoint) {
+                        const clickRange = element.ownerDocument.caretRangeFromPoint(clickEvent.clientX, clickEvent.clientY);
+                        if (clickRange && element.contains(clickRange.startContainer)) {
+                            selection.removeAllRanges();
+                            selection.addRange(clickRange);
+                        } else {
+                            // 如果点击位置无效，设置到文本末尾
+                            range.selectNodeContents(element);
+                            range.collapse(false);
+                            selection.removeAllRanges();
+                            selection.addRange(range);
+                        }
+                    } else {
+                        // 浏览器不支持caretRangeFromPoint，设置到文本末尾
+                        range.selectNodeContents(element);
+                        range.collapse(false);
+                        selection.removeAllRanges();
+                        selection.addRange(range);
+                    }
+                } else {
+                    // 没有点击事件，设置到文本末尾
+                    const range = element.ownerDocument.createRange();
+                    const selection = element.ownerDocument.getSelection();
+                    range.selectNodeContents(element);
+                    range.collapse(false);
+                    selection.removeAllRanges();
+                    selection.addRange(range);
+                }
+            } catch (error) {
+                // 光标设置失败，至少确保元素获得焦点
+                element.focus();
+            }
+
+            // 添加键盘事件监听
+            element.addEventListener('keydown', handleDirectEditKeydown);
+            element.addEventListener('blur', handleDirectEditBlur);
+            element.addEventListener('input', handleDirectEditInput);
+        }
+
+        // 处理直接编辑的键盘事件
+        function handleDirectEditKeydown(e) {
+            if (e.key === 'Enter' && !e.shiftKey) {
+                // Enter键完成编辑
+                e.preventDefault();
+                finishDirectEdit(true);
+            } else if (e.key === 'Escape') {
+                // ESC键取消编辑
+                e.preventDefault();
+                finishDirectEdit(false);
+            }
+        }
+
+        // 处理直接编辑失去焦点
+        function handleDirectEditBlur(e) {
+            // 延迟处理，避免与其他事件冲突
+            setTimeout(() => {
+                if (currentInlineEditor && currentInlineEditor.element === e.target) {
+                    finishDirectEdit(true);
+                }
+            }, 100);
+        }
+
+        // 处理直接编辑输入事件
+        function handleDirectEditInput(e) {
+            // 可以在这里添加实时预览更新逻辑
+        }
+
+        // 完成直接编辑
+        function finishDirectEdit(save = true) {
+            if (!currentInlineEditor) return;
+
+            const element = currentInlineEditor.element;
+            const originalText = currentInlineEditor.originalText;
+            const originalHTML = currentInlineEditor.originalHTML;
+            const newText = element.textContent;
+
+            // 移除事件监听器
+            element.removeEventListener('keydown', handleDirectEditKeydown);
+            element.removeEventListener('blur', handleDirectEditBlur);
+            element.removeEventListener('input', handleDirectEditInput);
+
+            // 恢复元素状态
+            element.contentEditable = false;
+            element.classList.remove('direct-editing');
+            element.style.outline = '';
+            element.style.outlineOffset = '';
+            element.style.backgroundColor = '';
+
+            if (save && newText !== originalText) {
+                // 保存更改
+                saveDirectEdit(element, newText);
+            } else {
+                // 取消更改，恢复原始内容
+                element.textContent = originalText;
+            }
+
+            // 清除当前编辑状态
+            currentInlineEditor = null;
+        }
+
+        // 保存直接编辑
+        function saveDirectEdit(element, newText) {
+            if (!element || newText === undefined) return;
+
+            // 获取更新后的HTML内容
+            const slideFrame = document.getElementById('slideFrame');
+            if (slideFrame && slideFrame.contentDocument) {
+                const updatedHtml = slideFrame.contentDocument.documentElement.outerHTML;
+
+                // 更新幻灯片数据
+                if (typeof slidesData !== 'undefined' && slidesData[currentSlideIndex]) {
+                    slidesData[currentSlideIndex].html_content = updatedHtml;
+
+                    // 更新代码编辑器
+                    if (typeof codeMirrorEditor !== 'undefined' && codeMirrorEditor && typeof isCodeMirrorInitialized !== 'undefined' && isCodeMirrorInitialized) {
+                        codeMirrorEditor.setValue(updatedHtml);
+                    } else {
+                        const codeEditor = document.getElementById('codeEditor');
+                        if (codeEditor) {
+                            codeEditor.value = updatedHtml;
+                        }
+                    }
+
+                    // 更新缩略图
+                    const thumbnailIframe = document.querySelectorAll('.slide-thumbnail .slide-preview iframe')[currentSlideIndex];
+                    if (thumbnailIframe && typeof setSafeIframeContent === 'function') {
+                        setSafeIframeContent(thumbnailIframe, updatedHtml);
+                    }
+
+                    // 保存到服务器
+                    if (typeof saveToServer === 'function') {
+                        saveToServer();
+                    }
+                    if (typeof showNotification === 'function') {
+                        showNotification('内容已更新并保存！', 'success');
+                    }
+                }
+            }
+        }
+
+        function setMode(mode) {
+            currentMode = mode;
+
+            // Update button states
+            document.querySelectorAll('.mode-toggle').forEach(btn => btn.classList.remove('active'));
+
+            // 处理按钮ID映射
+            let buttonId;
+            switch(mode) {
+                case 'quickedit':
+                    buttonId = 'quickEditMode';
+                    break;
+                default:
+                    buttonId = mode + 'Mode';
+                    break;
+            }
+
+            const modeButton = document.getElementById(buttonId);
+            if (modeButton) {
+                modeButton.classList.add('active');
+            } else {
+                // Mode button not found
+            }
+
+            const previewPane = document.getElementById('previewPane');
+            const editPane = document.getElementById('editPane');
+
+            if (!previewPane || !editPane) {
+                // Required panes not found
+                return;
+            }
+
+            switch(mode) {
+                case 'preview':
+                    previewPane.style.display = 'block';
+                    previewPane.style.flex = '1';
+                    editPane.style.display = 'none';
+                    if (typeof disableQuickEdit === 'function') {
+                        disableQuickEdit();
+                    }
+                    break;
+                case 'edit':
+                    previewPane.style.display = 'none';
+                    editPane.style.display = 'block';
+                    editPane.style.flex = '1';
+                    if (typeof disableQuickEdit === 'function') {
+                        disableQuickEdit();
+                    }
+                    // 延迟重新计算CodeMirror尺寸，确保DOM更新完成
+                    setTimeout(() => {
+                        if (typeof resizeCodeMirror === 'function') {
+                            resizeCodeMirror();
+                        }
+                    }, 100);
+                    break;
+                case 'split':
+                    previewPane.style.display = 'block';
+                    previewPane.style.flex = '1';
+                    editPane.style.display = 'block';
+                    editPane.style.flex = '1';
+                    if (typeof disableQuickEdit === 'function') {
+                        disableQuickEdit();
+                    }
+                    // 延迟重新计算CodeMirror尺寸，确保DOM更新完成
+                    setTimeout(() => {
+                        if (typeof resizeCodeMirror === 'function') {
+                            resizeCodeMirror();
+                        }
+                    }, 100);
+                    break;
+                case 'quickedit':
+                    previewPane.style.display = 'block';
+                    previewPane.style.flex = '1';
+                    editPane.style.display = 'none';
+                    if (typeof enableQuickEdit === 'function') {
+                        enableQuickEdit();
+                    }
+                    break;
+                default:
+                    // Unknown mode
+                    break;
+            }
+        }
+
+        function saveSlide() {
+            const codeEditor = document.getElementById('codeEditor');
+            let newContent;
+
+            if (codeMirrorEditor && isCodeMirrorInitialized) {
+                newContent = codeMirrorEditor.getValue();
+            } else {
+                newContent = codeEditor.value;
+            }
+
+            // Update slides data
+            if (slidesData[currentSlideIndex]) {
+                slidesData[currentSlideIndex].html_content = newContent;
+
+                // Update preview
+                const slideFrame = document.getElementById('slideFrame');
+                setSafeIframeContent(slideFrame, newContent);
+
+                // 延迟重新初始化JavaScript以确保内容加载完成
+                setTimeout(() => {
+                    forceReinitializeIframeJS(slideFrame);
+                }, 300);
+
+                // Update thumbnail
+                const thumbnailIframe = document.querySelectorAll('.slide-thumbnail .slide-preview iframe')[currentSlideIndex];
+                if (thumbnailIframe) {
+                    setSafeIframeContent(thumbnailIframe, newContent);
+                    // 缩略图不需要重新初始化JavaScript，避免性能问题
+                }
+
+                // Save to server
+                saveToServer();
+
+                showNotification('幻灯片已保存！', 'success');
+            }
+        }
+
+        function regenerateSlide() {
+            regenerateSlideByIndex(currentSlideIndex);
+        }
+
+        // 更新AI编辑助手中的当前页数显示
+        function updateAICurrentSlideInfo() {
+            const slideInfo = document.getElementById('aiCurrentSlideInfo');
+            if (slideInfo && slidesData && slidesData.length > 0) {
+                slideInfo.textContent = `第${currentSlideIndex + 1}页 / 共${slidesData.length}页`;
+            }
+
+
+        }
+
+        // 更新AI助手中选中图像的信息显示
+        function updateAIAssistantSelectedImage(imageInfo) {
+            // 检查是否已存在选中图像信息区域
+            let selectedImageContainer = document.getElementById('aiSelectedImageContainer');
+
+            if (!selectedImageContainer) {
+                // 创建选中图像信息容器
+                selectedImageContainer = document.createElement('div');
+                selectedImageContainer.id = 'aiSelectedImageContainer';
+                selectedImageContainer.className = 'ai-selected-image-container';
+
+                // 插入到AI输入容器之前
+                const inputContainer = document.querySelector('.ai-input-container');
+                if (inputContainer) {
+                    inputContainer.parentNode.insertBefore(selectedImageContainer, inputContainer);
+                }
+            }
+
+            if (imageInfo) {
+                // 显示选中图像信息
+                selectedImageContainer.innerHTML = `
+                    <div class="ai-selected-image-header">
+                        <h6><i class="fas fa-image"></i> 已选择图像</h6>
+                        <button class="ai-clear-selection-btn" onclick="clearImageSelection()" title="清除选择">
+                            <i class="fas fa-times"></i>
+                        </button>
+                    </div>
+                    <div class="ai-selected-image-info">
+                        <div class="ai-selected-image-preview">
+                            <img src="${imageInfo.src}" alt="${imageInfo.alt}" onerror="this.src='data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iNjAiIGhlaWdodD0iNjAiIHZpZXdCb3g9IjAgMCA2MCA2MCIgZmlsbD0ibm9uZSIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj4KPHJlY3Qgd2lkdGg9IjYwIiBoZWlnaHQ9IjYwIiBmaWxsPSIjRjBGMEYwIi8+CjxwYXRoIGQ9Ik0yMCAyMEg0MFY0MEgyMFYyMFoiIGZpbGw9IiNDQ0NDQ0MiLz4KPC9zdmc+Cg=='">
+                        </div>
+                        <div class="ai-selected-image-details">
+                            <div class="ai-image-detail-item">
+                                <span class="ai-detail-label">类型:</span>
+                                <span class="ai-detail-value">${getImageTypeDisplay(imageInfo.type)}</span>
+                            </div>
+                            <div class="ai-image-detail-item">
+                                <span class="ai-detail-label">尺寸:</span>
+                                <span class="ai-detail-value">${Math.round(imageInfo.width)} × ${Math.round(imageInfo.height)}</span>
+                            </div>
+                            <div class="ai-image-detail-item">
+                                <span class="ai-detail-label">位置:</span>
+                                <span class="ai-detail-value">第${imageInfo.slideIndex + 1}页</span>
+                            </div>
+                            ${imageInfo.alt ? `
+                            <div class="ai-image-detail-item">
+                                <span class="ai-detail-label">描述:</span>
+                                <span class="ai-detail-value">${imageInfo.alt}</span>
+                            </div>
+                            ` : ''}
+                            ${imageInfo.isBackgroundImage ? `
+                            <div class="ai-image-detail-item">
+                                <span class="ai-detail-label">背景:</span>
+                                <span class="ai-detail-value">CSS背景图像</span>
+                            </div>
+                            ` : ''}
+                        </div>
+                    </div>
+                    <div class="ai-image-actions">
+                        <div class="ai-image-action-row">
+                            <button class="ai-regenerate-image-btn" onclick="regenerateSelectedImage()" title="重新生成此图像">
+                                <i class="fas fa-sync"></i> 重新生成
+                            </button>
+                            <button class="ai-replace-image-btn" onclick="replaceSelectedImageFromGallery()" title="从图床选择图片替换">
+                                <i class="fas fa-images"></i> 选择替换
+                            </button>
+                        </div>
+                        <div class="ai-image-action-row">
+                            <button class="ai-delete-image-btn" onclick="deleteSelectedImage()" title="删除此图像">
+                                <i class="fas fa-trash"></i> 删除图像
+                            </button>
+                        </div>
+                    </div>
+                `;
+                selectedImageContainer.style.display = 'block';
+            } else {
+                // 隐藏选中图像信息
+                selectedImageContainer.style.display = 'none';
+            }
+        }
+
+        // 清除图像选择
+        function clearImageSelection() {
+            selectedImageInfo = null;
+
+            // 清除幻灯片中的选择状态
+            const slideFrame = document.getElementById('slideFrame');
+            if (slideFrame) {
+                try {
+                    const iframeDoc = slideFrame.contentDocument || slideFrame.contentWindow.document;
+                    const selectedImages = iframeDoc.querySelectorAll('.image-selected');
+                    selectedImages.forEach(img => {
+                        img.classList.remove('image-selected');
+                        img.style.outline = '';
+                        img.style.outlineOffset = '';
+                        img.style.boxShadow = '';
+                        img.style.transform = '';
+                    });
+                } catch (e) {
+                    // 清除图像选择状态失败
+                }
+            }
+
+            // 更新AI助手界面
+            updateAIAssistantSelectedImage(null);
+        }
+
+        // 重新生成选中的图像
+        async function regenerateSelectedImage() {
+            if (!selectedImageInfo) {
+                showNotification('请先选择要重新生成的图像', 'warning');
+                return;
+            }
+
+            // 显示确认对话框
+            const confirmed = await showImageRegenerateConfirmDialog();
+            if (!confirmed) return;
+
+            const regenerateBtn = document.querySelector('.ai-regenerate-image-btn');
+            if (!regenerateBtn) return;
+
+            // 保存原始状态用于撤销
+            const originalHtmlContent = slidesData[selectedImageInfo.slideIndex].html_content;
+
+            // 禁用按钮并显示加载状态
+            const originalText = regenerateBtn.innerHTML;
+            regenerateBtn.disabled = true;
+            regenerateBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> 生成中...';
+
+            // 显示进度提示
+            const progressToast = showProgressToast('正在分析图像上下文...');
+
+            try {
+                // 更新进度
+                updateProgressToast(progressToast, '正在生成新图像...', 30);
+
+                // 构建重新生成请求
+                const requestData = {
+                    slide_index: selectedImageInfo.slideIndex,
+                    image_info: selectedImageInfo,
+                    slide_content: {
+                        title: selectedImageInfo.slideTitle,
+                        html_content: slidesData[selectedImageInfo.slideIndex].html_content
+                    },
+                    project_topic: editorProject.topic,
+                    project_scenario: editorProject.scenario,
+                    regeneration_reason: '用户请求重新生成图像'
+                };
+
+                // 发送重新生成请求
+                const response = await fetch('/landppt/api/ai/regenerate-image', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(requestData)
+                });
+
+                const result = await response.json();
+
+                if (result.success) {
+                    // 更新进度
+                    updateProgressToast(progressToast, '正在更新幻灯片...', 80);
+
+                    // 更新幻灯片内容
+                    if (result.updated_html_content) {
+                        slidesData[selectedImageInfo.slideIndex].html_content = result.updated_html_content;
+
+                        // 更新预览
+                        const slideFrame = document.getElementById('slideFrame');
+                        if (slideFrame && selectedImageInfo.slideIndex === currentSlideIndex) {
+                            setSafeIframeContent(slideFrame, result.updated_html_content);
+                            setTimeout(() => {
+                                forceReinitializeIframeJS(slideFrame);
+                            }, 300);
+                        }
+
+                        // 更新缩略图
+                        const thumbnailIframe = document.querySelectorAll('.slide-thumbnail .slide-preview iframe')[selectedImageInfo.slideIndex];
+                        if (thumbnailIframe) {
+                            setSafeIframeContent(thumbnailIframe, result.updated_html_content);
+                        }
+
+                        // 保存到服务器
+                        updateProgressToast(progressToast, '正在保存...', 90);
+                        await saveToServer();
+
+                        // 完成进度
+                        updateProgressToast(progressToast, '完成！', 100);
+
+                        // 显示撤销选项
+                        showUndoOption(originalHtmlContent, selectedImageInfo.slideIndex);
+
+                        // 清除选择状态
+                        clearImageSelection();
+
+                        // 关闭进度提示
+                        setTimeout(() => closeProgressToast(progressToast), 1000);
+
+                        showNotification('图像重新生成成功！', 'success');
+                    } else {
+                        closeProgressToast(progressToast);
+                        showNotification('图像生成成功，但更新失败', 'warning');
+                    }
+                } else {
+                    closeProgressToast(progressToast);
+                    showNotification(result.message || '图像重新生成失败', 'error');
+                }
+
+            } catch (error) {
+                closeProgressToast(progressToast);
+                showNotification('网络错误，请重试', 'error');
+            } finally {
+                // 恢复按钮状态
+                regenerateBtn.disabled = false;
+                regenerateBtn.innerHTML = originalText;
+            }
+        }
+
+        // 删除选中的图像
+        async function deleteSelectedImage() {
+            if (!selectedImageInfo) {
+                showNotification('请先选择要删除的图像', 'warning');
+                return;
+            }
+
+            // 显示确认对话框
+            const confirmed = await showImageDeleteConfirmDialog();
+            if (!confirmed) return;
+
+            try {
+                // 保存原始状态用于撤销
+                const originalHtmlContent = slidesData[selectedImageInfo.slideIndex].html_content;
+
+                // 从HTML中删除图像
+                const updatedHtml = removeImageFromHtml(
+                    slidesData[selectedImageInfo.slideIndex].html_content,
+                    selectedImageInfo
+                );
+
+                if (updatedHtml === slidesData[selectedImageInfo.slideIndex].html_content) {
+                    showNotification('未找到要删除的图像', 'warning');
+                    return;
+                }
+
+                // 更新幻灯片内容
+                slidesData[selectedImageInfo.slideIndex].html_content = updatedHtml;
+
+                // 更新预览
+                const slideFrame = document.getElementById('slideFrame');
+                if (slideFrame && selectedImageInfo.slideIndex === currentSlideIndex) {
+                    setSafeIframeContent(slideFrame, updatedHtml);
+                    setTimeout(() => {
+                        forceReinitializeIframeJS(slideFrame);
+                    }, 300);
+                }
+
+                // 更新缩略图
+                const thumbnailIframe = document.querySelectorAll('.slide-thumbnail .slide-preview iframe')[selectedImageInfo.slideIndex];
+                if (thumbnailIframe) {
+                    setSafeIframeContent(thumbnailIframe, updatedHtml);
+                }
+
+                // 保存到服务器
+                await saveToServer();
+
+                // 显示撤销选项
+                showUndoOption(originalHtmlContent, selectedImageInfo.slideIndex, '图像删除');
+
+                // 清除选择状态
+                clearImageSelection();
+
+                showNotification('图像删除成功！', 'success');
+
+            } catch (error) {
+                showNotification('删除图像失败，请重试', 'error');
+            }
+        }
+
+        // 从图床选择图片替换选中的图像
+        async function replaceSelectedImageFromGallery() {
+            if (!selectedImageInfo) {
+                showNotification('请先选择要替换的图像', 'warning');
+                return;
+            }
+
+            try {
+                // 显示图片选择对话框
+                const selectedImage = await showImageGalleryDialog();
+                if (!selectedImage) return;
+
+                // 保存原始状态用于撤销
+                const originalHtmlContent = slidesData[selectedImageInfo.slideIndex].html_content;
+
+                // 构建新图像URL
+                const newImageUrl = selectedImage.url;
+
+                // 替换HTML中的图像
+                const updatedHtml = replaceImageInHtmlClient(
+                    slidesData[selectedImageInfo.slideIndex].html_content,
+                    selectedImageInfo,
+                    newImageUrl
+                );
+
+                if (updatedHtml === slidesData[selectedImageInfo.slideIndex].html_content) {
+                    showNotification('图像替换失败', 'warning');
+                    return;
+                }
+
+                // 更新幻灯片内容
+                slidesData[selectedImageInfo.slideIndex].html_content = updatedHtml;
+
+                // 更新预览
+                const slideFrame = document.getElementById('slideFrame');
+                if (slideFrame && selectedImageInfo.slideIndex === currentSlideIndex) {
+                    setSafeIframeContent(slideFrame, updatedHtml);
+                    setTimeout(() => {
+                        forceReinitializeIframeJS(slideFrame);
+                    }, 300);
+                }
+
+                // 更新缩略图
+                const thumbnailIframe = document.querySelectorAll('.slide-thumbnail .slide-preview iframe')[selectedImageInfo.slideIndex];
+                if (thumbnailIframe) {
+                    setSafeIframeContent(thumbnailIframe, updatedHtml);
+                }
+
+                // 保存到服务器
+                await saveToServer();
+
+                // 显示撤销选项
+                showUndoOption(originalHtmlContent, selectedImageInfo.slideIndex, '图像替换');
+
+                // 清除选择状态
+                clearImageSelection();
+
+                showNotification('图像替换成功！', 'success');
+
+            } catch (error) {
+                showNotification('替换图像失败，请重试', 'error');
+            }
+        }
+
+        // 一键修复排版
+        async function autoRepairSlideLayout() {
+            closeAIEditSidebar();
+            if (currentSlideIndex < 0 || currentSlideIndex >= slidesData.length) {
+                showNotification('请先选择一个幻灯片', 'warning');
+                return;
+            }
+
+            const slideInfo = slidesData[currentSlideIndex];
+            if (!slideInfo || !slideInfo.html_content) {
+                showNotification('当前幻灯片没有可修复的内容', 'warning');
+                return;
+            }
+
+            const progressToast = showProgressToast('正在准备布局修复...', 5);
+
+            try {
+                updateProgressToast(progressToast, '正在生成幻灯片截图...', 20);
+
+                const targetProjectId = projectId || slideInfo.project_id;
+                updateProgressToast(progressToast, '正在调用智能排版诊断...', 40);
+                const response = await fetch(`/landppt/api/projects/${targetProjectId}/slides/${currentSlideIndex + 1}/auto-repair-layout`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        html_content: slideInfo.html_content,
+                        slide_data: slideInfo
+                    })
+                });
+
+                updateProgressToast(progressToast, '正在解析修复结果...', 60);
+                const result = await response.json();
+
+                if (!response.ok) {
+                    closeProgressToast(progressToast);
+                    console.error('Auto layout repair failed:', result);
+                    showNotification(result.message || '排版修复失败，请重试', 'error');
+                    return;
+                }
+
+                updateProgressToast(progressToast, '正在应用修复后的排版...', 80);
+
+                if (result && result.repaired_html) {
+                    slidesData[currentSlideIndex].html_content = result.repaired_html;
+                    slidesData[currentSlideIndex].is_user_edited = true;
+
+                    await refreshSlidePreview(currentSlideIndex, { force: true });
+                    updateThumbnailDisplay(currentSlideIndex, slidesData[currentSlideIndex]);
+                    updateCodeEditorContent(result.repaired_html);
+
+                    updateProgressToast(progressToast, '正在保存最新内容...', 90);
+                    if (typeof saveToServer === 'function') {
+                        await saveToServer();
+                    }
+
+                    closeAIEditSidebar();
+                    showNotification('排版修复完成！', 'success');
+                    updateProgressToast(progressToast, '排版修复完成！', 100);
+                } else {
+                    updateProgressToast(progressToast, '未检测到新的排版内容', 100);
+                    showNotification('排版修复未返回新内容', 'warning');
+                }
+
+                closeProgressToast(progressToast);
+
+            } catch (error) {
+                console.error('Auto layout repair error:', error);
+                closeProgressToast(progressToast);
+                showNotification('排版修复失败，请检查网络连接后重试', 'error');
+            }
+        }
+
+        // 一键配图功能
+        async function autoGenerateSlideImages() {
+            if (currentSlideIndex < 0 || currentSlideIndex >= slidesData.length) {
+                showNotification('请先选择一个幻灯片', 'warning');
+                return;
+            }
+
+            const currentSlide = slidesData[currentSlideIndex];
+            if (!currentSlide) {
+                showNotification('当前幻灯片数据无效', 'error');
+                return;
+            }
+
+            // 显示确认对话框
+            const confirmed = await showAutoImageGenerateConfirmDialog();
+            if (!confirmed) return;
+
+            // 显示进度提示
+            const progressToast = showProgressToast('正在分析幻灯片内容...');
+
+            try {
+                // 更新进度
+                updateProgressToast(progressToast, '正在生成配图...', 30);
+
+                // 构建一键配图请求
+                const requestData = {
+                    slide_index: currentSlideIndex,
+                    slide_content: {
+                        title: currentSlide.title || `第${currentSlideIndex + 1}页`,
+                        html_content: currentSlide.html_content
+                    },
+                    project_topic: editorProject.topic,
+                    project_scenario: editorProject.scenario
+                };
+
+                // 发送一键配图请求
+                const response = await fetch('/landppt/api/ai/auto-generate-slide-images', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(requestData)
+                });
+
+                const result = await response.json();
+
+                if (result.success) {
+                    // 更新进度
+                    updateProgressToast(progressToast, '正在更新幻灯片...', 80);
+
+                    // 更新幻灯片内容
+                    if (result.updated_html_content) {
+                        slidesData[currentSlideIndex].html_content = result.updated_html_content;
+
+                        // 更新预览
+                        const slideFrame = document.getElementById('slideFrame');
+                        if (slideFrame) {
+                            setSafeIframeContent(slideFrame, result.updated_html_content);
+                            setTimeout(() => {
+                                forceReinitializeIframeJS(slideFrame);
+                            }, 300);
+                        }
+
+                        // 更新缩略图
+                        const thumbnailIframe = document.querySelectorAll('.slide-thumbnail .slide-preview iframe')[currentSlideIndex];
+                        if (thumbnailIframe) {
+                            setSafeIframeContent(thumbnailIframe, result.updated_html_content);
+                        }
+
+                        // 更新代码编辑器
+                        if (codeMirrorEditor && isCodeMirrorInitialized) {
+                            codeMirrorEditor.setValue(result.updated_html_content);
+                        } else {
+                            const codeEditor = document.getElementById('codeEditor');
+                            if (codeEditor) {
+                                codeEditor.value = result.updated_html_content;
+                            }
+                        }
+
+                        // 保存到服务器
+                        await saveToServer();
+
+                        // 完成进度
+                        updateProgressToast(progressToast, '配图完成！', 100);
+                        setTimeout(() => {
+                            closeProgressToast(progressToast);
+                        }, 1500);
+
+                        // 显示成功消息
+                        const imageCount = result.generated_images_count || 0;
+                        showNotification(`一键配图完成！已为当前幻灯片生成${imageCount}张图片`, 'success');
+
+                        // 显示AI分析信息
+                        if (result.ai_analysis) {
+                            addAIMessage('assistant', `配图分析：${result.ai_analysis.reasoning || '已完成图片生成和插入'}`);
+                        }
+
+                    } else {
+                        closeProgressToast(progressToast);
+                        showNotification('配图生成成功，但未能更新幻灯片内容', 'warning');
+                    }
+
+                } else {
+                    closeProgressToast(progressToast);
+                    showNotification(result.message || '一键配图失败，请重试', 'error');
+                }
+
+            } catch (error) {
+                closeProgressToast(progressToast);
+                showNotification('一键配图失败，请检查网络连接后重试', 'error');
+            }
+        }
+
+        // 显示一键配图确认对话框
+        async function showAutoImageGenerateConfirmDialog() {
+            return new Promise((resolve) => {
+                const modal = document.createElement('div');
+                modal.className = 'modal fade show';
+                modal.style.display = 'block';
+                modal.style.backgroundColor = 'rgba(0,0,0,0.5)';
+                modal.style.zIndex = '20000';
+                modal.innerHTML = `
+                    <div class="modal-dialog modal-dialog-centered">
+                        <div class="modal-content">
+                            <div class="modal-header">
+                                <h5 class="modal-title">
+                                    <i class="fas fa-magic text-primary"></i> 一键配图
+                                </h5>
+                            </div>
+                            <div class="modal-body">
+                                <p>AI将自动分析当前幻灯片内容，为其生成合适的配图并插入到适当位置。</p>
+                                <div class="alert alert-info">
+                                    <i class="fas fa-info-circle"></i>
+                                    <strong>功能说明：</strong>
+                                    <ul class="mb-0 mt-2">
+                                        <li>AI会分析幻灯片的标题和内容</li>
+                                        <li>根据内容生成相关的图片描述和关键词</li>
+                                        <li>自动生成配图并插入到合适位置</li>
+                                        <li>保持原有的布局和样式</li>
+                                    </ul>
+                                </div>
+                            </div>
+                            <div class="modal-footer">
+                                <button type="button" class="btn btn-secondary" onclick="closeAutoImageConfirmDialog(false)">取消</button>
+                                <button type="button" class="btn btn-primary" onclick="closeAutoImageConfirmDialog(true)">
+                                    <i class="fas fa-magic"></i> 开始配图
+                                </button>
+                            </div>
+                        </div>
+                    </div>
+                `;
+
+                document.body.appendChild(modal);
+
+                window.closeAutoImageConfirmDialog = (confirmed) => {
+                    document.body.removeChild(modal);
+                    delete window.closeAutoImageConfirmDialog;
+                    resolve(confirmed);
+                };
+            });
+        }
+
+        // 用户体验优化功能
+
+        // 显示图像重新生成确认对话框
+        async function showImageRegenerateConfirmDialog() {
+            return new Promise((resolve) => {
+                const modal = document.createElement('div');
+                modal.className = 'modal fade show';
+                modal.style.display = 'block';
+                modal.style.backgroundColor = 'rgba(0,0,0,0.5)';
+                modal.style.zIndex = '20000'; // 确保在AI助手侧边栏之上
+                modal.innerHTML = `
+                    <div class="modal-dialog modal-dialog-centered">
+                        <div class="modal-content">
+                            <div class="modal-header">
+                                <h5 class="modal-title">
+                                    <i class="fas fa-sync text-primary"></i> 重新生成图像
+                                </h5>
+                            </div>
+                            <div class="modal-body">
+                                <p>确定要重新生成选中的图像吗？</p>
+                                <div class="alert alert-info">
+                                    <i class="fas fa-info-circle"></i>
+                                    新图像将保持原有的位置和尺寸，但内容会根据幻灯片上下文重新生成。
+                                </div>
+                            </div>
+                            <div class="modal-footer">
+                                <button type="button" class="btn btn-secondary" onclick="closeConfirmDialog(false)">取消</button>
+                                <button type="button" class="btn btn-primary" onclick="closeConfirmDialog(true)">
+                                    <i class="fas fa-sync"></i> 确定重新生成
+                                </button>
+                            </div>
+                        </div>
+                    </div>
+                `;
+
+                document.body.appendChild(modal);
+
+                window.closeConfirmDialog = (confirmed) => {
+                    document.body.removeChild(modal);
+                    delete window.closeConfirmDialog;
+                    resolve(confirmed);
+                };
+            });
+        }
+
+        // 显示图像删除确认对话框
+        async function showImageDeleteConfirmDialog() {
+            return new Promise((resolve) => {
+                const modal = document.createElement('div');
+                modal.className = 'modal fade show';
+                modal.style.display = 'block';
+                modal.style.backgroundColor = 'rgba(0,0,0,0.5)';
+                modal.style.zIndex = '20000';
+                modal.innerHTML = `
+                    <div class="modal-dialog modal-dialog-centered">
+                        <div class="modal-content">
+                            <div class="modal-header">
+                                <h5 class="modal-title">
+                                    <i class="fas fa-trash text-danger"></i> 删除图像
+                                </h5>
+                            </div>
+                            <div class="modal-body">
+                                <p>确定要删除选中的图像吗？</p>
+                                <div class="alert alert-warning">
+                                    <i class="fas fa-exclamation-triangle"></i>
+                                    图像将从幻灯片中完全移除，但可以在5秒内撤销此操作。
+                                </div>
+                            </div>
+                            <div class="modal-footer">
+                                <button type="button" class="btn btn-secondary" onclick="closeDeleteDialog(false)">取消</button>
+                                <button type="button" class="btn btn-danger" onclick="closeDeleteDialog(true)">
+                                    <i class="fas fa-trash"></i> 确定删除
+                                </button>
+                            </div>
+                        </div>
+                    </div>
+                `;
+
+                document.body.appendChild(modal);
+
+                window.closeDeleteDialog = (confirmed) => {
+                    document.body.removeChild(modal);
+                    delete window.closeDeleteDialog;
+                    resolve(confirmed);
+                };
+            });
+        }
+
+        // 显示图片库选择对话框
+        async function showImageGalleryDialog() {
+            return new Promise((resolve) => {
+                const modal = document.createElement('div');
+                modal.className = 'modal fade show';
+                modal.style.display = 'block';
+                modal.style.backgroundColor = 'rgba(0,0,0,0.5)';
+                modal.style.zIndex = '20000';
+                modal.innerHTML = `
+                    <div class="modal-dialog modal-xl modal-dialog-centered">
+                        <div class="modal-content">
+                            <div class="modal-header">
+                                <h5 class="modal-title">
+                                    <i class="fas fa-images text-primary"></i> 选择图片
+                                </h5>
+                                <button type="button" class="btn-close" onclick="closeGalleryDialog(null)"></button>
+                            </div>
+                            <div class="modal-body">
+                                <!-- 搜索和筛选区域 -->
+                                <div class="row mb-3">
+                                    <div class="col-md-6">
+                                        <div class="input-group">
+                                            <span class="input-group-text"><i class="fas fa-search"></i></span>
+                                            <input type="text" class="form-control" id="imageSearchInput"
+                                                   placeholder="搜索图片标题或描述..." onkeyup="searchImages(event)">
+                                        </div>
+                                    </div>
+                                    <div class="col-md-3">
+                                        <select class="form-select" id="imageCategoryFilter" onchange="filterImages()">
+                                            <option value="">所有分类</option>
+                                            <option value="ai_generated">AI生成</option>
+                                            <option value="network_search">网络搜索</option>
+                                            <option value="local_upload">本地上传</option>
+                                        </select>
+                                    </div>
+                                    <div class="col-md-3">
+                                        <select class="form-select" id="imagePageSize" onchange="changePageSize()">
+                                            <option value="12">每页12张</option>
+                                            <option value="24" selected>每页24张</option>
+                                            <option value="48">每页48张</option>
+                                        </select>
+                                    </div>
+                                </div>
+
+                                <!-- 图片展示区域 -->
+                                <div id="imageGalleryContainer" style="min-height: 400px; max-height: 500px; overflow-y: auto;">
+                                    <div class="text-center">
+                                        <i class="fas fa-spinner fa-spin"></i> 加载图片库...
+                                    </div>
+                                </div>
+
+                                <!-- 分页区域 -->
+                                <div id="imagePagination" class="d-flex justify-content-between align-items-center mt-3">
+                                    <div id="imageStats" class="text-muted"></div>
+                                    <nav>
+                                        <ul class="pagination pagination-sm mb-0" id="paginationList">
+                                        </ul>
+                                    </nav>
+                                </div>
+                            </div>
+                            <div class="modal-footer">
+                                <button type="button" class="btn btn-secondary" onclick="closeGalleryDialog(null)">取消</button>
+                                <button type="button" class="btn btn-primary" id="useSelectedBtn" onclick="useSelectedImage()" disabled>
+                                    <i class="fas fa-check"></i> 使用选中图片
+                                </button>
+                            </div>
+                        </div>
+                    </div>
+                `;
+
+                document.body.appendChild(modal);
+
+                // 初始化图片库
+                initImageGallery();
+
+                window.closeGalleryDialog = (selectedImage) => {
+                    document.body.removeChild(modal);
+                    delete window.closeGalleryDialog;
+                    delete window.selectGalleryImage;
+                    delete window.useSelectedImage;
+                    delete window.searchImages;
+                    delete window.filterImages;
+                    delete window.changePageSize;
+                    delete window.goToPage;
+                    resolve(selectedImage);
+                };
+
+                window.selectGalleryImage = (imageData) => {
+                    // 更新选中状态
+                    document.querySelectorAll('.gallery-image-item').forEach(item => {
+                        item.classList.remove('selected');
+                    });
+                    event.currentTarget.classList.add('selected');
+
+                    // 启用使用按钮
+                    document.getElementById('useSelectedBtn').disabled = false;
+
+                    // 保存选中的图片数据
+                    window.selectedImageData = imageData;
+                };
+
+                window.useSelectedImage = () => {
+                    if (window.selectedImageData) {
+                        window.closeGalleryDialog(window.selectedImageData);
+                    }
+                };
+            });
+        }
+
+        // 显示进度提示
+        function showProgressToast(message) {
+            const toast = document.createElement('div');
+            toast.className = 'progress-toast';
+            toast.innerHTML = `
+                <div class="progress-toast-content">
+                    <div class="progress-toast-icon">
+                        <i class="fas fa-spinner fa-spin"></i>
+                    </div>
+                    <div class="progress-toast-text">
+                        <div class="progress-message">${message}</div>
+                        <div class="progress-bar">
+                            <div class="progress-fill" style="width: 0%"></div>
+                        </div>
+                    </div>
+                </div>
+            `;
+
+            document.body.appendChild(toast);
+
+            // 添加样式
+            if (!document.getElementById('progress-toast-styles')) {
+                const style = document.createElement('style');
+                style.id = 'progress-toast-styles';
+                style.textContent = `
+                    .progress-toast {
+                        position: fixed;
+                        top: 20px;
+                        right: 20px;
+                        background: var(--glass-bg);
+                        backdrop-filter: blur(10px);
+                        border: 1px solid var(--glass-border);
+                        border-radius: var(--border-radius-md);
+                        padding: var(--spacing-md);
+                        z-index: 25000;
+                        min-width: 300px;
+                        box-shadow: 0 8px 25px rgba(31, 38, 135, 0.2);
+                        animation: slideInRight 0.3s ease;
+                    }
+
+                    .progress-toast-content {
+                        display: flex;
+                        align-items: center;
+                        gap: var(--spacing-sm);
+                    }
+
+                    .progress-toast-icon {
+                        color: var(--primary-color);
+                        font-size: 1.2rem;
+                    }
+
+                    .progress-toast-text {
+                        flex: 1;
+                    }
+
+                    .progress-message {
+                        font-size: 0.875rem;
+                        font-weight: 600;
+                        color: var(--text-primary);
+                        margin-bottom: var(--spacing-xs);
+                    }
+
+                    .progress-bar {
+                        height: 4px;
+                        background: rgba(0,0,0,0.1);
+                        border-radius: 2px;
+                        overflow: hidden;
+                    }
+
+                    .progress-fill {
+                        height: 100%;
+                        background: var(--primary-gradient);
+                        transition: width 0.3s ease;
+                    }
+
+                    @keyframes slideInRight {
+                        from { transform: translateX(100%); opacity: 0; }
+                        to { transform: translateX(0); opacity: 1; }
+                    }
+                `;
+                document.head.appendChild(style);
+            }
+
+            return toast;
+        }
+
+        // 更新进度提示
+        function updateProgressToast(toast, message, progress) {
+            const messageEl = toast.querySelector('.progress-message');
+            const fillEl = toast.querySelector('.progress-fill');
+
+            if (messageEl) messageEl.textContent = message;
+            if (fillEl) fillEl.style.width = `${progress}%`;
+        }
+
+        // 关闭进度提示
+        function closeProgressToast(toast) {
+            if (toast && toast.parentNode) {
+                toast.style.animation = 'slideOutRight 0.3s ease';
+                setTimeout(() => {
+                    if (toast.parentNode) {
+                        toast.parentNode.removeChild(toast);
+                    }
+                }, 300);
+            }
+        }
+
+        // 显示撤销选项
+        function showUndoOption(originalHtmlContent, slideIndex, operationType = '图像重新生成') {
+            const undoToast = document.createElement('div');
+            undoToast.className = 'undo-toast';
+
+            const operationMessages = {
+                '图像重新生成': { icon: 'fa-sync', message: '图像已重新生成' },
+                '图像删除': { icon: 'fa-trash', message: '图像已删除' },
+                '图像替换': { icon: 'fa-images', message: '图像已替换' }
+            };
+
+            const operation = operationMessages[operationType] || operationMessages['图像重新生成'];
+
+            undoToast.innerHTML = `
+                <div class="undo-toast-content">
+                    <div class="undo-message">
+                        <i class="fas fa-check-circle text-success"></i>
+                        ${operation.message}
+                    </div>
+                    <button class="undo-btn" onclick="undoImageRegeneration('${slideIndex}', this)">
+                        <i class="fas fa-undo"></i> 撤销
+                    </button>
+                </div>
+            `;
+
+            // 保存原始内容和操作类型到按钮的数据属性中
+            const undoBtn = undoToast.querySelector('.undo-btn');
+            undoBtn.setAttribute('data-original-content', originalHtmlContent);
+            undoBtn.setAttribute('data-operation-type', operationType);
+
+            document.body.appendChild(undoToast);
+
+            // 添加样式
+            if (!document.getElementById('undo-toast-styles')) {
+                const style = document.createElement('style');
+                style.id = 'undo-toast-styles';
+                style.textContent = `
+                    .undo-toast {
+                        position: fixed;
+                        bottom: 20px;
+                        right: 20px;
+                        background: var(--glass-bg);
+                        backdrop-filter: blur(10px);
+                        border: 1px solid var(--glass-border);
+                        border-radius: var(--border-radius-md);
+                        padding: var(--spacing-md);
+                        z-index: 25000;
+                        box-shadow: 0 8px 25px rgba(31, 38, 135, 0.2);
+                        animation: slideInUp 0.3s ease;
+                    }
+
+                    .undo-toast-content {
+                        display: flex;
+                        align-items: center;
+                        gap: var(--spacing-md);
+                    }
+
+                    .undo-message {
+                        font-size: 0.875rem;
+                        color: var(--text-primary);
+                    }
+
+                    .undo-btn {
+                        background: var(--accent-gradient);
+                        border: none;
+                        color: white;
+                        padding: var(--spacing-xs) var(--spacing-sm);
+                        border-radius: var(--border-radius-sm);
+                        font-size: 0.8125rem;
+                        cursor: pointer;
+                        transition: all 0.2s ease;
+                    }
+
+                    .undo-btn:hover {
+                        transform: translateY(-1px);
+                        box-shadow: 0 4px 15px rgba(67, 233, 123, 0.3);
+                    }
+
+                    @keyframes slideInUp {
+                        from { transform: translateY(100%); opacity: 0; }
+                        to { transform: translateY(0); opacity: 1; }
+                    }
+                `;
+                document.head.appendChild(style);
+            }
+
+            // 15秒后自动隐藏
+            setTimeout(() => {
+                if (undoToast.parentNode) {
+                    undoToast.style.animation = 'slideOutDown 0.3s ease';
+                    setTimeout(() => {
+                        if (undoToast.parentNode) {
+                            undoToast.parentNode.removeChild(undoToast);
+                        }
+                    }, 300);
+                }
+            }, 5000);
+        }
+
+        // 撤销图像操作（重新生成、删除、替换）
+        async function undoImageRegeneration(slideIndex, button) {
+            const originalContent = button.getAttribute('data-original-content');
+            const operationType = button.getAttribute('data-operation-type') || '图像重新生成';
+            if (!originalContent) return;
+
+            try {
+                // 恢复原始内容
+                slidesData[slideIndex].html_content = originalContent;
+
+                // 更新预览
+                if (slideIndex == currentSlideIndex) {
+                    const slideFrame = document.getElementById('slideFrame');
+                    if (slideFrame) {
+                        setSafeIframeContent(slideFrame, originalContent);
+                        setTimeout(() => {
+                            forceReinitializeIframeJS(slideFrame);
+                        }, 300);
+                    }
+                }
+
+                // 更新缩略图
+                const thumbnailIframe = document.querySelectorAll('.slide-thumbnail .slide-preview iframe')[slideIndex];
+                if (thumbnailIframe) {
+                    setSafeIframeContent(thumbnailIframe, originalContent);
+                }
+
+                // 保存到服务器
+                await saveToServer();
+
+                // 移除撤销提示
+                const undoToast = button.closest('.undo-toast');
+                if (undoToast && undoToast.parentNode) {
+                    undoToast.parentNode.removeChild(undoToast);
+                }
+
+                showNotification(`已撤销${operationType}`, 'info');
+
+            } catch (error) {
+                showNotification('撤销操作失败', 'error');
+            }
+        }
+
+        // 从HTML中删除图像（保持完整HTML结构）
+        function removeImageFromHtml(htmlContent, imageInfo) {
+            try {
+                const imageType = imageInfo.type || 'img';
+                const oldSrc = imageInfo.src || '';
+
+                let updatedHtml = htmlContent;
+                let removed = false;
+
+                if (imageType === 'img') {
+                    // 使用正则表达式删除整个img标签
+                    const imgRegex = new RegExp(
+                        `<img[^>]*src=["'][^"']*${escapeRegExp(oldSrc.split('/').pop())}[^"']*["'][^>]*>`,
+                        'gi'
+                    );
+
+                    if (imgRegex.test(htmlContent)) {
+                        updatedHtml = htmlContent.replace(imgRegex, '');
+                        removed = true;
+                    } else {
+                        // 后备方案：查找包含特定src的img标签
+                        const fallbackRegex = new RegExp(
+                            `<img[^>]*src=["'][^"']*${escapeRegExp(oldSrc)}[^"']*["'][^>]*>`,
+                            'gi'
+                        );
+                        if (fallbackRegex.test(htmlContent)) {
+                            updatedHtml = htmlContent.replace(fallbackRegex, '');
+                            removed = true;
+                        }
+                    }
+                } else if (imageType === 'background') {
+                    // 删除背景图像样式，但保留元素和其他样式
+                    const bgRegex = new RegExp(
+                        `(style=["'][^"']*?)background-image:\\s*url\\([^)]*${escapeRegExp(oldSrc.split('/').pop())}[^)]*\\);?([^"']*?["'])`,
+                        'gi'
+                    );
+
+                    if (bgRegex.test(htmlContent)) {
+                        updatedHtml = htmlContent.replace(bgRegex, (match, before, after) => {
+                            // 清理可能的多余分号和空格
+                            const cleanBefore = before.replace(/;\s*$/, '');
+                            const cleanAfter = after.replace(/^\s*;/, '');
+
+                            if (cleanBefore.trim() === 'style="' && cleanAfter.trim() === '"') {
+                                // 如果style属性变空，则完全移除
+                                return '';
+                            } else {
+                                return cleanBefore + (cleanBefore.endsWith(';') ? '' : ';') + cleanAfter;
+                            }
+                        });
+                        removed = true;
+                    }
+                } else if (imageType === 'svg') {
+                    // SVG删除相对复杂，这里提供基本支持
+                    if (imageInfo.outerHTML) {
+                        const svgContent = imageInfo.outerHTML.substring(0, 100); // 取前100字符作为匹配
+                        if (htmlContent.includes(svgContent)) {
+                            // 尝试找到完整的SVG标签
+                            const svgRegex = /<svg[^>]*>[\s\S]*?<\/svg>/gi;
+                            const svgMatches = htmlContent.match(svgRegex);
+
+                            if (svgMatches) {
+                                for (const svgMatch of svgMatches) {
+                                    if (svgMatch.includes(svgContent)) {
+                                        updatedHtml = htmlContent.replace(svgMatch, '');
+                                        removed = true;
+                                        break;
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+
+                // 清理可能产生的多余空白
+                if (removed) {
+                    updatedHtml = updatedHtml.replace(/\s{2,}/g, ' ').trim();
+                }
+
+                return removed ? updatedHtml : htmlContent;
+
+            } catch (error) {
+                return htmlContent;
+            }
+        }
+
+        // 图片库状态管理
+        let galleryState = {
+            allImages: [],
+            filteredImages: [],
+            currentPage: 1,
+            pageSize: 24,
+            searchTerm: '',
+            categoryFilter: ''
+        };
+
+        // 初始化图片库
+        async function initImageGallery() {
+            try {
+                // 自动分页加载所有图片
+                const allImages = await loadAllImages();
+
+                if (allImages.length > 0) {
+                    galleryState.allImages = allImages;
+                    galleryState.filteredImages = [...allImages];
+                    renderImageGallery();
+                } else {
+                    showEmptyGallery();
+                }
+
+            } catch (error) {
+                showGalleryError(error.message);
+            }
+        }
+
+        // 加载所有图片（自动分页）
+        async function loadAllImages() {
+            const allImages = [];
+            let currentPage = 1;
+            let hasMore = true;
+
+            while (hasMore) {
+                try {
+                    const response = await fetch(`/landppt/api/image/gallery/list?page=${currentPage}&per_page=50`);
+
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                    }
+
+                    const result = await response.json();
+
+                    if (result.success && result.images && result.images.length > 0) {
+                        allImages.push(...result.images);
+
+                        // 检查是否还有更多页面
+                        hasMore = result.pagination && result.pagination.has_next;
+                        currentPage++;
+                    } else {
+                        hasMore = false;
+                    }
+                } catch (error) {
+                    hasMore = false;
+                }
+            }
+
+            return allImages;
+        }
+
+        // 渲染图片库
+        function renderImageGallery() {
+            const container = document.getElementById('imageGalleryContainer');
+            if (!container) return;
+
+            const { filteredImages, currentPage, pageSize } = galleryState;
+
+            if (filteredImages.length === 0) {
+                showEmptyGallery();
+                return;
+            }
+
+            // 计算分页
+            const totalPages = Math.ceil(filteredImages.length / pageSize);
+            const startIndex = (currentPage - 1) * pageSize;
+            const endIndex = Math.min(startIndex + pageSize, filteredImages.length);
+            const currentImages = filteredImages.slice(startIndex, endIndex);
+
+            // 渲染图片网格
+            const imagesHtml = currentImages.map(image => `
+                <div class="col-lg-2 col-md-3 col-sm-4 col-6">
+                    <div class="gallery-image-item"
+                         onclick="selectGalleryImage({
+                             id: '${image.id}',
+                             url: '${image.url}',
+                             title: '${escapeHtml(image.title || '')}',
+                             alt: '${escapeHtml(image.alt_text || image.title || '')}',
+                             width: ${image.width || 0},
+                             height: ${image.height || 0},
+                             category: '${image.category || image.source || ''}',
+                             description: '${escapeHtml(image.description || '')}'
+                         })"
+                         ondblclick="handleImageDoubleClick({
+                             id: '${image.id}',
+                             url: '${image.url}',
+                             title: '${escapeHtml(image.title || '')}',
+                             alt: '${escapeHtml(image.alt_text || image.title || '')}',
+                             width: ${image.width || 0},
+                             height: ${image.height || 0},
+                             category: '${image.category || image.source || ''}',
+                             description: '${escapeHtml(image.description || '')}'
+                         })"
+                         style="cursor: pointer; border: 2px solid transparent; border-radius: 8px; padding: 8px; transition: all 0.2s ease; position: relative;">
+                        <div class="image-wrapper" style="position: relative; overflow: hidden; border-radius: 4px;">
+                            <img src="${getImageUrl(image)}" alt="${escapeHtml(image.alt_text || image.title || '')}"
+                                 style="width: 100%; height: 120px; object-fit: cover; transition: transform 0.2s ease;"
+                                 onload="this.style.opacity='1'; this.parentElement.querySelector('.loading-spinner').style.display='none';"
+                                 onerror="handleImageError(this, '${image.id}');">
+                            <div class="loading-spinner" style="position: absolute; top: 50%; left: 50%; transform: translate(-50%, -50%); color: #ccc;">
+                                <i class="fas fa-spinner fa-spin"></i>
+                            </div>
+                            <div class="image-overlay" style="position: absolute; top: 0; left: 0; right: 0; bottom: 0; background: rgba(0,0,0,0.7); opacity: 0; transition: opacity 0.2s ease; display: flex; align-items: center; justify-content: center;">
+                                <i class="fas fa-eye text-white" style="font-size: 1.5rem;"></i>
+                            </div>
+                        </div>
+                        <div class="text-center mt-2">
+                            <small class="d-block text-truncate fw-bold">${escapeHtml(image.title || '未命名图片')}</small>
+                            <small class="text-muted">${image.width || 0} × ${image.height || 0}</small>
+                            ${getImageCategoryBadge(image)}
+                        </div>
+                    </div>
+                </div>
+            `).join('');
+
+            container.innerHTML = `
+                <div class="row g-3">
+                    ${imagesHtml}
+                </div>
+                <style>
+                    .gallery-image-item:hover {
+                        border-color: #007bff !important;
+                        background-color: rgba(0, 123, 255, 0.1);
+                        transform: translateY(-2px);
+                        box-shadow: 0 4px 12px rgba(0, 123, 255, 0.2);
+                    }
+                    .gallery-image-item:hover .image-overlay {
+                        opacity: 1;
+                    }
+                    .gallery-image-item:hover img {
+                        transform: scale(1.05);
+                    }
+                    .gallery-image-item.selected {
+                        border-color: #28a745 !important;
+                        background-color: rgba(40, 167, 69, 0.1);
+                        box-shadow: 0 0 0 3px rgba(40, 167, 69, 0.2);
+                    }
+                </style>
+            `;
+
+            // 更新分页和统计信息
+            updatePagination(totalPages);
+            updateStats(startIndex + 1, endIndex, filteredImages.length);
+        }
+
+        // 更新分页
+        function updatePagination(totalPages) {
+            const paginationList = document.getElementById('paginationList');
+            if (!paginationList) return;
+
+            const { currentPage } = galleryState;
+            let paginationHtml = '';
+
+            // 上一页
+            paginationHtml += `
+                <li class="page-item ${currentPage === 1 ? 'disabled' : ''}">
+                    <a class="page-link" href="#" onclick="goToPage(${currentPage - 1}); return false;">
+                        <i class="fas fa-chevron-left"></i>
+                    </a>
+                </li>
+            `;
+
+            // 页码
+            const maxVisiblePages = 5;
+            let startPage = Math.max(1, currentPage - Math.floor(maxVisiblePages / 2));
+            let endPage = Math.min(totalPages, startPage + maxVisiblePages - 1);
+
+            if (endPage - startPage < maxVisiblePages - 1) {
+                startPage = Math.max(1, endPage - maxVisiblePages + 1);
+            }
+
+            for (let i = startPage; i <= endPage; i++) {
+                paginationHtml += `
+                    <li class="page-item ${i === currentPage ? 'active' : ''}">
+                        <a class="page-link" href="#" onclick="goToPage(${i}); return false;">${i}</a>
+                    </li>
+                `;
+            }
+
+            // 下一页
+            paginationHtml += `
+                <li class="page-item ${currentPage === totalPages ? 'disabled' : ''}">
+                    <a class="page-link" href="#" onclick="goToPage(${currentPage + 1}); return false;">
+                        <i class="fas fa-chevron-right"></i>
+                    </a>
+                </li>
+            `;
+
+            paginationList.innerHTML = paginationHtml;
+        }
+
+        // 更新统计信息
+        function updateStats(start, end, total) {
+            const statsElement = document.getElementById('imageStats');
+            if (statsElement) {
+                statsElement.textContent = `显示 ${start}-${end} 项，共 ${total} 张图片`;
+            }
+        }
+
+        // 初始化CodeMirror编辑器
+        function initializeCodeMirror() {
+            const textareaElement = document.getElementById('codeEditor');
+            if (!textareaElement || isCodeMirrorInitialized) return;
+
+            try {
+                // 创建CodeMirror实例
+                codeMirrorEditor = CodeMirror.fromTextArea(textareaElement, {
+                    mode: 'htmlmixed',
+                    theme: 'material',
+                    lineNumbers: true,
+                    lineWrapping: true,
+                    autoCloseTags: true,
+                    autoCloseBrackets: true,
+                    matchTags: true,
+                    foldGutter: true,
+                    gutters: ['CodeMirror-linenumbers', 'CodeMirror-foldgutter'],
+                    indentUnit: 2,
+                    tabSize: 2,
+                    indentWithTabs: false,
+                    extraKeys: {
+                        // 保存功能
+                        'Ctrl-S': function(cm) {
+                            saveSlide();
+                        },
+                        'Cmd-S': function(cm) {
+                            saveSlide();
+                        },
+                        // 搜索功能
+                        'Ctrl-F': 'findPersistent',
+                        'Cmd-F': 'findPersistent',
+                        // 查找替换功能
+                        'Ctrl-H': 'replace',
+                        'Cmd-Alt-F': 'replace',
+                        'Ctrl-Shift-H': 'replace',
+                        // 查找下一个/上一个
+                        'Ctrl-G': 'findNext',
+                        'Cmd-G': 'findNext',
+                        'Shift-Ctrl-G': 'findPrev',
+                        'Shift-Cmd-G': 'findPrev',
+                        'F3': 'findNext',
+                        'Shift-F3': 'findPrev',
+                        // ESC键关闭搜索对话框
+                        'Esc': function(cm) {
+                            if (cm.state.search && cm.state.search.overlay) {
+                                cm.execCommand('clearSearch');
+                            }
+                        }
+                    }
+                });
+
+                // 设置编辑器样式 - 使用具体的高度计算
+                codeMirrorEditor.setSize('100%', 'auto');
+
+                // 强制刷新编辑器以确保正确的尺寸
+                setTimeout(() => {
+                    codeMirrorEditor.refresh();
+                    // 计算并设置正确的高度
+                    const editPane = document.getElementById('editPane');
+                    if (editPane) {
+                        const rect = editPane.getBoundingClientRect();
+                        const height = Math.max(400, rect.height - 40); // 减去padding，最小400px
+                        codeMirrorEditor.setSize('100%', height + 'px');
+                    }
+                }, 200);
+
+                // 绑定内容变化事件
+                codeMirrorEditor.on('change', function(cm) {
+                    clearTimeout(cm.saveTimeout);
+                    cm.saveTimeout = setTimeout(() => {
+                        if (currentMode === 'split') {
+                            // Auto-update preview in split mode
+                            const slideFrame = document.getElementById('slideFrame');
+                            if (slideFrame && slidesData[currentSlideIndex]) {
+                                const newContent = codeMirrorEditor.getValue();
+                                slidesData[currentSlideIndex].html_content = newContent;
+                                setSafeIframeContent(slideFrame, newContent);
+                            }
+                        }
+                    }, 500);
+                });
+
+                isCodeMirrorInitialized = true;
+
+                // 添加搜索功能的增强配置
+                codeMirrorEditor.on('cursorActivity', function(cm) {
+                    // 当光标移动时，如果有搜索状态，保持高亮
+                    if (cm.state.search && cm.state.search.query) {
+                        // 搜索功能已激活，保持高亮状态
+                    }
+                });
+
+                // 恢复用户的主题偏好
+                setTimeout(() => {
+                    restoreCodeMirrorTheme();
+                }, 100);
+            } catch (error) {
+                // 如果CodeMirror初始化失败，保持使用原始textarea
+            }
+        }
+
+        // 切换CodeMirror主题
+        function changeCodeMirrorTheme(themeName) {
+            if (codeMirrorEditor && isCodeMirrorInitialized) {
+                codeMirrorEditor.setOption('theme', themeName);
+
+                // 保存主题偏好到localStorage
+                localStorage.setItem('codeMirrorTheme', themeName);
+
+                // 更新下拉菜单显示
+                const themeDropdown = document.getElementById('themeDropdown');
+                if (themeDropdown) {
+                    const themeNames = {
+                        'material': 'Material Dark',
+                        'monokai': 'Monokai',
+                        'dracula': 'Dracula',
+                        'default': '默认浅色'
+                    };
+                    themeDropdown.innerHTML = `<i class="fas fa-palette"></i> ${themeNames[themeName] || themeName}`;
+                }
+            } else {
+                // CodeMirror编辑器未初始化，无法切换主题
+            }
+        }
+
+        // 从localStorage恢复主题偏好
+        function restoreCodeMirrorTheme() {
+            const savedTheme = localStorage.getItem('codeMirrorTheme');
+            if (savedTheme && codeMirrorEditor && isCodeMirrorInitialized) {
+                changeCodeMirrorTheme(savedTheme);
+            }
+        }
+
+        // 重新计算CodeMirror编辑器的尺寸
+        function resizeCodeMirror() {
+            if (codeMirrorEditor && isCodeMirrorInitialized) {
+                const editPane = document.getElementById('editPane');
+                if (editPane && editPane.style.display !== 'none') {
+                    // 刷新编辑器以重新计算尺寸
+                    codeMirrorEditor.refresh();
+
+                    // 设置正确的高度
+                    const rect = editPane.getBoundingClientRect();
+                    const height = Math.max(400, rect.height - 40); // 减去padding，最小400px
+                    if (height > 0) {
+                        codeMirrorEditor.setSize('100%', height + 'px');
+                    }
+                }
+            }
+        }
+
+
+
+        // 初始化侧栏宽度调整功能
+        function initializeSidebarResize() {
+            const resizeHandle = document.getElementById('aiSidebarResizeHandle');
+            const sidebar = document.getElementById('aiEditSidebar');
+
+            if (!resizeHandle || !sidebar) return;
+
+            resizeHandle.addEventListener('mousedown', (e) => {
+                isResizingSidebar = true;
+                sidebarStartWidth = sidebar.offsetWidth;
+                sidebarStartX = e.clientX;
+
+                document.addEventListener('mousemove', handleSidebarResize);
+                document.addEventListener('mouseup', stopSidebarResize);
+
+                e.preventDefault();
+            });
+        }
+
+        function handleSidebarResize(e) {
+            if (!isResizingSidebar) return;
+
+            const sidebar = document.getElementById('aiEditSidebar');
+            if (!sidebar) return;
+
+            const deltaX = sidebarStartX - e.clientX; // 向左拖拽为正值
+            const newWidth = Math.max(400, Math.min(800, sidebarStartWidth + deltaX));
+
+            sidebar.style.width = newWidth + 'px';
+            sidebar.style.right = sidebar.classList.contains('open') ? '0' : `-${newWidth}px`;
+        }
+
+        function stopSidebarResize() {
+            isResizingSidebar = false;
+            document.removeEventListener('mousemove', handleSidebarResize);
+            document.removeEventListener('mouseup', stopSidebarResize);
+        }
+
+        // AI编辑侧栏控制函数
+        function openAIEditSidebar() {
+            const sidebar = document.getElementById('aiEditSidebar');
+            const overlay = document.getElementById('aiSidebarOverlay');
+
+            sidebar.classList.add('open');
+            overlay.classList.add('show');
+
+            // 更新当前页数显示
+            updateAICurrentSlideInfo();
+
+            // 聚焦到输入框
+            setTimeout(() => {
+                document.getElementById('aiInputBox').focus();
+            }, 300);
+        }
+
+        function closeAIEditSidebar() {
+            const sidebar = document.getElementById('aiEditSidebar');
+            const overlay = document.getElementById('aiSidebarOverlay');
+
+            sidebar.classList.remove('open');
+            overlay.classList.remove('show');
+        }
+
+        // 快捷重新生成功能
+        function quickRegenerateSlide() {
+            if (currentSlideIndex >= 0 && currentSlideIndex < slidesData.length) {
+                // 使用与enhanced_ppt_service.py相同的重新生成逻辑
+                regenerateSlideByIndex(currentSlideIndex);
+                closeAIEditSidebar();
+            } else {
+                showNotification('请先选择一个幻灯片', 'warning');
+            }
+        }
+
+        // AI消息处理函数
+        function addAIMessage(content, type = 'assistant', messageId = null) {
+            const messagesContainer = document.getElementById('aiChatMessages');
+
+            // 如果提供了messageId，尝试找到现有消息并更新
+            if (messageId) {
+                const existingMessage = document.getElementById(messageId);
+                if (existingMessage) {
+                    if (type === 'user') {
+                        existingMessage.textContent = content;
+                    } else {
+                        existingMessage.innerHTML = content.replace(/\n/g, '<br>');
+                    }
+                    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+                    return existingMessage;
+                }
+            }
+
+            // 创建新消息
+            const messageDiv = document.createElement('div');
+            messageDiv.className = `ai-message ${type}`;
+            if (messageId) {
+                messageDiv.id = messageId;
+            }
+
+            if (type === 'user') {
+                messageDiv.textContent = content;
+            } else {
+                messageDiv.innerHTML = content.replace(/\n/g, '<br>');
+            }
+
+            messagesContainer.appendChild(messageDiv);
+            messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+            // 保存到聊天历史（按幻灯片索引存储）
+            if (currentSlideIndex >= 0) {
+                if (!aiChatHistory[currentSlideIndex]) {
+                    aiChatHistory[currentSlideIndex] = [];
+                }
+                // 将type转换为role格式，以便后端AI能正确理解
+                const role = type === 'user' ? 'user' : 'assistant';
+                aiChatHistory[currentSlideIndex].push({
+                    role: role,
+                    content: content,
+                    timestamp: Date.now()
+                });
+            }
+
+            return messageDiv;
+        }
+
+        // 添加等待响应动画
+        function addWaitingAnimation() {
+            const messagesContainer = document.getElementById('aiChatMessages');
+            const waitingDiv = document.createElement('div');
+            waitingDiv.className = 'ai-message assistant ai-waiting';
+            waitingDiv.id = 'ai-waiting-animation';
+            waitingDiv.innerHTML = `
+                <div class="ai-typing-indicator">
+                    <span></span>
+                    <span></span>
+                    <span></span>
+                </div>
+                <span style="margin-left: 10px;">AI正在思考中...</span>
+            `;
+
+            messagesContainer.appendChild(waitingDiv);
+            messagesContainer.scrollTop = messagesContainer.scrollHeight;
+
+            return waitingDiv;
+        }
+
+        // 移除等待动画
+        function removeWaitingAnimation() {
+            const waitingDiv = document.getElementById('ai-waiting-animation');
+            if (waitingDiv) {
+                waitingDiv.remove();
+            }
+        }
+
+        function clearAIMessages() {
+            const messagesContainer = document.getElementById('aiChatMessages');
+            // 保留系统欢迎消息
+            const systemMessage = messagesContainer.querySelector('.ai-message.system');
+            messagesContainer.innerHTML = '';
+            if (systemMessage) {
+                messagesContainer.appendChild(systemMessage);
+            }
+            // 清除当前幻灯片的对话历史
+            if (currentSlideIndex >= 0) {
+                aiChatHistory[currentSlideIndex] = [];
+            }
+        }
+
+        // 切换幻灯片时清除对话记录
+        function clearAIMessagesForSlideSwitch() {
+            const messagesContainer = document.getElementById('aiChatMessages');
+            // 保留系统欢迎消息
+            const systemMessage = messagesContainer.querySelector('.ai-message.system');
+            messagesContainer.innerHTML = '';
+            if (systemMessage) {
+                messagesContainer.appendChild(systemMessage);
+            }
+        }
+
+        // 验证当前幻灯片索引的有效性
+        function validateCurrentSlideIndex(functionName = 'unknown') {
+            const isValid = currentSlideIndex >= 0 && currentSlideIndex < (slidesData ? slidesData.length : 0);
+
+            if (!isValid) {
+                return false;
+            }
+
+            return true;
+        }
+
+        // 清除AI对话上下文
+        function clearAIContext() {
+            if (confirm('确定要清除当前幻灯片的对话上下文吗？这将删除当前幻灯片的所有对话记录。')) {
+                clearAIMessages();
+                showNotification('对话上下文已清除', 'info');
+            }
+        }
+
+        // 显示当前幻灯片大纲
+        function showSlideOutline() {
+            if (currentSlideIndex < 0 || currentSlideIndex >= slidesData.length) {
+                showNotification('请先选择一个幻灯片', 'warning');
+                return;
+            }
+
+            const currentSlide = slidesData[currentSlideIndex];
+            let outlineContent = '';
+
+            // 尝试从项目大纲中获取当前页的信息
+            if (projectOutline && projectOutline.slides && projectOutline.slides[currentSlideIndex]) {
+                const slideOutline = projectOutline.slides[currentSlideIndex];
+                outlineContent = `
+                    <h5 style="margin-bottom: 25px; color: #2c3e50; font-size: 1.3em;"><i class="fas fa-file-alt"></i> 第${currentSlideIndex + 1}页大纲编辑</h5>
+                    <div style="background: #f8f9fa; padding: 25px; border-radius: 8px; margin: 15px 0;">
+                        <div style="margin-bottom: 20px;">
+                            <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #495057; font-size: 1.1em;">标题：</label>
+                            <input type="text" id="slideTitle" value="${(slideOutline.title || currentSlide.title || '').replace(/"/g, '&quot;')}"
+                                   style="width: 100%; padding: 12px; border: 1px solid #ddd; border-radius: 6px; font-size: 16px; box-sizing: border-box;">
+                        </div>
+                        <div style="margin-bottom: 20px;">
+                            <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #495057; font-size: 1.1em;">类型：</label>
+                            <select id="slideType" style="width: 100%; padding: 12px; border: 1px solid #ddd; border-radius: 6px; font-size: 16px; box-sizing: border-box;">
+                                <option value="title" ${(slideOutline.slide_type || slideOutline.type) === 'title' ? 'selected' : ''}>标题页</option>
+                                <option value="content" ${(slideOutline.slide_type || slideOutline.type) === 'content' ? 'selected' : ''}>内容页</option>
+                                <option value="conclusion" ${(slideOutline.slide_type || slideOutline.type) === 'conclusion' ? 'selected' : ''}>结论页</option>
+                            </select>
+                        </div>
+                        ${slideOutline.content_points ? `
+                            <div style="margin-bottom: 20px;">
+                                <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #495057; font-size: 1.1em;">要点：</label>
+                                <div id="bulletPointsContainer" style="background: white; border: 1px solid #ddd; border-radius: 6px; padding: 8px; min-height: 120px;">
+                                    ${slideOutline.content_points.map((point, index) => `
+                                        <div class="bullet-point-item" data-index="${index}" style="display: flex; align-items: flex-start; margin-bottom: 8px; padding: 8px; border-radius: 4px; transition: all 0.2s ease; position: relative;">
+                                            <span style="color: #666; margin-right: 8px; font-weight: bold; min-width: 20px;">•</span>
+                                            <div style="flex: 1; position: relative;">
+                                                <div class="bullet-point-text" contenteditable="true" style="outline: none; min-height: 20px; line-height: 1.4; word-wrap: break-word;">${point}</div>
+                                            </div>
+
+                                        </div>
+                                    `).join('')}
+                                </div>
+                                <div style="margin-top: 8px; text-align: right; display: flex; gap: 8px; justify-content: flex-end;">
+                                    <button class="enhance-all-btn" onclick="enhanceAllBulletPoints()" title="AI增强所有要点" style="background-color: #6c757d; color: #fff; border: none; padding: 8px 16px; border-radius: 4px; cursor: pointer;">
+                                        <span>增强要点</span>
+                                    </button>
+                                    <button type="button" onclick="addNewBulletPoint()" class="btn btn-sm modal-btn-primary bullet-add-btn" style="background-color: #6c757d; color: #fff; border: none; padding: 8px 16px; border-radius: 4px; cursor: pointer;">
+                                        <i class="fas fa-plus"></i><span>添加要点</span>
+                                    </button>
+                                </div>
+                            </div>
+                        ` : `
+                            <div style="margin-bottom: 20px;">
+                                <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #495057; font-size: 1.1em;">要点：</label>
+                                <div id="bulletPointsContainer" style="background: white; border: 1px solid #ddd; border-radius: 6px; padding: 8px; min-height: 120px;">
+                                    <div class="empty-bullet-points" style="text-align: center; color: #999; padding: 40px 20px;">
+                                        <i class="fas fa-list" style="font-size: 24px; margin-bottom: 10px; opacity: 0.5;"></i>
+                                        <p style="margin: 0;">暂无要点，点击下方按钮添加</p>
+                                    </div>
+                                </div>
+                                <div class="bullet-actions">
+                                    <button type="button" class="btn btn-sm modal-btn-neutral" onclick="enhanceAllBulletPoints()" title="AI增强所有要点">
+                                        <span>增强要点</span>
+                                    </button>
+                                    <button type="button" class="btn btn-sm modal-btn-primary bullet-add-btn" onclick="addNewBulletPoint()">
+                                        <i class="fas fa-plus"></i><span>添加要点</span>
+                                    </button>
+                                </div>
+                            </div>
+                        `}
+                        <div style="margin-bottom: 15px;">
+                            <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #495057; font-size: 1.1em;">描述：</label>
+                            <textarea id="slideDescription" rows="4" style="width: 100%; padding: 12px; border: 1px solid #ddd; border-radius: 6px; font-size: 16px; box-sizing: border-box; resize: vertical;">${slideOutline.description || ''}</textarea>
+                        </div>
+                    </div>
+                `;
+            } else {
+                outlineContent = `
+                    <h5 style="margin-bottom: 25px; color: #2c3e50; font-size: 1.3em;"><i class="fas fa-file-alt"></i> 第${currentSlideIndex + 1}页大纲编辑</h5>
+                    <div style="background: #f8f9fa; padding: 25px; border-radius: 8px; margin: 15px 0;">
+                        <div style="margin-bottom: 20px;">
+                            <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #495057; font-size: 1.1em;">标题：</label>
+                            <input type="text" id="slideTitle" value="${(currentSlide.title || '').replace(/"/g, '&quot;')}"
+                                   style="width: 100%; padding: 12px; border: 1px solid #ddd; border-radius: 6px; font-size: 16px; box-sizing: border-box;">
+                        </div>
+                        <div style="margin-bottom: 20px;">
+                            <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #495057; font-size: 1.1em;">类型：</label>
+                            <select id="slideType" style="width: 100%; padding: 12px; border: 1px solid #ddd; border-radius: 6px; font-size: 16px; box-sizing: border-box;">
+                                <option value="title">标题页</option>
+                                <option value="content" selected>内容页</option>
+                                <option value="conclusion">结论页</option>
+                            </select>
+                        </div>
+                        <div style="margin-bottom: 20px;">
+                            <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #495057; font-size: 1.1em;">要点：</label>
+                            <textarea id="slidePoints" rows="6" placeholder="请输入要点，每行一个..." style="width: 100%; padding: 12px; border: 1px solid #ddd; border-radius: 6px; font-size: 16px; box-sizing: border-box; resize: vertical;"></textarea>
+                        </div>
+                        <div style="margin-bottom: 15px;">
+                            <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #495057; font-size: 1.1em;">描述：</label>
+                            <textarea id="slideDescription" rows="4" placeholder="请输入幻灯片描述..." style="width: 100%; padding: 12px; border: 1px solid #ddd; border-radius: 6px; font-size: 16px; box-sizing: border-box; resize: vertical;"></textarea>
+                        </div>
+                    </div>
+                `;
+            }
+
+            // 创建大纲编辑模态框
+            const modal = document.createElement('div');
+            modal.id = 'slideOutlineModal';
+            modal.style.cssText = `
+                position: fixed;
+                top: 0;
+                left: 0;
+                width: 100%;
+                height: 100%;
+                background: rgba(0,0,0,0.5);
+                z-index: 10001;
+                display: flex;
+                justify-content: center;
+                align-items: center;
+            `;
+
+            const outlineContainer = document.createElement('div');
+            outlineContainer.style.cssText = `
+                background: var(--bg-primary);
+                border-radius: 12px;
+                padding: 30px;
+                width: 90vw;
+                max-width: 1200px;
+                max-height: 85vh;
+                overflow-y: auto;
+                position: relative;
+                border: 1px solid var(--border-color);
+                box-shadow: 0 20px 50px rgba(0,0,0,0.25);
+            `;
+
+            const closeBtn = document.createElement('button');
+            closeBtn.type = 'button';
+            closeBtn.className = 'modal-close-button';
+            closeBtn.innerHTML = '<i class="fas fa-times"></i>';
+            closeBtn.style.cssText += 'position:absolute;top:18px;right:18px;z-index:1;';
+
+            // 添加按钮区域
+            const buttonArea = `
+                <div style="display: flex; justify-content: space-between; margin-top: 30px; padding-top: 20px; border-top: 2px solid #e9ecef;">
+                    <button onclick="aiOptimizeSingleSlideInSlidesEditor()" class="outline-modal-btn outline-modal-btn--solid">
+                        <i class="fas fa-robot"></i>
+                        <span>AI优化</span>
+                    </button>
+                    <div style="display: flex; gap: 15px;">
+                        <button onclick="saveSlideOutline()" class="outline-modal-btn outline-modal-btn--solid">
+                            <i class="fas fa-save"></i>
+                            <span>保存大纲</span>
+                        </button>
+                        <button onclick="regenerateFromOutline()" class="outline-modal-btn">
+                            <i class="fas fa-sync"></i>
+                            <span>根据大纲重新生成</span>
+                        </button>
+                    </div>
+                </div>
+            `;
+
+            closeBtn.addEventListener('click', () => {
+                document.body.removeChild(modal);
+            });
+
+            modal.addEventListener('click', (e) => {
+                if (e.target === modal) {
+                    document.body.removeChild(modal);
+                }
+            });
+
+            outlineContainer.innerHTML = outlineContent + buttonArea;
+            outlineContainer.appendChild(closeBtn);
+            modal.appendChild(outlineContainer);
+            document.body.appendChild(modal);
+        }
+
+        // 保存幻灯片大纲
+        async function saveSlideOutline() {
+            const title = document.getElementById('slideTitle').value;
+            const type = document.getElementById('slideType').value;
+            const description = document.getElementById('slideDescription').value;
+
+            // 从大纲编辑界面收集要点数据
+            let points = [];
+            const bulletPointsContainer = document.getElementById('bulletPointsContainer');
+            if (bulletPointsContainer) {
+                const bulletPointItems = bulletPointsContainer.querySelectorAll('.bullet-point-item');
+                points = Array.from(bulletPointItems).map(item => {
+                    const textElement = item.querySelector('.bullet-point-text');
+                    return textElement ? textElement.textContent.trim() : '';
+                }).filter(point => point); // 过滤空要点
+            } else {
+                // 回退到传统的textarea方式（如果没有新的要点容器）
+                const pointsElement = document.getElementById('slidePoints');
+                points = pointsElement ? pointsElement.value.split('\n').filter(p => p.trim()) : [];
+            }
+
+            // 更新本地数据
+            if (!projectOutline) {
+                projectOutline = { slides: [] };
+            }
+            if (!projectOutline.slides) {
+                projectOutline.slides = [];
+            }
+
+            projectOutline.slides[currentSlideIndex] = {
+                title: title,
+                slide_type: type,
+                type: type,
+                description: description,
+                content_points: points
+            };
+
+            // 更新幻灯片标题
+            if (slidesData[currentSlideIndex]) {
+                slidesData[currentSlideIndex].title = title;
+            }
+
+            try {
+                // 保存大纲到数据库
+                const response = await fetch(`/landppt/projects/${projectId}/update-outline`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        outline_content: JSON.stringify(projectOutline, null, 2)
+                    })
+                });
+
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+
+                const data = await response.json();
+                if (data.status === 'success') {
+                    showNotification('大纲已保存！', 'success');
+                } else {
+                    throw new Error(data.message || data.error || '保存失败');
+                }
+            } catch (error) {
+                showNotification('保存大纲失败：' + error.message, 'error');
+                return; // 如果保存失败，不关闭模态框
+            }
+
+            // 关闭模态框
+            const modal = document.getElementById('slideOutlineModal');
+            if (modal) {
+                document.body.removeChild(modal);
+            }
+
+            // 更新缩略图标题
+            const thumbnails = document.querySelectorAll('.slide-thumbnail .slide-title');
+            if (thumbnails[currentSlideIndex]) {
+                thumbnails[currentSlideIndex].textContent = `${currentSlideIndex + 1}. ${title}`;
+            }
+
+            // 更新AI编辑助手右上角的大纲显示
+            updateAIOutlineDisplay();
+        }
+
+        // 更新AI编辑助手右上角的大纲显示
+        function updateAIOutlineDisplay() {
+            // 这里可以添加更新右上角大纲显示的逻辑
+            // 目前大纲按钮点击时会显示最新的大纲信息
+        }
+
+        // 获取项目选择的全局母版模板
+        async function getSelectedGlobalTemplate() {
+            try {
+                const response = await fetch(`/landppt/api/projects/${projectId}/selected-global-template`);
+                if (!response.ok) {
+                    return null;
+                }
+                const data = await response.json();
+                return data.template || null;
+            } catch (error) {
+                return null;
+            }
+        }
+
+        // 使用全局母版生成幻灯片HTML内容
+        async function generateSlideWithGlobalTemplate(template, title, content) {
+            try {
+                let htmlTemplate = template.html_template;
+
+                // 替换模板中的占位符
+                htmlTemplate = htmlTemplate.replace(/\{\{\s*page_title\s*\}\}/g, title);
+                htmlTemplate = htmlTemplate.replace(/\{\{\s*main_heading\s*\}\}/g, title);
+                htmlTemplate = htmlTemplate.replace(/\{\{\s*page_content\s*\}\}/g, content);
+                htmlTemplate = htmlTemplate.replace(/\{\{\s*current_page_number\s*\}\}/g, '1');
+                htmlTemplate = htmlTemplate.replace(/\{\{\s*total_page_count\s*\}\}/g, slidesData.length.toString());
+
+                return htmlTemplate;
+            } catch (error) {
+                // 返回默认的HTML内容
+                return `
+                    <div style="width: 1280px; height: 720px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                                display: flex; flex-direction: column; justify-content: center; align-items: center;
+                                color: white; font-family: 'Microsoft YaHei', Arial, sans-serif;">
+                        <h1 style="font-size: 48px; margin-bottom: 20px; text-align: center;">${title}</h1>
+                        <p style="font-size: 24px; text-align: center;">${content}</p>
+                    </div>
+                `;
+            }
+        }
+
+        // 根据大纲重新生成幻灯片
+        function regenerateFromOutline() {
+            if (confirm('确定要根据当前大纲重新生成这张幻灯片吗？这将覆盖现有内容。')) {
+                // 先保存大纲
+                saveSlideOutline();
+
+                // 然后重新生成
+                setTimeout(() => {
+                    regenerateSlideByIndex(currentSlideIndex);
+                }, 500);
+            }
+        }
+
+        // 同步更新大纲（插入、删除幻灯片时调用）
+        async function updateOutlineForSlideOperation(operation, slideIndex, slideData = null) {
+            try {
+                if (!projectOutline) {
+                    projectOutline = { slides: [] };
+                }
+                if (!projectOutline.slides) {
+                    projectOutline.slides = [];
+                }
+
+                switch (operation) {
+                    case 'insert':
+                        // 插入新的幻灯片大纲
+                        if (slideData) {
+                            projectOutline.slides.splice(slideIndex, 0, slideData);
+                        }
+                        break;
+                    case 'delete':
+                        // 删除指定位置的幻灯片大纲
+                        if (slideIndex >= 0 && slideIndex < projectOutline.slides.length) {
+                            projectOutline.slides.splice(slideIndex, 1);
+                        }
+                        break;
+                }
+
+                // 保存更新后的大纲到数据库
+                const response = await fetch(`/landppt/projects/${projectId}/update-outline`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        outline_content: JSON.stringify(projectOutline, null, 2)
+                    })
+                });
+
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+
+                const data = await response.json();
+                if (data.status === 'success') {
+                    // 大纲已同步更新
+                } else {
+                    throw new Error(data.message || data.error || '大纲更新失败');
+                }
+            } catch (error) {
+                throw error;
+            }
+        }
+
+        // 发送AI消息 - 使用流式输出
+        async function sendAIMessage() {
+            const inputBox = document.getElementById('aiInputBox');
+            const sendBtn = document.getElementById('aiSendBtn');
+            let message = inputBox.value.trim();
+
+            if (!message || isAISending) {
+                return;
+            }
+
+            // 自动将所有已上传的图片信息嵌入到消息中
+            message = autoEmbedUploadedImages(message);
+
+            if (currentSlideIndex < 0 || currentSlideIndex >= slidesData.length) {
+                showNotification('请先选择一个幻灯片', 'warning');
+                return;
+            }
+
+            // 禁用发送按钮和输入框
+            isAISending = true;
+            sendBtn.disabled = true;
+            sendBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> 响应中...';
+            inputBox.disabled = true;
+
+            // 添加用户消息
+            addAIMessage(message, 'user');
+            inputBox.value = '';
+
+            // 添加等待动画
+            const waitingDiv = addWaitingAnimation();
+
+            try {
+                // 构建AI请求上下文
+                const currentSlide = slidesData[currentSlideIndex];
+
+                // 获取当前幻灯片的大纲信息
+                let slideOutline = null;
+                if (projectOutline && projectOutline.slides && projectOutline.slides[currentSlideIndex]) {
+                    slideOutline = projectOutline.slides[currentSlideIndex];
+                }
+
+                // 获取当前幻灯片的对话历史
+                let chatHistory = [];
+                if (aiChatHistory[currentSlideIndex]) {
+                    chatHistory = aiChatHistory[currentSlideIndex].map(msg => ({
+                        role: msg.role,
+                        content: msg.content
+                    }));
+                }
+
+                // 捕获幻灯片截图（如果启用了视觉模式）
+                let slideScreenshot = null;
+                if (visionModeEnabled) {
+                    slideScreenshot = await captureSlideScreenshot();
+                }
+
+                // 获取所有已上传的图片信息
+                const referencedImages = getAllUploadedImages();
+
+                const context = {
+                    slideIndex: currentSlideIndex + 1,
+                    slideTitle: currentSlide.title,
+                    slideContent: currentSlide.html_content,
+                    userRequest: message,
+                    slideOutline: slideOutline, // 添加当前幻灯片的大纲信息
+                    chatHistory: chatHistory, // 添加对话历史
+                    images: referencedImages, // 添加图片信息
+                    visionEnabled: visionModeEnabled, // 添加视觉模式状态
+                    slideScreenshot: slideScreenshot, // 添加截图数据
+                    projectInfo: {
+                        title: editorProject.title,
+                        topic: editorProject.topic,
+                        scenario: editorProject.scenario
+                    }
+                };
+
+
+
+                // 发送流式AI编辑请求
+                const response = await fetch('/landppt/api/ai/slide-edit/stream', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(context)
+                });
+
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+
+                // 处理流式响应
+                await handleStreamingResponse(response, waitingDiv);
+
+            } catch (error) {
+                removeWaitingAnimation();
+                addAIMessage('抱歉，无法连接到AI服务。请检查网络连接后重试。', 'assistant');
+            } finally {
+                // 恢复发送按钮和输入框
+                isAISending = false;
+                sendBtn.disabled = false;
+                sendBtn.innerHTML = '<i class="fas fa-paper-plane"></i> 发送';
+                inputBox.disabled = false;
+                inputBox.focus();
+            }
+        }
+
+        // 处理流式响应
+        async function handleStreamingResponse(response, waitingDiv) {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let aiMessageDiv = null;
+            let fullResponse = '';
+            let newHtmlContent = null;
+
+            try {
+                while (true) {
+                    const { done, value } = await reader.read();
+                    if (done) break;
+
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split('\n');
+                    buffer = lines.pop() || '';
+
+                    for (const line of lines) {
+                        if (line.trim().startsWith('data: ')) {
+                            try {
+                                const dataStr = line.slice(6).trim();
+                                if (dataStr) {
+                                    const data = JSON.parse(dataStr);
+
+                                    if (data.type === 'start') {
+                                        // 移除等待动画，开始显示AI回复
+                                        removeWaitingAnimation();
+                                        // 使用时间戳确保每次对话都有唯一的消息ID
+                                        const messageId = 'ai-streaming-message-' + Date.now();
+                                        aiMessageDiv = addAIMessage('', 'assistant', messageId);
+                                    } else if (data.type === 'content' && data.content) {
+                                        // 追加内容到AI消息
+                                        fullResponse += data.content;
+                                        if (aiMessageDiv) {
+                                            // 转义HTML标签，防止实时渲染
+                                            const escapedContent = fullResponse
+                                                .replace(/&/g, '&amp;')
+                                                .replace(/</g, '&lt;')
+                                                .replace(/>/g, '&gt;')
+                                                .replace(/\n/g, '<br>');
+                                            aiMessageDiv.innerHTML = escapedContent;
+                                            // 滚动到底部
+                                            const messagesContainer = document.getElementById('aiChatMessages');
+                                            messagesContainer.scrollTop = messagesContainer.scrollHeight;
+                                        }
+                                    } else if (data.type === 'complete') {
+                                        // 流式输出完成
+                                        newHtmlContent = data.newHtmlContent;
+                                        fullResponse = data.fullResponse || fullResponse;
+
+                                        console.log('🎯 AI流式响应完成');
+                                        console.log('📝 完整响应长度:', fullResponse ? fullResponse.length : 0);
+                                        console.log('🔍 提取的HTML内容:', newHtmlContent ? `长度${newHtmlContent.length}` : '无');
+                                        
+                                        if (newHtmlContent) {
+                                            console.log('✅ 检测到HTML内容，准备添加按钮');
+                                            console.log('📄 HTML内容预览:', newHtmlContent.substring(0, 200));
+                                        } else {
+                                            console.warn('⚠️  未检测到HTML内容');
+                                            console.log('📝 完整AI响应预览:', fullResponse ? fullResponse.substring(0, 500) : '无响应内容');
+                                        }
+
+                                        // 确保最终内容正确显示，转义HTML标签
+                                        if (aiMessageDiv) {
+                                            const escapedContent = fullResponse
+                                                .replace(/&/g, '&amp;')
+                                                .replace(/</g, '&lt;')
+                                                .replace(/>/g, '&gt;')
+                                                .replace(/\n/g, '<br>');
+                                            aiMessageDiv.innerHTML = escapedContent;
+                                        }
+
+                                        // 如果有HTML内容，添加应用按钮
+                                        if (newHtmlContent) {
+                                            console.log('🎯 调用addApplyChangesButton函数');
+                                            addApplyChangesButton(aiMessageDiv, newHtmlContent);
+                                        } else {
+                                            // 即使没有HTML，也提供手动提取选项
+                                            console.log('🔧 添加手动提取HTML的提示');
+                                            addManualHtmlExtractPrompt(aiMessageDiv, fullResponse);
+                                        }
+
+                                        break;
+                                    } else if (data.type === 'error') {
+                                        removeWaitingAnimation();
+                                        addAIMessage('抱歉，处理您的请求时出现了错误：' + (data.error || '未知错误'), 'assistant');
+                                        break;
+                                    }
+                                }
+                            } catch (e) {
+                                // 解析流式数据失败
+                            }
+                        }
+                    }
+                }
+            } catch (error) {
+                removeWaitingAnimation();
+                addAIMessage('抱歉，处理流式响应时出现了错误。', 'assistant');
+            }
+        }
+
+        // 添加手动HTML提取提示
+        function addManualHtmlExtractPrompt(messageDiv, fullResponse) {
+            if (!messageDiv || !fullResponse) return;
+
+            // 检查是否已经有提示了
+            if (messageDiv.querySelector('.manual-html-extract')) return;
+
+            const promptContainer = document.createElement('div');
+            promptContainer.className = 'manual-html-extract';
+            promptContainer.style.cssText = `
+                margin-top: 15px;
+                padding: 10px;
+                background: #f8f9fa;
+                border: 1px solid #dee2e6;
+                border-radius: 4px;
+                font-size: 14px;
+                color: #6c757d;
+            `;
+
+            const promptText = document.createElement('p');
+            promptText.textContent = '未能自动检测到HTML代码。如果AI的回复中包含HTML代码，您可以点击下方按钮手动提取：';
+            promptText.style.margin = '0 0 10px 0';
+
+            const extractBtn = document.createElement('button');
+            extractBtn.textContent = '尝试手动提取HTML';
+            extractBtn.style.cssText = `
+                background: #17a2b8;
+                color: white;
+                border: none;
+                padding: 6px 12px;
+                border-radius: 4px;
+                cursor: pointer;
+                font-size: 12px;
+            `;
+
+            extractBtn.addEventListener('click', () => {
+                // 尝试更激进的HTML提取
+                const htmlContent = extractHtmlFromResponse(fullResponse);
+                if (htmlContent) {
+                    console.log('🎉 手动提取HTML成功');
+                    promptContainer.remove();
+                    addApplyChangesButton(messageDiv, htmlContent);
+                } else {
+                    alert('仍然无法提取到HTML内容。请确认AI的回复中包含有效的HTML代码。');
+                }
+            });
+
+            promptContainer.appendChild(promptText);
+            promptContainer.appendChild(extractBtn);
+            messageDiv.appendChild(promptContainer);
+        }
+
+        // 更激进的HTML提取函数
+        function extractHtmlFromResponse(response) {
+            if (!response) return null;
+
+            // 尝试多种模式
+            const patterns = [
+                /```html\s*([\s\S]*?)\s*```/gi,
+                /```HTML\s*([\s\S]*?)\s*```/gi,
+                /```\s*html\s*([\s\S]*?)\s*```/gi,
+                /<html[^>]*>[\s\S]*?<\/html>/gi,
+                /<div[^>]*style[^>]*1280px[^>]*>[\s\S]*?<\/div>/gi,
+                /<div[^>]*class[^>]*slide[^>]*>[\s\S]*?<\/div>/gi,
+                /<div[^>]*>[\s\S]*?<\/div>/gi // 最宽松的匹配
+            ];
+
+            for (const pattern of patterns) {
+                const matches = response.match(pattern);
+                if (matches && matches.length > 0) {
+                    let extracted = matches[0];
+                    // 如果是代码块格式，提取内容
+                    if (extracted.startsWith('```')) {
+                        const lines = extracted.split('\n');
+                        lines.shift(); // 移除第一行 ```html
+                        lines.pop(); // 移除最后一行 ```
+                        extracted = lines.join('\n').trim();
+                    }
+                    if (extracted.length > 50) { // 确保有实质内容
+                        return extracted;
+                    }
+                }
+            }
+            return null;
+        }
+
+        // 添加应用更改按钮
+        function addApplyChangesButton(messageDiv, newHtmlContent) {
+            if (!messageDiv || !newHtmlContent) {
+                console.error('❌ addApplyChangesButton参数无效:', {
+                    messageDiv: !!messageDiv,
+                    newHtmlContent: !!newHtmlContent
+                });
+                return;
+            }
+
+            console.log('🚀 开始添加应用更改按钮');
+
+            // 检查是否已经有按钮了
+            if (messageDiv.querySelector('.ai-apply-changes-btn')) {
+                console.log('⚠️  按钮已存在，跳过添加');
+                return;
+            }
+
+            console.log('✅ 开始创建按钮容器和按钮');
+
+            const buttonContainer = document.createElement('div');
+            buttonContainer.className = 'ai-apply-changes-container';
+            buttonContainer.style.cssText = `
+                margin-top: 15px;
+                padding-top: 15px;
+                border-top: 1px solid #eee;
+                display: flex;
+                gap: 10px;
+                align-items: center;
+            `;
+
+            const applyBtn = document.createElement('button');
+            applyBtn.className = 'ai-apply-changes-btn';
+            applyBtn.innerHTML = '<i class="fas fa-check"></i> 应用更改';
+            applyBtn.style.cssText = `
+                background: #28a745;
+                color: white;
+                border: none;
+                padding: 8px 16px;
+                border-radius: 4px;
+                cursor: pointer;
+                font-size: 14px;
+                transition: background-color 0.2s ease;
+            `;
+
+            const previewBtn = document.createElement('button');
+            previewBtn.className = 'ai-preview-changes-btn';
+            previewBtn.innerHTML = '<i class="fas fa-eye"></i> 预览';
+            previewBtn.style.cssText = `
+                background: #007bff;
+                color: white;
+                border: none;
+                padding: 8px 16px;
+                border-radius: 4px;
+                cursor: pointer;
+                font-size: 14px;
+                transition: background-color 0.2s ease;
+            `;
+
+            // 绑定事件
+            applyBtn.addEventListener('click', async () => {
+                applyBtn.disabled = true;
+                applyBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> 应用中...';
+                try {
+                    await applyAIChanges(newHtmlContent);
+                    applyBtn.innerHTML = '<i class="fas fa-check"></i> 已保存';
+                    applyBtn.style.background = '#28a745';
+                    applyBtn.style.color = 'white';
+
+                    // 3秒后变为已应用状态
+                    setTimeout(() => {
+                        applyBtn.innerHTML = '<i class="fas fa-check-circle"></i> 已应用';
+                        applyBtn.style.background = '#6c757d';
+                    }, 3000);
+                } catch (error) {
+                    applyBtn.innerHTML = '<i class="fas fa-exclamation-triangle"></i> 保存失败';
+                    applyBtn.style.background = '#dc3545';
+                    applyBtn.style.color = 'white';
+
+                    // 显示详细错误信息
+                    const errorMsg = error.message || '未知错误';
+                    applyBtn.title = `保存失败: ${errorMsg}`;
+
+                    setTimeout(() => {
+                        applyBtn.innerHTML = '<i class="fas fa-check"></i> 重试应用';
+                        applyBtn.style.background = '#28a745';
+                        applyBtn.style.color = 'white';
+                        applyBtn.title = '';
+                        applyBtn.disabled = false;
+                    }, 3000);
+                }
+            });
+
+            previewBtn.addEventListener('click', () => {
+                showHTMLPreview(newHtmlContent);
+            });
+
+            // 悬停效果
+            applyBtn.addEventListener('mouseenter', () => {
+                if (!applyBtn.disabled) applyBtn.style.background = '#218838';
+            });
+            applyBtn.addEventListener('mouseleave', () => {
+                if (!applyBtn.disabled) applyBtn.style.background = '#28a745';
+            });
+
+            previewBtn.addEventListener('mouseenter', () => {
+                previewBtn.style.background = '#0056b3';
+            });
+            previewBtn.addEventListener('mouseleave', () => {
+                previewBtn.style.background = '#007bff';
+            });
+
+            buttonContainer.appendChild(applyBtn);
+            buttonContainer.appendChild(previewBtn);
+            messageDiv.appendChild(buttonContainer);
+            
+            console.log('🎉 按钮添加完成！');
+            console.log('📋 按钮容器已添加到消息区域');
+            
+            // 验证按钮是否正确添加
+            const addedButtons = messageDiv.querySelectorAll('.ai-apply-changes-btn, .ai-preview-changes-btn');
+            console.log('🔍 已添加的按钮数量:', addedButtons.length);
+        }
+
+        // 显示HTML预览
+        function showHTMLPreview(htmlContent) {
+            // 创建全屏预览模态框
+            const modal = document.createElement('div');
+            modal.style.cssText = `
+                position: fixed;
+                top: 0;
+                left: 0;
+                width: 100%;
+                height: 100%;
+                background: black;
+                z-index: 10000;
+                display: flex;
+                justify-content: center;
+                align-items: center;
+                padding: 20px;
+                box-sizing: border-box;
+            `;
+
+            const closeBtn = document.createElement('button');
+            closeBtn.innerHTML = '<i class="fas fa-times"></i>';
+            closeBtn.style.cssText = `
+                position: absolute;
+                top: 20px;
+                right: 20px;
+                background: rgba(255,255,255,0.2);
+                color: white;
+                border: 2px solid rgba(255,255,255,0.3);
+                border-radius: 50%;
+                width: 40px;
+                height: 40px;
+                cursor: pointer;
+                font-size: 16px;
+                z-index: 10001;
+                transition: all 0.3s ease;
+            `;
+
+            closeBtn.addEventListener('mouseenter', () => {
+                closeBtn.style.background = 'rgba(255,255,255,0.3)';
+                closeBtn.style.borderColor = 'rgba(255,255,255,0.5)';
+            });
+
+            closeBtn.addEventListener('mouseleave', () => {
+                closeBtn.style.background = 'rgba(255,255,255,0.2)';
+                closeBtn.style.borderColor = 'rgba(255,255,255,0.3)';
+            });
+
+            // 创建PPT容器，使用与全屏放映相同的样式
+            const slideContainer = document.createElement('div');
+            slideContainer.style.cssText = `
+                background: white;
+                border-radius: 10px;
+                box-shadow: 0 10px 30px rgba(255,255,255,0.2);
+                overflow: hidden;
+                position: relative;
+                width: 100%;
+                height: 100%;
+                max-width: calc(100vh * 16/9 - 40px);
+                max-height: calc(100vw * 9/16 - 40px);
+                aspect-ratio: 16/9;
+            `;
+
+            const iframe = document.createElement('iframe');
+            iframe.style.cssText = `
+                width: 100%;
+                height: 100%;
+                border: none;
+                background: white;
+            `;
+            iframe.srcdoc = htmlContent;
+
+            closeBtn.addEventListener('click', () => {
+                document.body.removeChild(modal);
+            });
+
+            modal.addEventListener('click', (e) => {
+                if (e.target === modal) {
+                    document.body.removeChild(modal);
+                }
+            });
+
+            // 键盘事件支持
+            const handleKeyPress = (e) => {
+                if (e.key === 'Escape') {
+                    document.body.removeChild(modal);
+                    document.removeEventListener('keydown', handleKeyPress);
+                }
+            };
+            document.addEventListener('keydown', handleKeyPress);
+
+            slideContainer.appendChild(iframe);
+            modal.appendChild(closeBtn);
+            modal.appendChild(slideContainer);
+            document.body.appendChild(modal);
+        }
+
+        // 应用AI更改
+        async function applyAIChanges(newHtmlContent) {
+            try {
+                // 验证当前索引状态
+                if (!validateCurrentSlideIndex('applyAIChanges')) {
+                    throw new Error(`无效的幻灯片索引: ${currentSlideIndex}，总页数: ${slidesData ? slidesData.length : 'undefined'}`);
+                }
+
+                // 获取当前正在编辑的幻灯片索引，确保索引正确
+                const targetSlideIndex = currentSlideIndex;
+
+
+
+                // 双重验证索引有效性
+                if (targetSlideIndex < 0 || targetSlideIndex >= slidesData.length) {
+                    throw new Error(`无效的幻灯片索引: ${targetSlideIndex}，总页数: ${slidesData.length}`);
+                }
+
+                // 更新当前幻灯片数据
+                slidesData[targetSlideIndex].html_content = newHtmlContent;
+
+                // 标记当前幻灯片为用户编辑状态
+                slidesData[targetSlideIndex].is_user_edited = true;
+
+                // 更新预览
+                const slideFrame = document.getElementById('slideFrame');
+                if (slideFrame) {
+                    setSafeIframeContent(slideFrame, newHtmlContent);
+                    setTimeout(() => {
+                        forceReinitializeIframeJS(slideFrame);
+                    }, 300);
+                }
+
+                // 更新缩略图
+                const thumbnailIframe = document.querySelectorAll('.slide-thumbnail .slide-preview iframe')[targetSlideIndex];
+                if (thumbnailIframe) {
+                    setSafeIframeContent(thumbnailIframe, newHtmlContent);
+                }
+
+                // 更新代码编辑器
+                const codeEditor = document.getElementById('codeEditor');
+                if (codeEditor) {
+                    if (codeMirrorEditor && isCodeMirrorInitialized) {
+                        codeMirrorEditor.setValue(newHtmlContent);
+                    } else {
+                        codeEditor.value = newHtmlContent;
+                    }
+                }
+
+                // 保存到服务器 - 使用单个幻灯片保存API，确保使用正确的索引
+                const saveSuccess = await saveSingleSlideToServer(targetSlideIndex, newHtmlContent);
+
+                if (saveSuccess) {
+                    showNotification(`AI更改已应用并保存！(第${targetSlideIndex + 1}页)`, 'success');
+                } else {
+                    showNotification(`AI更改已应用，但保存第${targetSlideIndex + 1}页时出现问题`, 'warning');
+                }
+
+            } catch (error) {
+                // 尝试恢复原始内容
+                try {
+                    // 这里可以添加恢复逻辑，但需要保存原始内容
+                } catch (restoreError) {
+                    // Failed to restore original content
+                }
+
+                showNotification('应用更改失败：' + error.message, 'error');
+                throw error; // 重新抛出错误以便按钮状态处理
+            }
+        }
+
+        function regenerateContextSlide() {
+            hideContextMenu();
+            regenerateSlideByIndex(contextMenuSlideIndex);
+        }
+
+        function regenerateSlideByIndex(slideIndex) {
+            if (slideIndex < 0 || slideIndex >= slidesData.length) {
+                alert('无效的幻灯片索引');
+                return;
+            }
+
+            const slideTitle = slidesData[slideIndex].title || `第${slideIndex + 1}页`;
+            if (confirm(`确定要重新生成"${slideTitle}"吗？这将覆盖现有内容。`)) {
+                // Show loading indicator
+                const loadingDiv = document.createElement('div');
+                loadingDiv.id = 'regenerateLoading';
+                loadingDiv.style.cssText = `
+                    position: fixed;
+                    top: 50%;
+                    left: 50%;
+                    transform: translate(-50%, -50%);
+                    background: rgba(0,0,0,0.8);
+                    color: white;
+                    padding: 20px;
+                    border-radius: 10px;
+                    z-index: 9999;
+                    text-align: center;
+                `;
+                loadingDiv.innerHTML = `
+                    <i class="fas fa-spinner fa-spin"></i>
+                    <div style="margin-top: 10px;">正在重新生成幻灯片...</div>
+                `;
+                document.body.appendChild(loadingDiv);
+
+                // Call API to regenerate slide
+                fetch(`/landppt/api/projects/${projectId}/slides/${slideIndex + 1}/regenerate`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        scenario: editorProject.scenario,
+                        topic: editorProject.topic,
+                        requirements: editorProject.requirements,
+                        language: 'zh'
+                    })
+                })
+                .then(response => response.json())
+                .then(data => {
+                    document.body.removeChild(loadingDiv);
+                    if (data.success) {
+                        // 更新本地数据而不是刷新页面
+                        if (data.slide_data) {
+                            // 更新slidesData中的对应幻灯片
+                            slidesData[slideIndex] = data.slide_data;
+
+                            // 更新缩略图显示
+                            updateThumbnailDisplay(slideIndex, data.slide_data);
+
+                            // 如果当前正在查看这个幻灯片，更新主预览区域
+                            if (currentSlideIndex === slideIndex) {
+                                updateMainPreview(data.slide_data);
+                                updateCodeEditor(data.slide_data);
+                            }
+
+                            showNotification('幻灯片重新生成成功！', 'success');
+                        } else {
+                            // 如果没有返回slide_data，则刷新页面
+                            showNotification('幻灯片重新生成成功！正在刷新页面...', 'success');
+                            setTimeout(() => location.reload(), 1000);
+                        }
+                    } else {
+                        showNotification('重新生成失败：' + (data.error || '未知错误'), 'error');
+                    }
+                })
+                .catch(error => {
+                    document.body.removeChild(loadingDiv);
+                    alert('重新生成失败：' + error.message);
+                });
+            }
+        }
+
+        // 更新缩略图显示
+        function updateThumbnailDisplay(slideIndex, slideData) {
+            const thumbnails = document.querySelectorAll('.slide-thumbnail');
+            if (thumbnails[slideIndex]) {
+                const thumbnail = thumbnails[slideIndex];
+
+                // 更新缩略图中的iframe内容
+                const iframe = thumbnail.querySelector('iframe');
+                if (iframe && slideData.html_content) {
+                    setSafeIframeContent(iframe, slideData.html_content);
+                }
+
+                // 更新标题
+                const titleElement = thumbnail.querySelector('.slide-title');
+                if (titleElement && slideData.title) {
+                    titleElement.textContent = `${slideIndex + 1}. ${slideData.title}`;
+                }
+            }
+        }
+
+        // 更新主预览区域
+        function updateMainPreview(slideData) {
+            const slideFrame = document.getElementById('slideFrame');
+            if (slideFrame && slideData.html_content) {
+                setSafeIframeContent(slideFrame, slideData.html_content);
+            }
+        }
+
+        // 更新代码编辑器
+        function updateCodeEditor(slideData) {
+            if (slideData.html_content) {
+                if (codeMirrorEditor) {
+                    // 如果使用CodeMirror
+                    codeMirrorEditor.setValue(slideData.html_content);
+                } else {
+                    // 如果使用普通textarea
+                    const codeEditor = document.getElementById('codeEditor');
+                    if (codeEditor) {
+                        codeEditor.value = slideData.html_content;
+                    }
+                }
+            }
+        }
+
+        async function saveToServer() {
+            try {
+
+                // 标记所有幻灯片为用户编辑状态
+                slidesData.forEach(slide => {
+                    slide.is_user_edited = true;
+                });
+
+                // 使用批量保存API
+                const response = await fetch(`/landppt/api/projects/${projectId}/slides/batch-save`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        slides_data: slidesData
+                    })
+                });
+
+                if (!response.ok) {
+                    const errorText = await response.text();
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+
+                const data = await response.json();
+
+                if (data.success) {
+                    return true;
+                } else {
+                    throw new Error(data.error || 'Unknown batch save error');
+                }
+
+            } catch (error) {
+                // 如果批量保存失败，回退到逐个保存
+                return await saveToServerFallback();
+            }
+        }
+
+        // 回退保存方法 - 逐个保存
+        async function saveToServerFallback() {
+            try {
+
+                let saveSuccessCount = 0;
+                let saveFailureCount = 0;
+                const saveErrors = [];
+
+                for (let i = 0; i < slidesData.length; i++) {
+                    try {
+                        const slide = slidesData[i];
+
+                        // 标记为用户编辑状态
+                        slide.is_user_edited = true;
+
+                        const success = await saveSingleSlideToServer(i, slide.html_content);
+                        if (success) {
+                            saveSuccessCount++;
+                        } else {
+                            saveFailureCount++;
+                            saveErrors.push(`第${i + 1}页保存失败`);
+                        }
+                    } catch (error) {
+                        saveFailureCount++;
+                        const errorMsg = `第${i + 1}页保存异常: ${error.message}`;
+                        saveErrors.push(errorMsg);
+                    }
+                }
+
+                if (saveFailureCount > 0) {
+                    // 即使部分失败，也不抛出错误，让用户知道部分保存成功
+                    return saveSuccessCount > 0; // 只要有成功的就返回true
+                } else {
+                    return true;
+                }
+
+            } catch (error) {
+                throw error; // 重新抛出错误以便调用者处理
+            }
+        }
+
+        // 清理数据库中多余的幻灯片
+        async function cleanupExcessSlides() {
+            try {
+
+                const response = await fetch(`/landppt/api/projects/${projectId}/slides/cleanup`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        current_slide_count: slidesData.length
+                    })
+                });
+
+                if (!response.ok) {
+                    const errorText = await response.text();
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+
+                const data = await response.json();
+
+                if (data.success) {
+                    return true;
+                } else {
+                    throw new Error(data.error || 'Unknown cleanup error');
+                }
+
+            } catch (error) {
+                // 不抛出错误，因为这不应该阻止删除操作的完成
+                return false;
+            }
+        }
+
+        // 保存单个幻灯片到服务器
+        async function saveSingleSlideToServer(slideIndex, htmlContent) {
+            try {
+                // 验证输入参数
+                if (typeof slideIndex !== 'number' || slideIndex < 0) {
+                    throw new Error(`无效的幻灯片索引: ${slideIndex}`);
+                }
+
+                if (!htmlContent || typeof htmlContent !== 'string') {
+                    throw new Error('HTML内容不能为空');
+                }
+
+                // 验证索引范围
+                if (slideIndex >= slidesData.length) {
+                    throw new Error(`幻灯片索引超出范围: ${slideIndex}，总页数: ${slidesData.length}`);
+                }
+
+
+
+                const requestData = {
+                    html_content: htmlContent
+                };
+
+
+
+                const response = await fetch(`/landppt/api/projects/${projectId}/slides/${slideIndex}/save`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(requestData)
+                });
+
+                if (!response.ok) {
+                    const errorText = await response.text();
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+
+                const data = await response.json();
+
+                // 验证保存是否成功
+                if (data.success === true) {
+                    return true;
+                } else {
+                    throw new Error(data.error || 'Unknown error occurred');
+                }
+
+            } catch (error) {
+                throw error; // 重新抛出错误以便调用者处理
+            }
+        }
+
+        let pptxExportInProgress = false;
+        let pptxExportPollingTimer = null;
+
+        async function exportToPDF() {
+            const progressToast = showProgressToast('正在生成PDF文件...');
+            updateProgressToast(progressToast, '正在生成PDF文件...', 20);
+
+            try {
+                triggerFileDownload(`/landppt/api/projects/${projectId}/export/pdf`);
+
+                updateProgressToast(progressToast, '正在准备下载...', 60);
+                await new Promise(resolve => setTimeout(resolve, 1200));
+
+                updateProgressToast(progressToast, 'PDF文件正在下载...', 100);
+                setTimeout(() => closeProgressToast(progressToast), 400);
+                showNotification('PDF文件生成完成，正在下载...', 'success');
+            } catch (error) {
+                console.error('PDF export error:', error);
+                closeProgressToast(progressToast);
+                showNotification(`PDF导出失败: ${error.message || error}`, 'error');
+            }
+        }
+
+
+        function exportToPDFClientSide() {
+            // 显示提示信息
+            // showNotification('正在打开客户端PDF导出页面...', 'info');
+
+            // 打开客户端PDF导出页面（原html2pdf.js方式）
+           // window.open(`/landppt/api/projects/${projectId}/export/pdf?fallback=true`, '_blank');
+        }
+
+        async function exportToPPTX() {
+            if (pptxExportInProgress) {
+                showNotification('PPTX导出正在进行中，请稍候...', 'warning');
+                return;
+            }
+
+            pptxExportInProgress = true;
+            const progressToast = showProgressToast('正在准备PPTX导出任务...');
+            updateProgressToast(progressToast, '正在准备导出文件...', 10);
+
+            try {
+                const response = await fetch(`/landppt/api/projects/${projectId}/export/pptx`);
+                if (!response.ok) {
+                    throw new Error(`服务返回异常(${response.status})`);
+                }
+
+                const contentType = response.headers.get('content-type') || '';
+                let data = {};
+                if (contentType.includes('application/json')) {
+                    data = await response.json();
+                } else {
+                    throw new Error('服务器返回了未知的响应格式。');
+                }
+
+                if (data.status === 'processing' && data.task_id) {
+                    updateProgressToast(progressToast, 'PPTX转换任务已启动，正在后台处理...', 20);
+                    await trackPptxExportTask(data.task_id, progressToast);
+                } else if (data.download_url) {
+                    updateProgressToast(progressToast, '转换完成，正在下载...', 100);
+                    triggerFileDownload(data.download_url);
+                    closeProgressToast(progressToast);
+                    showNotification('PPTX转换完成，正在下载...', 'success');
+                } else {
+                    throw new Error(data.error || data.message || 'PPTX导出请求未能启动。');
+                }
+            } catch (error) {
+                console.error('PPTX export error:', error);
+                clearPptxExportPolling();
+                closeProgressToast(progressToast);
+                showNotification(`PPTX导出失败: ${error.message || error}`, 'error');
+            } finally {
+                pptxExportInProgress = false;
+                clearPptxExportPolling();
+            }
+        }
+
+        function clearPptxExportPolling() {
+            if (pptxExportPollingTimer) {
+                clearTimeout(pptxExportPollingTimer);
+                pptxExportPollingTimer = null;
+            }
+        }
+
+        async function trackPptxExportTask(taskId, progressToast) {
+            return new Promise((resolve, reject) => {
+                const pollInterval = 2000;
+                const maxAttempts = 3000;
+                let attempts = 0;
+
+                const poll = async () => {
+                    attempts += 1;
+                    try {
+                        const response = await fetch(`/landppt/api/landppt/tasks/${taskId}`);
+                        if (!response.ok) {
+                            throw new Error(`任务状态查询失败(${response.status})`);
+                        }
+
+                        const data = await response.json();
+
+                        if (data.status === 'completed' && data.result && data.result.success) {
+                            updateProgressToast(progressToast, '转换完成，正在准备下载...', 100);
+                            clearPptxExportPolling();
+                            setTimeout(() => closeProgressToast(progressToast), 400);
+                            const downloadUrl = data.download_url || `/landppt/api/landppt/tasks/${taskId}/download`;
+                            triggerFileDownload(downloadUrl);
+                            showNotification('PPTX转换完成，正在下载...', 'success');
+                            resolve();
+                            return;
+                        }
+
+                        if (data.status === 'failed') {
+                            const errorMessage = data.error || (data.result && data.result.error) || 'PPTX转换失败';
+                            throw new Error(errorMessage);
+                        }
+
+                        const statusTextMap = {
+                            pending: '任务已排队，等待开始...',
+                            running: '正在转换PPTX，请稍候...',
+                        };
+                        const message = statusTextMap[data.status] || '转换任务进行中，请稍候...';
+
+                        let progressValue = 20 + Math.round((attempts / maxAttempts) * 70);
+                        if (typeof data.progress === 'number') {
+                            const reported = Math.round(data.progress);
+                            progressValue = Math.max(progressValue, Math.min(95, reported));
+                        }
+                        progressValue = Math.min(progressValue, 95);
+
+                        updateProgressToast(progressToast, message, progressValue);
+                    } catch (pollError) {
+                        clearPptxExportPolling();
+                        reject(pollError);
+                        return;
+                    }
+
+                    if (attempts >= maxAttempts) {
+                        clearPptxExportPolling();
+                        reject(new Error('等待PPTX转换超时，请稍后重试。'));
+                        return;
+                    }
+
+                    pptxExportPollingTimer = setTimeout(poll, pollInterval);
+                };
+
+                pptxExportPollingTimer = setTimeout(poll, pollInterval);
+            });
+        }
+
+        function triggerFileDownload(url) {
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = '';
+            link.style.display = 'none';
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+        }
+
+        // 将HTML页面转换为图片并导出为PPTX（使用后端Playwright截图）
+        async function exportToPPTXAsImages() {
+            if (pptxExportInProgress) {
+                showNotification('PPTX导出正在进行中，请稍候...', 'warning');
+                return;
+            }
+
+            pptxExportInProgress = true;
+            const progressToast = showProgressToast('正在准备图片导出...');
+
+            try {
+                // 使用slidesData数组
+                if (!slidesData || slidesData.length === 0) {
+                    throw new Error('未找到幻灯片内容');
+                }
+
+                updateProgressToast(progressToast, `正在准备 ${slidesData.length} 张幻灯片...`, 10);
+
+                // 提取每张幻灯片的HTML内容
+                const slides = slidesData.map((slide, index) => ({
+                    index: index,
+                    html_content: slide.html_content,
+                    title: slide.title || `幻灯片 ${index + 1}`
+                }));
+
+                updateProgressToast(progressToast, '正在发送到服务器进行高质量渲染...', 20);
+
+                // 发送HTML内容到后端，让后端使用Playwright进行截图和生成PPTX
+                const response = await fetch(`/landppt/api/projects/${projectId}/export/pptx-images`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({
+                        slides: slides
+                    })
+                });
+
+                if (!response.ok) {
+                    throw new Error(`服务返回异常(${response.status})`);
+                }
+
+                const contentType = response.headers.get('content-type') || '';
+                let data = {};
+                if (contentType.includes('application/json')) {
+                    data = await response.json();
+                } else {
+                    throw new Error('服务器返回了未知的响应格式。');
+                }
+
+                if (data.status === 'processing' && data.task_id) {
+                    updateProgressToast(progressToast, 'PPTX生成任务已启动，正在后台处理...', 80);
+                    await trackPptxExportTask(data.task_id, progressToast);
+                } else if (data.download_url) {
+                    updateProgressToast(progressToast, '转换完成，正在下载...', 100);
+                    triggerFileDownload(data.download_url);
+                    closeProgressToast(progressToast);
+                    showNotification('PPTX转换完成，正在下载...', 'success');
+                } else {
+                    throw new Error(data.error || data.message || 'PPTX导出请求未能启动。');
+                }
+
+            } catch (error) {
+                console.error('PPTX image export error:', error);
+                clearPptxExportPolling();
+                closeProgressToast(progressToast);
+                showNotification(`图片导出失败: ${error.message || error}`, 'error');
+            } finally {
+                pptxExportInProgress = false;
+                clearPptxExportPolling();
+            }
+        }
+
+
+        function downloadHTML() {
+            // 显示提示信息
+            showNotification('正在准备HTML文件包...', 'info');
+
+            // 创建下载链接
+            const downloadLink = document.createElement('a');
+            downloadLink.href = `/landppt/api/projects/${projectId}/export/html`;
+            downloadLink.download = '';
+            downloadLink.style.display = 'none';
+
+            // 添加到页面并触发下载
+            document.body.appendChild(downloadLink);
+            downloadLink.click();
+            document.body.removeChild(downloadLink);
+
+            // 延迟显示成功消息
+            setTimeout(() => {
+                showNotification('HTML文件包下载已开始', 'success');
+            }, 1000);
+        }
+
+        function showNotification(message, type = 'info') {
+            // 创建通知元素
+            const notification = document.createElement('div');
+            notification.className = `notification notification-${type}`;
+            notification.textContent = message;
+
+            // 添加样式
+            notification.style.cssText = `
+                position: fixed;
+                top: 20px;
+                right: 20px;
+                padding: 12px 20px;
+                border-radius: 6px;
+                color: white;
+                font-weight: 500;
+                z-index: 10000;
+                opacity: 0;
+                transform: translateX(100%);
+                transition: all 0.3s ease;
+            `;
+
+            // 根据类型设置背景色
+            switch(type) {
+                case 'success':
+                    notification.style.backgroundColor = '#28a745';
+                    break;
+                case 'error':
+                    notification.style.backgroundColor = '#dc3545';
+                    break;
+                case 'warning':
+                    notification.style.backgroundColor = '#ffc107';
+                    notification.style.color = '#212529';
+                    break;
+                default:
+                    notification.style.backgroundColor = '#007bff';
+            }
+
+            // 添加到页面
+            document.body.appendChild(notification);
+
+            // 显示动画
+            setTimeout(() => {
+                notification.style.opacity = '1';
+                notification.style.transform = 'translateX(0)';
+            }, 100);
+
+            // 自动隐藏
+            setTimeout(() => {
+                notification.style.opacity = '0';
+                notification.style.transform = 'translateX(100%)';
+                setTimeout(() => {
+                    if (notification.parentNode) {
+                        notification.parentNode.removeChild(notification);
+                    }
+                }, 300);
+            }, 3000);
+        }
+
+        function exportSingleSlideHTML() {
+            hideContextMenu();
+            if (contextMenuSlideIndex >= 0 && contextMenuSlideIndex < slidesData.length) {
+                const slide = slidesData[contextMenuSlideIndex];
+                if (slide && slide.html_content) {
+                    // Create a blob with the HTML content
+                    const blob = new Blob([slide.html_content], { type: 'text/html' });
+
+                    // Create download link
+                    const url = URL.createObjectURL(blob);
+                    const a = document.createElement('a');
+                    a.href = url;
+                    a.download = `slide_${contextMenuSlideIndex + 1}_${slide.title || 'untitled'}.html`;
+
+                    // Trigger download
+                    document.body.appendChild(a);
+                    a.click();
+                    document.body.removeChild(a);
+
+                    // Clean up
+                    URL.revokeObjectURL(url);
+
+                    alert(`第${contextMenuSlideIndex + 1}页已导出为HTML文件`);
+                } else {
+                    alert('该幻灯片没有可导出的HTML内容');
+                }
+            }
+        }
+
+        async function showShareDialog() {
+            try {
+                // 显示加载提示
+                showNotification('正在生成分享链接...', 'info');
+
+                // 调用API生成分享链接
+                const response = await fetch(`/landppt/api/projects/${projectId}/share/generate`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    }
+                });
+
+                if (!response.ok) {
+                    throw new Error('生成分享链接失败');
+                }
+
+                const result = await response.json();
+                const shareUrl = `${window.location.origin}${result.share_url}`;
+
+                // 创建分享对话框
+                const modal = document.createElement('div');
+                modal.style.cssText = `
+                    position: fixed;
+                    top: 0;
+                    left: 0;
+                    width: 100%;
+                    height: 100%;
+                    background: rgba(0,0,0,0.5);
+                    display: flex;
+                    justify-content: center;
+                    align-items: center;
+                    z-index: 10000;
+                `;
+
+                modal.innerHTML = `
+                    <div style="
+                        background: white;
+                        padding: 30px;
+                        border-radius: 15px;
+                        max-width: 500px;
+                        width: 90%;
+                        text-align: center;
+                        box-shadow: 0 10px 30px rgba(0,0,0,0.3);
+                    ">
+                        <h4 style="margin-bottom: 20px; color: #2c3e50;">
+                            <i class="fas fa-share-alt" style="color: #17a2b8;"></i> 分享链接
+                        </h4>
+                        
+                        <div style="
+                            background: #f8f9fa;
+                            padding: 15px;
+                            border-radius: 8px;
+                            margin-bottom: 20px;
+                            border: 1px solid #dee2e6;
+                            word-break: break-all;
+                            font-family: monospace;
+                            font-size: 13px;
+                            color: #495057;
+                        ">${shareUrl}</div>
+                        <div style="display: flex; gap: 10px; justify-content: center; flex-wrap: wrap;">
+                            <button onclick="copyShareUrl('${shareUrl}')" class="btn btn-primary">
+                                <i class="fas fa-copy"></i> 复制链接
+                            </button>
+                            <button onclick="openShareUrl('${shareUrl}')" class="btn btn-success">
+                                <i class="fas fa-external-link-alt"></i> 打开演示
+                            </button>
+                            <button onclick="disableSharing()" class="btn btn-warning">
+                                <i class="fas fa-ban"></i> 禁用分享
+                            </button>
+                            <button onclick="this.closest('.share-modal').remove()" class="btn btn-secondary">
+                                <i class="fas fa-times"></i> 关闭
+                            </button>
+                        </div>
+                        <div style="margin-top: 15px; font-size: 12px; color: #6c757d;">
+                            <i class="fas fa-shield-alt"></i> 分享链接已启用，可随时禁用
+                        </div>
+                    </div>
+                `;
+
+                modal.className = 'share-modal';
+                document.body.appendChild(modal);
+
+                // 点击背景关闭
+                modal.addEventListener('click', function(e) {
+                    if (e.target === modal) {
+                        modal.remove();
+                    }
+                });
+
+                showNotification('分享链接已生成', 'success');
+
+            } catch (error) {
+                console.error('Error generating share link:', error);
+                showNotification('生成分享链接失败: ' + error.message, 'error');
+            }
+        }
+
+        async function disableSharing() {
+            try {
+                const response = await fetch(`/landppt/api/projects/${projectId}/share/disable`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    }
+                });
+
+                if (!response.ok) {
+                    throw new Error('禁用分享失败');
+                }
+
+                // 关闭对话框
+                document.querySelector('.share-modal')?.remove();
+                showNotification('分享已禁用', 'success');
+
+            } catch (error) {
+                console.error('Error disabling share:', error);
+                showNotification('禁用分享失败: ' + error.message, 'error');
+            }
+        }
+
+        function copyShareUrl(url) {
+            navigator.clipboard.writeText(url).then(() => {
+                showNotification('分享链接已复制到剪贴板！', 'success');
+            }).catch(() => {
+                // 备用复制方法
+                const textArea = document.createElement('textarea');
+                textArea.value = url;
+                document.body.appendChild(textArea);
+                textArea.select();
+                document.execCommand('copy');
+                document.body.removeChild(textArea);
+                showNotification('分享链接已复制到剪贴板！', 'success');
+            });
+        }
+
+        function openShareUrl(url) {
+            window.open(url, '_blank');
+        }
+
+        // Auto-save on code change (fallback for non-CodeMirror mode)
+        function initializeCodeEditorAutoSave() {
+            const codeEditor = document.getElementById('codeEditor');
+            if (codeEditor && !isCodeMirrorInitialized) {
+                codeEditor.addEventListener('input', function() {
+                    clearTimeout(this.saveTimeout);
+                    this.saveTimeout = setTimeout(() => {
+                        if (currentMode === 'split') {
+                            // Auto-update preview in split mode
+                            const slideFrame = document.getElementById('slideFrame');
+                            setSafeIframeContent(slideFrame, this.value);
+                        }
+                    }, 1000);
+                });
+            }
+        }
+
+        // Initialize event listeners for thumbnails using event delegation
+        function initializeThumbnailEvents() {
+            // Use event delegation on the slides container
+            const slidesContainer = document.querySelector('.slides-container');
+            if (!slidesContainer) {
+                return;
+            }
+
+            // Remove existing event listeners to prevent duplicates
+            slidesContainer.removeEventListener('click', slidesContainer.clickHandler);
+            slidesContainer.removeEventListener('contextmenu', slidesContainer.contextHandler);
+            slidesContainer.removeEventListener('dragstart', slidesContainer.dragStartHandler);
+            slidesContainer.removeEventListener('dragover', slidesContainer.dragOverHandler);
+            slidesContainer.removeEventListener('drop', slidesContainer.dropHandler);
+            slidesContainer.removeEventListener('dragend', slidesContainer.dragEndHandler);
+
+            // Create event handlers using event delegation
+            slidesContainer.clickHandler = (e) => {
+                const thumbnail = e.target.closest('.slide-thumbnail');
+                if (thumbnail) {
+                    e.preventDefault();
+                    e.stopPropagation();
+                    const index = parseInt(thumbnail.getAttribute('data-slide-index'));
+                    if (!isNaN(index)) {
+                        selectSlide(index);
+                    }
+                }
+            };
+
+            slidesContainer.contextHandler = (e) => {
+                const thumbnail = e.target.closest('.slide-thumbnail');
+                if (thumbnail) {
+                    e.preventDefault();
+                    const index = parseInt(thumbnail.getAttribute('data-slide-index'));
+                    if (!isNaN(index)) {
+                        showContextMenu(e, index);
+                    }
+                }
+            };
+
+            slidesContainer.dragStartHandler = (e) => {
+                const thumbnail = e.target.closest('.slide-thumbnail');
+                if (thumbnail) {
+                    const index = parseInt(thumbnail.getAttribute('data-slide-index'));
+                    if (!isNaN(index)) {
+                        handleDragStart(e, index);
+                    }
+                }
+            };
+
+            slidesContainer.dragOverHandler = (e) => {
+                const thumbnail = e.target.closest('.slide-thumbnail');
+                if (thumbnail) {
+                    handleDragOver(e);
+                }
+            };
+
+            slidesContainer.dropHandler = (e) => {
+                const thumbnail = e.target.closest('.slide-thumbnail');
+                if (thumbnail) {
+                    const index = parseInt(thumbnail.getAttribute('data-slide-index'));
+                    if (!isNaN(index)) {
+                        handleDrop(e, index);
+                    }
+                }
+            };
+
+            slidesContainer.dragEndHandler = (e) => {
+                const thumbnail = e.target.closest('.slide-thumbnail');
+                if (thumbnail) {
+                    handleDragEnd(e);
+                }
+            };
+
+            // Add event listeners using delegation
+            slidesContainer.addEventListener('click', slidesContainer.clickHandler);
+            slidesContainer.addEventListener('contextmenu', slidesContainer.contextHandler);
+            slidesContainer.addEventListener('dragstart', slidesContainer.dragStartHandler);
+            slidesContainer.addEventListener('dragover', slidesContainer.dragOverHandler);
+            slidesContainer.addEventListener('drop', slidesContainer.dropHandler);
+            slidesContainer.addEventListener('dragend', slidesContainer.dragEndHandler);
+        }
+
+        // 优化的幻灯片放映功能 - 双缓冲无闪烁系统
+        let slideshowCache = new Map(); // 缓存幻灯片内容
+        let isTransitioning = false; // 防止快速切换时的重复操作
+        let currentFrameIndex = 1; // 当前显示的iframe索引 (1 或 2)
+        let nextFrameIndex = 2; // 下一个iframe索引 (1 或 2)
+
+        function startSlideshow() {
+            if (!slidesData || slidesData.length === 0) {
+                showNotification('没有可用的幻灯片！', 'warning');
+                return;
+            }
+
+            isSlideshow = true;
+            slideshowIndex = currentSlideIndex;
+
+            // 重置双缓冲系统
+            currentFrameIndex = 1;
+            nextFrameIndex = 2;
+
+            const overlay = document.getElementById('slideshowOverlay');
+            const frame1 = document.getElementById('slideshowFrame1');
+            const frame2 = document.getElementById('slideshowFrame2');
+
+            // 初始化iframe状态
+            frame1.classList.add('visible');
+            frame1.classList.remove('hidden');
+            frame2.classList.add('hidden');
+            frame2.classList.remove('visible');
+
+            // 使用requestAnimationFrame优化显示
+            requestAnimationFrame(() => {
+                overlay.style.display = 'flex';
+
+                // 预加载当前和下一张幻灯片
+                preloadSlideshowSlides();
+
+                // 在第一个iframe中加载当前幻灯片
+                const content = slideshowCache.get(slideshowIndex) || slidesData[slideshowIndex].html_content;
+                setSafeIframeContentNoFlash(frame1, content, () => {
+                    // 更新幻灯片信息
+                    const info = document.getElementById('slideshowInfo');
+                    info.textContent = `${slideshowIndex + 1} / ${slidesData.length}`;
+                });
+            });
+
+            // Add keyboard event listeners
+            document.addEventListener('keydown', handleSlideshowKeyboard);
+
+            // Add touch gesture support
+            initializeSlideshowTouchGestures();
+
+            // Add mouse movement detection for controls visibility
+            initializeSlideshowMouseControls();
+        }
+
+        // 预加载幻灯片内容，提升切换流畅度
+        function preloadSlideshowSlides() {
+            // 预加载当前、前一张和后一张幻灯片
+            const indicesToPreload = [
+                slideshowIndex - 1,
+                slideshowIndex,
+                slideshowIndex + 1
+            ].filter(index => index >= 0 && index < slidesData.length);
+
+            indicesToPreload.forEach(index => {
+                if (!slideshowCache.has(index)) {
+                    const content = slidesData[index].html_content;
+                    slideshowCache.set(index, content);
+                }
+            });
+        }
+
+        function exitSlideshow() {
+            isSlideshow = false;
+            isTransitioning = false;
+
+            const overlay = document.getElementById('slideshowOverlay');
+            const frame1 = document.getElementById('slideshowFrame1');
+            const frame2 = document.getElementById('slideshowFrame2');
+
+            // 使用fade out效果
+            overlay.style.opacity = '0';
+            setTimeout(() => {
+                overlay.style.display = 'none';
+                overlay.style.opacity = '1';
+
+                // 清理iframe内容，避免内存泄漏
+                frame1.srcdoc = '';
+                frame2.srcdoc = '';
+                frame1.removeAttribute('data-current-content');
+                frame2.removeAttribute('data-current-content');
+            }, 200);
+
+            // Remove keyboard event listeners
+            document.removeEventListener('keydown', handleSlideshowKeyboard);
+
+            // Remove touch gesture listeners
+            removeSlideshowTouchGestures();
+
+            // Remove mouse movement listeners
+            removeSlideshowMouseControls();
+
+            // 清理缓存（可选，节省内存）
+            slideshowCache.clear();
+        }
+
+        // 无闪烁幻灯片更新函数 - 双缓冲系统
+        function updateSlideshowSlide() {
+            if (!slidesData || slidesData.length === 0 || isTransitioning) return;
+
+            isTransitioning = true;
+
+            const info = document.getElementById('slideshowInfo');
+
+            // 立即更新幻灯片信息
+            info.textContent = `${slideshowIndex + 1} / ${slidesData.length}`;
+
+            // 获取当前显示的iframe和下一个iframe
+            const currentFrame = document.getElementById(`slideshowFrame${currentFrameIndex}`);
+            const nextFrame = document.getElementById(`slideshowFrame${nextFrameIndex}`);
+
+            // 在后台iframe中预加载新内容
+            const content = slideshowCache.get(slideshowIndex) || slidesData[slideshowIndex].html_content;
+
+            // 使用优化的内容设置方法
+            setSafeIframeContentNoFlash(nextFrame, content, () => {
+                // 内容加载完成后，瞬间切换显示
+                requestAnimationFrame(() => {
+                    // 隐藏当前iframe，显示新iframe
+                    currentFrame.classList.remove('visible');
+                    currentFrame.classList.add('hidden');
+                    nextFrame.classList.remove('hidden');
+                    nextFrame.classList.add('visible');
+
+                    // 交换iframe索引
+                    [currentFrameIndex, nextFrameIndex] = [nextFrameIndex, currentFrameIndex];
+
+                    isTransitioning = false;
+
+                    // 预加载相邻幻灯片
+                    preloadSlideshowSlides();
+
+                    // 异步初始化JavaScript，不阻塞UI
+                    setTimeout(() => {
+                        forceReinitializeIframeJS(nextFrame);
+                    }, 100);
+                });
+            });
+        }
+
+        // 优化的iframe内容设置，避免闪烁
+        function setSafeIframeContentNoFlash(iframe, html, callback) {
+            if (!iframe || !html) {
+                if (callback) callback();
+                return;
+            }
+
+            // 检查内容是否相同，避免不必要的更新
+            if (iframe.getAttribute('data-current-content') === html) {
+                if (callback) callback();
+                return;
+            }
+
+            // 直接设置内容，不使用过渡效果
+            try {
+                iframe.srcdoc = html;
+                iframe.setAttribute('data-current-content', html);
+
+                // 监听加载完成
+                const handleLoad = () => {
+                    iframe.removeEventListener('load', handleLoad);
+                    if (callback) {
+                        // 短暂延迟确保内容完全渲染
+                        setTimeout(callback, 50);
+                    }
+                };
+
+                iframe.addEventListener('load', handleLoad);
+
+                // 备用超时机制
+                setTimeout(() => {
+                    iframe.removeEventListener('load', handleLoad);
+                    if (callback) callback();
+                }, 500);
+
+            } catch (e) {
+                if (callback) callback();
+            }
+        }
+
+        // 优化的切换函数，支持快速响应和防抖
+        function previousSlideshow() {
+            if (isTransitioning) return; // 防止快速切换时的重复操作
+
+            if (slideshowIndex > 0) {
+                slideshowIndex--;
+                updateSlideshowSlide();
+            } else {
+                // 到达第一张时的视觉反馈
+                const slideContainer = document.querySelector('.slideshow-slide');
+                slideContainer.style.transform = 'translateX(-10px)';
+                setTimeout(() => {
+                    slideContainer.style.transform = 'translateX(0)';
+                }, 150);
+            }
+        }
+
+        function nextSlideshow() {
+            if (isTransitioning) return; // 防止快速切换时的重复操作
+
+            if (slideshowIndex < slidesData.length - 1) {
+                slideshowIndex++;
+                updateSlideshowSlide();
+            } else {
+                // 到达最后一张时的视觉反馈
+                const slideContainer = document.querySelector('.slideshow-slide');
+                slideContainer.style.transform = 'translateX(10px)';
+                setTimeout(() => {
+                    slideContainer.style.transform = 'translateX(0)';
+                }, 150);
+            }
+        }
+
+        // 快速跳转到指定幻灯片
+        function jumpToSlide(index) {
+            if (isTransitioning || index < 0 || index >= slidesData.length) return;
+
+            slideshowIndex = index;
+            updateSlideshowSlide();
+        }
+
+        // 优化的键盘事件处理，支持更多快捷键和防抖
+        let keyboardTimeout;
+
+        function handleSlideshowKeyboard(e) {
+            if (!isSlideshow) return;
+
+            // 防抖处理，避免按键过快
+            clearTimeout(keyboardTimeout);
+            keyboardTimeout = setTimeout(() => {
+                switch(e.key) {
+                    case 'ArrowLeft':
+                    case 'ArrowUp':
+                    case 'PageUp':
+                    case 'Backspace':
+                        e.preventDefault();
+                        previousSlideshow();
+                        break;
+                    case 'ArrowRight':
+                    case 'ArrowDown':
+                    case 'PageDown':
+                    case ' ':
+                    case 'Enter':
+                        e.preventDefault();
+                        nextSlideshow();
+                        break;
+                    case 'Escape':
+                    case 'q':
+                    case 'Q':
+                        e.preventDefault();
+                        exitSlideshow();
+                        break;
+                    case 'Home':
+                        e.preventDefault();
+                        jumpToSlide(0);
+                        break;
+                    case 'End':
+                        e.preventDefault();
+                        jumpToSlide(slidesData.length - 1);
+                        break;
+                    case 'f':
+                    case 'F':
+                    case 'F11':
+                        e.preventDefault();
+                        toggleSlideshowFullscreen();
+                        break;
+                    default:
+                        // 数字键快速跳转
+                        if (e.key >= '1' && e.key <= '9') {
+                            e.preventDefault();
+                            const slideNum = parseInt(e.key) - 1;
+                            if (slideNum < slidesData.length) {
+                                jumpToSlide(slideNum);
+                            }
+                        }
+                        break;
+                }
+            }, 50); // 50ms防抖
+        }
+
+        // 全屏切换功能
+        function toggleSlideshowFullscreen() {
+            const overlay = document.getElementById('slideshowOverlay');
+
+            if (!document.fullscreenElement) {
+                overlay.requestFullscreen().catch(err => {
+                    // 无法进入全屏
+                });
+            } else {
+                document.exitFullscreen().catch(err => {
+                    // 无法退出全屏
+                });
+            }
+        }
+
+        // 拖拽功能
+        function handleDragStart(event, slideIndex) {
+            draggedSlideIndex = slideIndex;
+            event.target.classList.add('dragging');
+            event.dataTransfer.effectAllowed = 'move';
+            event.dataTransfer.setData('text/html', event.target.outerHTML);
+        }
+
+        function handleDragOver(event) {
+            event.preventDefault();
+            event.dataTransfer.dropEffect = 'move';
+
+            const thumbnail = event.currentTarget;
+            const rect = thumbnail.getBoundingClientRect();
+            const midY = rect.top + rect.height / 2;
+
+            // 清除所有指示器
+            document.querySelectorAll('.drag-indicator').forEach(indicator => {
+                indicator.classList.remove('show');
+            });
+
+            // 显示适当的指示器
+            if (event.clientY < midY) {
+                thumbnail.querySelector('.drag-indicator.top').classList.add('show');
+            } else {
+                thumbnail.querySelector('.drag-indicator.bottom').classList.add('show');
+            }
+
+            thumbnail.classList.add('drag-over');
+        }
+
+        function handleDrop(event, targetIndex) {
+            event.preventDefault();
+
+            if (draggedSlideIndex === -1 || draggedSlideIndex === targetIndex) {
+                return;
+            }
+
+            const rect = event.currentTarget.getBoundingClientRect();
+            const midY = rect.top + rect.height / 2;
+            const insertBefore = event.clientY < midY;
+
+            // 计算新的插入位置
+            let newIndex = targetIndex;
+            if (!insertBefore) {
+                newIndex = targetIndex + 1;
+            }
+
+            // 如果拖拽的元素在目标位置之前，需要调整索引
+            if (draggedSlideIndex < newIndex) {
+                newIndex--;
+            }
+
+            // 移动幻灯片
+            moveSlide(draggedSlideIndex, newIndex);
+        }
+
+        function handleDragEnd(event) {
+            event.target.classList.remove('dragging');
+            document.querySelectorAll('.slide-thumbnail').forEach(thumb => {
+                thumb.classList.remove('drag-over');
+            });
+            document.querySelectorAll('.drag-indicator').forEach(indicator => {
+                indicator.classList.remove('show');
+            });
+            draggedSlideIndex = -1;
+        }
+
+        function moveSlide(fromIndex, toIndex) {
+            if (fromIndex === toIndex || fromIndex < 0 || toIndex < 0 ||
+                fromIndex >= slidesData.length || toIndex > slidesData.length) {
+                return;
+            }
+
+            // 移动数据
+            const movedSlide = slidesData.splice(fromIndex, 1)[0];
+            slidesData.splice(toIndex, 0, movedSlide);
+
+            // 更新页码
+            slidesData.forEach((slide, index) => {
+                slide.page_number = index + 1;
+            });
+
+            // 更新当前选中的索引
+            if (currentSlideIndex === fromIndex) {
+                currentSlideIndex = toIndex;
+            } else if (currentSlideIndex > fromIndex && currentSlideIndex <= toIndex) {
+                currentSlideIndex--;
+            } else if (currentSlideIndex < fromIndex && currentSlideIndex >= toIndex) {
+                currentSlideIndex++;
+            }
+
+            // 重新渲染侧边栏
+            refreshSidebar();
+
+            // 保存到服务器
+            saveToServer();
+        }
+
+        // 右键菜单功能
+        function showContextMenu(event, slideIndex) {
+            event.preventDefault();
+            contextMenuSlideIndex = slideIndex;
+
+            const contextMenu = document.getElementById('contextMenu');
+            const pasteMenuItem = document.getElementById('pasteMenuItem');
+
+            // 更新粘贴菜单项状态
+            if (copiedSlideData) {
+                pasteMenuItem.classList.remove('disabled');
+            } else {
+                pasteMenuItem.classList.add('disabled');
+            }
+
+            // 显示菜单
+            contextMenu.style.display = 'block';
+            contextMenu.style.left = event.pageX + 'px';
+            contextMenu.style.top = event.pageY + 'px';
+
+            // 确保菜单不超出屏幕
+            const rect = contextMenu.getBoundingClientRect();
+            if (rect.right > window.innerWidth) {
+                contextMenu.style.left = (event.pageX - rect.width) + 'px';
+            }
+            if (rect.bottom > window.innerHeight) {
+                contextMenu.style.top = (event.pageY - rect.height) + 'px';
+            }
+        }
+
+        function hideContextMenu() {
+            document.getElementById('contextMenu').style.display = 'none';
+        }
+
+        function editSlide() {
+            hideContextMenu();
+            selectSlide(contextMenuSlideIndex);
+            setMode('edit');
+        }
+
+        function copySlide() {
+            hideContextMenu();
+            if (!isPPTGenerationCompleted()) {
+                showNotification('PPT生成完成后才能使用复制功能', 'warning');
+                return;
+            }
+            if (contextMenuSlideIndex >= 0 && contextMenuSlideIndex < slidesData.length) {
+                copiedSlideData = JSON.parse(JSON.stringify(slidesData[contextMenuSlideIndex]));
+                showNotification('幻灯片已复制到剪贴板', 'success');
+            }
+        }
+
+        async function pasteSlide() {
+            hideContextMenu();
+            if (!isPPTGenerationCompleted()) {
+                showNotification('PPT生成完成后才能使用粘贴功能', 'warning');
+                return;
+            }
+            if (!copiedSlideData) {
+                showNotification('剪贴板中没有幻灯片数据', 'warning');
+                return;
+            }
+
+            try {
+                // 获取全局母版模板
+                const globalTemplate = await getSelectedGlobalTemplate();
+
+                // 创建新的幻灯片数据
+                const newSlide = JSON.parse(JSON.stringify(copiedSlideData));
+                newSlide.page_number = contextMenuSlideIndex + 2;
+                newSlide.title = newSlide.title + ' (副本)';
+
+                // 如果有全局母版，使用模板生成新的HTML内容
+                if (globalTemplate) {
+                    newSlide.html_content = await generateSlideWithGlobalTemplate(
+                        globalTemplate,
+                        newSlide.title,
+                        '复制的幻灯片内容'
+                    );
+                }
+
+                // 插入到指定位置
+                slidesData.splice(contextMenuSlideIndex + 1, 0, newSlide);
+
+                // 更新后续幻灯片的页码
+                for (let i = contextMenuSlideIndex + 2; i < slidesData.length; i++) {
+                    slidesData[i].page_number = i + 1;
+                }
+
+                // 同步更新大纲
+                await updateOutlineForSlideOperation('insert', contextMenuSlideIndex + 1, {
+                    title: newSlide.title,
+                    slide_type: 'content',
+                    type: 'content',
+                    description: '复制的幻灯片内容',
+                    content_points: []
+                });
+
+                // 刷新界面
+                refreshSidebar();
+                saveToServer();
+                showNotification('幻灯片已粘贴', 'success');
+            } catch (error) {
+                showNotification('粘贴幻灯片失败：' + error.message, 'error');
+            }
+        }
+
+        async function insertNewSlide() {
+            hideContextMenu();
+            if (!isPPTGenerationCompleted()) {
+                showNotification('PPT生成完成后才能添加新幻灯片', 'warning');
+                return;
+            }
+
+            try {
+                // 获取全局母版模板
+                const globalTemplate = await getSelectedGlobalTemplate();
+
+                const slideTitle = `第${contextMenuSlideIndex + 2}页`;
+                let htmlContent = `
+                    <div style="width: 1280px; height: 720px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+                                display: flex; flex-direction: column; justify-content: center; align-items: center;
+                                color: white; font-family: 'Microsoft YaHei', Arial, sans-serif;">
+                        <h1 style="font-size: 48px; margin-bottom: 20px; text-align: center;">新建幻灯片</h1>
+                        <p style="font-size: 24px; text-align: center;">请编辑此幻灯片内容</p>
+                    </div>
+                `;
+
+                // 如果有全局母版，使用模板生成HTML内容
+                if (globalTemplate) {
+                    htmlContent = await generateSlideWithGlobalTemplate(
+                        globalTemplate,
+                        slideTitle,
+                        '新建幻灯片，请编辑内容'
+                    );
+                }
+
+                // 创建新的空白幻灯片
+                const newSlide = {
+                    page_number: contextMenuSlideIndex + 2,
+                    title: slideTitle,
+                    html_content: htmlContent
+                };
+
+                // 插入到指定位置
+                slidesData.splice(contextMenuSlideIndex + 1, 0, newSlide);
+
+                // 更新后续幻灯片的页码
+                for (let i = contextMenuSlideIndex + 2; i < slidesData.length; i++) {
+                    slidesData[i].page_number = i + 1;
+                }
+
+                // 同步更新大纲
+                await updateOutlineForSlideOperation('insert', contextMenuSlideIndex + 1, {
+                    title: slideTitle,
+                    slide_type: 'content',
+                    type: 'content',
+                    description: '新建幻灯片，请编辑内容',
+                    content_points: []
+                });
+
+                // 刷新界面
+                refreshSidebar();
+                saveToServer();
+                showNotification('新幻灯片已插入', 'success');
+            } catch (error) {
+                showNotification('插入新幻灯片失败：' + error.message, 'error');
+            }
+        }
+
+        async function duplicateSlide() {
+            hideContextMenu();
+            if (!isPPTGenerationCompleted()) {
+                showNotification('PPT生成完成后才能复制幻灯片', 'warning');
+                return;
+            }
+            if (contextMenuSlideIndex >= 0 && contextMenuSlideIndex < slidesData.length) {
+                try {
+                    // 获取全局母版模板
+                    const globalTemplate = await getSelectedGlobalTemplate();
+
+                    const originalSlide = slidesData[contextMenuSlideIndex];
+                    const duplicatedSlide = JSON.parse(JSON.stringify(originalSlide));
+                    duplicatedSlide.page_number = contextMenuSlideIndex + 2;
+                    duplicatedSlide.title = duplicatedSlide.title + ' (副本)';
+
+                    // 如果有全局母版，使用模板重新生成HTML内容
+                    if (globalTemplate) {
+                        duplicatedSlide.html_content = await generateSlideWithGlobalTemplate(
+                            globalTemplate,
+                            duplicatedSlide.title,
+                            '复制的幻灯片内容'
+                        );
+                    }
+
+                    // 插入到原幻灯片后面
+                    slidesData.splice(contextMenuSlideIndex + 1, 0, duplicatedSlide);
+
+                    // 更新后续幻灯片的页码
+                    for (let i = contextMenuSlideIndex + 2; i < slidesData.length; i++) {
+                        slidesData[i].page_number = i + 1;
+                    }
+
+                    // 同步更新大纲
+                    await updateOutlineForSlideOperation('insert', contextMenuSlideIndex + 1, {
+                        title: duplicatedSlide.title,
+                        slide_type: 'content',
+                        type: 'content',
+                        description: '复制的幻灯片内容',
+                        content_points: []
+                    });
+
+                    // 刷新界面
+                    refreshSidebar();
+                    saveToServer();
+                    showNotification('幻灯片已复制', 'success');
+                } catch (error) {
+                    showNotification('复制幻灯片失败：' + error.message, 'error');
+                }
+            }
+        }
+
+        async function deleteSlide() {
+            hideContextMenu();
+            if (!isPPTGenerationCompleted()) {
+                showNotification('PPT生成完成后才能删除幻灯片', 'warning');
+                return;
+            }
+            if (slidesData.length <= 1) {
+                showNotification('至少需要保留一张幻灯片', 'warning');
+                return;
+            }
+
+            if (confirm('确定要删除这张幻灯片吗？')) {
+                try {
+                    // 删除幻灯片
+                    slidesData.splice(contextMenuSlideIndex, 1);
+
+                    // 更新后续幻灯片的页码
+                    for (let i = contextMenuSlideIndex; i < slidesData.length; i++) {
+                        slidesData[i].page_number = i + 1;
+                    }
+
+                    // 调整当前选中的索引
+                    if (currentSlideIndex >= contextMenuSlideIndex) {
+                        currentSlideIndex = Math.max(0, currentSlideIndex - 1);
+                    }
+
+                    // 同步更新大纲
+                    await updateOutlineForSlideOperation('delete', contextMenuSlideIndex);
+
+                    // 刷新界面
+                    refreshSidebar();
+                    selectSlide(currentSlideIndex);
+
+                    // 保存当前幻灯片数据
+                    await saveToServer();
+
+                    // 清理数据库中多余的幻灯片
+                    await cleanupExcessSlides();
+
+                    showNotification('幻灯片已删除', 'success');
+                } catch (error) {
+                    showNotification('删除幻灯片失败：' + error.message, 'error');
+                }
+            }
+        }
+
+        function refreshSidebar() {
+            const slidesContainer = document.querySelector('.slides-container');
+            if (!slidesContainer) return;
+
+            // 如果没有slides数据，显示提示信息
+            if (!slidesData || slidesData.length === 0) {
+                slidesContainer.innerHTML = `
+                    <div class="text-center p-4" style="color: #7f8c8d;" id="noSlidesMessage">
+                        <div style="font-size: 48px; margin-bottom: 15px;">
+                            <i class="fas fa-magic"></i>
+                        </div>
+                        <h5 style="margin-bottom: 10px;">PPT正在生成中...</h5>
+                        <p style="margin-bottom: 15px; font-size: 14px;">
+                            幻灯片生成完成后，您可以在这里进行编辑和管理
+                        </p>
+                        <div class="spinner-border text-primary" role="status" style="margin-bottom: 15px;">
+                            <span class="visually-hidden">Loading...</span>
+                        </div>
+                        <br>
+                        <button class="btn btn-primary btn-sm" onclick="checkForUpdates()">
+                            <i class="fas fa-refresh"></i> 刷新页面
+                        </button>
+                    </div>
+                `;
+                return;
+            }
+
+            // 清除现有的幻灯片缩略图和提示信息
+            const existingThumbnails = slidesContainer.querySelectorAll('.slide-thumbnail');
+            const noSlidesMessage = slidesContainer.querySelector('#noSlidesMessage');
+            existingThumbnails.forEach(thumb => thumb.remove());
+            if (noSlidesMessage) noSlidesMessage.remove();
+
+            // 重新生成幻灯片缩略图
+            slidesData.forEach((slide, index) => {
+                const thumbnailDiv = document.createElement('div');
+                thumbnailDiv.className = `slide-thumbnail ${index === currentSlideIndex ? 'active' : ''}`;
+                thumbnailDiv.setAttribute('data-slide-index', index);
+                thumbnailDiv.setAttribute('draggable', 'true');
+                // 不再使用内联事件处理器，依赖事件委托
+
+                thumbnailDiv.innerHTML = `
+                    <div class="drag-indicator top"></div>
+                    <div class="slide-preview">
+                        <iframe title="Slide ${index + 1}"
+                                loading="lazy"></iframe>
+                    </div>
+                    <div class="slide-title">${index + 1}. ${slide.title}</div>
+                    <div class="drag-indicator bottom"></div>
+                `;
+
+                // 设置iframe内容并应用缩放
+                const iframe = thumbnailDiv.querySelector('iframe');
+                const thumbnailUrl = serverThumbnailUrls.get(slide.html_content);
+                if (iframe && thumbnailUrl) {
+                    // 使用服务端渲染的缩略图，iframe保留但不加载内容，页面内容被修改时再启用
+                    const image = document.createElement('img');
+                    image.className = 'slide-thumbnail-image';
+                    image.loading = 'lazy';
+                    image.alt = `Slide ${index + 1}`;
+                    image.src = thumbnailUrl;
+                    image.onerror = () => {
+                        image.remove();
+                        iframe.style.display = '';
+                        setSafeIframeContent(iframe, slidesData[index] ? slidesData[index].html_content : slide.html_content);
+                    };
+                    iframe.style.display = 'none';
+                    iframe.before(image);
+                    iframe.onload = function() {
+                        this.style.transform = getResponsiveScale();
+                        this.style.width = getResponsiveWidth();
+                        this.style.height = getResponsiveHeight();
+                    };
+                } else if (iframe) {
+                    // 安全设置iframe内容
+                    setSafeIframeContent(iframe, slide.html_content);
+
+                    iframe.onload = function() {
+                        // 应用响应式缩放
+                        this.style.transform = getResponsiveScale();
+                        this.style.width = getResponsiveWidth();
+                        this.style.height = getResponsiveHeight();
+                    };
+                }
+
+                slidesContainer.appendChild(thumbnailDiv);
+            });
+
+            // 重新初始化事件监听器
+            initializeThumbnailEvents();
+        }
+
+        // 优化的iframe JavaScript重新初始化函数
+        let isReinitializing = false; // 防止重复初始化
+
+        function forceReinitializeIframeJS(iframe) {
+            if (!iframe || isReinitializing) return;
+
+            isReinitializing = true;
+
+            // 使用requestAnimationFrame优化性能
+            requestAnimationFrame(() => {
+                try {
+                    const iframeWindow = iframe.contentWindow;
+                    const iframeDoc = iframe.contentDocument || iframeWindow.document;
+
+                    if (!iframeWindow || !iframeDoc) {
+                        isReinitializing = false;
+                        return;
+                    }
+
+                    // 只检查Chart.js，减少不必要的操作
+                    if (iframeWindow.Chart) {
+                        const canvasElements = iframeDoc.querySelectorAll('canvas[id*="chart"], canvas[id*="Chart"]');
+
+                        if (canvasElements.length > 0) {
+                            // 简化检查逻辑
+                            let needsReinitialization = false;
+                            canvasElements.forEach(canvas => {
+                                if (!canvas.chart) {
+                                    needsReinitialization = true;
+                                }
+                            });
+
+                            // 只在真正需要时才重新初始化
+                            if (needsReinitialization) {
+                                const scripts = iframeDoc.querySelectorAll('script');
+                                scripts.forEach(script => {
+                                    if (script.textContent && script.textContent.includes('Chart')) {
+                                        try {
+                                            iframeWindow.eval(script.textContent);
+                                        } catch (e) {
+                                            // 静默处理错误
+                                        }
+                                    }
+                                });
+                            }
+                        }
+                    }
+
+                    // 初始化图像选择功能
+                    initializeImageSelection(iframe, iframeWindow, iframeDoc);
+
+                } catch (e) {
+                    // 静默处理错误，避免控制台噪音
+                } finally {
+                    // 延迟重置标志，避免过于频繁的调用
+                    setTimeout(() => {
+                        isReinitializing = false;
+                    }, 500);
+                }
+            });
+        }
+
+        // 图像选择功能相关变量
+        let selectedImageInfo = null;
+        let imageSelectionEnabled = false;
+
+        // 初始化图像选择功能（仅在快速编辑模式下启用）
+        function initializeImageSelection(iframe, iframeWindow, iframeDoc) {
+            try {
+                // 移除之前的事件监听器
+                const existingSelectables = iframeDoc.querySelectorAll('[data-image-selectable]');
+                existingSelectables.forEach(element => {
+                    element.removeAttribute('data-image-selectable');
+                    element.style.cursor = '';
+                    element.classList.remove('image-selected', 'image-selectable');
+                    // 移除之前添加的事件监听器
+                    if (element._imageClickHandler) {
+                        element.removeEventListener('click', element._imageClickHandler);
+                        element.removeEventListener('mouseenter', element._imageMouseEnterHandler);
+                        element.removeEventListener('mouseleave', element._imageMouseLeaveHandler);
+                        delete element._imageClickHandler;
+                        delete element._imageMouseEnterHandler;
+                        delete element._imageMouseLeaveHandler;
+                    }
+                });
+
+                // 只在快速编辑模式下启用图像选择功能
+                if (!quickEditMode || currentMode !== 'quickedit') {
+                    return;
+                }
+
+                let imageIndex = 0;
+
+                // 1. 处理 <img> 标签
+                const images = iframeDoc.querySelectorAll('img');
+                images.forEach((img) => {
+                    // 跳过装饰性图像或很小的图像
+                    if (img.width < 30 || img.height < 30) return;
+
+                    setupImageSelection(img, imageIndex++, iframe, 'img');
+                });
+
+                // 2. 处理具有背景图像的元素
+                const allElements = iframeDoc.querySelectorAll('*');
+                allElements.forEach((element) => {
+                    const computedStyle = iframeWindow.getComputedStyle(element);
+                    const backgroundImage = computedStyle.backgroundImage;
+
+                    // 检查是否有背景图像（排除 none 和渐变）
+                    if (backgroundImage &&
+                        backgroundImage !== 'none' &&
+                        backgroundImage.includes('url(')) {
+
+                        // 获取元素尺寸
+                        const rect = element.getBoundingClientRect();
+
+                        // 跳过太小的元素
+                        if (rect.width < 50 || rect.height < 50) return;
+
+                        // 跳过已经处理过的img元素
+                        if (element.tagName.toLowerCase() === 'img') return;
+
+                        setupImageSelection(element, imageIndex++, iframe, 'background');
+                    }
+                });
+
+                // 3. 处理SVG图像
+                const svgElements = iframeDoc.querySelectorAll('svg');
+                svgElements.forEach((svg) => {
+                    const rect = svg.getBoundingClientRect();
+                    if (rect.width < 30 || rect.height < 30) return;
+
+                    setupImageSelection(svg, imageIndex++, iframe, 'svg');
+                });
+
+                // 添加样式到iframe文档
+                addImageSelectionStyles(iframeDoc);
+
+
+
+            } catch (e) {
+                // 初始化图像选择功能失败
+            }
+        }
+
+        // 设置单个元素的图像选择功能
+        function setupImageSelection(element, index, iframe, type) {
+            element.setAttribute('data-image-selectable', 'true');
+            element.setAttribute('data-image-index', index);
+            element.setAttribute('data-image-type', type);
+            element.style.cursor = 'pointer';
+            element.classList.add('image-selectable');
+
+            // 创建事件处理器并保存引用以便后续移除
+            element._imageClickHandler = function(e) {
+                // 只在快速编辑模式下响应点击
+                if (!quickEditMode || currentMode !== 'quickedit') {
+                    return;
+                }
+                e.preventDefault();
+                e.stopPropagation();
+                selectImage(element, iframe);
+            };
+
+            element._imageMouseEnterHandler = function() {
+                // 只在快速编辑模式下显示悬停效果
+                if (!quickEditMode || currentMode !== 'quickedit') {
+                    return;
+                }
+                if (!element.classList.contains('image-selected')) {
+                    element.style.outline = '2px dashed #007bff';
+                    element.style.outlineOffset = '2px';
+                }
+            };
+
+            element._imageMouseLeaveHandler = function() {
+                // 只在快速编辑模式下处理悬停离开
+                if (!quickEditMode || currentMode !== 'quickedit') {
+                    return;
+                }
+                if (!element.classList.contains('image-selected')) {
+                    element.style.outline = '';
+                    element.style.outlineOffset = '';
+                }
+            };
+
+            // 添加事件监听器
+            element.addEventListener('click', element._imageClickHandler);
+            element.addEventListener('mouseenter', element._imageMouseEnterHandler);
+            element.addEventListener('mouseleave', element._imageMouseLeaveHandler);
+        }
+
+        // 添加图像选择相关样式
+        function addImageSelectionStyles(iframeDoc) {
+            let styleElement = iframeDoc.getElementById('image-selection-styles');
+            if (!styleElement) {
+                styleElement = iframeDoc.createElement('style');
+                styleElement.id = 'image-selection-styles';
+                styleElement.textContent = `
+                    .image-selectable {
+                        transition: all 0.2s ease;
+                    }
+                    .image-selectable:hover {
+                        transform: scale(1.02);
+                    }
+                    .image-selected {
+                        outline: 3px solid #007bff !important;
+                        outline-offset: 3px !important;
+                        box-shadow: 0 0 10px rgba(0, 123, 255, 0.3) !important;
+                        transform: scale(1.02) !important;
+                    }
+                `;
+                iframeDoc.head.appendChild(styleElement);
+            }
+        }
+
+        // 选择图像
+        function selectImage(imgElement, iframe) {
+            try {
+                const iframeDoc = iframe.contentDocument || iframe.contentWindow.document;
+
+                // 清除之前的选择
+                const previousSelected = iframeDoc.querySelectorAll('.image-selected');
+                previousSelected.forEach(img => {
+                    img.classList.remove('image-selected');
+                    img.style.outline = '';
+                    img.style.outlineOffset = '';
+                    img.style.boxShadow = '';
+                    img.style.transform = '';
+                });
+
+                // 选择当前图像
+                imgElement.classList.add('image-selected');
+
+                // 提取图像信息
+                const imageInfo = extractImageInfo(imgElement, iframe);
+                selectedImageInfo = imageInfo;
+
+                // 通知AI助手
+                notifyAIAssistantImageSelected(imageInfo);
+
+            } catch (e) {
+                // 选择图像失败
+            }
+        }
+
+        // 提取图像信息
+        function extractImageInfo(imageElement, iframe) {
+            const rect = imageElement.getBoundingClientRect();
+            const computedStyle = iframe.contentWindow.getComputedStyle(imageElement);
+            const imageType = imageElement.getAttribute('data-image-type') || 'img';
+
+            let imageInfo = {
+                index: imageElement.getAttribute('data-image-index'),
+                type: imageType,
+                className: imageElement.className,
+                id: imageElement.id || '',
+                style: imageElement.getAttribute('style') || '',
+                width: rect.width,
+                height: rect.height,
+                position: {
+                    top: rect.top,
+                    left: rect.left,
+                    right: rect.right,
+                    bottom: rect.bottom
+                },
+                computedStyle: {
+                    position: computedStyle.position,
+                    display: computedStyle.display,
+                    float: computedStyle.float,
+                    margin: computedStyle.margin,
+                    padding: computedStyle.padding,
+                    border: computedStyle.border,
+                    borderRadius: computedStyle.borderRadius,
+                    transform: computedStyle.transform,
+                    zIndex: computedStyle.zIndex,
+                    opacity: computedStyle.opacity,
+                    backgroundImage: computedStyle.backgroundImage,
+                    backgroundSize: computedStyle.backgroundSize,
+                    backgroundPosition: computedStyle.backgroundPosition,
+                    backgroundRepeat: computedStyle.backgroundRepeat
+                },
+                slideIndex: currentSlideIndex,
+                slideTitle: slidesData[currentSlideIndex]?.title || '',
+                outerHTML: imageElement.outerHTML,
+                parentInfo: extractParentInfo(imageElement)
+            };
+
+            // 根据图像类型提取特定信息
+            if (imageType === 'img') {
+                // <img> 标签的特定属性
+                imageInfo.src = imageElement.src;
+                imageInfo.alt = imageElement.alt || '';
+                imageInfo.title = imageElement.title || '';
+                imageInfo.naturalWidth = imageElement.naturalWidth;
+                imageInfo.naturalHeight = imageElement.naturalHeight;
+                imageInfo.computedStyle.objectFit = computedStyle.objectFit;
+                imageInfo.computedStyle.objectPosition = computedStyle.objectPosition;
+            } else if (imageType === 'background') {
+                // 背景图像的特定属性
+                const backgroundImage = computedStyle.backgroundImage;
+                const urlMatch = backgroundImage.match(/url\(['"]?([^'"]+)['"]?\)/);
+                imageInfo.src = urlMatch ? urlMatch[1] : '';
+                imageInfo.alt = imageElement.getAttribute('alt') || imageElement.getAttribute('title') || '背景图像';
+                imageInfo.title = imageElement.getAttribute('title') || '背景图像';
+                imageInfo.isBackgroundImage = true;
+            } else if (imageType === 'svg') {
+                // SVG 的特定属性
+                imageInfo.src = imageElement.getAttribute('src') || 'data:image/svg+xml;base64,' + btoa(imageElement.outerHTML);
+                imageInfo.alt = imageElement.getAttribute('alt') || imageElement.getAttribute('title') || 'SVG图像';
+                imageInfo.title = imageElement.getAttribute('title') || 'SVG图像';
+                imageInfo.isSVG = true;
+            }
+
+            return imageInfo;
+        }
+
+        // 提取父容器信息
+        function extractParentInfo(imgElement) {
+            const parent = imgElement.parentElement;
+            if (!parent) return null;
+
+            return {
+                tagName: parent.tagName,
+                className: parent.className,
+                style: parent.getAttribute('style') || '',
+                id: parent.id || ''
+            };
+        }
+
+        // 获取图像类型的显示名称
+        function getImageTypeDisplay(type) {
+            const typeMap = {
+                'img': '图片标签',
+                'background': '背景图像',
+                'svg': 'SVG图像'
+            };
+            return typeMap[type] || '未知类型';
+        }
+
+        // 客户端图像替换函数（保持完整HTML结构）
+        function replaceImageInHtmlClient(htmlContent, imageInfo, newImageUrl) {
+            try {
+                // 使用字符串替换而不是DOM解析，避免样式丢失
+                const imageType = imageInfo.type || 'img';
+                const oldSrc = imageInfo.src || '';
+
+                let updatedHtml = htmlContent;
+                let replaced = false;
+
+                if (imageType === 'img') {
+                    // 使用正则表达式替换img标签的src属性
+                    const imgRegex = new RegExp(
+                        `(<img[^>]*src=["'])[^"']*${escapeRegExp(oldSrc.split('/').pop())}[^"']*(['"][^>]*>)`,
+                        'gi'
+                    );
+
+                    if (imgRegex.test(htmlContent)) {
+                        updatedHtml = htmlContent.replace(imgRegex, `$1${newImageUrl}$2`);
+                        replaced = true;
+                    } else {
+                        // 后备方案：直接字符串替换
+                        if (htmlContent.includes(oldSrc)) {
+                            updatedHtml = htmlContent.replace(new RegExp(escapeRegExp(oldSrc), 'g'), newImageUrl);
+                            replaced = true;
+                        }
+                    }
+                } else if (imageType === 'background') {
+                    // 替换CSS背景图像
+                    const bgRegex = new RegExp(
+                        `(background-image:\\s*url\\(['"]?)[^'"\\)]*${escapeRegExp(oldSrc.split('/').pop())}[^'"\\)]*(['"]?\\))`,
+                        'gi'
+                    );
+
+                    if (bgRegex.test(htmlContent)) {
+                        updatedHtml = htmlContent.replace(bgRegex, `$1${newImageUrl}$2`);
+                        replaced = true;
+                    } else {
+                        // 后备方案
+                        if (htmlContent.includes(oldSrc)) {
+                            updatedHtml = htmlContent.replace(new RegExp(escapeRegExp(oldSrc), 'g'), newImageUrl);
+                            replaced = true;
+                        }
+                    }
+                }
+
+                return replaced ? updatedHtml : htmlContent;
+
+            } catch (error) {
+                return htmlContent;
+            }
+        }
+
+        // 搜索图片
+        function searchImages(event) {
+            if (event.key === 'Enter' || event.type === 'input') {
+                galleryState.searchTerm = event.target.value.toLowerCase();
+                galleryState.currentPage = 1;
+                applyFilters();
+            }
+        }
+
+
+
+        // 筛选图片分类
+        function filterImages() {
+            const categoryFilter = document.getElementById('imageCategoryFilter');
+            galleryState.categoryFilter = categoryFilter.value;
+            galleryState.currentPage = 1;
+            applyFilters();
+        }
+
+        // 改变每页显示数量
+        function changePageSize() {
+            const pageSizeSelect = document.getElementById('imagePageSize');
+            galleryState.pageSize = parseInt(pageSizeSelect.value);
+            galleryState.currentPage = 1;
+            renderImageGallery();
+        }
+
+        // 跳转到指定页面
+        function goToPage(page) {
+            const totalPages = Math.ceil(galleryState.filteredImages.length / galleryState.pageSize);
+            if (page >= 1 && page <= totalPages) {
+                galleryState.currentPage = page;
+                renderImageGallery();
+            }
+        }
+
+        // 应用筛选条件
+        function applyFilters() {
+            const { allImages, searchTerm, categoryFilter } = galleryState;
+
+            galleryState.filteredImages = allImages.filter(image => {
+                // 搜索筛选
+                const matchesSearch = !searchTerm ||
+                    (image.title && image.title.toLowerCase().includes(searchTerm)) ||
+                    (image.description && image.description.toLowerCase().includes(searchTerm)) ||
+                    (image.alt_text && image.alt_text.toLowerCase().includes(searchTerm));
+
+                // 分类筛选 - 兼容多种可能的字段名
+                let matchesCategory = true;
+                if (categoryFilter) {
+                    matchesCategory =
+                        image.category === categoryFilter ||
+                        image.source === categoryFilter ||
+                        image.source_type === categoryFilter ||
+                        image.type === categoryFilter ||
+                        // 根据图片来源推断分类 - 修复字段映射
+                        (categoryFilter === 'ai_generated' && (image.source === 'ai_generated' || image.source_type === 'ai_generated' || image.generation_prompt)) ||
+                        (categoryFilter === 'network_search' && (image.source === 'web_search' || image.source_type === 'web_search')) ||
+                        (categoryFilter === 'local_upload' && (image.source === 'local_storage' || image.source_type === 'local_storage'));
+                }
+
+                return matchesSearch && matchesCategory;
+            });
+
+            renderImageGallery();
+        }
+
+        // 双击图片直接选择
+        function handleImageDoubleClick(imageData) {
+            // 双击图片直接选择并关闭对话框
+            window.closeGalleryDialog(imageData);
+        }
+
+        // 获取正确的图片URL
+        function getImageUrl(image) {
+            if (!image) return '';
+
+            // 如果已经是完整URL，直接返回
+            if (image.url && (image.url.startsWith('http') || image.url.startsWith('/landppt/api/'))) {
+                return image.url;
+            }
+
+            // 如果有image.id，构建API URL
+            if (image.id) {
+                return `/landppt/api/image/view/${image.id}`;
+            }
+
+            // 如果有相对路径，转换为API URL
+            if (image.url) {
+                return image.url.startsWith('/') ? image.url : `/landppt/api/image/view/${image.url}`;
+            }
+
+            // 默认占位图
+            return 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMTIwIiBoZWlnaHQ9IjEyMCIgdmlld0JveD0iMCAwIDEyMCAxMjAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CjxyZWN0IHdpZHRoPSIxMjAiIGhlaWdodD0iMTIwIiBmaWxsPSIjRjVGNUY1Ii8+CjxwYXRoIGQ9Ik02MCA0NUw3NSA2NUg0NUw2MCA0NVoiIGZpbGw9IiNEREREREQiLz4KPGNpcmNsZSBjeD0iNTAiIGN5PSI0MCIgcj0iNSIgZmlsbD0iI0RERERERCIvPgo8L3N2Zz4K';
+        }
+
+        // 处理图片加载错误
+        function handleImageError(imgElement, imageId) {
+            // 隐藏加载动画
+            const spinner = imgElement.parentElement.querySelector('.loading-spinner');
+            if (spinner) spinner.style.display = 'none';
+
+            // 尝试备用URL
+            const originalSrc = imgElement.src;
+
+            // 如果不是API URL，尝试API URL
+            if (!originalSrc.includes('/landppt/api/image/view/')) {
+                const apiUrl = `/landppt/api/image/view/${imageId}`;
+                if (originalSrc !== apiUrl) {
+                    imgElement.src = apiUrl;
+                    return;
+                }
+            }
+
+            // 如果API URL也失败，尝试添加时间戳避免缓存
+            if (!originalSrc.includes('?t=')) {
+                const timestampUrl = `${originalSrc}?t=${Date.now()}`;
+                imgElement.src = timestampUrl;
+                return;
+            }
+
+            // 最终使用占位图
+            imgElement.src = 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMTIwIiBoZWlnaHQ9IjEyMCIgdmlld0JveD0iMCAwIDEyMCAxMjAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CjxyZWN0IHdpZHRoPSIxMjAiIGhlaWdodD0iMTIwIiBmaWxsPSIjRjVGNUY1Ii8+CjxwYXRoIGQ9Ik02MCA0NUw3NSA2NUg0NUw2MCA0NVoiIGZpbGw9IiNEREREREQiLz4KPGNpcmNsZSBjeD0iNTAiIGN5PSI0MCIgcj0iNSIgZmlsbD0iI0RERERERCIvPjx0ZXh0IHg9IjYwIiB5PSI4MCIgdGV4dC1hbmNob3I9Im1pZGRsZSIgZm9udC1zaXplPSI4IiBmaWxsPSIjOTk5Ij7liqDovb3lpLHotKU8L3RleHQ+PC9zdmc+';
+            imgElement.style.opacity = '0.5';
+            imgElement.title = '图片加载失败';
+        }
+
+        // 显示空图片库
+        function showEmptyGallery() {
+            const container = document.getElementById('imageGalleryContainer');
+            if (container) {
+                container.innerHTML = `
+                    <div class="text-center text-muted py-5">
+                        <i class="fas fa-images fa-4x mb-3" style="opacity: 0.3;"></i>
+                        <h5>图片库中暂无图片</h5>
+                        <p>您可以先上传一些图片到图片库</p>
+                        <a href="/landppt/image-gallery" class="btn btn-outline-primary" target="_blank">
+                            <i class="fas fa-upload"></i> 前往图片库上传
+                        </a>
+                    </div>
+                `;
+            }
+
+            // 清空分页
+            const paginationList = document.getElementById('paginationList');
+            if (paginationList) paginationList.innerHTML = '';
+
+            const statsElement = document.getElementById('imageStats');
+            if (statsElement) statsElement.textContent = '共 0 张图片';
+        }
+
+        // 显示图片库错误
+        function showGalleryError(errorMessage) {
+            const container = document.getElementById('imageGalleryContainer');
+            if (container) {
+                container.innerHTML = `
+                    <div class="text-center text-danger py-5">
+                        <i class="fas fa-exclamation-triangle fa-3x mb-3"></i>
+                        <h5>加载图片库失败</h5>
+                        <p>${escapeHtml(errorMessage)}</p>
+                        <button class="btn btn-outline-danger" onclick="initImageGallery()">
+                            <i class="fas fa-redo"></i> 重新加载
+                        </button>
+                    </div>
+                `;
+            }
+        }
+
+        // 获取分类名称
+        function getCategoryName(category) {
+            const categoryNames = {
+                'ai_generated': 'AI生成',
+                'web_search': '网络搜索',
+                'network_search': '网络搜索',
+                'network': '网络搜索',
+                'local_storage': '本地上传',
+                'local_upload': '本地上传',
+                'local': '本地上传'
+            };
+            return categoryNames[category] || category;
+        }
+
+        // 获取图片分类标签
+        function getImageCategoryBadge(image) {
+            let category = '';
+            let badgeClass = 'bg-secondary';
+
+            // 尝试从多个字段确定分类
+            if (image.category) {
+                category = image.category;
+            } else if (image.source) {
+                category = image.source;
+            } else if (image.source_type) {
+                category = image.source_type;
+            } else if (image.generation_prompt) {
+                category = 'ai_generated';
+            } else if (image.url && image.url.includes('/network/')) {
+                category = 'web_search';
+            } else if (image.url && image.url.includes('/local/')) {
+                category = 'local_storage';
+            }
+
+            // 设置对应的样式 - 修复分类映射
+            switch (category) {
+                case 'ai_generated':
+                    badgeClass = 'bg-success';
+                    break;
+                case 'web_search':
+                case 'network_search':
+                case 'network':
+                    badgeClass = 'bg-info';
+                    break;
+                case 'local_storage':
+                case 'local_upload':
+                case 'local':
+                    badgeClass = 'bg-primary';
+                    break;
+            }
+
+            if (category) {
+                return `<small class="d-block"><span class="badge ${badgeClass}">${getCategoryName(category)}</span></small>`;
+            }
+
+            return '';
+        }
+
+        // HTML转义函数
+        function escapeHtml(text) {
+            const div = document.createElement('div');
+            div.textContent = text;
+            return div.innerHTML;
+        }
+
+        // 辅助函数：转义正则表达式特殊字符
+        function escapeRegExp(string) {
+            return string.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+        }
+
+        // 通知AI助手图像已选择
+        function notifyAIAssistantImageSelected(imageInfo) {
+            // 更新AI助手界面显示选中的图像信息
+            updateAIAssistantSelectedImage(imageInfo);
+
+            // 如果AI助手侧栏未打开，则打开它
+            const sidebar = document.getElementById('aiEditSidebar');
+            if (!sidebar.classList.contains('open')) {
+                openAIEditSidebar();
+            }
+        }
+
+        // 响应式缩放辅助函数
+        function getResponsiveScale() {
+            const width = window.innerWidth;
+            if (width <= 576) return 'scale(0.06)';
+            if (width <= 768) return 'scale(0.08)';
+            if (width <= 992) return 'scale(0.1)';
+            if (width <= 1200) return 'scale(0.12)';
+            return 'scale(0.15)';
+        }
+
+        function getResponsiveWidth() {
+            const width = window.innerWidth;
+            if (width <= 576) return '1667%';
+            if (width <= 768) return '1250%';
+            if (width <= 992) return '1000%';
+            if (width <= 1200) return '833%';
+            return '667%';
+        }
+
+        function getResponsiveHeight() {
+            const width = window.innerWidth;
+            if (width <= 576) return '1667%';
+            if (width <= 768) return '1250%';
+            if (width <= 992) return '1000%';
+            if (width <= 1200) return '833%';
+            return '667%';
+        }
+
+        // 窗口大小改变时重新应用缩放
+        window.addEventListener('resize', function() {
+            const iframes = document.querySelectorAll('.slide-preview iframe');
+            iframes.forEach(iframe => {
+                iframe.style.transform = getResponsiveScale();
+                iframe.style.width = getResponsiveWidth();
+                iframe.style.height = getResponsiveHeight();
+            });
+        });
+
+        // 点击其他地方隐藏右键菜单
+        document.addEventListener('click', function(event) {
+            if (!event.target.closest('.context-menu')) {
+                hideContextMenu();
+            }
+        });
+
+        // 阻止页面默认右键菜单
+        document.addEventListener('contextmenu', function(event) {
+            if (!event.target.closest('.slide-thumbnail')) {
+                // 只在非幻灯片区域阻止默认右键菜单
+                // event.preventDefault();
+            }
+        });
+
+
+
+        // 移除重复的checkForUpdates函数定义 - 已在上面定义
+
+        // 更新主预览区域
+        function updateMainPreviewArea() {
+            const previewPane = document.getElementById('previewPane');
+            if (!previewPane) return;
+
+            if (hasSlidesData && slidesData.length > 0) {
+                // 如果有幻灯片数据，更新预览区域
+                previewPane.innerHTML = `
+                    <div class="slide-frame-container">
+                        <div class="slide-frame-wrapper" id="slideFrameWrapper">
+                            <button class="preview-nav-btn left" id="previewPrevBtn" onclick="navigatePreviewSlide(-1)" title="&#19978;&#19968;&#39029; (&#8592;)">
+                                <i class="fas fa-chevron-left"></i>
+                            </button>
+
+                            <iframe class="slide-frame" id="slideFrame"
+                                    title="Slide Preview"></iframe>
+                            <div class="quick-edit-overlay" id="quickEditOverlay"></div>
+
+                            <button class="preview-nav-btn right" id="previewNextBtn" onclick="navigatePreviewSlide(1)" title="&#19979;&#19968;&#39029; (&#8594;)">
+                                <i class="fas fa-chevron-right"></i>
+                            </button>
+                        </div>
+                    </div>
+                `;
+
+                updatePreviewNavButtons();
+
+                // 设置第一张幻灯片的内容
+                const slideFrame = document.getElementById('slideFrame');
+                if (slideFrame && slidesData[0]) {
+                    setSafeIframeContent(slideFrame, slidesData[0].html_content);
+
+                    // 初始化iframe和重新初始化JavaScript
+                    setTimeout(() => {
+                        initializeMainFrame();
+                        applyMainFrameScale();
+                        forceReinitializeIframeJS(slideFrame);
+                        updatePreviewNavButtons();
+                    }, 100);
+                }
+            } else {
+                // 如果没有幻灯片数据，显示等待界面
+                previewPane.innerHTML = `
+                    <div class="d-flex align-items-center justify-content-center h-100" style="background: #f8f9fa; border-radius: 8px;">
+                        <div class="text-center" style="color: #6c757d;">
+                            <div style="font-size: 64px; margin-bottom: 20px;">
+                                <i class="fas fa-presentation-screen"></i>
+                            </div>
+                            <h4 style="margin-bottom: 15px;">等待PPT生成</h4>
+                            <p style="margin-bottom: 20px;">PPT生成完成后，预览将在这里显示</p>
+                            <button class="btn btn-outline-primary" onclick="checkForUpdates()">
+                                <i class="fas fa-refresh"></i> 刷新页面
+                            </button>
+                        </div>
+                    </div>
+                `;
+            }
+        }
+
+        // 单页HTML的并发请求数
+        const SLIDE_FETCH_CONCURRENCY = 6;
+
+        // 获取单页HTML：地址带内容版本号，未变化的页面直接使用浏览器缓存
+        async function fetchSlideHtml(slide) {
+            const response = await fetch(slide.html_url, { credentials: 'same-origin' });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            return response.text();
+        }
+
+        // 先获取幻灯片清单（不含HTML），再按页并发获取各页HTML，然后渲染缩略图和主预览。
+        // 编辑器的批量保存和导出需要所有页面的完整内容，因此仍在渲染前加载全部页面
+        async function loadEditorSlides() {
+            try {
+                const response = await fetch(`/landppt/api/projects/${projectId}/slides-manifest`, {
+                    credentials: 'same-origin'
+                });
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}`);
+                }
+                const manifest = await response.json();
+                const slides = manifest.slides || [];
+
+                let nextIndex = 0;
+                const worker = async () => {
+                    while (nextIndex < slides.length) {
+                        const slide = slides[nextIndex++];
+                        slide.html_content = await fetchSlideHtml(slide);
+                    }
+                };
+                await Promise.all(Array.from({ length: Math.min(SLIDE_FETCH_CONCURRENCY, slides.length) }, worker));
+
+                // 清单中的链接、哈希和修订号不属于幻灯片数据，避免随批量保存提交
+                serverThumbnailUrls.clear();
+                slides.forEach(slide => {
+                    serverThumbnailUrls.set(slide.html_content, slide.thumbnail_url);
+                    delete slide.html_url;
+                    delete slide.thumbnail_url;
+                    delete slide.hash;
+                    delete slide.revision;
+                    delete slide.index;
+                });
+
+                // 原地替换，保持 window.slidesData 指向同一数组
+                slidesData.splice(0, slidesData.length, ...slides);
+            } catch (error) {
+                console.error('加载幻灯片数据失败:', error);
+                showNotification('加载幻灯片失败，请刷新页面重试', 'error');
+                const loadingMessage = document.getElementById('slidesLoadingMessage');
+                if (loadingMessage) {
+                    loadingMessage.textContent = '加载幻灯片失败，请刷新页面重试';
+                }
+                return;
+            }
+
+            const loadingMessage = document.getElementById('slidesLoadingMessage');
+            if (loadingMessage) {
+                loadingMessage.remove();
+            }
+
+            hasSlidesData = slidesData.length > 0;
+            currentSlideIndex = 0;
+            refreshSidebar();
+            updateMainPreviewArea();
+
+            const firstSlideHtml = hasSlidesData ? slidesData[0].html_content : '';
+            if (codeMirrorEditor && isCodeMirrorInitialized) {
+                codeMirrorEditor.setValue(firstSlideHtml);
+            } else {
+                const codeEditor = document.getElementById('codeEditor');
+                if (codeEditor) {
+                    codeEditor.value = firstSlideHtml;
+                }
+            }
+
+            updateAICurrentSlideInfo();
+            updateFunctionButtonsState();
+        }
+
+        // 页面加载完成后应用响应式缩放和绑定事件
+        document.addEventListener('DOMContentLoaded', function() {
+            // 为所有现有的iframe应用响应式缩放
+            const iframes = document.querySelectorAll('.slide-preview iframe');
+            iframes.forEach(iframe => {
+                iframe.style.transform = getResponsiveScale();
+                iframe.style.width = getResponsiveWidth();
+                iframe.style.height = getResponsiveHeight();
+            });
+
+            // 初始化右侧主iframe
+            setTimeout(() => {
+                initializeMainFrame();
+                applyMainFrameScale();
+            }, 100);
+
+            // 初始化缩略图事件监听器
+            initializeThumbnailEvents();
+
+            // 初始化AI侧栏宽度调整功能
+            initializeSidebarResize();
+
+            // 初始化CodeMirror编辑器
+            initializeCodeMirror();
+
+            // 初始化代码编辑器自动保存（fallback）
+            initializeCodeEditorAutoSave();
+
+            // 绑定按钮事件监听器
+            const slideshowBtn = document.getElementById('slideshowBtn');
+            const saveSlideBtn = document.getElementById('saveSlideBtn');
+            const aiEditBtn = document.getElementById('aiEditBtn');
+
+            if (slideshowBtn) {
+                slideshowBtn.addEventListener('click', startSlideshow);
+            }
+            if (saveSlideBtn) {
+                saveSlideBtn.addEventListener('click', saveSlide);
+            }
+            if (aiEditBtn) {
+                aiEditBtn.addEventListener('click', openAIEditSidebar);
+            }
+
+            // 绑定AI输入框回车键事件
+            const aiInputBox = document.getElementById('aiInputBox');
+            if (aiInputBox) {
+                aiInputBox.addEventListener('keydown', function(event) {
+                    if (event.key === 'Enter' && !event.shiftKey) {
+                        event.preventDefault();
+                        sendAIMessage();
+                    }
+                });
+            }
+
+            // 确保第一张幻灯片被选中
+            if (hasSlidesData && slidesData.length > 0) {
+                selectSlide(0);
+            }
+
+            // 更新功能按钮状态
+            updateFunctionButtonsState();
+
+            // 加载幻灯片数据
+            loadEditorSlides();
+
+            // 移除自动检查逻辑，只在页面加载时检查一次
+            // setTimeout(checkForUpdates, 1000); - 已移除
+            // setTimeout(startAutoCheck, 2000); - 已移除
+        });
+
+        // 防抖函数，优化窗口大小变化时的性能
+        let resizeTimeout;
+        function debounceResize() {
+            clearTimeout(resizeTimeout);
+            resizeTimeout = setTimeout(() => {
+                // 重新计算左侧缩略图缩放
+                const iframes = document.querySelectorAll('.slide-preview iframe');
+                iframes.forEach(iframe => {
+                    iframe.style.transform = getResponsiveScale();
+                    iframe.style.width = getResponsiveWidth();
+                    iframe.style.height = getResponsiveHeight();
+                });
+
+                // 清除缓存的缩放比例，强制重新计算
+                cachedScale = null;
+                lastContainerSize = null;
+
+                // 重新计算主iframe缩放
+                applyMainFrameScale();
+
+                // 重新计算CodeMirror编辑器尺寸
+                resizeCodeMirror();
+            }, 150); // 防抖延迟150ms
+        }
+
+        // 窗口大小改变时使用防抖处理
+        window.addEventListener('resize', debounceResize);
+
+        // 触摸手势支持，提升移动设备体验
+        let touchStartX = 0;
+        let touchStartY = 0;
+        let touchEndX = 0;
+        let touchEndY = 0;
+        let touchStartTime = 0;
+
+        function initializeSlideshowTouchGestures() {
+            const overlay = document.getElementById('slideshowOverlay');
+
+            overlay.addEventListener('touchstart', handleTouchStart, { passive: true });
+            overlay.addEventListener('touchend', handleTouchEnd, { passive: true });
+            overlay.addEventListener('touchmove', handleTouchMove, { passive: false });
+        }
+
+        function removeSlideshowTouchGestures() {
+            const overlay = document.getElementById('slideshowOverlay');
+
+            overlay.removeEventListener('touchstart', handleTouchStart);
+            overlay.removeEventListener('touchend', handleTouchEnd);
+            overlay.removeEventListener('touchmove', handleTouchMove);
+        }
+
+        function handleTouchStart(e) {
+            if (!isSlideshow || e.touches.length !== 1) return;
+
+            const touch = e.touches[0];
+            touchStartX = touch.clientX;
+            touchStartY = touch.clientY;
+            touchStartTime = Date.now();
+        }
+
+        function handleTouchMove(e) {
+            if (!isSlideshow || e.touches.length !== 1) return;
+
+            // 防止页面滚动
+            e.preventDefault();
+        }
+
+        function handleTouchEnd(e) {
+            if (!isSlideshow || e.changedTouches.length !== 1) return;
+
+            const touch = e.changedTouches[0];
+            touchEndX = touch.clientX;
+            touchEndY = touch.clientY;
+
+            const deltaX = touchEndX - touchStartX;
+            const deltaY = touchEndY - touchStartY;
+            const deltaTime = Date.now() - touchStartTime;
+
+            // 检查是否为有效的滑动手势
+            const minSwipeDistance = 50;
+            const maxSwipeTime = 500;
+            const maxVerticalDistance = 100;
+
+            if (deltaTime > maxSwipeTime) return;
+            if (Math.abs(deltaY) > maxVerticalDistance) return;
+
+            if (Math.abs(deltaX) > minSwipeDistance) {
+                if (deltaX > 0) {
+                    // 向右滑动 - 上一张
+                    previousSlideshow();
+                } else {
+                    // 向左滑动 - 下一张
+                    nextSlideshow();
+                }
+            } else if (Math.abs(deltaX) < 10 && Math.abs(deltaY) < 10) {
+                // 点击手势 - 下一张
+                nextSlideshow();
+            }
+        }
@@ -0,0 +1,3235 @@
+        // 图片上传相关函数
+        function triggerImageUpload() {
+            if (isUploading) {
+                showNotification('正在上传中，请稍候...', 'warning');
+                return;
+            }
+            showImageSelectMenu();
+        }
+
+        // 初始化图片上传功能
+        function initImageUpload() {
+            const fileInput = document.getElementById('aiImageFileInput');
+            const uploadBtn = document.getElementById('aiImageUploadBtn');
+            const inputContainer = document.querySelector('.ai-input-container');
+
+
+
+            if (!fileInput || !uploadBtn || !inputContainer) {
+                return;
+            }
+
+            // 文件选择处理
+            fileInput.addEventListener('change', handleFileSelect);
+
+            // 拖拽事件处理 - 使用重命名的函数避免冲突
+            inputContainer.addEventListener('dragenter', handleImageDragEnter);
+            inputContainer.addEventListener('dragover', handleImageDragOver);
+            inputContainer.addEventListener('dragleave', handleImageDragLeave);
+            inputContainer.addEventListener('drop', handleImageFileDrop);
+
+            // 阻止默认拖拽行为
+            ['dragenter', 'dragover', 'dragleave', 'drop'].forEach(eventName => {
+                inputContainer.addEventListener(eventName, preventImageDefaults, false);
+            });
+
+
+        }
+
+        // 检查是否为文件拖拽
+        function isFileDrag(e) {
+            return e.dataTransfer &&
+                   e.dataTransfer.types &&
+                   (e.dataTransfer.types.includes('Files') ||
+                    e.dataTransfer.types.includes('application/x-moz-file'));
+        }
+
+        function preventImageDefaults(e) {
+            // 只处理文件拖拽，不影响其他拖拽操作
+            if (isFileDrag(e)) {
+                e.preventDefault();
+                e.stopPropagation();
+            }
+        }
+
+        function handleImageDragEnter(e) {
+            if (isFileDrag(e)) {
+                e.preventDefault();
+                const inputContainer = document.querySelector('.ai-input-container');
+                inputContainer.classList.add('drag-over');
+            }
+        }
+
+        function handleImageDragOver(e) {
+            if (isFileDrag(e)) {
+                e.preventDefault();
+                e.dataTransfer.dropEffect = 'copy';
+            }
+        }
+
+        function handleImageDragLeave(e) {
+            if (isFileDrag(e)) {
+                // 检查是否真的离开了容器区域
+                const inputContainer = document.querySelector('.ai-input-container');
+                const rect = inputContainer.getBoundingClientRect();
+                const x = e.clientX;
+                const y = e.clientY;
+
+                if (x < rect.left || x > rect.right || y < rect.top || y > rect.bottom) {
+                    inputContainer.classList.remove('drag-over');
+                }
+            }
+        }
+
+        function handleImageFileDrop(e) {
+            // 总是阻止默认行为
+            e.preventDefault();
+            e.stopPropagation();
+
+            const inputContainer = document.querySelector('.ai-input-container');
+            inputContainer.classList.remove('drag-over');
+
+            if (e.dataTransfer && e.dataTransfer.files && e.dataTransfer.files.length > 0) {
+                const files = e.dataTransfer.files;
+
+                // 过滤出图片文件
+                const imageFiles = Array.from(files).filter(file => file.type.startsWith('image/'));
+
+                if (imageFiles.length > 0) {
+                    handleFiles(imageFiles);
+                    showNotification(`检测到 ${imageFiles.length} 张图片，正在上传...`, 'info');
+                } else {
+                    showNotification('请拖拽图片文件到此区域', 'warning');
+                }
+            } else {
+                showNotification('拖拽失败，请重试', 'error');
+            }
+        }
+
+        function handleFileSelect(e) {
+            const files = e.target.files;
+            handleFiles(files);
+        }
+
+        function handleFiles(files) {
+            if (isUploading) {
+                showNotification('正在上传中，请稍候...', 'warning');
+                return;
+            }
+
+            // 支持的图片格式
+            const supportedTypes = [
+                'image/jpeg', 'image/jpg', 'image/png', 'image/gif',
+                'image/webp', 'image/bmp', 'image/svg+xml'
+            ];
+
+            const validFiles = [];
+            const errors = [];
+
+            Array.from(files).forEach(file => {
+                // 验证文件类型
+                if (!supportedTypes.includes(file.type.toLowerCase())) {
+                    errors.push(`${file.name}: 不支持的图片格式 (${file.type})`);
+                    return;
+                }
+
+                // 验证文件大小 (10MB)
+                if (file.size > 10 * 1024 * 1024) {
+                    errors.push(`${file.name}: 文件大小超过10MB限制 (${formatFileSize(file.size)})`);
+                    return;
+                }
+
+                // 验证文件名
+                if (file.name.length > 100) {
+                    errors.push(`${file.name}: 文件名过长，请使用较短的文件名`);
+                    return;
+                }
+
+                validFiles.push(file);
+            });
+
+            // 显示错误信息
+            if (errors.length > 0) {
+                const errorMessage = '以下文件无法上传：\n' + errors.join('\n');
+                showNotification(errorMessage, 'error');
+            }
+
+            if (validFiles.length === 0) {
+                if (errors.length === 0) {
+                    showNotification('没有选择有效的图片文件', 'warning');
+                }
+                return;
+            }
+
+            // 检查是否超过最大上传数量
+            const maxImages = 10;
+            if (uploadedImages.length + validFiles.length > maxImages) {
+                showNotification(`最多只能上传${maxImages}张图片，当前已有${uploadedImages.length}张`, 'warning');
+                return;
+            }
+
+            // 上传文件
+            uploadFiles(validFiles);
+        }
+
+        async function uploadFiles(files) {
+            if (files.length === 0) return;
+
+            isUploading = true;
+            showUploadProgress(true);
+
+            try {
+                for (let i = 0; i < files.length; i++) {
+                    const file = files[i];
+                    updateUploadProgress((i / files.length) * 100, `上传中 ${i + 1}/${files.length}: ${file.name}`);
+
+                    const result = await uploadSingleFile(file);
+                    if (result.success) {
+                        addUploadedImage(result.data);
+                    } else {
+                        showNotification(`上传失败: ${file.name} - ${result.message}`, 'error');
+                    }
+                }
+
+                updateUploadProgress(100, '上传完成');
+                setTimeout(() => showUploadProgress(false), 1000);
+
+                showNotification(`成功上传 ${files.length} 张图片`, 'success');
+
+            } catch (error) {
+                showNotification('上传失败，请重试', 'error');
+            } finally {
+                isUploading = false;
+                setTimeout(() => showUploadProgress(false), 1000);
+            }
+        }
+
+        async function uploadSingleFile(file) {
+            const formData = new FormData();
+            formData.append('file', file);
+            formData.append('title', file.name.split('.')[0]);
+            formData.append('description', `AI编辑助手上传的图片: ${file.name}`);
+            formData.append('category', 'ai_assistant');
+            formData.append('tags', 'ai_assistant,ppt_edit');
+
+            try {
+                const response = await fetch('/landppt/api/image/upload', {
+                    method: 'POST',
+                    body: formData
+                });
+
+                const result = await response.json();
+
+                if (result.success) {
+                    // 获取图片的绝对URL
+                    const imageUrl = await getImageAbsoluteUrl(result.image_id);
+                    return {
+                        success: true,
+                        data: {
+                            id: result.image_id,
+                            name: file.name,
+                            size: file.size,
+                            url: imageUrl,
+                            file: file
+                        }
+                    };
+                } else {
+                    return {
+                        success: false,
+                        message: result.message || '上传失败'
+                    };
+                }
+            } catch (error) {
+                return {
+                    success: false,
+                    message: '网络错误'
+                };
+            }
+        }
+
+        async function getImageAbsoluteUrl(imageId) {
+            try {
+                const response = await fetch(`/landppt/api/image/${imageId}/info`);
+                const result = await response.json();
+
+                if (result.success && result.image_info) {
+                    return result.image_info.absolute_url;
+                } else {
+                    // 如果获取失败，使用默认的URL格式
+                    return `${window.location.origin}/landppt/api/image/${imageId}`;
+                }
+            } catch (error) {
+                return `${window.location.origin}/landppt/api/image/${imageId}`;
+            }
+        }
+
+        function showUploadProgress(show) {
+            const progressDiv = document.getElementById('aiUploadProgress');
+            progressDiv.style.display = show ? 'block' : 'none';
+
+            if (!show) {
+                updateUploadProgress(0, '');
+            }
+        }
+
+        function updateUploadProgress(percent, text) {
+            const progressFill = document.getElementById('aiProgressFill');
+            const progressText = document.getElementById('aiProgressText');
+
+            progressFill.style.width = `${percent}%`;
+            progressText.textContent = text;
+        }
+
+        function addUploadedImage(imageData) {
+            uploadedImages.push(imageData);
+            renderUploadedImages();
+        }
+
+        function renderUploadedImages() {
+            const container = document.getElementById('aiUploadedImages');
+            const uploadBtn = document.getElementById('aiImageUploadBtn');
+
+            container.innerHTML = '';
+
+            // 更新上传按钮状态
+            if (uploadedImages.length === 0) {
+                uploadBtn.classList.remove('has-images');
+                uploadBtn.removeAttribute('data-count');
+                return;
+            } else {
+                uploadBtn.classList.add('has-images');
+                uploadBtn.setAttribute('data-count', uploadedImages.length);
+            }
+
+            uploadedImages.forEach((image, index) => {
+                const imageDiv = document.createElement('div');
+                imageDiv.className = 'ai-uploaded-image';
+                imageDiv.title = `${image.name} (${formatFileSize(image.size)}) - 点击查看大图`;
+
+                // 创建图片预览
+                const img = document.createElement('img');
+                if (image.file) {
+                    // 本地上传的图片
+                    img.src = URL.createObjectURL(image.file);
+                } else {
+                    // 从图床选择的图片
+                    img.src = image.url;
+                }
+                img.alt = image.name;
+
+                // 创建删除按钮
+                const removeBtn = document.createElement('button');
+                removeBtn.className = 'ai-image-remove';
+                removeBtn.innerHTML = '<i class="fas fa-times"></i>';
+                removeBtn.onclick = (e) => {
+                    e.stopPropagation();
+                    removeUploadedImage(index);
+                };
+
+                // 创建信息显示
+                const infoDiv = document.createElement('div');
+                infoDiv.className = 'ai-image-info';
+                infoDiv.textContent = formatFileSize(image.size);
+
+                imageDiv.appendChild(img);
+                imageDiv.appendChild(removeBtn);
+                imageDiv.appendChild(infoDiv);
+
+                // 点击图片显示全屏预览
+                imageDiv.addEventListener('click', () => {
+                    showImagePreview(image);
+                });
+
+                container.appendChild(imageDiv);
+            });
+        }
+
+        function removeUploadedImage(index) {
+            if (index >= 0 && index < uploadedImages.length) {
+                const image = uploadedImages[index];
+                // 释放blob URL（仅对本地上传的图片）
+                if (image.file) {
+                    URL.revokeObjectURL(URL.createObjectURL(image.file));
+                }
+                uploadedImages.splice(index, 1);
+                renderUploadedImages();
+                showNotification('图片已移除', 'info');
+            }
+        }
+
+
+
+        function formatFileSize(bytes) {
+            if (bytes === 0) return '0 B';
+            const k = 1024;
+            const sizes = ['B', 'KB', 'MB', 'GB'];
+            const i = Math.floor(Math.log(bytes) / Math.log(k));
+            return parseFloat((bytes / Math.pow(k, i)).toFixed(1)) + ' ' + sizes[i];
+        }
+
+        function clearUploadedImages() {
+            // 释放所有blob URLs（仅对本地上传的图片）
+            uploadedImages.forEach(image => {
+                if (image.file) {
+                    URL.revokeObjectURL(URL.createObjectURL(image.file));
+                }
+            });
+            uploadedImages = [];
+            renderUploadedImages();
+        }
+
+
+
+        // 自动将所有已上传的图片信息嵌入到消息中
+        function autoEmbedUploadedImages(message) {
+            if (uploadedImages.length === 0) {
+                return message;
+            }
+
+            // 构建图片信息文本
+            let imageInfoText = '\n\n📷 图片信息：\n';
+            uploadedImages.forEach((image, index) => {
+                imageInfoText += `${index + 1}. 图片名称：${image.name}\n`;
+                imageInfoText += `   图片地址：${image.url}\n`;
+                imageInfoText += `   文件大小：${formatFileSize(image.size)}\n`;
+                if (index < uploadedImages.length - 1) {
+                    imageInfoText += '\n';
+                }
+            });
+
+            // imageInfoText += '\n请分析这些图片的内容，并根据我的要求进行处理。';
+
+            return message + imageInfoText;
+        }
+
+        // 获取所有已上传的图片信息
+        function getAllUploadedImages() {
+            return uploadedImages.map(image => ({
+                name: image.name,
+                url: image.url,
+                size: image.size > 0 ? formatFileSize(image.size) : '未知大小',
+                id: image.id
+            }));
+        }
+
+        // 视觉模式切换功能
+        function toggleVisionMode() {
+            visionModeEnabled = !visionModeEnabled;
+            const visionBtn = document.getElementById('aiVisionToggleBtn');
+
+            if (visionModeEnabled) {
+                visionBtn.classList.add('active');
+                visionBtn.title = '关闭视觉模式 - AI将不再看到当前幻灯片';
+                showNotification('视觉模式已启用 - AI现在可以看到当前幻灯片', 'success');
+            } else {
+                visionBtn.classList.remove('active');
+                visionBtn.title = '启用视觉模式 - AI将能看到当前幻灯片';
+                showNotification('视觉模式已关闭', 'info');
+            }
+        }
+
+        // 捕获当前幻灯片截图
+        async function captureSlideScreenshot() {
+            if (!visionModeEnabled) {
+                return null;
+            }
+
+            try {
+                const slideFrame = document.getElementById('slideFrame');
+                if (!slideFrame) {
+                    return null;
+                }
+
+                // 等待iframe内容加载完成
+                await new Promise(resolve => {
+                    if (slideFrame.contentDocument && slideFrame.contentDocument.readyState === 'complete') {
+                        resolve();
+                    } else {
+                        slideFrame.onload = resolve;
+                        setTimeout(resolve, 1000); // 超时保护
+                    }
+                });
+
+                // 获取iframe内容
+                const iframeDoc = slideFrame.contentDocument || slideFrame.contentWindow.document;
+                if (!iframeDoc) {
+                    return null;
+                }
+
+                // 使用html2canvas捕获iframe内容
+                if (typeof html2canvas === 'undefined') {
+                    await loadHtml2Canvas();
+                }
+
+                const canvas = await html2canvas(iframeDoc.body, {
+                    width: 1280,
+                    height: 720,
+                    scale: 1,
+                    useCORS: true,
+                    allowTaint: true,
+                    backgroundColor: '#ffffff'
+                });
+
+                // 转换为base64
+                const dataURL = canvas.toDataURL('image/jpeg', 0.8);
+                return dataURL;
+
+            } catch (error) {
+                return null;
+            }
+        }
+
+        // 动态加载html2canvas库
+        async function loadHtml2Canvas() {
+            return new Promise((resolve, reject) => {
+                if (typeof html2canvas !== 'undefined') {
+                    resolve();
+                    return;
+                }
+
+                const script = document.createElement('script');
+                script.src = 'https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js';
+                script.onload = resolve;
+                script.onerror = reject;
+                document.head.appendChild(script);
+            });
+        }
+
+
+
+        // 全屏图片预览相关函数
+        function showImagePreview(image) {
+            currentPreviewImage = image;
+
+            const overlay = document.getElementById('imagePreviewOverlay');
+            const title = document.getElementById('imagePreviewTitle');
+            const details = document.getElementById('imagePreviewDetails');
+            const img = document.getElementById('imagePreviewImg');
+            const loading = document.getElementById('imagePreviewLoading');
+
+            // 显示遮罩层
+            overlay.style.display = 'flex';
+
+            // 设置图片信息
+            title.textContent = image.name;
+            details.textContent = `大小: ${formatFileSize(image.size)} | 发送消息时自动包含此图片`;
+
+            // 显示加载状态
+            loading.style.display = 'block';
+            img.style.display = 'none';
+
+            // 加载图片
+            img.onload = function() {
+                loading.style.display = 'none';
+                img.style.display = 'block';
+            };
+
+            img.onerror = function() {
+                loading.style.display = 'none';
+                img.style.display = 'block';
+                img.src = 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMjAwIiBoZWlnaHQ9IjIwMCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj48cmVjdCB3aWR0aD0iMTAwJSIgaGVpZ2h0PSIxMDAlIiBmaWxsPSIjZGRkIi8+PHRleHQgeD0iNTAlIiB5PSI1MCUiIGZvbnQtZmFtaWx5PSJBcmlhbCwgc2Fucy1zZXJpZiIgZm9udC1zaXplPSIxNCIgZmlsbD0iIzk5OSIgdGV4dC1hbmNob3I9Im1pZGRsZSIgZHk9Ii4zZW0iPuWbvueJh+WKoOi9veWksei0pTwvdGV4dD48L3N2Zz4=';
+            };
+
+            // 设置图片源
+            img.src = image.url;
+
+            // 阻止页面滚动
+            document.body.style.overflow = 'hidden';
+        }
+
+        function closeImagePreview() {
+            const overlay = document.getElementById('imagePreviewOverlay');
+            overlay.style.display = 'none';
+            currentPreviewImage = null;
+
+            // 恢复页面滚动
+            document.body.style.overflow = '';
+        }
+
+        function downloadCurrentImage() {
+            if (!currentPreviewImage) return;
+
+            const link = document.createElement('a');
+            link.href = currentPreviewImage.url;
+            link.download = currentPreviewImage.name;
+            document.body.appendChild(link);
+            link.click();
+            document.body.removeChild(link);
+
+            showNotification(`开始下载: ${currentPreviewImage.name}`, 'success');
+        }
+
+
+
+        function removeCurrentImage() {
+            if (!currentPreviewImage) return;
+
+            const index = uploadedImages.findIndex(img => img.id === currentPreviewImage.id);
+            if (index !== -1) {
+                if (confirm(`确定要删除图片 "${currentPreviewImage.name}" 吗？`)) {
+                    removeUploadedImage(index);
+                    closeImagePreview();
+                }
+            }
+        }
+
+        // 键盘事件处理
+        document.addEventListener('keydown', function(e) {
+            if (e.key === 'Escape' && currentPreviewImage) {
+                closeImagePreview();
+            }
+        });
+
+        // 点击遮罩层关闭预览
+        document.addEventListener('click', function(e) {
+            if (e.target.id === 'imagePreviewOverlay') {
+                closeImagePreview();
+            }
+        });
+
+        // 图片选择菜单相关函数
+        function showImageSelectMenu() {
+            const menu = document.getElementById('imageSelectMenu');
+            menu.style.display = 'flex';
+            document.body.style.overflow = 'hidden';
+        }
+
+        function closeImageSelectMenu() {
+            const menu = document.getElementById('imageSelectMenu');
+            menu.style.display = 'none';
+            document.body.style.overflow = '';
+        }
+
+        function selectFromLocal() {
+            closeImageSelectMenu();
+            const fileInput = document.getElementById('aiImageFileInput');
+            fileInput.click();
+        }
+
+        function selectFromLibrary() {
+            closeImageSelectMenu();
+            showImageLibrary();
+        }
+
+        // 图床选择器相关函数
+        function showImageLibrary() {
+            const overlay = document.getElementById('imageLibraryOverlay');
+            const loading = document.getElementById('imageLibraryLoading');
+            const grid = document.getElementById('imageLibraryGrid');
+            const empty = document.getElementById('imageLibraryEmpty');
+
+            overlay.style.display = 'flex';
+            loading.style.display = 'block';
+            grid.style.display = 'none';
+            empty.style.display = 'none';
+
+            selectedLibraryImages = [];
+            updateSelectionCount();
+
+            document.body.style.overflow = 'hidden';
+
+            // 初始化搜索功能
+            initImageLibrarySearch();
+
+            // 加载图床图片
+            loadLibraryImages();
+        }
+
+        function closeImageLibrary() {
+            const overlay = document.getElementById('imageLibraryOverlay');
+            overlay.style.display = 'none';
+            selectedLibraryImages = [];
+            document.body.style.overflow = '';
+
+            // 重置搜索状态
+            const searchInput = document.getElementById('imageLibrarySearchInput');
+            const clearBtn = document.getElementById('imageLibrarySearchClear');
+            if (searchInput) {
+                searchInput.value = '';
+            }
+            if (clearBtn) {
+                clearBtn.style.display = 'none';
+            }
+            currentSearchTerm = '';
+            filteredLibraryImages = [];
+
+            // 重置分页状态
+            currentPage = 1;
+            totalPages = 1;
+            totalCount = 0;
+            hidePaginationUI();
+        }
+
+        async function loadLibraryImages(searchTerm = '', page = 1) {
+            try {
+                // 使用与image_gallery.html相同的API端点
+                const params = new URLSearchParams({
+                    page: page,
+                    per_page: perPage,
+                    category: '', // 不限制分类
+                    search: searchTerm,
+                    sort: 'created_desc'
+                });
+
+                const response = await fetch(`/landppt/api/image/gallery/list?${params}`);
+                const result = await response.json();
+
+                const loading = document.getElementById('imageLibraryLoading');
+                const grid = document.getElementById('imageLibraryGrid');
+                const empty = document.getElementById('imageLibraryEmpty');
+
+                loading.style.display = 'none';
+
+                if (result.success && result.images && result.images.length > 0) {
+                    libraryImages = result.images;
+                    filteredLibraryImages = libraryImages;
+
+                    // 更新分页信息
+                    if (result.pagination) {
+                        currentPage = result.pagination.current_page;
+                        totalPages = result.pagination.total_pages;
+                        totalCount = result.pagination.total_count;
+                        updatePaginationUI();
+                    }
+
+                    renderLibraryImages();
+                    grid.style.display = 'grid';
+                } else {
+                    empty.style.display = 'block';
+                    hidePaginationUI();
+                }
+            } catch (error) {
+                const loading = document.getElementById('imageLibraryLoading');
+                const empty = document.getElementById('imageLibraryEmpty');
+
+                loading.style.display = 'none';
+                empty.style.display = 'block';
+                empty.innerHTML = `
+                    <i class="fas fa-exclamation-triangle"></i>
+                `;
+                showNotification('加载图床图片失败', 'error');
+            }
+        }
+
+        function renderLibraryImages() {
+            const grid = document.getElementById('imageLibraryGrid');
+            grid.innerHTML = '';
+
+            filteredLibraryImages.forEach(image => {
+                const item = document.createElement('div');
+                item.className = 'image-library-item';
+                item.dataset.imageId = image.image_id;
+
+                // 列表中使用后台生成的小尺寸缩略图
+                const imageUrl = `/landppt/api/image/thumbnail/${image.image_id}?size=strip`;
+
+                // 格式化文件大小 - 检查多个可能的位置
+                let fileSize = '未知大小';
+                if (image.file_size && image.file_size > 0) {
+                    // 直接从根级别获取file_size
+                    fileSize = formatFileSize(image.file_size);
+                } else if (image.metadata) {
+                    // 从metadata中获取
+                    if (image.metadata.file_size && image.metadata.file_size > 0) {
+                        fileSize = formatFileSize(image.metadata.file_size);
+                    } else if (image.metadata.size && image.metadata.size > 0) {
+                        fileSize = formatFileSize(image.metadata.size);
+                    }
+                }
+
+                item.innerHTML = `
+                    <img src="${imageUrl}" alt="${image.title || '未命名图片'}" loading="lazy" onerror="this.src='data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMTUwIiBoZWlnaHQ9IjE1MCIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj48cmVjdCB3aWR0aD0iMTAwJSIgaGVpZ2h0PSIxMDAlIiBmaWxsPSIjZjBmMGYwIi8+PHRleHQgeD0iNTAlIiB5PSI1MCUiIGZvbnQtZmFtaWx5PSJBcmlhbCwgc2Fucy1zZXJpZiIgZm9udC1zaXplPSIxMiIgZmlsbD0iIzk5OSIgdGV4dC1hbmNob3I9Im1pZGRsZSIgZHk9Ii4zZW0iPuWbvueJh+WKoOi9veWksei0pTwvdGV4dD48L3N2Zz4='">
+                    <div class="image-info">
+                        <div>${image.title || '未命名图片'}</div>
+                        <div>${fileSize}</div>
+                    </div>
+                    <div class="selection-indicator">
+                        <i class="fas fa-check"></i>
+                    </div>
+                `;
+
+                item.addEventListener('click', () => toggleImageSelection(image, item));
+                grid.appendChild(item);
+            });
+        }
+
+        function toggleImageSelection(image, element) {
+            const imageId = image.image_id;
+            const index = selectedLibraryImages.findIndex(img => img.image_id === imageId);
+
+            if (index === -1) {
+                // 添加到选择列表
+                selectedLibraryImages.push(image);
+                element.classList.add('selected');
+            } else {
+                // 从选择列表移除
+                selectedLibraryImages.splice(index, 1);
+                element.classList.remove('selected');
+            }
+
+            updateSelectionCount();
+        }
+
+        function updateSelectionCount() {
+            const countSpan = document.getElementById('selectedCount');
+            const confirmBtn = document.getElementById('confirmSelectionBtn');
+
+            countSpan.textContent = selectedLibraryImages.length;
+            confirmBtn.disabled = selectedLibraryImages.length === 0;
+        }
+
+        async function confirmImageSelection() {
+            if (selectedLibraryImages.length === 0) return;
+
+            let addedCount = 0;
+
+            // 显示处理进度
+            showNotification('正在处理选择的图片...', 'info');
+
+            // 逐个处理选择的图片，获取完整信息
+            for (const image of selectedLibraryImages) {
+                try {
+                    // 获取图片的完整信息和绝对URL
+                    const imageInfo = await getImageCompleteInfo(image.image_id);
+
+                    const imageData = {
+                        id: image.image_id,
+                        name: imageInfo.name || image.title || '未命名图片',
+                        size: imageInfo.size || 0,
+                        url: imageInfo.absoluteUrl,
+                        file: null // 从图床选择的图片没有file对象
+                    };
+
+                    // 检查是否已经存在
+                    const exists = uploadedImages.find(img => img.id === imageData.id);
+                    if (!exists) {
+                        uploadedImages.push(imageData);
+                        addedCount++;
+                    }
+                } catch (error) {
+                    // 如果获取详细信息失败，使用基本信息
+                    const imageData = {
+                        id: image.image_id,
+                        name: image.title || '未命名图片',
+                        size: image.file_size || (image.metadata && image.metadata.file_size) || 0,
+                        url: `${window.location.origin}/landppt/api/image/view/${image.image_id}`,
+                        file: null
+                    };
+
+                    const exists = uploadedImages.find(img => img.id === imageData.id);
+                    if (!exists) {
+                        uploadedImages.push(imageData);
+                        addedCount++;
+                    }
+                }
+            }
+
+            renderUploadedImages();
+            closeImageLibrary();
+
+            if (addedCount > 0) {
+                showNotification(`已添加 ${addedCount} 张图片`, 'success');
+            } else {
+                showNotification('所选图片已存在，未添加新图片', 'info');
+            }
+        }
+
+        // 获取图片的完整信息，包括绝对URL
+        async function getImageCompleteInfo(imageId) {
+            try {
+                const response = await fetch(`/landppt/api/image/${imageId}/info`);
+                const result = await response.json();
+
+                if (result.success && result.image_info) {
+                    return {
+                        name: result.image_info.title || result.image_info.filename,
+                        size: result.image_info.file_size || 0,
+                        absoluteUrl: result.image_info.absolute_url
+                    };
+                } else {
+                    throw new Error('获取图片信息失败');
+                }
+            } catch (error) {
+                // 如果专用接口失败，尝试使用详情接口
+                try {
+                    const detailResponse = await fetch(`/landppt/api/image/detail/${imageId}`);
+                    const detailResult = await detailResponse.json();
+
+                    if (detailResult.success && detailResult.image) {
+                        const image = detailResult.image;
+                        return {
+                            name: image.title || image.filename,
+                            size: (image.metadata && image.metadata.file_size) ? image.metadata.file_size : 0,
+                            absoluteUrl: `${window.location.origin}/landppt/api/image/view/${imageId}`
+                        };
+                    }
+                } catch (detailError) {
+                    // 获取图片详情也失败
+                }
+
+                throw error;
+            }
+        }
+
+        // 分页相关函数
+        function updatePaginationUI() {
+            const pagination = document.getElementById('imageLibraryPagination');
+            const paginationInfo = document.getElementById('paginationInfo');
+            const prevBtn = document.getElementById('prevPageBtn');
+            const nextBtn = document.getElementById('nextPageBtn');
+
+            if (!pagination) return;
+
+            // 显示分页控件
+            pagination.style.display = 'flex';
+
+            // 更新分页信息
+            paginationInfo.textContent = `第 ${currentPage} 页，共 ${totalPages} 页 (总计 ${totalCount} 张图片)`;
+
+            // 更新按钮状态
+            prevBtn.disabled = currentPage <= 1;
+            nextBtn.disabled = currentPage >= totalPages;
+        }
+
+        function hidePaginationUI() {
+            const pagination = document.getElementById('imageLibraryPagination');
+            if (pagination) {
+                pagination.style.display = 'none';
+            }
+        }
+
+        function loadPreviousPage() {
+            if (currentPage > 1) {
+                loadLibraryImages(currentSearchTerm, currentPage - 1);
+            }
+        }
+
+        function loadNextPage() {
+            if (currentPage < totalPages) {
+                loadLibraryImages(currentSearchTerm, currentPage + 1);
+            }
+        }
+
+        // 图片库搜索相关函数
+        function initImageLibrarySearch() {
+            const searchInput = document.getElementById('imageLibrarySearchInput');
+            const clearBtn = document.getElementById('imageLibrarySearchClear');
+
+            if (!searchInput) return;
+
+            // 搜索输入事件
+            searchInput.addEventListener('input', function(e) {
+                const searchTerm = e.target.value.trim();
+                currentSearchTerm = searchTerm;
+
+                if (searchTerm) {
+                    clearBtn.style.display = 'block';
+                    // 搜索时重置到第一页
+                    loadLibraryImages(searchTerm, 1);
+                } else {
+                    clearBtn.style.display = 'none';
+                    // 清空搜索时重置到第一页
+                    loadLibraryImages('', 1);
+                }
+            });
+
+            // 回车键搜索
+            searchInput.addEventListener('keydown', function(e) {
+                if (e.key === 'Enter') {
+                    e.preventDefault();
+                    const searchTerm = e.target.value.trim();
+                    currentSearchTerm = searchTerm;
+                    loadLibraryImages(searchTerm, 1);
+                }
+            });
+        }
+
+
+
+        function clearImageLibrarySearch() {
+            const searchInput = document.getElementById('imageLibrarySearchInput');
+            const clearBtn = document.getElementById('imageLibrarySearchClear');
+
+            searchInput.value = '';
+            clearBtn.style.display = 'none';
+            currentSearchTerm = '';
+
+            // 重新加载第一页数据
+            loadLibraryImages('', 1);
+        }
+
+        // AI增强所有要点功能
+        async function enhanceAllBulletPoints() {
+            const bulletPointsContainer = document.getElementById('bulletPointsContainer');
+            if (!bulletPointsContainer) {
+                showNotification('找不到要点容器', 'error');
+                return;
+            }
+
+            const bulletPointItems = bulletPointsContainer.querySelectorAll('.bullet-point-item');
+            if (bulletPointItems.length === 0) {
+                showNotification('没有要点可以增强', 'warning');
+                return;
+            }
+
+            // 收集所有要点的原始内容
+            const originalPoints = [];
+            bulletPointItems.forEach((item, index) => {
+                const textElement = item.querySelector('.bullet-point-text');
+                const text = textElement ? textElement.textContent.trim() : '';
+                if (text) {
+                    originalPoints.push({
+                        index: index,
+                        text: text,
+                        element: textElement
+                    });
+                }
+            });
+
+            if (originalPoints.length === 0) {
+                showNotification('没有有效的要点内容可以增强', 'warning');
+                return;
+            }
+
+            // 显示加载状态
+            const enhanceAllBtn = event.target;
+            const originalBtnContent = enhanceAllBtn.innerHTML;
+            enhanceAllBtn.disabled = true;
+            enhanceAllBtn.style.opacity = '0.6';
+            enhanceAllBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> <span>正在增强...</span>';
+
+            try {
+                // 获取当前幻灯片和项目信息
+                const currentSlide = slidesData[currentSlideIndex];
+                let slideOutline = null;
+                if (projectOutline && projectOutline.slides && projectOutline.slides[currentSlideIndex]) {
+                    slideOutline = projectOutline.slides[currentSlideIndex];
+                }
+
+                // 构建AI增强请求
+                const enhanceRequest = {
+                    slideIndex: currentSlideIndex + 1,
+                    slideTitle: currentSlide.title || `第${currentSlideIndex + 1}页`,
+                    slideContent: currentSlide.html_content,
+                    userRequest: `请增强和优化以下所有要点，使它们更加详细、准确和有吸引力。保持每个要点的核心意思不变，但可以添加更多细节、使用更好的表达方式或提供更具体的描述。要点之间应该保持逻辑连贯性和风格一致性。`,
+                    slideOutline: slideOutline,
+                    projectInfo: {
+                        title: editorProject.title,
+                        topic: editorProject.topic,
+                        scenario: editorProject.scenario
+                    },
+                    contextInfo: {
+                        allBulletPoints: originalPoints.map(p => p.text),
+                        totalPoints: originalPoints.length
+                    }
+                };
+
+                // 发送AI增强请求
+                const response = await fetch('/landppt/api/ai/enhance-all-bullet-points', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify(enhanceRequest)
+                });
+
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+
+                const result = await response.json();
+
+                if (result.success && result.enhancedPoints && Array.isArray(result.enhancedPoints)) {
+                    // 显示增强结果的确认对话框
+                    showAllBulletPointsEnhancementDialog(originalPoints, result.enhancedPoints);
+                } else {
+                    throw new Error(result.error || result.message || '增强失败');
+                }
+
+            } catch (error) {
+                showNotification('AI增强失败：' + error.message, 'error');
+            } finally {
+                // 恢复按钮状态
+                enhanceAllBtn.disabled = false;
+                enhanceAllBtn.style.opacity = '1';
+                enhanceAllBtn.innerHTML = originalBtnContent;
+            }
+        }
+
+        // 键盘事件处理
+        document.addEventListener('keydown', function(e) {
+            if (e.key === 'Escape') {
+                if (document.getElementById('bulletPointEnhancementDialog')) {
+                    closeBulletPointEnhancementDialog();
+                } else if (document.getElementById('imageSelectMenu').style.display === 'flex') {
+                    closeImageSelectMenu();
+                } else if (document.getElementById('imageLibraryOverlay').style.display === 'flex') {
+                    closeImageLibrary();
+                } else if (currentPreviewImage) {
+                    closeImagePreview();
+                }
+            }
+        });
+
+        // 显示所有要点增强结果对话框
+        function showAllBulletPointsEnhancementDialog(originalPoints, enhancedPoints) {
+            // 创建对话框
+            const dialog = document.createElement('div');
+            dialog.id = 'bulletPointEnhancementDialog';
+            dialog.style.cssText = `
+                position: fixed;
+                top: 0;
+                left: 0;
+                width: 100%;
+                height: 100%;
+                background: rgba(0,0,0,0.6);
+                z-index: 10002;
+                display: flex;
+                justify-content: center;
+                align-items: center;
+                backdrop-filter: blur(5px);
+            `;
+
+            const dialogContent = document.createElement('div');
+            dialogContent.style.cssText = `
+                background: white;
+                border-radius: 12px;
+                padding: 30px;
+                width: 95vw;
+                max-width: 1000px;
+                max-height: 85vh;
+                overflow-y: auto;
+                position: relative;
+                box-shadow: 0 20px 40px rgba(0,0,0,0.3);
+                animation: slideInUp 0.3s ease;
+            `;
+
+            // 构建对比内容
+            let comparisonContent = '';
+            const maxLength = Math.max(originalPoints.length, enhancedPoints.length);
+
+            for (let i = 0; i < maxLength; i++) {
+                const original = originalPoints[i] ? originalPoints[i].text : '';
+                const enhanced = enhancedPoints[i] ? cleanAIContent(enhancedPoints[i]) : '';
+
+                if (original || enhanced) {
+                    comparisonContent += `
+                        <div style="margin-bottom: 25px; border: 1px solid #e9ecef; border-radius: 8px; overflow: hidden;">
+                            <div style="background: #f8f9fa; padding: 10px 15px; border-bottom: 1px solid #e9ecef; font-weight: bold; color: #495057;">
+                                要点 ${i + 1}
+                            </div>
+                            <div style="padding: 15px;">
+                                <div style="margin-bottom: 15px;">
+                                    <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #dc3545; font-size: 13px;">原始内容：</label>
+                                    <div style="background: #fff5f5; padding: 12px; border-radius: 6px; border-left: 3px solid #dc3545; font-size: 14px; line-height: 1.4; min-height: 20px;">
+                                        ${original || '<em style="color: #999;">无内容</em>'}
+                                    </div>
+                                </div>
+                                <div>
+                                    <label style="font-weight: bold; display: block; margin-bottom: 8px; color: #28a745; font-size: 13px;">AI增强后：</label>
+                                    <div style="background: #f0fff4; padding: 12px; border-radius: 6px; border-left: 3px solid #28a745; font-size: 14px; line-height: 1.4; min-height: 20px;">
+                                        ${enhanced || '<em style="color: #999;">无增强内容</em>'}
+                                    </div>
+                                </div>
+                            </div>
+                        </div>
+                    `;
+                }
+            }
+
+            dialogContent.innerHTML = `
+                <style>
+                    @keyframes slideInUp {
+                        from {
+                            opacity: 0;
+                            transform: translateY(30px);
+                        }
+                        to {
+                            opacity: 1;
+                            transform: translateY(0);
+                        }
+                    }
+                </style>
+                <h4 style="margin: 0 0 25px 0; color: #2c3e50; display: flex; align-items: center; gap: 10px;">
+                    <span style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border-radius: 50%; width: 32px; height: 32px; display: flex; align-items: center; justify-content: center; font-size: 16px;">🪄</span>
+                    AI要点增强结果 (共 ${maxLength} 个要点)
+                </h4>
+
+                <div style="margin-bottom: 30px;">
+                    ${comparisonContent}
+                </div>
+
+                <div style="text-align: right; display: flex; gap: 15px; justify-content: flex-end; border-top: 1px solid #e9ecef; padding-top: 20px;">
+                    <button onclick="closeBulletPointEnhancementDialog()"
+                            style="background: #6c757d; color: white; border: none; padding: 12px 24px; border-radius: 8px; cursor: pointer; font-size: 14px; font-weight: 500; transition: all 0.3s ease;">
+                        <i class="fas fa-times"></i> 取消
+                    </button>
+                    <button onclick="applyAllBulletPointsEnhancement()"
+                            style="background: linear-gradient(135deg, #28a745 0%, #20c997 100%); color: white; border: none; padding: 12px 24px; border-radius: 8px; cursor: pointer; font-size: 14px; font-weight: 500; transition: all 0.3s ease; box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);">
+                        <i class="fas fa-check"></i> 应用所有增强
+                    </button>
+                </div>
+            `;
+
+            dialog.appendChild(dialogContent);
+            document.body.appendChild(dialog);
+
+            // 存储增强结果供后续使用
+            dialog._enhancedPoints = enhancedPoints;
+            dialog._originalPoints = originalPoints;
+
+            // 点击遮罩关闭
+            dialog.addEventListener('click', (e) => {
+                if (e.target === dialog) {
+                    closeBulletPointEnhancementDialog();
+                }
+            });
+        }
+
+        // 关闭要点增强对话框
+        function closeBulletPointEnhancementDialog() {
+            const dialog = document.getElementById('bulletPointEnhancementDialog');
+            if (dialog) {
+                document.body.removeChild(dialog);
+            }
+        }
+
+        // 清理AI返回的内容，移除无关的开场白和格式标记
+        function cleanAIContent(content) {
+            if (!content) return '';
+
+            // 移除常见的开场白模式
+            const unwantedPatterns = [
+                /^好的[，,。.]*.*?[。.]/,
+                /^作为.*?专家[，,。.]*.*?[。.]/,
+                /^我将.*?[。.]/,
+                /^我会.*?[。.]/,
+                /^以下是.*?[：:]/,
+                /^根据.*?[：:]/,
+                /^请注意.*?[：:]/,
+                /^需要说明.*?[：:]/,
+                /^增强后的要点.*?[：:]/,
+                /^优化后的.*?[：:]/,
+                /^改进后的.*?[：:]/
+            ];
+
+            let cleaned = content.trim();
+
+            // 应用清理模式
+            unwantedPatterns.forEach(pattern => {
+                cleaned = cleaned.replace(pattern, '');
+            });
+
+            // 移除开头的编号和符号
+            cleaned = cleaned.replace(/^[\d\s\.\-\*\•\·\→\▪\▫]+/, '').trim();
+
+            return cleaned;
+        }
+
+        // 应用所有要点增强
+        function applyAllBulletPointsEnhancement() {
+            const dialog = document.getElementById('bulletPointEnhancementDialog');
+            if (!dialog || !dialog._enhancedPoints || !dialog._originalPoints) {
+                showNotification('无法获取增强结果', 'error');
+                return;
+            }
+
+            const enhancedPoints = dialog._enhancedPoints;
+            const originalPoints = dialog._originalPoints;
+            const bulletPointsContainer = document.getElementById('bulletPointsContainer');
+
+            if (!bulletPointsContainer) {
+                showNotification('找不到要点容器', 'error');
+                return;
+            }
+
+            let appliedCount = 0;
+
+            // 更新现有要点，并清理内容
+            originalPoints.forEach((originalPoint, index) => {
+                if (enhancedPoints[index] && originalPoint.element) {
+                    const cleanedContent = cleanAIContent(enhancedPoints[index]);
+                    if (cleanedContent && cleanedContent.length >= 5) {
+                        originalPoint.element.textContent = cleanedContent;
+                        appliedCount++;
+                    }
+                }
+            });
+
+            // 如果增强后的要点比原始要点多，添加新要点
+            if (enhancedPoints.length > originalPoints.length) {
+                for (let i = originalPoints.length; i < enhancedPoints.length; i++) {
+                    if (enhancedPoints[i]) {
+                        const cleanedContent = cleanAIContent(enhancedPoints[i]);
+                        if (cleanedContent && cleanedContent.length >= 5) {
+                            addNewBulletPointWithContent(cleanedContent);
+                            appliedCount++;
+                        }
+                    }
+                }
+            }
+
+            closeBulletPointEnhancementDialog();
+
+            if (appliedCount > 0) {
+                showNotification(`已成功增强 ${appliedCount} 个要点！`, 'success');
+            } else {
+                showNotification('没有要点被增强', 'warning');
+            }
+        }
+
+        // 添加带内容的新要点（用于增强功能）
+        function addNewBulletPointWithContent(content) {
+            const container = document.getElementById('bulletPointsContainer');
+            if (!container) return;
+
+            // 移除空状态提示
+            const emptyState = container.querySelector('.empty-bullet-points');
+            if (emptyState) {
+                emptyState.remove();
+            }
+
+            // 获取当前要点数量
+            const existingPoints = container.querySelectorAll('.bullet-point-item');
+            const newIndex = existingPoints.length;
+
+            // 创建新要点元素
+            const newBulletPoint = document.createElement('div');
+            newBulletPoint.className = 'bullet-point-item';
+            newBulletPoint.setAttribute('data-index', newIndex);
+            newBulletPoint.style.cssText = `
+                display: flex;
+                align-items: flex-start;
+                margin-bottom: 8px;
+                padding: 8px;
+                border-radius: 4px;
+                transition: all 0.2s ease;
+                position: relative;
+            `;
+
+            newBulletPoint.innerHTML = `
+                <span style="color: #666; margin-right: 8px; font-weight: bold; min-width: 20px;">•</span>
+                <div style="flex: 1; position: relative;">
+                    <div class="bullet-point-text" contenteditable="true"
+                         style="outline: none; min-height: 20px; line-height: 1.4; word-wrap: break-word;">${content}</div>
+                </div>
+                <button class="delete-bullet-btn" onclick="deleteBulletPoint(${newIndex})"
+                        style="background: #dc3545; color: white; border: none; border-radius: 50%; width: 28px; height: 28px; cursor: pointer; margin-left: 4px; display: flex; align-items: center; justify-content: center; font-size: 12px; transition: all 0.3s ease; opacity: 0.7;"
+                        title="删除此要点">
+                    <i class="fas fa-trash"></i>
+                </button>
+            `;
+
+            container.appendChild(newBulletPoint);
+        }
+
+        // 点击遮罩层关闭
+        document.addEventListener('click', function(e) {
+            if (e.target.id === 'imageSelectMenu') {
+                closeImageSelectMenu();
+            } else if (e.target.id === 'imageLibraryOverlay') {
+                closeImageLibrary();
+            } else if (e.target.id === 'imagePreviewOverlay') {
+                closeImagePreview();
+            }
+        });
+
+        // 添加新要点功能
+        function addNewBulletPoint() {
+            const container = document.getElementById('bulletPointsContainer');
+            if (!container) return;
+
+            // 移除空状态提示
+            const emptyState = container.querySelector('.empty-bullet-points');
+            if (emptyState) {
+                emptyState.remove();
+            }
+
+            // 获取当前要点数量
+            const existingPoints = container.querySelectorAll('.bullet-point-item');
+            const newIndex = existingPoints.length;
+
+            // 创建新要点元素
+            const newBulletPoint = document.createElement('div');
+            newBulletPoint.className = 'bullet-point-item';
+            newBulletPoint.setAttribute('data-index', newIndex);
+            newBulletPoint.style.cssText = `
+                display: flex;
+                align-items: flex-start;
+                margin-bottom: 8px;
+                padding: 8px;
+                border-radius: 4px;
+                transition: all 0.2s ease;
+                position: relative;
+                background: rgba(40, 167, 69, 0.1);
+                border: 2px dashed #28a745;
+            `;
+
+            newBulletPoint.innerHTML = `
+                <span style="color: #666; margin-right: 8px; font-weight: bold; min-width: 20px;">•</span>
+                <div style="flex: 1; position: relative;">
+                    <div class="bullet-point-text" contenteditable="true"
+                         style="outline: none; min-height: 20px; line-height: 1.4; word-wrap: break-word; background: white; padding: 8px; border-radius: 4px; border: 1px solid #28a745;"
+                         placeholder="请输入新要点内容...">
+                    </div>
+                </div>
+
+                <button class="delete-bullet-btn" onclick="deleteBulletPoint(${newIndex})"
+                        style="background: #dc3545; color: white; border: none; border-radius: 50%; width: 28px; height: 28px; cursor: pointer; margin-left: 4px; display: flex; align-items: center; justify-content: center; font-size: 12px; transition: all 0.3s ease; opacity: 0.7;"
+                        title="删除此要点">
+                    <i class="fas fa-trash"></i>
+                </button>
+            `;
+
+            container.appendChild(newBulletPoint);
+
+            // 聚焦到新要点的文本区域
+            const textArea = newBulletPoint.querySelector('.bullet-point-text');
+            textArea.focus();
+
+            // 添加事件监听器
+            textArea.addEventListener('blur', function() {
+                // 移除新建状态样式
+                newBulletPoint.style.background = '';
+                newBulletPoint.style.border = '';
+                textArea.style.background = '';
+                textArea.style.border = '';
+                textArea.style.padding = '';
+            });
+
+            textArea.addEventListener('input', function() {
+                if (this.textContent.trim()) {
+                    // 有内容时移除新建状态样式
+                    newBulletPoint.style.background = '';
+                    newBulletPoint.style.border = '';
+                    textArea.style.background = '';
+                    textArea.style.border = '';
+                    textArea.style.padding = '';
+                }
+            });
+
+            showNotification('已添加新要点，请输入内容', 'info');
+        }
+
+        // 删除要点功能
+        function deleteBulletPoint(pointIndex) {
+            const bulletPointItem = document.querySelector(`.bullet-point-item[data-index="${pointIndex}"]`);
+            if (!bulletPointItem) return;
+
+            const pointText = bulletPointItem.querySelector('.bullet-point-text')?.textContent.trim();
+            const confirmMessage = pointText ?
+                `确定要删除要点"${pointText.substring(0, 30)}${pointText.length > 30 ? '...' : ''}"吗？` :
+                '确定要删除这个要点吗？';
+
+            if (confirm(confirmMessage)) {
+                bulletPointItem.remove();
+
+                // 重新编号剩余要点
+                const container = document.getElementById('bulletPointsContainer');
+                const remainingPoints = container.querySelectorAll('.bullet-point-item');
+
+                remainingPoints.forEach((item, index) => {
+                    item.setAttribute('data-index', index);
+                    // 更新删除按钮的onclick事件
+                    const deleteBtn = item.querySelector('.delete-bullet-btn');
+                    if (deleteBtn) deleteBtn.setAttribute('onclick', `deleteBulletPoint(${index})`);
+                });
+
+                // 如果没有要点了，显示空状态
+                if (remainingPoints.length === 0) {
+                    container.innerHTML = `
+                        <div class="empty-bullet-points" style="text-align: center; color: #999; padding: 40px 20px;">
+                            <i class="fas fa-list" style="font-size: 24px; margin-bottom: 10px; opacity: 0.5;"></i>
+                            <p style="margin: 0;">暂无要点，点击下方按钮添加</p>
+                        </div>
+                    `;
+                }
+
+                showNotification('要点已删除', 'info');
+            }
+        }
+
+        // 验证和修复图片URL
+        function validateAndFixImageUrls() {
+            uploadedImages.forEach(image => {
+                // 确保URL是绝对路径
+                if (image.url && !image.url.startsWith('http') && !image.url.startsWith(window.location.origin)) {
+                    if (image.url.startsWith('/')) {
+                        image.url = window.location.origin + image.url;
+                    } else {
+                        image.url = window.location.origin + '/' + image.url;
+                    }
+                }
+
+                // 确保文件大小是数字
+                if (typeof image.size === 'string') {
+                    image.size = parseInt(image.size) || 0;
+                }
+            });
+        }
+
+        // 添加键盘快捷键支持
+        document.addEventListener('keydown', function(e) {
+            // Ctrl/Cmd + E 切换快速编辑模式
+            if ((e.ctrlKey || e.metaKey) && e.key === 'e' && !e.shiftKey && !e.altKey) {
+                e.preventDefault();
+                toggleQuickEditMode();
+            }
+
+            // ESC 键退出快速编辑模式
+            if (e.key === 'Escape' && currentMode === 'quickedit') {
+                if (currentInlineEditor) {
+                    finishDirectEdit(false); // 取消编辑
+                } else {
+                    setMode('preview');
+                }
+            }
+        });
+
+        // 在页面加载完成后初始化图片上传功能
+        document.addEventListener('DOMContentLoaded', function() {
+            // 延迟初始化，确保所有元素都已加载
+            setTimeout(() => {
+                const imageUploadBtn = document.getElementById('aiImageUploadBtn');
+                const inputContainer = document.querySelector('.ai-input-container');
+
+                if (imageUploadBtn && inputContainer) {
+                    if (typeof initImageUpload === 'function') {
+                        initImageUpload();
+                    }
+
+                    // 验证和修复现有图片数据
+                    if (typeof validateAndFixImageUrls === 'function') {
+                        validateAndFixImageUrls();
+                    }
+                } else {
+                    console.log('图片上传元素未找到:', {
+                        uploadBtn: !!imageUploadBtn,
+                        inputContainer: !!inputContainer
+                    });
+                }
+            }, 100);
+        });
+
+        // Speech Script Generation Functions
+        let speechScriptData = null;
+        let speechScriptModal = null;
+
+        function showSpeechScriptDialog() {
+            if (speechScriptModal) {
+                document.body.removeChild(speechScriptModal);
+            }
+
+            speechScriptModal = document.createElement('div');
+            speechScriptModal.className = 'modal fade show';
+            speechScriptModal.style.display = 'flex';
+            speechScriptModal.style.alignItems = 'center';
+            speechScriptModal.style.justifyContent = 'center';
+            speechScriptModal.style.position = 'fixed';
+            speechScriptModal.style.top = '0';
+            speechScriptModal.style.left = '0';
+            speechScriptModal.style.width = '100%';
+            speechScriptModal.style.height = '100%';
+            speechScriptModal.style.backgroundColor = 'rgba(0,0,0,0.5)';
+            speechScriptModal.style.zIndex = '20000';
+            speechScriptModal.innerHTML = `
+                <div class="speech-modal-dialog" style="max-width: 90vw; width: 1200px;">
+                    <div class="speech-modal-content">
+                        <div class="speech-modal-header">
+                            <div class="speech-modal-title">
+                                <div class="speech-modal-icon">
+                                    <svg width="24" height="24" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                        <path d="M12 2C13.1 2 14 2.9 14 4V12C14 13.1 13.1 14 12 14C10.9 14 10 13.1 10 12V4C10 2.9 10.9 2 12 2Z" fill="currentColor"/>
+                                        <path d="M19 10V12C19 15.87 15.87 19 12 19C8.13 19 5 15.87 5 12V10H7V12C7 14.76 9.24 17 12 17C14.76 17 17 14.76 17 12V10H19Z" fill="currentColor"/>
+                                        <path d="M10 21H14V23H10V21Z" fill="currentColor"/>
+                                    </svg>
+                                </div>
+                                <span>生成演讲稿</span>
+                            </div>
+                            <button type="button" class="speech-modal-close" onclick="closeSpeechScriptDialog()">
+                                <svg width="20" height="20" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M18 6L6 18M6 6L18 18" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                </svg>
+                            </button>
+                        </div>
+                        <div class="speech-modal-body">
+                            <!-- Generation Type Selection -->
+                            <div class="speech-section">
+                                <h6 class="speech-section-title">生成范围</h6>
+                                <div class="speech-generation-type-group">
+                                    <div class="speech-type-option">
+                                        <input type="radio" name="generationType" id="singleSlide" value="single" checked>
+                                        <label for="singleSlide" class="speech-type-label">
+                                            <div class="speech-type-icon">
+                                                <svg width="24" height="24" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                                    <path d="M14 2H6C4.9 2 4 2.9 4 4V20C4 21.1 4.89 22 5.99 22H18C19.1 22 20 21.1 20 20V8L14 2Z" stroke="currentColor" stroke-width="2" fill="none"/>
+                                                    <path d="M14 2V8H20" stroke="currentColor" stroke-width="2" fill="none"/>
+                                                </svg>
+                                            </div>
+                                            <div class="speech-type-text">
+                                                <div class="speech-type-title">当前页</div>
+                                                <div class="speech-type-desc">为当前选中的幻灯片生成演讲稿</div>
+                                            </div>
+                                        </label>
+                                    </div>
+
+                                    <div class="speech-type-option">
+                                        <input type="radio" name="generationType" id="multiSlide" value="multi">
+                                        <label for="multiSlide" class="speech-type-label">
+                                            <div class="speech-type-icon">
+                                                <svg width="24" height="24" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                                    <path d="M15 2H6C4.9 2 4 2.9 4 4V20C4 21.1 4.89 22 5.99 22H18C19.1 22 20 21.1 20 20V9L15 2Z" stroke="currentColor" stroke-width="2" fill="none"/>
+                                                    <path d="M15 2V9H20" stroke="currentColor" stroke-width="2" fill="none"/>
+                                                    <path d="M9 2H8C6.9 2 6 2.9 6 4V18C6 19.1 6.89 20 7.99 20H11" stroke="currentColor" stroke-width="1.5" fill="none" opacity="0.6"/>
+                                                </svg>
+                                            </div>
+                                            <div class="speech-type-text">
+                                                <div class="speech-type-title">多页选择</div>
+                                                <div class="speech-type-desc">选择多个幻灯片生成演讲稿</div>
+                                            </div>
+                                        </label>
+                                    </div>
+
+                                    <div class="speech-type-option">
+                                        <input type="radio" name="generationType" id="fullPresentation" value="full">
+                                        <label for="fullPresentation" class="speech-type-label">
+                                            <div class="speech-type-icon">
+                                                <svg width="24" height="24" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                                    <path d="M3 3V21H21V3H3Z" stroke="currentColor" stroke-width="2" fill="none"/>
+                                                    <path d="M9 9L15 15M15 9L9 15" stroke="currentColor" stroke-width="1.5" opacity="0.4"/>
+                                                    <path d="M7 1V5M17 1V5M1 7H23" stroke="currentColor" stroke-width="2"/>
+                                                </svg>
+                                            </div>
+                                            <div class="speech-type-text">
+                                                <div class="speech-type-title">全部幻灯片</div>
+                                                <div class="speech-type-desc">为整个演示生成完整演讲稿</div>
+                                            </div>
+                                        </label>
+                                    </div>
+                                </div>
+                            </div>
+
+                            <!-- Multi-slide Selection (hidden by default) -->
+                            <div id="multiSlideSelection" class="speech-section" style="display: none;">
+                                <h6 class="speech-section-title">选择幻灯片</h6>
+                                <div class="slide-selection-grid" id="slideSelectionGrid"></div>
+                            </div>
+
+                            <!-- Customization Options -->
+                            <div class="speech-section">
+                                <h6 class="speech-section-title">自定义选项</h6>
+                                <div class="speech-config-grid">
+                                    <div class="speech-config-card">
+                                        <div class="speech-config-title">语调风格</div>
+                                        <div class="speech-config-control">
+                                            <select class="speech-form-select" id="speechTone" onchange="toggleCustomToneInput()">
+                                                <option value="conversational">对话式</option>
+                                                <option value="formal">正式</option>
+                                                <option value="casual">轻松</option>
+                                                <option value="persuasive">说服性</option>
+                                                <option value="educational">教学式</option>
+                                                <option value="authoritative">权威式</option>
+                                                <option value="storytelling">叙事性</option>
+                                                <option value="custom">自定义</option>
+                                            </select>
+                                            <div id="customToneContainer" class="speech-config-extra" style="display: none;">
+                                                <input type="text" class="speech-form-input" id="customTone"
+                                                       placeholder="请描述您希望的语调风格，例如：幽默风趣、严肃专业、温和亲切等...">
+                                            </div>
+                                        </div>
+                                    </div>
+
+                                    <div class="speech-config-card">
+                                        <div class="speech-config-title">目标受众</div>
+                                        <div class="speech-config-control">
+                                            <select class="speech-form-select" id="targetAudience" onchange="toggleCustomAudienceInput()">
+                                                <option value="general_public">普通大众</option>
+                                                <option value="executives">企业高管</option>
+                                                <option value="students">学生</option>
+                                                <option value="technical_experts">技术专家</option>
+                                                <option value="colleagues">同事</option>
+                                                <option value="clients">客户</option>
+                                                <option value="investors">投资者</option>
+                                                <option value="custom">自定义</option>
+                                            </select>
+                                            <div id="customAudienceContainer" class="speech-config-extra" style="display: none;">
+                                                <input type="text" class="speech-form-input" id="customAudience"
+                                                       placeholder="请描述您的目标受众，例如：中小企业主、医疗从业者、教育工作者等...">
+                                            </div>
+                                        </div>
+                                    </div>
+
+                                    <div class="speech-config-card">
+                                        <div class="speech-config-title">语言复杂度</div>
+                                        <div class="speech-config-control">
+                                            <select class="speech-form-select" id="languageComplexity">
+                                                <option value="moderate">适中</option>
+                                                <option value="simple">简单</option>
+                                                <option value="advanced">高级</option>
+                                            </select>
+                                        </div>
+                                    </div>
+
+                                    <div class="speech-config-card">
+                                        <div class="speech-config-title">演讲节奏</div>
+                                        <div class="speech-config-control">
+                                            <select class="speech-form-select" id="speakingPace">
+                                                <option value="normal">正常</option>
+                                                <option value="slow">缓慢</option>
+                                                <option value="fast">快速</option>
+                                            </select>
+                                        </div>
+                                    </div>
+
+                                    <div class="speech-config-card">
+                                        <div class="speech-config-title">过渡语句</div>
+                                        <div class="speech-config-description">生成内容时自动添加段落衔接提示。</div>
+                                        <div class="speech-form-check">
+                                            <input type="checkbox" id="includeTransitions" checked>
+                                            <label for="includeTransitions" class="speech-checkbox-label">
+                                                <span class="speech-checkbox-custom"></span>
+                                                包含过渡语句
+                                            </label>
+                                        </div>
+                                    </div>
+
+                                    <div class="speech-config-card speech-config-card-full">
+                                        <div class="speech-config-title">自定义风格要求（可选）</div>
+                                        <div class="speech-config-control">
+                                            <textarea class="speech-form-textarea" id="customStylePrompt" rows="3"
+                                                      placeholder="例如：使用更多的数据支撑，增加互动问题，保持幽默感等..."></textarea>
+                                        </div>
+                                    </div>
+                                </div>
+                            </div>
+                        </div>
+                        <div class="speech-modal-footer">
+                            <button type="button" class="speech-btn speech-btn-outline" onclick="showCurrentSpeechScripts()">
+                                <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M1 12S5 4 12 4s11 8 11 8-4 8-11 8S1 12 1 12z" stroke="currentColor" stroke-width="2"/>
+                                    <circle cx="12" cy="12" r="3" stroke="currentColor" stroke-width="2"/>
+                                </svg>
+                                查看演讲稿
+                            </button>
+                            <button type="button" class="speech-btn speech-btn-secondary" onclick="closeSpeechScriptDialog()">
+                                <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M18 6L6 18M6 6L18 18" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                </svg>
+                                取消
+                            </button>
+                            <button type="button" class="speech-btn speech-btn-primary" onclick="generateSpeechScript()">
+                                <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M12 2L2 7L12 12L22 7L12 2Z" stroke="currentColor" stroke-width="2" stroke-linejoin="round"/>
+                                    <path d="M2 17L12 22L22 17" stroke="currentColor" stroke-width="2" stroke-linejoin="round"/>
+                                    <path d="M2 12L12 17L22 12" stroke="currentColor" stroke-width="2" stroke-linejoin="round"/>
+                                </svg>
+                                生成演讲稿
+                            </button>
+                        </div>
+                    </div>
+                </div>
+            `;
+
+            document.body.appendChild(speechScriptModal);
+
+            // Close modal when clicking on the backdrop only
+            speechScriptModal.addEventListener('click', function(e) {
+                // Only close if clicking directly on the modal backdrop, not on child elements
+                if (e.target === speechScriptModal) {
+                    closeSpeechScriptDialog();
+                }
+            });
+
+            // Prevent modal content from closing the modal
+            const modalContent = speechScriptModal.querySelector('.speech-modal-content');
+            if (modalContent) {
+                modalContent.addEventListener('click', function(e) {
+                    e.stopPropagation();
+                });
+            }
+
+            // Initialize the dialog
+            initializeSpeechScriptDialog();
+        }
+
+        function initializeSpeechScriptDialog() {
+            // Handle generation type changes
+            const typeRadios = document.querySelectorAll('input[name="generationType"]');
+            typeRadios.forEach(radio => {
+                radio.addEventListener('change', function() {
+                    const multiSlideSelection = document.getElementById('multiSlideSelection');
+                    if (this.value === 'multi') {
+                        multiSlideSelection.style.display = 'block';
+                        populateSlideSelection();
+                    } else {
+                        multiSlideSelection.style.display = 'none';
+                    }
+                });
+            });
+        }
+
+        function populateSlideSelection() {
+            const grid = document.getElementById('slideSelectionGrid');
+            if (!grid || !slidesData) return;
+
+            grid.innerHTML = '';
+
+            slidesData.forEach((slide, index) => {
+                const slideItem = document.createElement('div');
+                slideItem.className = 'slide-selection-item';
+                slideItem.innerHTML = `
+                    <input class="slide-selection-checkbox" type="checkbox" id="slide_${index}" value="${index}">
+                    <label class="slide-selection-card" for="slide_${index}">
+                        <span class="slide-selection-indicator" aria-hidden="true"></span>
+                        <div class="slide-selection-meta">
+                            <span class="slide-selection-title">第${index + 1}页</span>
+                            <span class="slide-selection-subtitle">${slide.title || '无标题'}</span>
+                        </div>
+                    </label>
+                `;
+                grid.appendChild(slideItem);
+            });
+        }
+
+        function closeSpeechScriptDialog() {
+            if (speechScriptModal) {
+                document.body.removeChild(speechScriptModal);
+                speechScriptModal = null;
+            }
+        }
+
+        // 演讲稿进度由服务端推送；轮询只作为兜底（事件流不可用时每秒一次，否则每10秒一次）
+        function trackSpeechScriptProgress(taskId, timeoutMs, handleResult, handleTimeout) {
+            const pushEnabled = !!(window.ProjectEvents && window.ProjectEvents.isSupported());
+            const pollDelay = pushEnabled ? 10000 : 1000;
+            const maxChecks = Math.ceil(timeoutMs / pollDelay);
+            let checkCount = 0;
+            let stopped = false;
+            let unsubscribe = null;
+
+            const stop = () => {
+                stopped = true;
+                clearInterval(interval);
+                if (unsubscribe) {
+                    unsubscribe();
+                    unsubscribe = null;
+                }
+            };
+            const handle = (result) => {
+                if (!stopped) {
+                    handleResult(result, stop);
+                }
+            };
+
+            const interval = setInterval(async () => {
+                checkCount++;
+
+                try {
+                    const response = await fetch(`/landppt/api/projects/${projectId}/speech-scripts/progress/${taskId}`);
+                    handle(await response.json());
+                } catch (error) {
+                    console.error('Progress tracking error:', error);
+
+                    // If too many errors or max checks reached, stop tracking
+                    if (checkCount >= maxChecks && !stopped) {
+                        stop();
+                        handleTimeout();
+                    }
+                }
+            }, pollDelay);
+
+            if (pushEnabled) {
+                unsubscribe = window.ProjectEvents.subscribe((event) => {
+                    if (event.task_id === taskId) {
+                        handle({ success: true, progress: event.progress });
+                    }
+                }, { projectId, types: ['speech_progress'] });
+            }
+
+            return interval;
+        }
+
+        function startProgressTracking(taskId, progressToast, totalSlides) {
+            return trackSpeechScriptProgress(taskId, 300000, (result, stop) => {
+                if (result.success && result.progress) {
+                    const progress = result.progress;
+                    const percentage = progress.progress_percentage;
+
+                    // Update progress toast
+                    updateProgressToast(progressToast, progress.message, percentage);
+
+                    // Check if completed or failed
+                    if (progress.status === 'completed') {
+                        stop();
+                        updateProgressToast(progressToast, progress.message, 100);
+
+                        // Close progress toast and start polling for data
+                        setTimeout(() => {
+                            closeProgressToast(progressToast);
+                            showNotification('演讲稿生成完成！', 'success');
+
+                            // 使用轮询机制等待数据库数据可用
+                            console.log('Starting to poll for speech scripts...');
+                            pollForSpeechScripts();
+                        }, 500);
+
+                    } else if (progress.status === 'failed') {
+                        stop();
+                        closeProgressToast(progressToast);
+                        showNotification(`生成失败: ${progress.message}`, 'error');
+                    }
+                } else {
+                    // Task not found or error, stop tracking
+                    stop();
+                    console.warn('Progress tracking failed, task not found');
+                    closeProgressToast(progressToast);
+                    showNotification('进度跟踪失败，请刷新页面查看结果', 'warning');
+                }
+            }, () => {
+                closeProgressToast(progressToast);
+                showNotification('进度跟踪超时，请刷新页面查看结果', 'warning');
+            });
+        }
+
+        function startSingleScriptProgressTracking(taskId, progressToast, slideIndex) {
+            return trackSpeechScriptProgress(taskId, 60000, (result, stop) => {
+                if (result.success && result.progress) {
+                    const progress = result.progress;
+                    const percentage = progress.progress_percentage;
+
+                    // Update progress toast
+                    updateProgressToast(progressToast, progress.message, percentage);
+
+                    // Check if completed or failed
+                    if (progress.status === 'completed') {
+                        stop();
+                        updateProgressToast(progressToast, `第${slideIndex + 1}页演讲稿重新生成完成！`, 100);
+
+                        // Close progress toast and refresh display
+                        setTimeout(() => {
+                            closeProgressToast(progressToast);
+                            showNotification(`第${slideIndex + 1}页演讲稿已更新`, 'success');
+
+                            // 刷新当前弹窗显示
+                            setTimeout(() => {
+                                showCurrentSpeechScripts();
+                            }, 1000);
+                        }, 1500);
+
+                    } else if (progress.status === 'failed') {
+                        stop();
+                        closeProgressToast(progressToast);
+                        showNotification(`第${slideIndex + 1}页重新生成失败: ${progress.message}`, 'error');
+                    }
+
+                } else {
+                    // Task not found or error, stop tracking
+                    stop();
+                    console.warn('Single script progress tracking failed, task not found');
+                    closeProgressToast(progressToast);
+                    showNotification('进度跟踪失败，请刷新页面查看结果', 'warning');
+                }
+            }, () => {
+                closeProgressToast(progressToast);
+                showNotification('进度跟踪超时，请刷新页面查看结果', 'warning');
+            });
+        }
+
+        async function generateSpeechScript() {
+            try {
+                // Get generation type
+                const generationType = document.querySelector('input[name="generationType"]:checked').value;
+
+                // Get slide indices based on type
+                let slideIndices = [];
+                if (generationType === 'single') {
+                    slideIndices = [currentSlideIndex];
+                } else if (generationType === 'multi') {
+                    const checkedBoxes = document.querySelectorAll('#slideSelectionGrid input[type="checkbox"]:checked');
+                    slideIndices = Array.from(checkedBoxes).map(cb => parseInt(cb.value));
+
+                    if (slideIndices.length === 0) {
+                        showNotification('请至少选择一页幻灯片', 'warning');
+                        return;
+                    }
+                } else if (generationType === 'full') {
+                    slideIndices = Array.from({length: slidesData.length}, (_, i) => i);
+                }
+
+                // Show progress toast
+                const progressToast = showProgressToast('正在生成演讲稿...', 0);
+                let progressInterval = null;
+
+                // Get customization options
+                const toneValue = document.getElementById('speechTone').value;
+                const audienceValue = document.getElementById('targetAudience').value;
+
+                const customization = {
+                    tone: toneValue === 'custom' ? 'conversational' : toneValue,
+                    target_audience: audienceValue === 'custom' ? 'general_public' : audienceValue,
+                    language_complexity: document.getElementById('languageComplexity').value,
+                    speaking_pace: document.getElementById('speakingPace').value,
+                    include_transitions: document.getElementById('includeTransitions').checked,
+                    custom_style_prompt: document.getElementById('customStylePrompt').value.trim() || null
+                };
+
+                // Add custom tone if specified
+                if (toneValue === 'custom') {
+                    const customTone = document.getElementById('customTone').value.trim();
+                    if (customTone) {
+                        customization.custom_tone = customTone;
+                        // Append to custom style prompt
+                        const existingPrompt = customization.custom_style_prompt || '';
+                        customization.custom_style_prompt = existingPrompt ?
+                            `${existingPrompt}。语调风格：${customTone}` :
+                            `语调风格：${customTone}`;
+                    } else {
+                        showNotification('请输入自定义语调风格描述', 'warning');
+                        return;
+                    }
+                }
+
+                // Add custom audience if specified
+                if (audienceValue === 'custom') {
+                    const customAudience = document.getElementById('customAudience').value.trim();
+                    if (customAudience) {
+                        customization.custom_audience = customAudience;
+                        // Append to custom style prompt
+                        const existingPrompt = customization.custom_style_prompt || '';
+                        customization.custom_style_prompt = existingPrompt ?
+                            `${existingPrompt}。目标受众：${customAudience}` :
+                            `目标受众：${customAudience}`;
+                    } else {
+                        showNotification('请输入自定义目标受众描述', 'warning');
+                        return;
+                    }
+                }
+
+                // Close the dialog
+                closeSpeechScriptDialog();
+
+                // Show progress with detailed info for full generation
+                let progressMessage = '正在生成演讲稿...';
+                if (generationType === 'full') {
+                    progressMessage = `正在生成全部演讲稿 (共${slideIndices.length}页)...`;
+                } else if (generationType === 'multi') {
+                    progressMessage = `正在生成演讲稿 (共${slideIndices.length}页)...`;
+                }
+
+                // Update progress toast message
+                updateProgressToast(progressToast, progressMessage, 0);
+
+                // Make API request
+                const response = await fetch(`/landppt/api/projects/${projectId}/speech-script/generate`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        generation_type: generationType,
+                        slide_indices: slideIndices,
+                        customization: customization
+                    })
+                });
+
+                const result = await response.json();
+
+                if (result.success && result.task_id) {
+                    console.log('Starting progress tracking for task:', result.task_id);
+                    // Start progress tracking immediately
+                    progressInterval = startProgressTracking(result.task_id, progressToast, slideIndices.length);
+                } else {
+                    closeProgressToast(progressToast);
+                    showNotification(`演讲稿生成失败: ${result.error || '未知错误'}`, 'error');
+                }
+
+            } catch (error) {
+                console.error('Speech script generation error:', error);
+
+                // Clear progress tracking
+                if (progressInterval) {
+                    clearInterval(progressInterval);
+                }
+                closeProgressToast(progressToast);
+
+                showNotification('演讲稿生成失败，请稍后重试', 'error');
+            } finally {
+                // Close speech script dialog
+                closeSpeechScriptDialog();
+            }
+        }
+
+        function showSpeechScriptPreview(result, editMode = false) {
+            if (speechScriptModal) {
+                document.body.removeChild(speechScriptModal);
+            }
+
+            speechScriptModal = document.createElement('div');
+            speechScriptModal.className = 'modal fade show';
+            speechScriptModal.style.display = 'flex';
+            speechScriptModal.style.alignItems = 'center';
+            speechScriptModal.style.justifyContent = 'center';
+            speechScriptModal.style.position = 'fixed';
+            speechScriptModal.style.top = '0';
+            speechScriptModal.style.left = '0';
+            speechScriptModal.style.width = '100%';
+            speechScriptModal.style.height = '100%';
+            speechScriptModal.style.backgroundColor = 'rgba(0,0,0,0.5)';
+            speechScriptModal.style.zIndex = '20000';
+
+            let scriptsHtml = '';
+            result.scripts.forEach((script, index) => {
+                const slideTitle = script.slide_index === -1 ? '开场白' :
+                                 script.slide_index >= result.scripts.length - 1 && script.slide_title === '结束语' ? '结束语' :
+                                 script.slide_title;
+
+                const scriptId = `script-${script.slide_index}-${index}`;
+                const contentId = `content-${script.slide_index}-${index}`;
+                const editId = `edit-${script.slide_index}-${index}`;
+
+                scriptsHtml += `
+                    <div class="speech-script-item" data-slide-index="${script.slide_index}" data-script-index="${index}">
+                        <div class="speech-script-header">
+                            <h6>${slideTitle}</h6>
+                            <div class="speech-script-meta">
+                                <span class="speech-script-duration">${script.estimated_duration || '未知时长'}</span>
+                            </div>
+                        </div>
+                        <div class="speech-script-content-wrapper">
+                            <div id="${contentId}" class="speech-script-content ${editMode ? 'hidden' : ''}">${script.script_content}</div>
+                            <textarea id="${editId}" class="speech-script-edit ${editMode ? '' : 'hidden'}" rows="8">${script.script_content}</textarea>
+                        </div>
+                        <div class="speech-script-actions">
+                            <button class="speech-script-btn save-btn ${editMode ? '' : 'hidden'}" onclick="saveSpeechScript(${script.slide_index}, ${index})">
+                                <svg width="14" height="14" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M19 21H5C4.44772 21 4 20.5523 4 20V4C4 3.44772 4.44772 3 5 3H16L20 7V20C20 20.5523 19.5523 21 19 21Z" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                    <polyline points="9,9 9,15 15,15 15,9" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                </svg>
+                                保存
+                            </button>
+                            <button class="speech-script-btn edit-btn ${editMode ? 'hidden' : ''}" onclick="toggleEditMode(${script.slide_index}, ${index})">
+                                <svg width="14" height="14" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M11 4H4C3.44772 4 3 4.44772 3 5V20C3 20.5523 3.44772 21 4 21H19C19.5523 21 20 20.5523 20 20V13" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                    <path d="M18.5 2.5C18.8978 2.10217 19.4374 1.87868 20 1.87868C20.5626 1.87868 21.1022 2.10217 21.5 2.5C21.8978 2.89783 22.1213 3.43739 22.1213 4C22.1213 4.56261 21.8978 5.10217 21.5 5.5L12 15L8 16L9 12L18.5 2.5Z" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                </svg>
+                                编辑
+                            </button>
+                            <button class="speech-script-btn" onclick="regenerateSingleScript(${script.slide_index})">
+                                <svg width="14" height="14" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M1 4V10H7" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                    <path d="M23 20V14H17" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                    <path d="M20.49 9C19.9828 7.56678 19.1209 6.28392 17.9845 5.27304C16.8482 4.26216 15.4745 3.55682 13.9917 3.21834C12.5089 2.87986 10.9652 2.91902 9.50481 3.33329C8.04437 3.74757 6.70779 4.52433 5.64 5.59L1 10M23 14L18.36 18.41C17.2922 19.4757 15.9556 20.2524 14.4952 20.6667C13.0348 21.081 11.4911 21.1201 10.0083 20.7817C8.52547 20.4432 7.1518 19.7378 6.01547 18.727C4.87913 17.7161 4.01717 16.4332 3.51 15" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                </svg>
+                                重新生成
+                            </button>
+                            <button class="speech-script-btn speech-script-btn-danger" onclick="deleteSpeechScriptBySlide(${script.slide_index})">
+                                <svg width="14" height="14" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M3 6H5H21" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                    <path d="M8 6V4C8 3.44772 8.44772 3 9 3H15C15.5523 3 16 3.44772 16 4V6M19 6V20C19 20.5523 18.4477 21 18 21H6C5.44772 21 5 20.5523 5 20V6H19Z" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                </svg>
+                                删除
+                            </button>
+                        </div>
+                    </div>`;
+            });
+
+            speechScriptModal.innerHTML = `
+                <div class="speech-modal-dialog" style="max-width: 90vw; width: 1200px;">
+                    <div class="speech-modal-content">
+                        <div class="speech-modal-header">
+                            <div class="speech-modal-title">
+                                <div class="speech-section-title">
+                                    <svg width="20" height="20" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                        <path d="M12 2L2 7L12 12L22 7L12 2Z" stroke="currentColor" stroke-width="2" stroke-linejoin="round"/>
+                                        <path d="M2 17L12 22L22 17" stroke="currentColor" stroke-width="2" stroke-linejoin="round"/>
+                                        <path d="M2 12L12 17L22 12" stroke="currentColor" stroke-width="2" stroke-linejoin="round"/>
+                                    </svg>
+                                    演讲稿${editMode ? '编辑' : '预览'}
+                                </div>
+                            </div>
+                            <button type="button" class="speech-modal-close" onclick="closeSpeechScriptDialog()">
+                                <svg width="20" height="20" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M18 6L6 18M6 6L18 18" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                </svg>
+                            </button>
+                        </div>
+                        <div class="speech-modal-body">
+                            <div class="speech-modal-controls">
+                                <div class="speech-duration-info">
+                                    <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                        <circle cx="12" cy="12" r="10" stroke="currentColor" stroke-width="2"/>
+                                        <polyline points="12,6 12,12 16,14" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                    </svg>
+                                    <span>总预计时长: <strong>${result.total_estimated_duration || '未知'}</strong></span>
+                                </div>
+                                <div class="speech-action-group">
+                                    <button class="speech-btn speech-btn-outline" onclick="exportSpeechScript('docx')">
+                                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                            <path d="M14 2H6C5.44772 2 5 2.44772 5 3V21C5 21.5523 5.44772 22 6 22H18C18.5523 22 19 21.5523 19 21V7L14 2Z" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                            <polyline points="14,2 14,8 20,8" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                        </svg>
+                                        导出DOCX
+                                    </button>
+                                    <button class="speech-btn speech-btn-outline" onclick="exportSpeechScript('markdown')">
+                                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                            <path d="M14 2H6C5.44772 2 5 2.44772 5 3V21C5 21.5523 5.44772 22 6 22H18C18.5523 22 19 21.5523 19 21V7L14 2Z" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                            <polyline points="14,2 14,8 20,8" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                        </svg>
+                                        导出Markdown
+                                    </button>
+                                    <button class="speech-btn ${editMode ? 'speech-btn-secondary' : 'speech-btn-primary'}" onclick="toggleAllEditMode()">
+                                        <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                            ${editMode ?
+                                                '<path d="M18 6L6 18M6 6L18 18" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>' :
+                                                '<path d="M11 4H4C3.44772 4 3 4.44772 3 5V20C3 20.5523 3.44772 21 4 21H19C19.5523 21 20 20.5523 20 20V13" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/><path d="M18.5 2.5C18.8978 2.10217 19.4374 1.87868 20 1.87868C20.5626 1.87868 21.1022 2.10217 21.5 2.5C21.8978 2.89783 22.1213 3.43739 22.1213 4C22.1213 4.56261 21.8978 5.10217 21.5 5.5L12 15L8 16L9 12L18.5 2.5Z" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>'
+                                            }
+                                        </svg>
+                                        ${editMode ? '退出编辑' : '编辑模式'}
+                                    </button>
+                                </div>
+                            </div>
+                            <div class="speech-scripts-container">
+                                ${scriptsHtml}
+                            </div>
+                        </div>
+                        <div class="speech-modal-footer">
+                            <button type="button" class="speech-btn speech-btn-secondary" onclick="closeSpeechScriptDialog()">
+                                <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M18 6L6 18M6 6L18 18" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                </svg>
+                                关闭
+                            </button>
+                            <button type="button" class="speech-btn speech-btn-primary" onclick="regenerateSpeechScript()">
+                                <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                                    <path d="M1 4V10H7" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                    <path d="M23 20V14H17" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                    <path d="M20.49 9C19.9828 7.56678 19.1209 6.28392 17.9845 5.27304C16.8482 4.26216 15.4745 3.55682 13.9917 3.21834C12.5089 2.87986 10.9652 2.91902 9.50481 3.33329C8.04437 3.74757 6.70779 4.52433 5.64 5.59L1 10M23 14L18.36 18.41C17.2922 19.4757 15.9556 20.2524 14.4952 20.6667C13.0348 21.081 11.4911 21.1201 10.0083 20.7817C8.52547 20.4432 7.1518 19.7378 6.01547 18.727C4.87913 17.7161 4.01717 16.4332 3.51 15" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+                                </svg>
+                                重新生成全部
+                            </button>
+                        </div>
+                    </div>
+                </div>
+            `;
+
+            document.body.appendChild(speechScriptModal);
+
+            // Close modal when clicking on the backdrop
+            speechScriptModal.addEventListener('click', function(e) {
+                if (e.target === speechScriptModal) {
+                    closeSpeechScriptDialog();
+                }
+            });
+        }
+
+        async function exportSpeechScript(format) {
+            if (!speechScriptData) {
+                showNotification('没有可导出的演讲稿数据', 'warning');
+                return;
+            }
+
+            try {
+                const response = await fetch(`/landppt/api/projects/${projectId}/speech-script/export`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        export_format: format,
+                        scripts_data: speechScriptData.scripts,
+                        include_metadata: true
+                    })
+                });
+
+                if (response.ok) {
+                    // Trigger file download
+                    const blob = await response.blob();
+                    const url = window.URL.createObjectURL(blob);
+                    const a = document.createElement('a');
+                    a.href = url;
+
+                    const contentDisposition = response.headers.get('Content-Disposition');
+                    let filename = `${editorProject.topic}_演讲稿.${format === 'docx' ? 'docx' : 'md'}`;
+                    if (contentDisposition) {
+                        const filenameMatch = contentDisposition.match(/filename\*=UTF-8''(.+)/);
+                        if (filenameMatch) {
+                            filename = decodeURIComponent(filenameMatch[1]);
+                        }
+                    }
+
+                    a.download = filename;
+                    document.body.appendChild(a);
+                    a.click();
+                    document.body.removeChild(a);
+                    window.URL.revokeObjectURL(url);
+
+                    showNotification(`演讲稿已导出为 ${format.toUpperCase()} 格式`, 'success');
+                } else {
+                    const result = await response.json();
+                    showNotification(`导出失败: ${result.error}`, 'error');
+                }
+            } catch (error) {
+                console.error('Export error:', error);
+                showNotification('导出失败，请稍后重试', 'error');
+            }
+        }
+
+        function regenerateSpeechScript() {
+            closeSpeechScriptDialog();
+            showSpeechScriptDialog();
+        }
+
+        function toggleEditMode(slideIndex, scriptIndex, forceMode = null) {
+            const contentDiv = document.getElementById(`content-${slideIndex}-${scriptIndex}`);
+            const editTextarea = document.getElementById(`edit-${slideIndex}-${scriptIndex}`);
+            const saveBtn = document.querySelector(`[data-slide-index="${slideIndex}"] .save-btn`);
+            const editBtn = document.querySelector(`[data-slide-index="${slideIndex}"] .edit-btn`);
+
+            // 确定当前状态
+            const isCurrentlyEditing = editTextarea && !editTextarea.classList.contains('hidden');
+
+            // 确定目标状态
+            let shouldEdit;
+            if (forceMode !== null) {
+                shouldEdit = forceMode;
+            } else {
+                shouldEdit = !isCurrentlyEditing;
+            }
+
+            if (shouldEdit) {
+                // 进入编辑模式
+                if (contentDiv) contentDiv.classList.add('hidden');
+                if (editTextarea) {
+                    editTextarea.classList.remove('hidden');
+                    editTextarea.focus();
+                }
+                if (saveBtn) saveBtn.classList.remove('hidden');
+                if (editBtn) editBtn.classList.add('hidden');
+            } else {
+                // 退出编辑模式
+                if (contentDiv) contentDiv.classList.remove('hidden');
+                if (editTextarea) editTextarea.classList.add('hidden');
+                if (saveBtn) saveBtn.classList.add('hidden');
+                if (editBtn) editBtn.classList.remove('hidden');
+            }
+        }
+
+        async function saveSpeechScript(slideIndex, scriptIndex) {
+            try {
+                const editTextarea = document.getElementById(`edit-${slideIndex}-${scriptIndex}`);
+                const contentDiv = document.getElementById(`content-${slideIndex}-${scriptIndex}`);
+                const newContent = editTextarea.value.trim();
+
+                if (!newContent) {
+                    showNotification('演讲稿内容不能为空', 'warning');
+                    return;
+                }
+
+                // 显示保存中状态
+                const saveBtn = document.querySelector(`[data-slide-index="${slideIndex}"] .save-btn`);
+                const originalText = saveBtn.innerHTML;
+                saveBtn.innerHTML = '保存中...';
+                saveBtn.disabled = true;
+
+                // 调用API保存
+                const response = await fetch(`/landppt/api/projects/${projectId}/speech-scripts/slide/${slideIndex}`, {
+                    method: 'PUT',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        script_content: newContent,
+                        slide_title: document.querySelector(`[data-slide-index="${slideIndex}"] h6`).textContent
+                    })
+                });
+
+                const result = await response.json();
+
+                if (result.success) {
+                    // 更新显示内容
+                    contentDiv.textContent = newContent;
+
+                    // 退出编辑模式
+                    toggleEditMode(slideIndex, scriptIndex, false);
+
+                    showNotification('演讲稿已保存', 'success');
+                } else {
+                    showNotification(`保存失败: ${result.error}`, 'error');
+                }
+
+            } catch (error) {
+                console.error('Save speech script error:', error);
+                showNotification('保存演讲稿失败', 'error');
+            } finally {
+                // 恢复按钮状态
+                const saveBtn = document.querySelector(`[data-slide-index="${slideIndex}"] .save-btn`);
+                saveBtn.innerHTML = originalText;
+                saveBtn.disabled = false;
+            }
+        }
+
+        async function regenerateSingleScript(slideIndex) {
+            if (!confirm(`确定要重新生成第${slideIndex + 1}页的演讲稿吗？当前内容将被覆盖。`)) {
+                return;
+            }
+
+            try {
+                // 显示进度提示
+                const progressToast = showProgressToast(`正在重新生成第${slideIndex + 1}页演讲稿...`, 0);
+
+                // 使用默认参数直接生成（使用正确的API结构）
+                const defaultCustomization = {
+                    tone: 'conversational',
+                    target_audience: 'general_public',
+                    language_complexity: 'moderate',
+                    speaking_pace: 'normal',
+                    include_transitions: true,
+                    include_timing_notes: false,
+                    custom_style_prompt: null,
+                    custom_audience: null
+                };
+
+                // 调用生成API
+                const response = await fetch(`/landppt/api/projects/${projectId}/speech-script/generate`, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json'
+                    },
+                    body: JSON.stringify({
+                        generation_type: 'single',
+                        slide_indices: [slideIndex],
+                        customization: defaultCustomization
+                    })
+                });
+
+                const result = await response.json();
+
+                console.log('Single script regeneration API response:', result);
+
+                if (result.success && result.task_id) {
+                    console.log('Starting progress tracking for single script regeneration:', result.task_id);
+
+                    // 开始进度跟踪
+                    startSingleScriptProgressTracking(result.task_id, progressToast, slideIndex);
+                } else {
+                    console.error('Single script regeneration failed:', result);
+                    closeProgressToast(progressToast);
+                    showNotification(`重新生成失败: ${result.error || result.message || '未知错误'}`, 'error');
+                }
+
+            } catch (error) {
+                console.error('Regenerate single script error:', error);
+                showNotification('重新生成失败', 'error');
+            }
+        }
+
+        function toggleAllEditMode() {
+            // 获取当前是否处于编辑模式（检查第一个textarea是否可见）
+            const firstTextarea = document.querySelector('.speech-script-edit');
+            const isCurrentlyEditing = firstTextarea && !firstTextarea.classList.contains('hidden');
+
+            // 切换所有项目的编辑模式
+            document.querySelectorAll('.speech-script-item').forEach(item => {
+                const slideIndex = parseInt(item.dataset.slideIndex);
+                const scriptIndex = parseInt(item.dataset.scriptIndex);
+
+                // 强制设置为相反的模式
+                toggleEditMode(slideIndex, scriptIndex, !isCurrentlyEditing);
+            });
+
+            const newEditMode = !isCurrentlyEditing;
+
+            // 同时更新所有单独的编辑按钮状态
+            document.querySelectorAll('.edit-btn').forEach(btn => {
+                if (newEditMode) {
+                    btn.classList.add('hidden');
+                } else {
+                    btn.classList.remove('hidden');
+                }
+            });
+
+            // 更新标题
+            const titleElement = document.querySelector('.speech-section-title');
+            if (titleElement) {
+                titleElement.innerHTML = `
+                    <svg width="20" height="20" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                        <path d="M12 2L2 7L12 12L22 7L12 2Z" stroke="currentColor" stroke-width="2" stroke-linejoin="round"/>
+                        <path d="M2 17L12 22L22 17" stroke="currentColor" stroke-width="2" stroke-linejoin="round"/>
+                        <path d="M2 12L12 17L22 12" stroke="currentColor" stroke-width="2" stroke-linejoin="round"/>
+                    </svg>
+                    演讲稿${newEditMode ? '编辑' : '预览'}
+                `;
+            }
+
+            // 更新按钮文本和样式 - 查找正确的编辑模式按钮
+            const toggleBtn = document.querySelector('.speech-action-group .speech-btn:last-child');
+            if (toggleBtn) {
+                // 更新按钮样式
+                if (newEditMode) {
+                    toggleBtn.className = 'speech-btn speech-btn-secondary';
+                } else {
+                    toggleBtn.className = 'speech-btn speech-btn-primary';
+                }
+
+                // 更新按钮内容
+                toggleBtn.innerHTML = `
+                    <svg width="16" height="16" viewBox="0 0 24 24" fill="none" xmlns="http://www.w3.org/2000/svg">
+                        ${newEditMode ?
+                            '<path d="M18 6L6 18M6 6L18 18" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>' :
+                            '<path d="M11 4H4C3.44772 4 3 4.44772 3 5V20C3 20.5523 3.44772 21 4 21H19C19.5523 21 20 20.5523 20 20V13" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/><path d="M18.5 2.5C18.8978 2.10217 19.4374 1.87868 20 1.87868C20.5626 1.87868 21.1022 2.10217 21.5 2.5C21.8978 2.89783 22.1213 3.43739 22.1213 4C22.1213 4.56261 21.8978 5.10217 21.5 5.5L12 15L8 16L9 12L18.5 2.5Z" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>'
+                        }
+                    </svg>
+                    ${newEditMode ? '退出编辑' : '编辑模式'}
+                `;
+            }
+        }
+
+        function toggleCustomToneInput() {
+            const toneSelect = document.getElementById('speechTone');
+            const customContainer = document.getElementById('customToneContainer');
+
+            if (toneSelect.value === 'custom') {
+                customContainer.style.display = 'block';
+                document.getElementById('customTone').focus();
+            } else {
+                customContainer.style.display = 'none';
+                document.getElementById('customTone').value = '';
+            }
+        }
+
+        function toggleCustomAudienceInput() {
+            const audienceSelect = document.getElementById('targetAudience');
+            const customContainer = document.getElementById('customAudienceContainer');
+
+            if (audienceSelect.value === 'custom') {
+                customContainer.style.display = 'block';
+                document.getElementById('customAudience').focus();
+            } else {
+                customContainer.style.display = 'none';
+                document.getElementById('customAudience').value = '';
+            }
+        }
+
+        async function pollForSpeechScripts() {
+            const maxAttempts = 30; // 最多尝试30次
+            const pollInterval = 1000; // 每1000ms查询一次
+            let attempts = 0;
+
+            const poll = async () => {
+                attempts++;
+                console.log(`Polling attempt ${attempts}/${maxAttempts}...`);
+
+                try {
+                    const response = await fetch(`/landppt/api/projects/${projectId}/speech-scripts`);
+                    const result = await response.json();
+
+                    if (result.success && result.scripts && result.scripts.length > 0) {
+                        console.log(`Found ${result.scripts.length} scripts, displaying...`);
+                        // 找到数据，显示演讲稿
+                        showCurrentSpeechScripts();
+                        return;
+                    }
+
+                    // 如果还没到最大尝试次数，继续轮询
+                    if (attempts < maxAttempts) {
+                        setTimeout(poll, pollInterval);
+                    } else {
+                        console.warn('Polling timeout: No scripts found after max attempts');
+                        showNotification('获取演讲稿超时，请手动刷新页面后查看', 'warning');
+                    }
+                } catch (error) {
+                    console.error('Polling error:', error);
+                    // 出错继续尝试
+                    if (attempts < maxAttempts) {
+                        setTimeout(poll, pollInterval);
+                    } else {
+                        showNotification('获取演讲稿失败，请刷新页面重试', 'error');
+                    }
+                }
+            };
+
+            // 开始轮询
+            poll();
+        }
+
+        async function showCurrentSpeechScripts() {
+            try {
+                // Close current dialog
+                closeSpeechScriptDialog();
+
+                console.log('Fetching speech scripts from API...');
+                // Fetch current speech scripts
+                const response = await fetch(`/landppt/api/projects/${projectId}/speech-scripts`);
+                const result = await response.json();
+
+                console.log('API response:', result);
+
+                if (!result.success) {
+                    console.error('API returned error:', result.error);
+                    showNotification(`获取演讲稿失败: ${result.error}`, 'error');
+                    return;
+                }
+
+                const scripts = result.scripts;
+                console.log(`Found ${scripts.length} scripts`);
+
+                if (scripts.length === 0) {
+                    console.warn('No scripts found in database');
+                    showNotification('暂无演讲稿，请先生成演讲稿', 'info');
+                    return;
+                }
+
+                // Sort by slide index
+                scripts.sort((a, b) => a.slide_index - b.slide_index);
+
+                // 转换为预览格式
+                const totalMinutes = scripts.reduce((total, script) => {
+                    if (script.estimated_duration && script.estimated_duration.includes('分钟')) {
+                        const minutes = parseFloat(script.estimated_duration.replace('分钟', ''));
+                        return total + (isNaN(minutes) ? 0 : minutes);
+                    }
+                    return total;
+                }, 0);
+
+                const previewData = {
+                    success: true,
+                    scripts: scripts,
+                    total_estimated_duration: totalMinutes > 0 ? totalMinutes.toFixed(1) + '分钟' : '未知',
+                    generation_metadata: {}
+                };
+
+                // 设置全局演讲稿数据，以便导出功能可以使用
+                speechScriptData = previewData;
+
+                // 直接使用预览弹窗显示，默认为非编辑模式
+                showSpeechScriptPreview(previewData, false);
+
+            } catch (error) {
+                console.error('Show current speech scripts error:', error);
+                showNotification('获取演讲稿失败，请稍后重试', 'error');
+            }
+        }
+
+        function closeSpeechScriptsDialog() {
+            const scriptsModal = document.getElementById('speechScriptsModal');
+            if (scriptsModal) {
+                document.body.removeChild(scriptsModal);
+            }
+        }
+
+        function getGenerationTypeText(type) {
+            const types = {
+                'single': '单页',
+                'multi': '多页',
+                'full': '全部'
+            };
+            return types[type] || type;
+        }
+
+        function getToneText(tone) {
+            const tones = {
+                'conversational': '对话式',
+                'formal': '正式',
+                'casual': '轻松',
+                'persuasive': '说服性',
+                'educational': '教学式',
+                'authoritative': '权威式',
+                'storytelling': '叙事性'
+            };
+            return tones[tone] || tone;
+        }
+
+        function getAudienceText(audience) {
+            const audiences = {
+                'general_public': '普通大众',
+                'executives': '企业高管',
+                'students': '学生',
+                'technical_experts': '技术专家',
+                'colleagues': '同事',
+                'clients': '客户',
+                'investors': '投资者'
+            };
+            return audiences[audience] || audience;
+        }
+
+        // 这个函数已经被regenerateSingleScript替代，保留为兼容性
+        async function reuseSpeechScriptParams(slideIndex) {
+            regenerateSingleScript(slideIndex);
+        }
+
+        async function deleteSpeechScriptBySlide(slideIndex) {
+            if (!confirm(`确定要删除第${slideIndex + 1}页的演讲稿吗？此操作不可撤销。`)) {
+                return;
+            }
+
+            try {
+                const response = await fetch(`/landppt/api/projects/${projectId}/speech-scripts/slide/${slideIndex}`, {
+                    method: 'DELETE'
+                });
+
+                const result = await response.json();
+
+                if (result.success) {
+                    showNotification(result.message, 'success');
+                    // Refresh scripts dialog
+                    showCurrentSpeechScripts();
+                } else {
+                    showNotification(`删除失败: ${result.error}`, 'error');
+                }
+
+            } catch (error) {
+                console.error('Delete speech script error:', error);
+                showNotification('删除演讲稿失败', 'error');
+            }
+        }
+
+        // 放映模式鼠标控制功能
+        let mouseMoveTimeout;
+        let isMouseIdle = false;
+        let slideshowControls, slideshowExitBtn, slideshowOverlay;
+
+        function handleSlideshowMouseMove() {
+            // 显示控制按钮
+            showSlideshowControls();
+
+            // 清除之前的定时器
+            clearTimeout(mouseMoveTimeout);
+
+            // 设置新的定时器，3秒后隐藏控制按钮
+            mouseMoveTimeout = setTimeout(() => {
+                hideSlideshowControls();
+            }, 3000);
+        }
+
+        function showSlideshowControls() {
+            if (slideshowControls) slideshowControls.classList.add('visible');
+            if (slideshowExitBtn) slideshowExitBtn.classList.add('visible');
+            const slideshowInfo = document.getElementById('slideshowInfo');
+            if (slideshowInfo) slideshowInfo.classList.add('visible');
+            isMouseIdle = false;
+            // 显示鼠标光标
+            if (slideshowOverlay) slideshowOverlay.style.cursor = 'default';
+        }
+
+        function hideSlideshowControls() {
+            if (slideshowControls) slideshowControls.classList.remove('visible');
+            if (slideshowExitBtn) slideshowExitBtn.classList.remove('visible');
+            const slideshowInfo = document.getElementById('slideshowInfo');
+            if (slideshowInfo) slideshowInfo.classList.remove('visible');
+            isMouseIdle = true;
+            // 隐藏鼠标光标
+            if (slideshowOverlay) slideshowOverlay.style.cursor = 'none';
+        }
+
+        function initializeSlideshowMouseControls() {
+            slideshowOverlay = document.getElementById('slideshowOverlay');
+            slideshowControls = document.querySelector('.slideshow-controls');
+            slideshowExitBtn = document.querySelector('.slideshow-exit');
+
+            // 初始状态：隐藏控制按钮
+            hideSlideshowControls();
+
+            // 鼠标移动事件
+            slideshowOverlay.addEventListener('mousemove', handleSlideshowMouseMove);
+
+            // 鼠标离开事件
+            slideshowOverlay.addEventListener('mouseleave', hideSlideshowControls);
+        }
+
+        function removeSlideshowMouseControls() {
+            // 清除定时器
+            clearTimeout(mouseMoveTimeout);
+
+            // 移除事件监听器
+            if (slideshowOverlay) {
+                slideshowOverlay.removeEventListener('mousemove', handleSlideshowMouseMove);
+                slideshowOverlay.removeEventListener('mouseleave', hideSlideshowControls);
+
+                // 恢复鼠标光标
+                slideshowOverlay.style.cursor = 'default';
+            }
+
+            // 清理引用
+            slideshowControls = null;
+            slideshowExitBtn = null;
+            slideshowOverlay = null;
+        }
+
+        // ========== AI优化大纲功能 ==========
+
+        // 辅助函数：获取正确的目标受众（处理自定义受众情况）
+        function getTargetAudience(outline) {
+            if (!outline || !outline.metadata) {
+                return '普通大众';
+            }
+            const audienceType = outline.metadata.target_audience;
+            // 如果选择的是"自定义"，则使用custom_audience字段的值
+            if (audienceType === '自定义' && outline.metadata.custom_audience) {
+                return outline.metadata.custom_audience;
+            }
+            return audienceType || '普通大众';
+        }
+
+        // 创建美化的AI优化需求输入弹窗
+        function showAIOptimizeModal(config) {
+            return new Promise((resolve, reject) => {
+                // 创建模态框遮罩
+                const modal = document.createElement('div');
+                modal.className = 'ai-optimize-modal';
+                modal.style.cssText = `
+                    position: fixed; top: 0; left: 0; width: 100%; height: 100%;
+                    background: var(--surface-contrast);
+                    z-index: 10002; display: flex; align-items: center; justify-content: center;
+                    padding: 20px; animation: fadeIn 0.3s ease;
+                `;
+
+                // 创建弹窗内容
+                const content = document.createElement('div');
+                content.style.cssText = `
+                    background: var(--surface);
+                    border-radius: 20px; padding: 0; max-width: 600px; width: 100%;
+                    border: 1px solid var(--glass-border);
+                    box-shadow: 0 24px 60px rgba(0, 0, 0, 0.45);
+                    animation: slideIn 0.3s ease; max-height: 90vh; overflow: hidden;
+                    display: flex; flex-direction: column;
+                `;
+
+                // 建议示例
+                const suggestions = config.suggestions || [
+                    '增加更多文字说明',
+                    '简化内容，突出核心要点',
+                    '添加数据支撑和案例分析',
+                    '优化逻辑结构，增强说服力',
+                    '增加视觉化描述建议'
+                ];
+
+                content.innerHTML = `
+                    <style>
+                        @keyframes fadeIn {
+                            from { opacity: 0; }
+                            to { opacity: 1; }
+                        }
+                        @keyframes slideIn {
+                            from { transform: translateY(-50px); opacity: 0; }
+                            to { transform: translateY(0); opacity: 1; }
+                        }
+                        .ai-optimize-modal__header {
+                            background: var(--surface-contrast);
+                            color: var(--surface);
+                            padding: 24px 32px;
+                        }
+                        .ai-optimize-modal__header-content {
+                            display: flex;
+                            justify-content: space-between;
+                            align-items: center;
+                            gap: 16px;
+                        }
+                        .ai-optimize-modal__title {
+                            margin: 0 0 6px 0;
+                            font-size: 1.3rem;
+                            font-weight: 700;
+                            letter-spacing: -0.01em;
+                            display: flex;
+                            align-items: center;
+                            gap: 12px;
+                        }
+                        .ai-optimize-modal__subtitle {
+                            margin: 0;
+                            font-size: 0.95rem;
+                            color: rgba(255, 255, 255, 0.72);
+                        }
+                        .ai-optimize-modal__close {
+                            border: none;
+                            background: var(--surface);
+                            color: var(--surface-contrast);
+                            width: 36px;
+                            height: 36px;
+                            border-radius: 50%;
+                            font-size: 1.2rem;
+                            cursor: pointer;
+                            transition: background 0.2s ease, transform 0.2s ease;
+                            display: flex;
+                            align-items: center;
+                            justify-content: center;
+                        }
+                        .ai-optimize-modal__close:hover {
+                            background: var(--surface-subtle);
+                            transform: scale(1.05);
+                        }
+                        .ai-optimize-modal__body {
+                            padding: 30px 32px;
+                            flex: 1;
+                            overflow-y: auto;
+                            background: var(--surface);
+                            display: flex;
+                            flex-direction: column;
+                            gap: 20px;
+                        }
+                        .ai-optimize-modal__body .current-info {
+                            background: var(--surface-subtle);
+                            border-left: 3px solid var(--surface-contrast);
+                            padding: 16px 18px;
+                            border-radius: 12px;
+                            color: var(--text-secondary);
+                            font-size: 0.95rem;
+                            line-height: 1.7;
+                        }
+                        .ai-optimize-modal__body .current-info strong {
+                            color: var(--surface-contrast);
+                            font-weight: 600;
+                            display: inline-flex;
+                            align-items: center;
+                            gap: 8px;
+                        }
+                        .input-group {
+                            display: flex;
+                            flex-direction: column;
+                            gap: 10px;
+                        }
+                        .input-label {
+                            display: block;
+                            color: var(--text-primary);
+                            font-weight: 600;
+                            font-size: 0.95rem;
+                            letter-spacing: 0.01em;
+                        }
+                        .input-textarea {
+                            width: 100%;
+                            min-height: 120px;
+                            padding: 16px 18px;
+                            border: 1px solid var(--glass-border);
+                            border-radius: 12px;
+                            font-size: 0.95rem;
+                            resize: vertical;
+                            font-family: inherit;
+                            transition: border-color 0.2s ease, box-shadow 0.2s ease;
+                            color: var(--text-primary);
+                            background: var(--surface);
+                        }
+                        .input-textarea::placeholder {
+                            color: var(--text-muted);
+                            opacity: 0.9;
+                        }
+                        .input-textarea:focus {
+                            outline: none;
+                            border-color: var(--surface-contrast);
+                            box-shadow: 0 0 0 3px rgba(17, 17, 17, 0.08);
+                        }
+                        .suggestions {
+                            display: flex;
+                            flex-direction: column;
+                            gap: 12px;
+                        }
+                        .suggestion-label {
+                            display: block;
+                            color: var(--text-secondary);
+                            font-size: 0.85rem;
+                            font-weight: 500;
+                            letter-spacing: 0.02em;
+                        }
+                        .suggestion-list {
+                            display: flex;
+                            flex-wrap: wrap;
+                            gap: 8px;
+                        }
+                        .suggestion-tag {
+                            display: inline-flex;
+                            align-items: center;
+                            justify-content: center;
+                            padding: 6px 14px;
+                            background: var(--surface-subtle);
+                            border: 1px solid var(--glass-border);
+                            border-radius: 999px;
+                            font-size: 0.8rem;
+                            color: var(--text-primary);
+                            cursor: pointer;
+                            transition: all 0.2s ease;
+                        }
+                        .suggestion-tag:hover {
+                            transform: translateY(-2px);
+                            background: var(--surface-contrast);
+                            border-color: var(--surface-contrast);
+                            color: var(--surface);
+                            box-shadow: 0 6px 16px rgba(0, 0, 0, 0.18);
+                        }
+                        .ai-optimize-modal__footer {
+                            padding: 20px 32px;
+                            background: var(--surface);
+                            border-top: 1px solid var(--glass-border);
+                            display: flex;
+                            align-items: center;
+                            justify-content: space-between;
+                            gap: 16px;
+                        }
+                        .footer-hint {
+                            color: var(--text-secondary);
+                            font-size: 0.85rem;
+                            display: inline-flex;
+                            align-items: center;
+                            gap: 8px;
+                        }
+                        .footer-actions {
+                            display: flex;
+                            gap: 12px;
+                        }
+                        .footer-actions .btn {
+                            min-width: 110px;
+                            justify-content: center;
+                        }
+                        .modal-cancel {
+                            background: var(--surface-subtle);
+                            border-color: var(--border-color);
+                            color: var(--text-primary);
+                        }
+                        .modal-cancel:hover {
+                            background: var(--surface);
+                        }
+                        @media (max-width: 520px) {
+                            .ai-optimize-modal__header,
+                            .ai-optimize-modal__body,
+                            .ai-optimize-modal__footer {
+                                padding-left: 20px;
+                                padding-right: 20px;
+                            }
+                            .footer-actions {
+                                width: 100%;
+                                flex-direction: column;
+                            }
+                            .footer-actions .btn {
+                                width: 100%;
+                            }
+                        }
+                    </style>
+                    
+                    <div class="ai-optimize-modal__header">
+                        <div class="ai-optimize-modal__header-content">
+                            <div>
+                                <h3 class="ai-optimize-modal__title">
+                                    <i class="fas fa-magic"></i>${config.title}
+                                </h3>
+                                <p class="ai-optimize-modal__subtitle">${config.subtitle}</p>
+                            </div>
+                            <button type="button" class="ai-optimize-modal__close" onclick="this.closest('.ai-optimize-modal').remove()" aria-label="关闭">
+                                <span aria-hidden="true">×</span>
+                            </button>
+                        </div>
+                    </div>
+
+                    <div class="ai-optimize-modal__body">
+                        <div class="current-info">
+                            <div>
+                                <strong><i class="fas fa-info-circle"></i> 当前内容</strong><br>
+                                ${config.currentInfo}
+                            </div>
+                        </div>
+
+                        <div class="input-group">
+                            <label class="input-label" for="aiOptimizeInput">
+                                <i class="fas fa-edit"></i> 请描述您的优化需求
+                            </label>
+                            <textarea id="aiOptimizeInput" class="input-textarea" placeholder="详细描述您希望如何优化此内容...
+
+例如：
+- 增加更多技术细节
+- 重新组织逻辑结构
+- 添加案例分析"></textarea>
+                        </div>
+
+                        <div class="suggestions">
+                            <label class="suggestion-label">
+                                <i class="fas fa-lightbulb"></i> 点击快捷建议快速填充
+                            </label>
+                            <div class="suggestion-list">
+                                ${suggestions.map(s => `<span class="suggestion-tag" onclick="document.getElementById('aiOptimizeInput').value = '${s}'">${s}</span>`).join('')}
+                            </div>
+                        </div>
+                    </div>
+
+                    <div class="ai-optimize-modal__footer">
+                        <div class="footer-hint">
+                            <i class="fas fa-robot"></i> AI将根据您的需求智能优化内容
+                        </div>
+                        <div class="footer-actions">
+                            <button type="button" class="btn btn-sm modal-cancel" onclick="this.closest('.ai-optimize-modal').remove()">
+                                取消
+                            </button>
+                            <button type="button" id="confirmOptimizeBtn" class="btn btn-sm btn-primary">
+                                开始优化
+                            </button>
+                        </div>
+                    </div>
+                `;
+
+                modal.appendChild(content);
+                document.body.appendChild(modal);
+
+                // 聚焦输入框
+                setTimeout(() => {
+                    const input = document.getElementById('aiOptimizeInput');
+                    if (input) input.focus();
+                }, 100);
+
+                // 点击背景关闭
+                modal.addEventListener('click', (e) => {
+                    if (e.target === modal) {
+                        modal.remove();
+                        reject('用户取消');
+                    }
+                });
+
+                // 确认按钮
+                const confirmBtn = document.getElementById('confirmOptimizeBtn');
+                confirmBtn.onclick = () => {
+                    const input = document.getElementById('aiOptimizeInput');
+                    const value = input?.value.trim();
+                    if (!value) {
+                        // 输入框抖动动画
+                        input.style.animation = 'shake 0.5s';
+                        setTimeout(() => { input.style.animation = ''; }, 500);
+                        return;
+                    }
+                    modal.remove();
+                    resolve(value);
+                };
+
+                // 添加shake动画
+                const style = document.createElement('style');
+                style.textContent = `
+                    @keyframes shake {
+                        0%, 100% { transform: translateX(0); }
+                        25% { transform: translateX(-10px); }
+                        75% { transform: translateX(10px); }
+                    }
+                `;
+                document.head.appendChild(style);
+            });
+        }
+
+        // AI优化单页幻灯片大纲
+        async function aiOptimizeSingleSlideInSlidesEditor() {
+            // 从表单中获取当前数据
+            const title = document.getElementById('slideTitle')?.value.trim() || '';
+            const slideType = document.getElementById('slideType')?.value || 'content';
+            const description = document.getElementById('slideDescription')?.value.trim() || '';
+            
+            // 获取所有内容要点
+            let contentPoints = [];
+            const bulletPointsContainer = document.getElementById('bulletPointsContainer');
+            if (bulletPointsContainer) {
+                const bulletPointItems = bulletPointsContainer.querySelectorAll('.bullet-point-item');
+                contentPoints = Array.from(bulletPointItems).map(item => {
+                    const textElement = item.querySelector('.bullet-point-text');
+                    return textElement ? textElement.textContent.trim() : '';
+                }).filter(point => point);
+            }
+
+            if (!title) {
+                showNotification('请先输入页面标题', 'warning');
+                return;
+            }
+
+            // 显示美化的优化需求输入弹窗
+            let userRequest;
+            try {
+                userRequest = await showAIOptimizeModal({
+                    title: `AI优化 - 第${currentSlideIndex + 1}页`,
+                    subtitle: '让AI帮助您优化这一页的内容',
+                    currentInfo: `<strong>标题：</strong>${title}<br><strong>类型：</strong>${slideType}<br><strong>内容要点：</strong>${contentPoints.length}个`,
+                    suggestions: [
+                        '增加更多技术细节和实例',
+                        '简化内容，突出核心要点',
+                        '优化逻辑结构，使内容更连贯',
+                        '增强说服力，添加数据支撑',
+                        '丰富表达方式，提升专业度'
+                    ]
+                });
+            } catch (e) {
+                return; // 用户取消
+            }
+
+            if (!userRequest || !userRequest.trim()) {
+                return;
+            }
+
+            // 显示加载提示
+            showNotification('AI正在优化第' + (currentSlideIndex + 1) + '页...', 'info');
+
+            try {
+                // 使用项目大纲数据
+                if (!projectOutline || !projectOutline.slides) {
+                    throw new Error('大纲数据不存在');
+                }
+
+                const outlineContent = JSON.stringify(projectOutline);
+
+                // 调用AI优化接口
+                const response = await fetch('/landppt/api/ai/optimize-outline', {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                    },
+                    body: JSON.stringify({
+                        outline_content: outlineContent,
+                        user_request: userRequest.trim(),
+                        project_info: {
+                            topic: projectOutline.title || '未知',
+                            scenario: projectOutline.metadata?.scenario || '通用',
+                            target_audience: getTargetAudience(projectOutline)
+                        },
+                        optimization_type: 'single',
+                        slide_index: currentSlideIndex
+                    })
+                });
+
+                const result = await response.json();
+
+                if (result.success && result.optimized_content) {
+                    // 解析优化后的单页数据
+                    const optimizedSlide = JSON.parse(result.optimized_content);
+                    
+                    // 更新弹窗中的表单
+                    document.getElementById('slideTitle').value = optimizedSlide.title || '';
+                    document.getElementById('slideType').value = optimizedSlide.slide_type || 'content';
+                    document.getElementById('slideDescription').value = optimizedSlide.description || '';
+                    
+                    // 更新内容要点
+                    const container = document.getElementById('bulletPointsContainer');
+                    if (container && optimizedSlide.content_points && optimizedSlide.content_points.length > 0) {
+                        // 清空现有内容
+                        container.innerHTML = '';
+                        
+                        // 添加优化后的要点
+                        optimizedSlide.content_points.forEach((point, index) => {
+                            const pointDiv = document.createElement('div');
+                            pointDiv.className = 'bullet-point-item';
+                            pointDiv.setAttribute('data-index', index);
+                            pointDiv.style.cssText = 'display: flex; align-items: flex-start; margin-bottom: 8px; padding: 8px; border-radius: 4px; transition: all 0.2s ease; position: relative;';
+                            pointDiv.innerHTML = `
+                                <span style="color: #666; margin-right: 8px; font-weight: bold; min-width: 20px;">•</span>
+                                <div style="flex: 1; position: relative;">
+                                    <div class="bullet-point-text" contenteditable="true" style="outline: none; min-height: 20px; line-height: 1.4; word-wrap: break-word;">${point}</div>
+                                </div>
+                            `;
+                            container.appendChild(pointDiv);
+                        });
+                    }
+                    
+                    showNotification('✅ AI优化完成，请检查后保存', 'success');
+
+                } else {
+                    // 显示详细的错误信息
+                    let errorMsg = result.error || '未知错误';
+                    if (result.extracted_json) {
+                        console.error('提取的JSON:', result.extracted_json);
+                    }
+                    if (result.raw_response) {
+                        console.error('AI原始响应:', result.raw_response);
+                    }
+                    showNotification('AI优化失败: ' + errorMsg, 'error');
+                }
+
+            } catch (error) {
+                console.error('AI优化失败:', error);
+                showNotification('AI优化失败: ' + error.message, 'error');
+            }
+        }
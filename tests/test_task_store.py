@@ -0,0 +1,109 @@
+"""
+后台任务存储测试：多个worker共享同一数据库时的任务查询、租约过期和过期清理
+"""
+
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from landppt.database.models import Base, BackgroundTaskRecord
+from landppt.services.background_tasks import BackgroundTaskManager, TaskStatus
+from landppt.services.task_store import TaskStore
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _manager(store: TaskStore, worker_id: str) -> BackgroundTaskManager:
+    manager = BackgroundTaskManager(store=store)
+    manager.worker_id = worker_id
+    return manager
+
+
+def _age_record(session_factory, task_id: str, seconds: float, lease_seconds: float = None):
+    db = session_factory()
+    try:
+        record = db.query(BackgroundTaskRecord).filter(BackgroundTaskRecord.task_id == task_id).one()
+        record.updated_at = time.time() - seconds
+        if lease_seconds is not None:
+            record.lease_expires_at = time.time() + lease_seconds
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_task_visible_from_other_worker(session_factory):
+    worker_a = _manager(TaskStore(session_factory), "worker-a")
+    worker_b = _manager(TaskStore(session_factory), "worker-b")
+
+    async def run():
+        task_id = await worker_a.submit_task_async(
+            "pdf_to_pptx", lambda: {"ok": True}, metadata={"filename": "demo.pdf"}
+        )
+        await worker_a.running_tasks[task_id]
+        return task_id, await worker_b.get_task_async(task_id)
+
+    task_id, task = asyncio.run(run())
+
+    assert task is not None
+    assert task.task_id == task_id
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result == {"ok": True}
+    assert task.metadata == {"filename": "demo.pdf"}
+    assert task.worker_id == "worker-a"
+
+
+def test_expired_lease_marks_task_failed(session_factory):
+    store = TaskStore(session_factory)
+    worker_a = _manager(store, "worker-a")
+    task_id = worker_a.create_task("pdf_to_pptx")
+    store.save(task_id, status="running", worker_id="worker-a", lease_seconds=60)
+
+    assert store.get(task_id)["status"] == "running"
+
+    # 模拟 worker-a 崩溃：不再续租，租约过期
+    _age_record(session_factory, task_id, seconds=120, lease_seconds=-1)
+
+    task = _manager(TaskStore(session_factory), "worker-b").get_task(task_id)
+    assert task.status == TaskStatus.FAILED
+    assert "worker-a" in task.error
+
+
+def test_cleanup_expired_removes_old_tasks(session_factory, tmp_path):
+    store = TaskStore(session_factory)
+    result_file = tmp_path / "result.pptx"
+    result_file.write_bytes(b"pptx")
+
+    old_id = "old-task"
+    store.save(old_id, task_type="pdf_to_pptx", status="completed", result_files=[str(result_file)])
+    store.append_items(old_id, ["script-0", "script-1"], start_seq=0)
+    _age_record(session_factory, old_id, seconds=7200)
+
+    recent_id = "recent-task"
+    store.save(recent_id, task_type="pdf_to_pptx", status="completed")
+    running_id = "running-task"
+    store.save(running_id, task_type="pdf_to_pptx", status="running", lease_seconds=60)
+    _age_record(session_factory, running_id, seconds=7200, lease_seconds=60)
+
+    assert store.get_items(old_id) == ["script-0", "script-1"]
+    assert store.cleanup_expired(max_age_seconds=3600) == 1
+
+    assert store.get(old_id) is None
+    assert store.get_items(old_id) == []
+    assert not result_file.exists()
+    assert store.get(recent_id)["status"] == "completed"
+    # 租约仍有效的执行中任务不会被清理
+    assert store.get(running_id)["status"] == "running"